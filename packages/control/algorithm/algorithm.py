@@ -2,12 +2,13 @@ import logging
 
 from control import counter
 from control import data
-from control.algorithm import common
+from control.algorithm import common, filter_chargepoints
 from control.algorithm.additional_current import AdditionalCurrent
 from control.algorithm.bidi_charging import Bidi
 from control.algorithm.min_current import MinCurrent
 from control.algorithm.no_current import NoCurrent
 from control.algorithm.surplus_controlled import SurplusControlled
+from helpermodules.cycle_profiler import cycle_profiler
 
 log = logging.getLogger(__name__)
 
@@ -26,31 +27,40 @@ class Algorithm:
         try:
             log.info("# Algorithmus")
             self.evu_counter = data.data.counter_all_data.get_evu_counter()
-            self._check_auto_phase_switch_delay()
-            self.surplus_controlled.check_submode_pv_charging()
-            common.reset_current()
-            for cp in data.data.cp_data.values():
-                cp.reset_values_before_algorithm()
+            filter_chargepoints.build_index()
+            with cycle_profiler.phase("algorithm/prepare"):
+                self._check_auto_phase_switch_delay()
+                self.surplus_controlled.check_submode_pv_charging()
+                common.reset_current()
+                for cp in data.data.cp_data.values():
+                    cp.reset_values_before_algorithm()
             log.info("**Mindestrom setzen**")
-            self.min_current.set_min_current()
+            with cycle_profiler.phase("algorithm/min_current"):
+                self.min_current.set_min_current()
             log.info("**Soll-Strom setzen**")
-            common.reset_current_to_target_current()
-            self.additional_current.set_additional_current()
-            self.surplus_controlled.set_required_current_to_max()
-            log.info("**PV-geführten Strom setzen**")
-            counter.limit_raw_power_left_to_surplus(self.evu_counter.calc_raw_surplus())
-            if self.evu_counter.data.set.surplus_power_left > 0:
+            with cycle_profiler.phase("algorithm/additional_current"):
                 common.reset_current_to_target_current()
-                self.surplus_controlled.set_surplus_current()
-            else:
-                log.info("Keine Leistung für PV-geführtes Laden übrig.")
+                self.additional_current.set_additional_current()
+                self.surplus_controlled.set_required_current_to_max()
+            log.info("**PV-geführten Strom setzen**")
+            with cycle_profiler.phase("algorithm/surplus"):
+                counter.limit_raw_power_left_to_surplus(self.evu_counter.calc_raw_surplus())
+                if self.evu_counter.data.set.surplus_power_left > 0:
+                    common.reset_current_to_target_current()
+                    self.surplus_controlled.set_surplus_current()
+                else:
+                    log.info("Keine Leistung für PV-geführtes Laden übrig.")
             log.info("**Bidi-(Ent-)Lade-Strom setzen**")
-            counter.set_raw_surplus_power_left()
-            self.bidi.set_bidi()
-            self.no_current.set_no_current()
-            self.no_current.set_none_current()
+            with cycle_profiler.phase("algorithm/bidi"):
+                counter.set_raw_surplus_power_left()
+                self.bidi.set_bidi()
+            with cycle_profiler.phase("algorithm/no_current"):
+                self.no_current.set_no_current()
+                self.no_current.set_none_current()
         except Exception:
             log.exception("Fehler im Algorithmus-Modul")
+        finally:
+            filter_chargepoints.clear_index()
 
     def _check_auto_phase_switch_delay(self) -> None:
         """ geht alle LP durch und prüft, ob eine Ladung aktiv ist, ob automatische Phasenumschaltung
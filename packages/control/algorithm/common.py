@@ -33,13 +33,14 @@ def reset_current_by_chargemode(modes: List[Tuple[Optional[str], str, bool]]) ->
 
 
 def mode_and_counter_generator(chargemodes: List) -> Iterable[Tuple[Tuple[Optional[str], str, bool], Counter]]:
+    # Zähler von der untersten Ebene der Hierarchie beginnend, die Hierarchie ändert sich im Algorithmus nicht.
+    counter_type = ComponentType.COUNTER.value
+    counters = [data.data.counter_data[f"counter{id}"]
+                for level in reversed(data.data.counter_all_data.get_hierarchy_index().levels)
+                for type, id in level if type == counter_type]
     for mode_tuple in chargemodes:
-        levels = data.data.counter_all_data.get_list_of_elements_per_level()
-        for level in reversed(levels):
-            for element in level:
-                if element["type"] == ComponentType.COUNTER.value:
-                    counter = data.data.counter_data[f"counter{element['id']}"]
-                    yield mode_tuple, counter
+        for counter in counters:
+            yield mode_tuple, counter
 
 
 # tested
@@ -1,6 +1,6 @@
 # tested
 import logging
-from typing import List, Optional, Tuple, Union
+from typing import Dict, FrozenSet, List, Optional, Tuple, Union
 
 from control import data
 from control.chargepoint.chargepoint import Chargepoint
@@ -8,12 +8,81 @@ from control.chargepoint.chargepoint import Chargepoint
 log = logging.getLogger(__name__)
 
 
+class ChargepointIndex:
+    """ Ladepunkte je (Lademodus, Submodus, Priorität) und Ladepunkt-Nummern je Zähler für einen Regelzyklus.
+
+    Lademodus, Submodus und Priorität werden beim Vorbereiten des Algorithmus gesetzt und ändern sich im Algorithmus
+    nicht. Der benötigte Strom wird im Algorithmus angepasst und daher bei jeder Abfrage geprüft.
+    """
+
+    def __init__(self, cp_data: Dict[str, Chargepoint]) -> None:
+        self.cp_data = cp_data
+        self.by_mode: Dict[Tuple, List[Chargepoint]] = {}
+        self.by_submode: Dict[Tuple, List[Chargepoint]] = {}
+        for cp in cp_data.values():
+            control_parameter = cp.data.control_parameter
+            self.by_mode.setdefault(
+                (control_parameter.chargemode, control_parameter.submode, control_parameter.prio), []).append(cp)
+            self.by_submode.setdefault((control_parameter.submode, control_parameter.prio), []).append(cp)
+        self._chargepoints_of_counter: Dict[str, FrozenSet[int]] = {}
+
+    def get_chargepoints_by_chargemode(self, modes: Tuple[Tuple[Optional[str], str, bool]]) -> List[Chargepoint]:
+        if len(modes) == 1:
+            return list(self._get_chargepoints_by_mode_tuple(modes[0]))
+        valid_chargepoints: Dict[Chargepoint, None] = {}
+        for mode_tuple in modes:
+            valid_chargepoints.update(dict.fromkeys(self._get_chargepoints_by_mode_tuple(mode_tuple)))
+        return list(valid_chargepoints)
+
+    def _get_chargepoints_by_mode_tuple(self, mode_tuple: Tuple[Optional[str], str, bool]) -> List[Chargepoint]:
+        mode, submode, prio = mode_tuple
+        if mode is None:
+            return self.by_submode.get((submode, prio), [])
+        return self.by_mode.get((mode, submode, prio), [])
+
+    def get_chargepoints_of_counter(self, counter: str) -> FrozenSet[int]:
+        try:
+            return self._chargepoints_of_counter[counter]
+        except KeyError:
+            cps_to_counter = data.data.counter_all_data.get_chargepoints_of_counter(counter)
+            cp_ids = self._chargepoints_of_counter[counter] = frozenset(int(cp[2:]) for cp in cps_to_counter)
+            return cp_ids
+
+
+_index: Optional[ChargepointIndex] = None
+
+
+def build_index() -> None:
+    """ erstellt den Index für den aktuellen Regelzyklus, nachdem die Ladepunkte für den Algorithmus vorbereitet
+    wurden."""
+    global _index
+    _index = ChargepointIndex(data.data.cp_data)
+
+
+def clear_index() -> None:
+    global _index
+    _index = None
+
+
+def _get_index() -> Optional[ChargepointIndex]:
+    # Wurden die Daten seit dem Erstellen des Index kopiert, darf der Index nicht mehr verwendet werden.
+    if _index is not None and _index.cp_data is data.data.cp_data:
+        return _index
+    return None
+
+
 def get_chargepoints_by_mode_and_counter(mode_tuple: Tuple[Optional[str], str, bool],
                                          counter: str) -> List[Chargepoint]:
-    cps_to_counter = data.data.counter_all_data.get_chargepoints_of_counter(counter)
-    cps_to_counter_ids = [int(cp[2:]) for cp in cps_to_counter]
+    index = _get_index()
+    if index is None:
+        cps_to_counter = data.data.counter_all_data.get_chargepoints_of_counter(counter)
+        cps_to_counter_ids = {int(cp[2:]) for cp in cps_to_counter}
+    else:
+        cps_to_counter_ids = index.get_chargepoints_of_counter(counter)
+        if not cps_to_counter_ids:
+            return []
     cps_by_mode = get_chargepoints_with_required_current_by_chargemode(mode_tuple)
-    return list(filter(lambda cp: cp.num in cps_to_counter_ids, cps_by_mode))
+    return [cp for cp in cps_by_mode if cp.num in cps_to_counter_ids]
 
 # tested
 
@@ -22,7 +91,10 @@ def get_chargepoints_by_chargemode(
         modes: Union[Tuple[Optional[str], str, bool],
                      Tuple[Tuple[Optional[str], str, bool]]]) -> List[Chargepoint]:
     modes = modes if isinstance(modes[0], Tuple) else (modes,)
-    valid_chargepoints: List[Chargepoint] = []
+    index = _get_index()
+    if index is not None:
+        return index.get_chargepoints_by_chargemode(modes)
+    valid_chargepoints: Dict[Chargepoint, None] = {}
 
     for mode_tuple in modes:
         mode = mode_tuple[0]
@@ -32,10 +104,9 @@ def get_chargepoints_by_chargemode(
         for cp in data.data.cp_data.values():
             if ((cp.data.control_parameter.prio == prio) and
                 (cp.data.control_parameter.chargemode == mode or mode is None) and
-                (cp.data.control_parameter.submode == submode) and
-                    cp not in valid_chargepoints):
-                valid_chargepoints.append(cp)
-    return valid_chargepoints
+                    (cp.data.control_parameter.submode == submode)):
+                valid_chargepoints[cp] = None
+    return list(valid_chargepoints)
 
 
 def get_chargepoints_with_required_current_by_chargemode(
@@ -74,41 +145,28 @@ def _get_preferenced_chargepoint(valid_chargepoints: List[Chargepoint]) -> List:
     niedrigste Ladepunktnummer.
     """
     preferenced_chargepoints = []
-    chargepoints = dict.fromkeys(valid_chargepoints)
     try:
-        # Bedingungen in der Reihenfolge, in der sie geprüft werden.
-        condition_types = ("min_current", "soc", "imported_since_plugged", "plug_in", "num")
-        # Bedingung, die geprüft wird (entspricht Index von condition_types)
+        # Werte der Bedingungen in der Reihenfolge, in der sie geprüft werden.
+        sort_keys = {cp: (cp.data.control_parameter.required_current,
+                          cp.data.set.charging_ev_data.data.get.soc or 0,
+                          cp.data.set.log.imported_since_plugged,
+                          cp.data.set.plug_time,
+                          cp.num) for cp in valid_chargepoints}
+        # Bedingung, die geprüft wird (entspricht Index in sort_keys)
         condition = 0
-        if chargepoints:
-            while len(chargepoints) > 0:
-                # entsprechend der Bedingung die Values im Dictionary füllen
-                if condition_types[condition] == "min_current":
-                    chargepoints.update(
-                        (cp, cp.data.control_parameter.required_current)
-                        for cp in chargepoints.keys())
-                elif condition_types[condition] == "soc":
-                    chargepoints.update(
-                        (cp, cp.data.set.charging_ev_data.data.get.soc or 0) for cp in chargepoints.keys())
-                elif condition_types[condition] == "plug_in":
-                    chargepoints.update((cp, cp.data.set.plug_time)
-                                        for cp in chargepoints.keys())
-                elif condition_types[condition] == "imported_since_plugged":
-                    chargepoints.update((cp, cp.data.set.log.imported_since_plugged) for cp in chargepoints.keys())
-                else:
-                    chargepoints.update((cp, cp.num) for cp in chargepoints.keys())
-
-                # kleinsten Value im Dictionary ermitteln
-                extreme_value = min(chargepoints.values())
-                # dazugehörige Keys ermitteln
-                extreme_cp = [
-                    key for key in chargepoints if chargepoints[key] == extreme_value]
-                if len(extreme_cp) > 1:
-                    # Wenn es mehrere LP gibt, die den gleichen Minimalwert haben, nächste Bedingung prüfen.
-                    condition += 1
-                else:
-                    preferenced_chargepoints.append(extreme_cp[0])
-                    chargepoints.pop(extreme_cp[0])
+        chargepoints = sorted(sort_keys, key=lambda cp: sort_keys[cp][condition])
+        first = 0
+        while first < len(chargepoints):
+            if (first + 1 < len(chargepoints) and
+                    sort_keys[chargepoints[first]][condition] == sort_keys[chargepoints[first + 1]][condition]):
+                # Wenn es mehrere LP gibt, die den gleichen Minimalwert haben, für die verbleibenden LP die nächste
+                # Bedingung prüfen.
+                condition += 1
+                chargepoints = sorted(chargepoints[first:], key=lambda cp: sort_keys[cp][condition])
+                first = 0
+            else:
+                preferenced_chargepoints.append(chargepoints[first])
+                first += 1
         if preferenced_chargepoints:
             log.debug(f"Geordnete Ladepunkte {[cp.num for cp in preferenced_chargepoints]}")
         return preferenced_chargepoints
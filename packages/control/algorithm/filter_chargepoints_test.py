@@ -163,3 +163,56 @@ def test_get_chargepoints_by_mode_and_counter(chargepoints_of_counter: List[str]
 
     # assertion
     assert valid_chargepoints == expected_chargepoints
+
+
+def test_index_matches_scan(monkeypatch):
+    # setup
+    modes = ((Chargemode.SCHEDULED_CHARGING, Chargemode.INSTANT_CHARGING, True),
+             (None, Chargemode.PV_CHARGING, False),
+             (Chargemode.INSTANT_CHARGING, Chargemode.INSTANT_CHARGING, False))
+    cp_modes = [modes[0], (Chargemode.ECO_CHARGING, Chargemode.PV_CHARGING, False), modes[2],
+                (Chargemode.PV_CHARGING, Chargemode.PV_CHARGING, False), modes[0]]
+    data.data.cp_data = {}
+    for num, mode_tuple in enumerate(cp_modes, start=1):
+        cp = Chargepoint(num, None)
+        cp.data.control_parameter.chargemode, cp.data.control_parameter.submode, cp.data.control_parameter.prio = (
+            mode_tuple)
+        cp.data.control_parameter.required_current = 6
+        data.data.cp_data[f"cp{num}"] = cp
+    monkeypatch.setattr(CounterAll, "get_chargepoints_of_counter", Mock(return_value=["cp1", "cp2", "cp4"]))
+    data.data.counter_all_data = CounterAll()
+    expected = filter_chargepoints.get_chargepoints_by_chargemode(modes)
+
+    # execution
+    filter_chargepoints.build_index()
+    try:
+        # der benötigte Strom wird im Algorithmus geändert
+        data.data.cp_data["cp4"].data.control_parameter.required_current = 0
+        by_chargemode = filter_chargepoints.get_chargepoints_by_chargemode(modes)
+        by_mode_and_counter = filter_chargepoints.get_chargepoints_by_mode_and_counter(modes[1], "counter0")
+    finally:
+        filter_chargepoints.clear_index()
+
+    # evaluation
+    assert [cp.num for cp in expected] == [1, 5, 2, 4, 3]
+    assert by_chargemode == expected
+    assert [cp.num for cp in by_mode_and_counter] == [2]
+
+
+def test_index_not_used_after_copy():
+    # setup
+    cp = Chargepoint(1, None)
+    data.data.cp_data = {"cp1": cp}
+    filter_chargepoints.build_index()
+    copied_cp = Chargepoint(1, None)
+    data.data.cp_data = {"cp1": copied_cp}
+
+    # execution
+    try:
+        valid_chargepoints = filter_chargepoints.get_chargepoints_by_chargemode(
+            (Chargemode.STOP, Chargemode.STOP, False))
+    finally:
+        filter_chargepoints.clear_index()
+
+    # evaluation
+    assert valid_chargepoints == [copied_cp]
@@ -1,17 +1,16 @@
-from helpermodules.utils.json_file_handler import write_and_check
 from helpermodules import timecheck
 import copy
 import datetime
 from enum import Enum
-import json
 import logging
-import os
-import pathlib
 from typing import Any, Dict, List, Optional, Tuple
 
 from control import data
+from control.chargelog.chargelog_store import charge_log_store
+from control.chargelog.energy_cost_accumulator import energy_cost_accumulator
 from helpermodules.measurement_logging.process_log import (
     FILE_ERRORS, CalculationType, _analyse_energy_source, _process_entries, get_totals)
+from helpermodules.measurement_logging.write_log import LogType, get_log_content
 
 # alte Daten: Startzeitpunkt der Ladung, Endzeitpunkt, Geladene Reichweite, Energie, Leistung, Ladedauer, LP-Nummer,
 # Lademodus, ID-Tag
@@ -301,27 +300,8 @@ def _create_entry(chargepoint, charging_ev):
 
 
 def write_new_entry(new_entry):
-    # json-Objekt in Datei einfügen
-    (_get_parent_file() / "data"/"charge_log").mkdir(mode=0o755, parents=True, exist_ok=True)
-    filepath = str(_get_parent_file() / "data" / "charge_log" /
-                   (timecheck.create_timestamp_YYYYMM() + ".json"))
-    try:
-        if os.path.exists(filepath) and os.path.getsize(filepath) == 0:
-            content = []
-        else:
-            with open(filepath, "r", encoding="utf-8") as json_file:
-                try:
-                    content = json.load(json_file)
-                except json.decoder.JSONDecodeError:
-                    corrupt_path = f"{filepath}.unparsable_{timecheck.create_timestamp()}"
-                    os.rename(filepath, corrupt_path)
-                    log.error(f"ChargeLog: Korrupte Datei umbenannt nach {corrupt_path}")
-                    content = []
-    except FileNotFoundError:
-        content = []
-    content.append(new_entry)
-    write_and_check(filepath, content)
-    log.debug(f"Neuer Ladelog-Eintrag: {new_entry}")
+    # json-Objekt an die Datei des Monats anhängen
+    charge_log_store.append(new_entry)
 
 
 def calc_energy_costs(cp, create_log_entry: bool = False):
@@ -397,6 +377,14 @@ def _get_reference_position(cp, create_log_entry: bool) -> ReferenceTime:
 
 
 def _get_reference_entries(cp) -> Tuple[List[Dict], List]:
+    reference = energy_cost_accumulator.get_reference()
+    if reference is not None:
+        return reference
+    # Die Bezugsdaten wurden seit dem letzten Log-Eintrag nicht aufbereitet (zB nach einem Neustart am Tageswechsel).
+    return _read_reference_entries(cp)
+
+
+def _read_reference_entries(cp) -> Tuple[List[Dict], List]:
     processed_entries = {}
     reference_entries = []
     try:
@@ -425,10 +413,8 @@ def get_todays_daily_log():
 
 
 def get_daily_log(day):
-    filepath = str(_get_parent_file() / "data" / "daily_log" / f"{day}.json")
     try:
-        with open(filepath, "r", encoding="utf-8") as json_file:
-            return json.load(json_file)
+        return get_log_content(LogType.DAILY, day)
     except FILE_ERRORS:
         return []
 
@@ -470,7 +456,3 @@ def get_relative_energy_source(absolut_energy_source: Dict[str, float]) -> Dict[
                 if source in absolute_source:
                     relative_energy_source[source] = value / absolut_energy_source["energy_imported"]
     return relative_energy_source
-
-
-def _get_parent_file() -> pathlib.Path:
-    return pathlib.Path(__file__).resolve().parents[3]
@@ -0,0 +1,202 @@
+""" Ablage des Ladeprotokolls.
+
+Das Ladeprotokoll wird weiterhin als JSON-Liste je Monat in data/charge_log/YYYYMM.json gespeichert, damit
+bestehende Dateien, der CSV-Export, die Sicherung und die Datenübernahme unverändert funktionieren. Neue Einträge
+werden vor der schließenden Klammer angehängt, ohne die bisherigen Einträge neu zu schreiben.
+
+Für die Abfrage der Einträge eines Monats wird ein Index nach Ladepunkt, Fahrzeug, ID-Tag und Tag aufgebaut und
+zwischengespeichert. Wird die Datei außerhalb der Ablage geändert (zB Wiederherstellen einer Sicherung), wird der Index
+beim nächsten Zugriff neu aufgebaut.
+"""
+from collections import OrderedDict
+import datetime
+import json
+import logging
+import os
+import pathlib
+import threading
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Set, Tuple
+
+from helpermodules import timecheck
+
+log = logging.getLogger("chargelog")
+
+# Anzahl der Monate, deren Index im Speicher gehalten wird
+CACHED_MONTHS = 24
+BEGIN_FORMAT = "%m/%d/%Y, %H:%M:%S"
+
+
+def _get_day(entry: Dict) -> Optional[int]:
+    try:
+        return datetime.datetime.strptime(entry["time"]["begin"], BEGIN_FORMAT).day
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class MonthIndex:
+    """ Einträge eines Monats mit Index je Filterkriterium. Die Indizes enthalten die Positionen der Einträge."""
+
+    def __init__(self, entries: List[Dict], signature: Tuple[int, int]) -> None:
+        self.entries: List[Dict] = []
+        self.chargepoint: Dict[Any, List[int]] = {}
+        self.vehicle: Dict[Any, List[int]] = {}
+        self.tag: Dict[Any, List[int]] = {}
+        self.day: Dict[Optional[int], List[int]] = {}
+        self.signature = signature
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry: Dict) -> None:
+        position = len(self.entries)
+        self.entries.append(entry)
+        if len(entry) == 0:
+            return
+        chargepoint, vehicle = entry.get("chargepoint", {}), entry.get("vehicle", {})
+        self.chargepoint.setdefault(chargepoint.get("id"), []).append(position)
+        self.vehicle.setdefault(vehicle.get("id"), []).append(position)
+        self.tag.setdefault(vehicle.get("rfid"), []).append(position)
+        self.day.setdefault(_get_day(entry), []).append(position)
+
+    def query(self, filter: Dict) -> List[Dict]:
+        """ Einträge, die zum Filter des Ladeprotokolls passen (siehe process_chargelog.get_log_data), in der
+        Reihenfolge der Datei"""
+        chargepoint_filter = filter.get("chargepoint", {})
+        vehicle_filter = filter.get("vehicle", {})
+        candidates: Optional[Set[int]] = None
+        for index, values in ((self.chargepoint, chargepoint_filter.get("id")),
+                              (self.vehicle, vehicle_filter.get("id")),
+                              (self.tag, vehicle_filter.get("tag")),
+                              (self.day, filter.get("date", {}).get("day"))):
+            if values:
+                positions = self._lookup(index, values)
+                candidates = positions if candidates is None else candidates & positions
+                if not candidates:
+                    return []
+        if candidates is None:
+            candidates = set(range(len(self.entries)))
+        chargemodes = vehicle_filter.get("chargemode")
+        entries = []
+        for position in sorted(candidates):
+            entry = self.entries[position]
+            if len(entry) == 0:
+                continue
+            if chargemodes and entry["vehicle"]["chargemode"] not in chargemodes:
+                continue
+            if "prio" in vehicle_filter and vehicle_filter["prio"] is not entry["vehicle"]["prio"]:
+                continue
+            entries.append(entry)
+        return entries
+
+    @staticmethod
+    def _lookup(index: Dict[Any, List[int]], values: Iterable) -> Set[int]:
+        positions: Set[int] = set()
+        for value in values:
+            positions.update(index.get(value, ()))
+        return positions
+
+
+class ChargeLogStore:
+    def __init__(self, path: pathlib.Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._months: "OrderedDict[str, MonthIndex]" = OrderedDict()
+
+    def append(self, entry: Dict) -> None:
+        """ hängt den Eintrag an die Datei des aktuellen Monats an."""
+        self.path.mkdir(mode=0o755, parents=True, exist_ok=True)
+        month = timecheck.create_timestamp_YYYYMM()
+        filepath = self._get_filepath(month)
+        with self._lock:
+            index = self._months.get(month)
+            if index is not None and (not filepath.exists() or index.signature != self._get_signature(filepath)):
+                # Die Datei wurde außerhalb der Ablage geändert.
+                del self._months[month]
+                index = None
+            encoded = json.dumps(entry).encode("utf-8")
+            if not self._append_to_list(filepath, encoded):
+                with open(filepath, "wb") as file:
+                    file.write(b"[" + encoded + b"]")
+                    file.flush()
+                    os.fsync(file.fileno())
+            if index is not None:
+                # Der Eintrag wird über json kopiert, damit spätere Änderungen am Objekt nicht in den Index gelangen.
+                index.add(json.loads(encoded))
+                index.signature = self._get_signature(filepath)
+        log.debug(f"Neuer Ladelog-Eintrag: {entry}")
+
+    def query(self, year: str, month: str, filter: Dict) -> Optional[List[Dict]]:
+        """ Return: gefilterte Einträge des Monats, None, wenn es für den Monat kein Ladeprotokoll gibt"""
+        index = self._get_month(f"{year}{month}")
+        return None if index is None else index.query(filter)
+
+    def _get_filepath(self, month: str) -> pathlib.Path:
+        return self.path / f"{month}.json"
+
+    @staticmethod
+    def _get_signature(filepath: pathlib.Path) -> Tuple[int, int]:
+        stat = filepath.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def _get_month(self, month: str) -> Optional[MonthIndex]:
+        filepath = self._get_filepath(month)
+        with self._lock:
+            try:
+                signature = self._get_signature(filepath)
+            except FileNotFoundError:
+                self._months.pop(month, None)
+                return None
+            index = self._months.get(month)
+            if index is None or index.signature != signature:
+                with open(filepath, "r", encoding="utf-8") as json_file:
+                    index = MonthIndex(json.load(json_file), signature)
+                self._months[month] = index
+            self._months.move_to_end(month)
+            while len(self._months) > CACHED_MONTHS:
+                self._months.popitem(last=False)
+            return index
+
+    @staticmethod
+    def _append_to_list(filepath: pathlib.Path, encoded: bytes) -> bool:
+        """ fügt den Eintrag vor der schließenden Klammer der JSON-Liste ein.
+
+        Return
+        ------
+        False, wenn die Datei nicht existiert, leer oder beschädigt ist und neu angelegt werden muss.
+        """
+        try:
+            with open(filepath, "r+b") as file:
+                position, last = _find_last_character(file, file.seek(0, os.SEEK_END))
+                previous = _find_last_character(file, position)[1] if last == b"]" else b""
+                if previous == b"":
+                    if last:
+                        corrupt_path = f"{filepath}.unparsable_{timecheck.create_timestamp()}"
+                        os.rename(filepath, corrupt_path)
+                        log.error(f"ChargeLog: Korrupte Datei umbenannt nach {corrupt_path}")
+                    return False
+                file.seek(position)
+                file.write((b"" if previous == b"[" else b", ") + encoded + b"]")
+                file.truncate()
+                file.flush()
+                os.fsync(file.fileno())
+                return True
+        except FileNotFoundError:
+            return False
+
+
+def _find_last_character(file: BinaryIO, end: int) -> Tuple[int, bytes]:
+    """ Position und Wert des letzten Zeichens vor end, das kein Leerzeichen oder Zeilenumbruch ist"""
+    while end > 0:
+        start = max(end - 64, 0)
+        file.seek(start)
+        chunk = file.read(end - start).rstrip()
+        if chunk:
+            return start + len(chunk) - 1, chunk[-1:]
+        end = start
+    return -1, b""
+
+
+def _get_parent_file() -> pathlib.Path:
+    return pathlib.Path(__file__).resolve().parents[3]
+
+
+charge_log_store = ChargeLogStore(_get_parent_file() / "data" / "charge_log")
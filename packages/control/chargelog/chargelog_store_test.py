@@ -0,0 +1,108 @@
+import json
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from control.chargelog import chargelog_store, process_chargelog
+from control.chargelog.chargelog_store import ChargeLogStore
+
+
+def entry(cp: int, ev: int, rfid: Optional[str], day: int, chargemode: str = "instant_charging",
+          prio: bool = False) -> dict:
+    return {"chargepoint": {"id": cp, "name": f"LP {cp}"},
+            "vehicle": {"id": ev, "name": f"EV {ev}", "chargemode": chargemode, "prio": prio, "rfid": rfid},
+            "time": {"begin": f"01/{day:02d}/2024, 15:00:00", "end": f"01/{day:02d}/2024, 16:00:00",
+                     "time_charged": "1:00"},
+            "data": {"range_charged": 10, "imported_since_mode_switch": 1000, "power": 1000, "costs": 0.3}}
+
+
+@pytest.fixture
+def store(tmp_path: Path, monkeypatch) -> ChargeLogStore:
+    monkeypatch.setattr(chargelog_store.timecheck, "create_timestamp_YYYYMM", lambda: "202401")
+    return ChargeLogStore(tmp_path)
+
+
+@pytest.mark.parametrize("content", [pytest.param(None, id="neue Datei"),
+                                     pytest.param("", id="leere Datei"),
+                                     pytest.param("[]\n", id="leere Liste")])
+def test_append_new_month(content, store: ChargeLogStore, tmp_path: Path):
+    # setup
+    if content is not None:
+        (tmp_path / "202401.json").write_text(content)
+
+    # execution
+    store.append(entry(1, 1, None, 1))
+    store.append(entry(2, 1, None, 2))
+
+    # evaluation
+    assert json.loads((tmp_path / "202401.json").read_text()) == [entry(1, 1, None, 1), entry(2, 1, None, 2)]
+
+
+def test_append_keeps_existing_entries(store: ChargeLogStore, tmp_path: Path):
+    # setup
+    filepath = tmp_path / "202401.json"
+    existing = [entry(1, 1, None, 1), {}]
+    filepath.write_text(json.dumps(existing))
+    history = filepath.read_bytes()[:-1]
+
+    # execution
+    store.append(entry(2, 1, None, 2))
+
+    # evaluation
+    assert filepath.read_bytes().startswith(history)
+    assert json.loads(filepath.read_text()) == existing + [entry(2, 1, None, 2)]
+
+
+def test_corrupt_file_renamed(store: ChargeLogStore, tmp_path: Path):
+    # setup
+    (tmp_path / "202401.json").write_text('[{"chargepoint": ')
+
+    # execution
+    store.append(entry(1, 1, None, 1))
+
+    # evaluation
+    assert json.loads((tmp_path / "202401.json").read_text()) == [entry(1, 1, None, 1)]
+    assert len(list(tmp_path.glob("202401.json.unparsable_*"))) == 1
+
+
+@pytest.mark.parametrize("filter, expected", [
+    pytest.param({"chargepoint": {"id": [1]}, "vehicle": {}}, [0, 2, 4], id="Ladepunkt"),
+    pytest.param({"chargepoint": {"id": []}, "vehicle": {"id": [2], "tag": ["1234"]}}, [3, 4], id="Fahrzeug und Tag"),
+    pytest.param({"chargepoint": {}, "vehicle": {"chargemode": ["pv_charging"], "prio": True}}, [4],
+                 id="Lademodus und Priorität"),
+    pytest.param({"chargepoint": {"id": [1]}, "vehicle": {}, "date": {"day": [2, 3]}}, [2], id="Tag"),
+    pytest.param({"chargepoint": {"id": [3]}, "vehicle": {}}, [], id="kein Treffer"),
+])
+def test_query(filter, expected, store: ChargeLogStore):
+    # setup
+    entries = [entry(1, 1, None, 1), entry(2, 1, "1234", 1), entry(1, 2, None, 2), entry(2, 2, "1234", 3),
+               entry(1, 2, "1234", 4, "pv_charging", True)]
+    for e in entries:
+        store.append(e)
+
+    # execution
+    result = store.query("2024", "01", filter)
+
+    # evaluation
+    assert result == [entries[i] for i in expected]
+
+
+def test_index_rebuilt_after_external_change(store: ChargeLogStore, tmp_path: Path, monkeypatch):
+    # setup
+    monkeypatch.setattr(process_chargelog, "charge_log_store", store)
+    store.append(entry(1, 1, None, 1))
+    request = {"year": 2024, "month": "01", "filter": {"chargepoint": {"id": [1]}, "vehicle": {}}}
+    first = process_chargelog.get_log_data(request)
+
+    # execution
+    # zB Wiederherstellen einer Sicherung
+    (tmp_path / "202401.json").write_text(json.dumps([entry(1, 1, None, 1), entry(1, 2, None, 2)]))
+    store.append(entry(1, 3, None, 3))
+    second = process_chargelog.get_log_data(request)
+
+    # evaluation
+    assert len(first["entries"]) == 1
+    assert [e["vehicle"]["id"] for e in second["entries"]] == [1, 2, 3]
+    assert second["totals"]["imported_since_mode_switch"] == 3000
+    assert process_chargelog.get_log_data({**request, "month": "02"}) == {"entries": [], "totals": {}}
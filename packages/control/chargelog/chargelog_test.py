@@ -5,8 +5,9 @@ from unittest.mock import Mock, mock_open, patch
 import pytest
 
 from control import data
-from control.chargelog import chargelog
+from control.chargelog import chargelog, energy_cost_accumulator
 from control.chargelog.chargelog import calc_energy_costs
+from control.chargelog.energy_cost_accumulator import EnergyCostAccumulator
 from control.chargepoint.chargepoint import Chargepoint
 
 
@@ -149,3 +150,50 @@ def test_calc_charge_cost_reference_middle_day_change(mock_data, monkeypatch):
     assert cp.data.set.log.charged_energy_by_source == {
         'grid': 1242.8, 'pv': 385.8, 'bat': 671.4, 'cp': 0.0}
     assert round(cp.data.set.log.costs, 5) == 0.5
+
+
+@pytest.mark.parametrize("create_log_entry, imported, charged_energy_by_source, expected_energy, expected_costs", [
+    pytest.param(False, 4050, {'bat': 100, 'cp': 0, 'grid': 100, 'pv': 100},
+                 {'grid': 1242.8, 'pv': 385.8, 'bat': 671.4, 'cp': 0.0}, 0.5, id="Zwischenergebnis"),
+    pytest.param(True, 4100, {'grid': 1243, 'pv': 386, 'bat': 671, 'cp': 0.0},
+                 {'bat': 699.57, 'cp': 0.0, 'grid': 1300.14, 'pv': 400.29}, 0.025, id="Ende"),
+])
+def test_calc_charge_cost_from_accumulator(create_log_entry, imported, charged_energy_by_source, expected_energy,
+                                           expected_costs, mock_data, monkeypatch, tmp_path):
+    # setup
+    daily_log = mock_daily_log(monkeypatch)
+    monkeypatch.setattr(chargelog.timecheck, "create_timestamp", Mock(return_value=1652683230))
+    accumulator = EnergyCostAccumulator(tmp_path / "energy_costs.json")
+    accumulator.update(daily_log["entries"])
+    # nach einem Neustart werden die Bezugsdaten aus dem Checkpoint geladen
+    monkeypatch.setattr(chargelog, "energy_cost_accumulator", EnergyCostAccumulator(tmp_path / "energy_costs.json"))
+    cp = Chargepoint(4, None)
+    cp.data.set.log.imported_since_plugged = cp.data.set.log.imported_since_mode_switch = 3950
+    cp.data.set.log.timestamp_mode_switch = 1652682600  # 8:30
+    cp.data.get.imported = imported
+    cp.data.set.log.charged_energy_by_source = charged_energy_by_source
+
+    # execution
+    calc_energy_costs(cp, create_log_entry)
+
+    # evaluation
+    # das Tages-Log wird nicht eingelesen
+    chargelog.get_todays_daily_log.assert_not_called()
+    assert cp.data.set.log.charged_energy_by_source == expected_energy
+    assert round(cp.data.set.log.costs, 5) == expected_costs
+
+
+def test_accumulator_day_change(monkeypatch, tmp_path):
+    # setup
+    daily_log = mock_daily_log(monkeypatch)
+    monkeypatch.setattr(energy_cost_accumulator.timecheck, "create_timestamp", Mock(return_value=1652683230))
+    accumulator = EnergyCostAccumulator(tmp_path / "energy_costs.json")
+    accumulator.update(daily_log["entries"][:1])
+
+    # execution
+    accumulator.update(daily_log["entries"][1:])
+
+    # evaluation
+    processed_entries, reference_entries = accumulator.get_reference()
+    assert [entry["timestamp"] for entry in reference_entries] == [1652682900, 1652683200]
+    assert processed_entries["totals"]["cp"]["cp4"]["energy_imported"] == 2000
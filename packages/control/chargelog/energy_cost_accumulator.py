@@ -0,0 +1,104 @@
+""" Bezugsdaten für die Berechnung der Ladekosten.
+
+Die Ladekosten werden alle 5 Minuten für jeden Ladepunkt aus den beiden letzten Einträgen des Tages-Logs berechnet.
+Die Aufbereitung der Einträge (Differenzen, Summen, Strom-Mix) ist für alle Ladepunkte gleich und wird daher einmal
+je Log-Eintrag durchgeführt, wenn der Eintrag geschrieben wurde. Die Ladepunkte verwenden das Ergebnis, ohne das
+Tages-Log erneut einzulesen. Die laufenden Kosten und Energiemengen je Ladevorgang liegen weiterhin im Log-Datensatz
+des Ladepunkts (chargepoint.data.set.log).
+
+Das Ergebnis wird in einem kleinen Checkpoint gespeichert, damit es nach einem Neustart bis zum nächsten Log-Eintrag
+weiter verwendet werden kann.
+"""
+import copy
+import json
+import logging
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from helpermodules import timecheck
+from helpermodules.measurement_logging.process_log import (
+    FILE_ERRORS, CalculationType, _analyse_energy_source, _process_entries, get_totals)
+from helpermodules.utils.json_file_handler import write_and_check
+
+log = logging.getLogger("chargelog")
+
+# Die Bezugsdaten gelten bis zum nächsten Log-Eintrag. Sind sie älter, fehlt ein Log-Eintrag und die Bezugsdaten
+# werden aus dem Tages-Log ermittelt.
+MAX_AGE = 600
+
+
+class EnergyCostAccumulator:
+    def __init__(self, checkpoint_path: Path) -> None:
+        self.checkpoint_path = checkpoint_path
+        # aufbereitete Einträge (nur die Summen der Ladepunkte) und die beiden letzten Einträge (nur Ladepunkte und
+        # Preise), wie sie chargelog._get_reference_entries liefert
+        self.processed_entries: Optional[Dict] = None
+        self.reference_entries: Optional[List[Dict]] = None
+        self._last_entry: Optional[Dict] = None
+        self._lock = Lock()
+        self._load_checkpoint()
+
+    def update(self, entries: Optional[List[Dict]]) -> None:
+        """ bereitet die beiden letzten Einträge des Tages-Logs auf. Wird nach jedem Eintrag ins Tages-Log mit den
+        Einträgen des Tages aufgerufen.
+        """
+        try:
+            with self._lock:
+                self.processed_entries, self.reference_entries = None, None
+                if not entries:
+                    return
+                last_entry, self._last_entry = self._last_entry, copy.deepcopy(entries[-1])
+                if len(entries) >= 2:
+                    reference_entries = copy.deepcopy(entries[-2:])
+                elif last_entry is not None and last_entry["timestamp"] < entries[-1]["timestamp"]:
+                    # Tageswechsel: letzter Eintrag des Vortags
+                    reference_entries = [last_entry, copy.deepcopy(entries[-1])]
+                else:
+                    return
+                processed_entries = {"entries": _process_entries(copy.deepcopy(reference_entries),
+                                                                 CalculationType.ENERGY),
+                                     "names": {}}
+                processed_entries["totals"] = get_totals(processed_entries["entries"], False)
+                processed_entries = _analyse_energy_source(processed_entries)
+                self.processed_entries = {"totals": {"cp": processed_entries["totals"]["cp"]}}
+                self.reference_entries = [{key: entry[key] for key in ("timestamp", "cp", "prices") if key in entry}
+                                          for entry in reference_entries]
+                self._write_checkpoint()
+        except Exception:
+            log.exception("Fehler beim Aufbereiten der Log-Einträge für die Ladekosten")
+
+    def get_reference(self) -> Optional[Tuple[Dict, List[Dict]]]:
+        """ Return: aufbereitete Einträge und die beiden letzten Einträge des Tages-Logs, None, wenn keine aktuellen
+        Bezugsdaten vorliegen"""
+        with self._lock:
+            if (self.reference_entries is None or
+                    timecheck.create_timestamp() - self.reference_entries[-1]["timestamp"] > MAX_AGE):
+                return None
+            return self.processed_entries, self.reference_entries
+
+    def _write_checkpoint(self) -> None:
+        try:
+            self.checkpoint_path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+            write_and_check(str(self.checkpoint_path), {"processed_entries": self.processed_entries,
+                                                        "reference_entries": self.reference_entries})
+        except Exception:
+            log.exception("Fehler beim Speichern der Bezugsdaten für die Ladekosten")
+
+    def _load_checkpoint(self) -> None:
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as file:
+                checkpoint = json.load(file)
+            self.processed_entries = checkpoint["processed_entries"]
+            self.reference_entries = checkpoint["reference_entries"]
+        except FILE_ERRORS:
+            pass
+        except Exception:
+            log.exception("Fehler beim Laden der Bezugsdaten für die Ladekosten")
+
+
+def _get_checkpoint_path() -> Path:
+    return Path(__file__).resolve().parents[3] / "data" / "log_store" / "energy_costs.json"
+
+
+energy_cost_accumulator = EnergyCostAccumulator(_get_checkpoint_path())
@@ -1,7 +1,7 @@
 """Zähler-Logik
 """
 import copy
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 import logging
 import re
 from typing import Callable, Dict, List, Optional, Tuple, Union
@@ -69,15 +69,105 @@ class CounterAllData:
     set: Set = field(default_factory=set_factory)
 
 
+@dataclass(frozen=True)
+class HierarchyIndex:
+    """Index der Hierarchie, damit Einträge, Eltern und Zweige nicht bei jeder Abfrage rekursiv gesucht werden müssen.
+    Der Index wird nicht verändert, sondern bei Änderung der Hierarchie neu erstellt. Einträge werden über ihren Pfad
+    (Position in der obersten Ebene, dann in den Kindern) referenziert, damit eine Kopie der Daten den Index nicht
+    kopieren muss.
+    """
+    hierarchy: List
+    # id: Pfad des Eintrags, zuerst die oberste Ebene, dann die Zweige unterhalb des EVU-Zählers
+    elements: Dict[int, Tuple[int, ...]]
+    # id: Pfad des übergeordneten Elements, nur für Elemente unterhalb des EVU-Zählers
+    parents: Dict[int, Tuple[int, ...]]
+    # id: Zähler im Zweig des Elements, beginnend beim direkt übergeordneten
+    counters_in_branch: Dict[int, Tuple[str, ...]]
+    # id: Ladepunkte in den folgenden Zweigen des Elements
+    chargepoints_below: Dict[int, Tuple[str, ...]]
+    # id: Pfade der Elemente, die zur Berechnung der Werte aus den untergeordneten Komponenten benötigt werden
+    downstream_elements: Dict[int, Tuple[Tuple[int, ...], ...]]
+    # je Ebene Typ und id der Elemente
+    levels: Tuple[Tuple[Tuple[str, int], ...], ...]
+
+    def get_entry(self, path: Tuple[int, ...]) -> Dict:
+        return _get_entry_by_path(self.hierarchy, path)
+
+    def __deepcopy__(self, memo: Dict) -> "HierarchyIndex":
+        # Nur die Hierarchie muss kopiert werden, alle anderen Werte sind unveränderlich.
+        return replace(self, hierarchy=copy.deepcopy(self.hierarchy, memo))
+
+
+def _get_entry_by_path(hierarchy: List, path: Tuple[int, ...]) -> Dict:
+    entry = hierarchy[path[0]]
+    for position in path[1:]:
+        entry = entry["children"][position]
+    return entry
+
+
+def build_hierarchy_index(hierarchy: List) -> HierarchyIndex:
+    elements: Dict[int, Tuple[int, ...]] = {}
+    parents: Dict[int, Tuple[int, ...]] = {}
+    counters_in_branch: Dict[int, Tuple[str, ...]] = {}
+    chargepoints_below: Dict[int, Tuple[str, ...]] = {}
+    levels: List[List[Tuple[str, int]]] = []
+
+    def add_level(entry: Dict, depth: int) -> None:
+        if len(levels) == depth:
+            levels.append([])
+        levels[depth].append((entry["type"], entry["id"]))
+        for child in entry["children"]:
+            add_level(child, depth + 1)
+
+    def add_branch(entry: Dict, path: Tuple[int, ...], counters: Tuple[str, ...]) -> Tuple[str, ...]:
+        counters = (f"counter{entry['id']}",) + counters
+        chargepoints: List[str] = []
+        for position, child in enumerate(entry["children"]):
+            elements.setdefault(child["id"], path + (position,))
+            parents[child["id"]] = path
+            counters_in_branch[child["id"]] = counters
+            chargepoints_of_child = add_branch(child, path + (position,), counters)
+            if child["type"] == ComponentType.CHARGEPOINT.value:
+                chargepoints.append(f"cp{child['id']}")
+            else:
+                chargepoints.extend(chargepoints_of_child)
+        chargepoints_below[entry["id"]] = tuple(chargepoints)
+        return chargepoints_below[entry["id"]]
+
+    for position, item in enumerate(hierarchy):
+        elements.setdefault(item["id"], (position,))
+        add_level(item, 0)
+    if hierarchy:
+        add_branch(hierarchy[0], (0,), ())
+
+    def get_downstream_elements(path: Tuple[int, ...]) -> Tuple[Tuple[int, ...], ...]:
+        children = _get_entry_by_path(hierarchy, path)["children"]
+        downstream_elements = [path + (position,) for position in range(len(children))]
+        for element in children:
+            if element["type"] == ComponentType.INVERTER.value:
+                # Speicher am Hybrid-Wechselrichter
+                inverter_path = elements[element["id"]]
+                inverter_children = _get_entry_by_path(hierarchy, inverter_path)["children"]
+                downstream_elements.extend(inverter_path + (position,)
+                                           for position, child in enumerate(inverter_children)
+                                           if child["type"] == ComponentType.BAT.value)
+        return tuple(downstream_elements)
+
+    return HierarchyIndex(hierarchy=hierarchy,
+                          elements=elements,
+                          parents=parents,
+                          counters_in_branch=counters_in_branch,
+                          chargepoints_below=chargepoints_below,
+                          downstream_elements={id: get_downstream_elements(path) for id, path in elements.items()},
+                          levels=tuple(tuple(level) for level in levels))
+
+
 class CounterAll:
     MISSING_EVU_COUNTER = "Bitte erst einen EVU-Zähler konfigurieren."
 
     def __init__(self):
         self.data = CounterAllData()
-        # Hilfsvariablen für die rekursiven Funktionen
-        self.connected_counters = []
-        self.connected_chargepoints = []
-        self.childless = []
+        self._hierarchy_index: Optional[HierarchyIndex] = None
         self.sim_counter = SimCounter("", "", prefix="bezug")
         self.sim_counter.topic = "openWB/set/counter/set/"
 
@@ -174,95 +264,69 @@ class CounterAll:
         evu = data.data.counter_data[f"counter{id_source}"].data.get.power
         return evu - power - self.data.set.smarthome_power_excluded_from_home_consumption, elements_to_sum_up
 
-    def _add_hybrid_bat(self, id: int) -> List:
-        elements = []
-        inverter_children = self.get_entry_of_element(id)["children"]
-        for child in inverter_children:
-            if child["type"] == ComponentType.BAT.value:
-                elements.append(child)
-        return elements
+    def get_hierarchy_index(self) -> HierarchyIndex:
+        """ gibt den Index der Hierarchie zurück und erstellt ihn neu, wenn die Hierarchie ersetzt wurde."""
+        index = self._hierarchy_index
+        if index is None or index.hierarchy is not self.data.get.hierarchy:
+            index = build_hierarchy_index(self.data.get.hierarchy)
+            self._hierarchy_index = index
+        return index
+
+    def _invalidate_hierarchy_index(self) -> None:
+        self._hierarchy_index = None
 
     def get_elements_for_downstream_calculation(self, id: int):
         """returns a list of elements that are relevant for the calculation of the counter values based on the
         downstream components, eg home consumption or virtual counter."""
-        elements = copy.deepcopy(self.get_entry_of_element(id)["children"])
-        elements_to_sum_up = elements
-        for element in elements:
-            if element["type"] == ComponentType.INVERTER.value:
-                elements_to_sum_up.extend(self._add_hybrid_bat(element['id']))
-        return elements_to_sum_up
+        index = self.get_hierarchy_index()
+        return [dict(index.get_entry(path)) for path in index.downstream_elements[id]]
 
     # Hierarchie analysieren
 
     def get_all_elements_without_children(self, id: int) -> List[Dict]:
-        self.childless.clear()
-        self.get_all_elements_without_children_recursive(self.get_entry_of_element(id))
-        return self.childless
+        childless = []
+        self.get_all_elements_without_children_recursive(self.get_entry_of_element(id), childless)
+        return childless
 
-    def get_all_elements_without_children_recursive(self, child: Dict) -> None:
+    def get_all_elements_without_children_recursive(self, child: Dict, childless: List[Dict]) -> None:
         for child in child["children"]:
             try:
                 if len(child["children"]) != 0:
-                    self.get_all_elements_without_children_recursive(child)
+                    self.get_all_elements_without_children_recursive(child, childless)
                 else:
-                    self.childless.append(child)
+                    childless.append(child)
             except Exception:
                 log.exception("Fehler in der allgemeinen Zähler-Klasse")
 
     def get_chargepoints_of_counter(self, counter: str) -> List[str]:
         """ gibt eine Liste der Ladepunkte, die in den folgenden Zweigen des Zählers sind, zurück.
         """
-        self.connected_chargepoints.clear()
+        index = self.get_hierarchy_index()
         if counter == self.get_evu_counter_str():
-            counter_object = self.data.get.hierarchy[0]
+            id = self.data.get.hierarchy[0]["id"]
         else:
-            counter_object = self.__get_entry(
-                self.data.get.hierarchy[0],
-                int(counter[7:]),
-                self.__get_entry_of_element)
-        try:
-            self._get_all_cp_connected_to_counter(counter_object)
-        except KeyError:
-            # Kein Ladepunkt unter dem Zähler
-            pass
-        return self.connected_chargepoints
-
-    def _get_all_cp_connected_to_counter(self, child: Dict) -> None:
-        """ Rekursive Funktion, die alle Ladepunkte ermittelt, die an den angegebenen Zähler angeschlossen sind.
-        """
-        # Alle Objekte der Ebene durchgehen
-        for child in child["children"]:
-            try:
-                if child["type"] == ComponentType.CHARGEPOINT.value:
-                    self.connected_chargepoints.append(f"cp{child['id']}")
-                # Wenn das Objekt noch Kinder hat, diese ebenfalls untersuchen.
-                elif len(child["children"]) != 0:
-                    self._get_all_cp_connected_to_counter(child)
-            except Exception:
-                log.exception("Fehler in der allgemeinen Zähler-Klasse")
+            id = int(counter[7:])
+            if id not in index.parents:
+                # Zähler ist nicht unterhalb des EVU-Zählers
+                return []
+        return list(index.chargepoints_below[id])
 
     def get_counters_to_check(self, num: int) -> List[str]:
         """ ermittelt alle Zähler im Zweig des Ladepunkts.
         """
-        self.connected_counters.clear()
-        self.__get_all_counter_in_branch(self.data.get.hierarchy[0], num)
-        return self.connected_counters
+        return list(self.get_hierarchy_index().counters_in_branch.get(num, ()))
 
     def get_entry_of_element(self, id_to_find: int) -> Dict[str, List[Dict[str, Union[int, str]]]]:
-        item = self.__is_id_in_top_level(id_to_find)
-        if item:
-            return item
-        else:
-            return self.__get_entry(self.data.get.hierarchy[0], id_to_find, self.__get_entry_of_element)
+        index = self.get_hierarchy_index()
+        path = index.elements.get(id_to_find)
+        return index.get_entry(path) if path else {}
 
     def get_entry_of_parent(self, id_to_find: int) -> Dict:
         if self.__is_id_in_top_level(id_to_find):
             return {}
-        for child in self.data.get.hierarchy[0]["children"]:
-            if child["id"] == id_to_find:
-                return self.data.get.hierarchy[0]
-        else:
-            return self.__get_entry(self.data.get.hierarchy[0], id_to_find, self.__get_entry_of_parent)
+        index = self.get_hierarchy_index()
+        path = index.parents.get(id_to_find)
+        return index.get_entry(path) if path else {}
 
     def __is_id_in_top_level(self, id_to_find: int) -> Dict:
         for item in self.data.get.hierarchy:
@@ -271,52 +335,11 @@ class CounterAll:
         else:
             return {}
 
-    def __get_all_counter_in_branch(self, child: Dict, id_to_find: int) -> bool:
-        """ Rekursive Funktion, die alle Zweige durchgeht, bis der entsprechende Ladepunkt gefunden wird und dann alle
-        Zähler in diesem Pfad der Liste anhängt.
-        """
-        parent_id = child["id"]
-        for child in child["children"]:
-            if child["id"] == id_to_find:
-                self.connected_counters.append(f"counter{parent_id}")
-                return True
-            if len(child["children"]) != 0:
-                found = self.__get_all_counter_in_branch(child, id_to_find)
-                if found:
-                    self.connected_counters.append(f"counter{parent_id}")
-                    return True
-        else:
-            return False
-
-    def __get_entry(self, child: Dict, id_to_find: int, func: Callable[[Dict, int], bool]) -> Dict:
-        for child in child["children"]:
-            found = func(child, id_to_find)
-            if found:
-                return child
-            if len(child["children"]) != 0:
-                entry = self.__get_entry(child, id_to_find, func)
-                if entry:
-                    return entry
-        else:
-            return {}
-
-    def __get_entry_of_element(self, child: Dict, id_to_find: int) -> bool:
-        if child["id"] == id_to_find:
-            return True
-        else:
-            return False
-
-    def __get_entry_of_parent(self, child: Dict, id_to_find: int) -> bool:
-        for child2 in child["children"]:
-            if child2["id"] == id_to_find:
-                return True
-        else:
-            return False
-
     def hierarchy_add_item_aside(self, new_id: int, new_type: ComponentType, id_to_find: int) -> None:
         """ ruft die rekursive Funktion zum Hinzufügen eines Zählers oder Ladepunkts in die Zählerhierarchie auf
         derselben Ebene wie das angegebene Element.
         """
+        self._invalidate_hierarchy_index()
         if self.__is_id_in_top_level(id_to_find):
             self.data.get.hierarchy.append({"id": new_id, "type": new_type.value, "children": []})
         else:
@@ -337,6 +360,7 @@ class CounterAll:
         """ruft die rekursive Funktion zum Löschen eines Elements. Je nach Flag werden die Kinder gelöscht oder auf die
         Ebene des gelöschten Elements gehoben.
         """
+        self._invalidate_hierarchy_index()
         item = self.__is_id_in_top_level(id_to_find)
         if item:
             if keep_children:
@@ -375,6 +399,7 @@ class CounterAll:
     def hierarchy_add_item_below(self, new_id: int, new_type: ComponentType, id_to_find: int) -> None:
         """ruft die rekursive Funktion zum Hinzufügen eines Elements als Kind des angegebenen Elements.
         """
+        self._invalidate_hierarchy_index()
         item = self.__is_id_in_top_level(id_to_find)
         if item:
             item["children"].append({"id": new_id, "type": new_type.value, "children": []})
@@ -404,19 +429,7 @@ class CounterAll:
             return False
 
     def get_list_of_elements_per_level(self) -> List[List[Dict[str, Union[int, str]]]]:
-        elements_per_level: List[List[Dict[str, Union[int, str]]]] = []
-        for item in self.data.get.hierarchy:
-            list(zip(elements_per_level, self._get_list_of_elements_per_level(elements_per_level, item, 0)))
-        return elements_per_level
-
-    def _get_list_of_elements_per_level(self, elements_per_level: List, child: Dict, index: int) -> List:
-        try:
-            elements_per_level[index].extend([{"type": child["type"], "id": child["id"]}])
-        except IndexError:
-            elements_per_level.insert(index, [{"type": child["type"], "id": child["id"]}])
-        for child in child["children"]:
-            elements_per_level = self._get_list_of_elements_per_level(elements_per_level, child, index+1)
-        return elements_per_level
+        return [[{"type": type, "id": id} for type, id in level] for level in self.get_hierarchy_index().levels]
 
     def validate_hierarchy(self):
         try:
@@ -6,9 +6,10 @@ import copy
 import logging
 from threading import Event, Lock
 from functools import wraps
-from typing import Dict
+from typing import Dict, Set
 from control.bat import Bat
 from control.bat_all import BatAll
+from control.data_snapshot import SnapshotCache
 from control.chargepoint.chargepoint import Chargepoint
 from control.chargepoint.chargepoint_all import AllChargepoints
 from control.chargepoint.chargepoint_template import CpTemplate
@@ -85,6 +86,7 @@ class Data:
         self._pv_data: Dict[str, Pv] = {}
         self._pv_all_data = PvAll()
         self._system_data = {}
+        self.snapshot_cache = SnapshotCache(SubData.snapshot_versions)
 
     # getter-Funktion, der Zugriff erfolgt wie bei einem Zugriff auf eine öffentliche Variable.
     @property
@@ -347,22 +349,17 @@ class Data:
         except Exception:
             log.exception("Fehler im Prepare-Modul")
 
+    def __get_configured_component_ids(self) -> Set[str]:
+        return {component[9:]
+                for dev in list(SubData.system_data) if "device" in dev
+                for component in list(SubData.system_data[dev].components)}
+
     def __copy_counter_data(self) -> None:
         self.counter_all_data = copy.deepcopy(SubData.counter_all_data)
         self.counter_data.clear()
+        component_ids = self.__get_configured_component_ids()
         for counter in SubData.counter_data:
-            stop = False
-            if counter != "all":
-                for dev in SubData.system_data:
-                    if "device" in dev:
-                        for component in SubData.system_data[dev].components:
-                            if component[9:] == counter[7:]:
-                                self.counter_data[counter] = copy.deepcopy(SubData.counter_data[counter])
-                                stop = True
-                                break
-                    if stop:
-                        break
-            else:
+            if counter == "all" or counter[7:] in component_ids:
                 self.counter_data[counter] = copy.deepcopy(SubData.counter_data[counter])
 
     def __copy_cp_data(self) -> None:
@@ -381,7 +378,8 @@ class Data:
                 self.cp_data[cp].data = copy.deepcopy(SubData.cp_data[cp].chargepoint.data)
                 self.cp_data[cp].chargepoint_module = SubData.cp_data[cp].chargepoint.chargepoint_module
         self.cp_all_data = copy.deepcopy(SubData.cp_all_data)
-        self.cp_template_data = copy.deepcopy(SubData.cp_template_data)
+        # Profile werden während des Regelzyklus nicht verändert und nur bei Änderungen neu kopiert.
+        self.cp_template_data = self.snapshot_cache.copy_dict("cp_template_data", SubData.cp_template_data)
         for chargepoint in self.cp_data:
             try:
                 if "cp" in chargepoint:
@@ -401,31 +399,16 @@ class Data:
         """
         try:
             self.__copy_counter_data()
+            component_ids = self.__get_configured_component_ids()
             self.pv_data.clear()
             for pv in SubData.pv_data:
-                stop = False
-                for dev in SubData.system_data:
-                    if "device" in dev:
-                        for component in SubData.system_data[dev].components:
-                            if component[9:] == pv[2:]:
-                                self.pv_data[pv] = copy.deepcopy(SubData.pv_data[pv])
-                                stop = True
-                                break
-                    if stop:
-                        break
+                if pv[2:] in component_ids:
+                    self.pv_data[pv] = copy.deepcopy(SubData.pv_data[pv])
             self.pv_all_data = copy.deepcopy(SubData.pv_all_data)
             self.bat_data.clear()
             for bat in SubData.bat_data:
-                stop = False
-                for dev in SubData.system_data:
-                    if "device" in dev:
-                        for component in SubData.system_data[dev].components:
-                            if component[9:] == bat[3:]:
-                                self.bat_data[bat] = copy.deepcopy(SubData.bat_data[bat])
-                                stop = True
-                                break
-                    if stop:
-                        break
+                if bat[3:] in component_ids:
+                    self.bat_data[bat] = copy.deepcopy(SubData.bat_data[bat])
             self.bat_all_data = copy.deepcopy(SubData.bat_all_data)
         except Exception:
             log.exception("Fehler im Prepare-Modul")
@@ -435,16 +418,14 @@ class Data:
         """
         with ModuleDataReceivedContext(self.event_module_update_completed):
             try:
-                self.general_data = copy.deepcopy(SubData.general_data)
                 self.io_actions = copy.deepcopy(SubData.io_actions)
                 self.io_states = copy.deepcopy(SubData.io_states)
                 self.optional_data = copy.deepcopy(SubData.optional_data)
                 self.__copy_ev_data()
-                self.__copy_cp_data()
-                self.__copy_counter_data()
+                # kopiert auch general_data und die Ladepunkte
                 self.__copy_system_data()
                 self.__copy_module_data()
-                self.graph_data = copy.deepcopy(SubData.graph_data)
+                self.graph_data = self.snapshot_cache.copy_object("graph_data", SubData.graph_data)
             except Exception:
                 log.exception("Fehler im Prepare-Modul")
 
@@ -452,8 +433,9 @@ class Data:
         self.ev_data.clear()
         for ev in SubData.ev_data:
             self.ev_data[ev] = copy.deepcopy(SubData.ev_data[ev])
-        self.ev_template_data = copy.deepcopy(SubData.ev_template_data)
-        self.ev_charge_template_data = copy.deepcopy(SubData.ev_charge_template_data)
+        self.ev_template_data = self.snapshot_cache.copy_dict("ev_template_data", SubData.ev_template_data)
+        self.ev_charge_template_data = self.snapshot_cache.copy_dict(
+            "ev_charge_template_data", SubData.ev_charge_template_data)
         for vehicle in self.ev_data:
             try:
                 self.ev_data[vehicle].charge_template = self.ev_charge_template_data["ct" + str(
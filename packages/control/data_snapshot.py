@@ -0,0 +1,77 @@
+""" Versionierte Kopien der per MQTT empfangenen Daten.
+
+SubData erhöht nach jeder verarbeiteten Nachricht die Version der betroffenen Kategorie. Beim Kopieren in die
+Regel-Daten wird eine Instanz nur dann erneut per deepcopy kopiert, wenn sich die Version seit der letzten Kopie
+geändert hat oder die Instanz in SubData ersetzt wurde. Unveränderte Instanzen werden zwischen den Zyklen geteilt.
+Daher dürfen nur Kategorien über den Cache kopiert werden, die während des Regelzyklus nicht verändert werden
+(z.B. Profile).
+"""
+import copy
+import logging
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Dict, TypeVar
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SnapshotVersions:
+    """ Zähler je Kategorie, wird von SubData nach dem Verarbeiten einer Nachricht erhöht."""
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._versions: Dict[str, int] = {}
+
+    def touch(self, category: str) -> None:
+        # Die Version muss nach dem Ändern der Daten erhöht werden. Wird während des Kopierens eine Nachricht
+        # verarbeitet, wurde die alte Version gelesen und beim nächsten Kopieren wird die Instanz erneut kopiert.
+        with self._lock:
+            self._versions[category] = self._versions.get(category, 0) + 1
+
+    def get(self, category: str) -> int:
+        with self._lock:
+            return self._versions.get(category, 0)
+
+
+@dataclass
+class _CachedCopy:
+    version: int
+    source: Any
+    copy: Any
+
+
+class SnapshotCache:
+    """ Hält je Kategorie und Key die zuletzt erstellte Kopie."""
+
+    def __init__(self, versions: SnapshotVersions) -> None:
+        self.versions = versions
+        self._cache: Dict[str, Dict[str, _CachedCopy]] = {}
+        self.copied = 0
+        self.shared = 0
+
+    def copy_dict(self, category: str, source: Dict[str, T]) -> Dict[str, T]:
+        version = self.versions.get(category)
+        cached = self._cache.get(category, {})
+        updated: Dict[str, _CachedCopy] = {}
+        for key, obj in list(source.items()):
+            updated[key] = self._get_copy(cached.get(key), version, obj)
+        self._cache[category] = updated
+        return {key: entry.copy for key, entry in updated.items()}
+
+    def copy_object(self, category: str, source: T) -> T:
+        version = self.versions.get(category)
+        entry = self._get_copy(self._cache.get(category, {}).get(category), version, source)
+        self._cache[category] = {category: entry}
+        return entry.copy
+
+    def _get_copy(self, entry: _CachedCopy, version: int, obj: Any) -> _CachedCopy:
+        if entry is not None and entry.version == version and entry.source is obj:
+            self.shared += 1
+            return entry
+        self.copied += 1
+        return _CachedCopy(version, obj, copy.deepcopy(obj))
+
+    def clear(self) -> None:
+        self._cache.clear()
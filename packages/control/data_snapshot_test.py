@@ -0,0 +1,71 @@
+from control.data_snapshot import SnapshotCache, SnapshotVersions
+from control.ev.ev_template import EvTemplate
+
+
+def test_copy_dict_shares_unchanged_copies():
+    # setup
+    versions = SnapshotVersions()
+    cache = SnapshotCache(versions)
+    source = {"et0": EvTemplate(), "et1": EvTemplate()}
+
+    # execution
+    first = cache.copy_dict("ev_template_data", source)
+    second = cache.copy_dict("ev_template_data", source)
+
+    # evaluation
+    assert first["et0"] is not source["et0"]
+    assert first["et0"] is second["et0"]
+    assert first["et1"] is second["et1"]
+    assert cache.copied == 2
+    assert cache.shared == 2
+
+
+def test_copy_dict_copies_after_touch():
+    # setup
+    versions = SnapshotVersions()
+    cache = SnapshotCache(versions)
+    source = {"et0": EvTemplate()}
+    first = cache.copy_dict("ev_template_data", source)
+
+    # execution
+    source["et0"].data.min_current = 10
+    versions.touch("ev_template_data")
+    second = cache.copy_dict("ev_template_data", source)
+
+    # evaluation
+    assert second["et0"] is not first["et0"]
+    assert second["et0"].data.min_current == 10
+
+
+def test_copy_dict_replaced_and_removed_instances():
+    # setup
+    versions = SnapshotVersions()
+    cache = SnapshotCache(versions)
+    source = {"et0": EvTemplate(), "et1": EvTemplate()}
+    first = cache.copy_dict("ev_template_data", source)
+
+    # execution
+    source["et0"] = EvTemplate()
+    source.pop("et1")
+    second = cache.copy_dict("ev_template_data", source)
+
+    # evaluation
+    assert second["et0"] is not first["et0"]
+    assert "et1" not in second
+
+
+def test_copy_object():
+    # setup
+    versions = SnapshotVersions()
+    cache = SnapshotCache(versions)
+    source = EvTemplate()
+
+    # execution
+    first = cache.copy_object("graph_data", source)
+    second = cache.copy_object("graph_data", source)
+    versions.touch("graph_data")
+    third = cache.copy_object("graph_data", source)
+
+    # evaluation
+    assert first is second
+    assert third is not first
@@ -399,3 +399,35 @@ def test_add_missing_entries(hierarchy, expected_hierarchy, data_, monkeypatch):
 
     # evaluation
     assert counter_all.data.get.hierarchy == expected_hierarchy
+
+
+def test_hierarchy_index_follows_changes():
+    # setup
+    c = hierarchy_cp()
+    assert c.get_chargepoints_of_counter("counter4") == ["cp5", "cp6"]
+
+    # execution
+    c.hierarchy_add_item_below(8, ComponentType.CHARGEPOINT, 4)
+    added = c.get_chargepoints_of_counter("counter4")
+    c.data.get.hierarchy = hierarchy_two_level().data.get.hierarchy
+    replaced = c.get_chargepoints_of_counter("counter0")
+
+    # evaluation
+    assert added == ["cp5", "cp6", "cp8"]
+    assert c.get_counters_to_check(8) == []
+    assert replaced == ["cp2"]
+
+
+def test_hierarchy_index_returns_copies():
+    # setup
+    c = hierarchy_cp()
+
+    # execution
+    c.get_chargepoints_of_counter("counter2").clear()
+    c.get_counters_to_check(5).clear()
+    c.get_list_of_elements_per_level().reverse()
+
+    # evaluation
+    assert c.get_chargepoints_of_counter("counter2") == ["cp3", "cp5", "cp6"]
+    assert c.get_counters_to_check(5) == ["counter4", "counter2", "counter0"]
+    assert c.get_list_of_elements_per_level()[0] == [{"type": "counter", "id": 0}]
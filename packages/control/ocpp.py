@@ -1,16 +1,17 @@
 from datetime import datetime, timezone
-import json
 import logging
 
 from helpermodules.utils.error_handling import ImportErrorContext
 with ImportErrorContext():
-    from ocpp.v16 import call, ChargePoint as OcppChargepoint
+    from ocpp.v16 import call
 with ImportErrorContext():
     import websockets
 import asyncio
-from typing import Callable, Optional
+import concurrent.futures
+from typing import Any, Callable, Optional
 
 from control import data
+from control.ocpp_session import session_manager
 from control.optional_data import OptionalProtocol
 from modules.common.fault_state import FaultState
 
@@ -25,24 +26,22 @@ try:
         def _process_call(self: OptionalProtocol,
                           chargebox_id: str,
                           fault_state: FaultState,
-                          func: Callable) -> Optional[websockets.WebSocketClientProtocol]:
-            async def make_call() -> websockets.WebSocketClientProtocol:
-                url = self.data.ocpp.config.url
-                async with websockets.connect(f"{url}{'' if url.endswith('/') else '/'}{chargebox_id}",
-                                              subprotocols=[self.data.ocpp.config.version]) as ws:
-                    try:
-                        cp = OcppChargepoint(chargebox_id, ws, 2)
-                        await cp.call(func)
-                    except asyncio.exceptions.TimeoutError:
-                        # log.exception("Erwarteter TimeOut StartTransaction")
-                        pass
-                    return ws
+                          func: Callable) -> Optional[Any]:
+            """ sendet die Nachricht über die dauerhafte Verbindung der Chargebox ID.
+
+            Return
+            ------
+            Antwort des Backends, None, wenn OCPP nicht aktiv ist oder keine Antwort empfangen wurde.
+            """
             try:
                 if self.data.ocpp.config.active and chargebox_id:
-                    return asyncio.run(make_call())
+                    return session_manager.call(self.data.ocpp.config.url, self.data.ocpp.config.version,
+                                                chargebox_id, func)
             except websockets.exceptions.InvalidStatusCode:
                 fault_state.warning(f"Chargebox ID {chargebox_id} konnte nicht im OCPP-Backend gefunden werden oder "
                                     "URL des Backends ist falsch.")
+            except (asyncio.exceptions.TimeoutError, concurrent.futures.TimeoutError):
+                log.warning(f"Keine Antwort des OCPP-Backends für Chargebox ID {chargebox_id} auf {func}")
             return None
 
         def boot_notification(self: OptionalProtocol,
@@ -68,14 +67,14 @@ try:
                               id_tag: str,
                               imported: int) -> Optional[int]:
             try:
-                ws = self._process_call(chargebox_id, fault_state, call.StartTransaction(
+                response = self._process_call(chargebox_id, fault_state, call.StartTransaction(
                     connector_id=connector_id,
                     id_tag=id_tag if id_tag else "",
                     meter_start=int(imported),
                     timestamp=self._get_formatted_time()
                 ))
-                if ws:
-                    transaction_id = json.loads(ws.messages[0])[2]["transactionId"]
+                if response:
+                    transaction_id = response.transaction_id
                     log.debug(f"Transaction ID: {transaction_id} für Chargebox ID: {chargebox_id} mit Tag: {id_tag} "
                               f"und Zählerstand: {imported} erhalten.")
                     return transaction_id
@@ -90,21 +89,27 @@ try:
                             transaction_id: int,
                             imported: int) -> None:
             try:
-                self._process_call(chargebox_id, fault_state, call.MeterValues(
-                    connector_id=connector_id,
-                    transaction_id=transaction_id,
-                    meter_value=[{"timestamp": self._get_formatted_time(),
-                                  "sampledValue": [
-                        {
-                            "value": f'{int(imported)}',
-                            "context": "Sample.Periodic",
-                            "format": "Raw",
-                            "measurand": "Energy.Active.Import.Register",
-                            "unit": "Wh"
-                        },
-                    ]}],
-                ))
-                log.debug(f"Zählerstand {imported} an Chargebox ID: {chargebox_id} übermittelt.")
+                if self.data.ocpp.config.active and chargebox_id:
+                    # Die Zählerstände werden gesammelt, bis das Backend erreichbar ist.
+                    last_error = session_manager.send_meter_values(
+                        self.data.ocpp.config.url, self.data.ocpp.config.version, chargebox_id, connector_id,
+                        transaction_id,
+                        [{"timestamp": self._get_formatted_time(),
+                          "sampledValue": [
+                              {
+                                  "value": f'{int(imported)}',
+                                  "context": "Sample.Periodic",
+                                  "format": "Raw",
+                                  "measurand": "Energy.Active.Import.Register",
+                                  "unit": "Wh"
+                              },
+                          ]}])
+                    if isinstance(last_error, websockets.exceptions.InvalidStatusCode):
+                        fault_state.warning(f"Chargebox ID {chargebox_id} konnte nicht im OCPP-Backend gefunden "
+                                            "werden oder URL des Backends ist falsch.")
+                    elif last_error is not None:
+                        fault_state.from_exception(last_error)
+                    log.debug(f"Zählerstand {imported} an Chargebox ID: {chargebox_id} übergeben.")
             except Exception as e:
                 fault_state.from_exception(e)
 
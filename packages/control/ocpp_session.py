@@ -0,0 +1,189 @@
+"""Dauerhafte Websocket-Verbindungen zum OCPP-Backend.
+
+Bisher wurde für jede OCPP-Nachricht eine neue Event-Loop gestartet und eine neue Websocket-Verbindung aufgebaut. Der
+OcppSessionManager führt stattdessen eine Event-Loop in einem eigenen Thread aus und hält je Chargebox-ID eine
+Verbindung. Eingehende Nachrichten werden von OcppChargepoint.start gelesen, sodass die Antworten des Backends
+ausgewertet werden können. Schlägt der Verbindungsaufbau fehl, wird der nächste Versuch mit wachsendem Abstand
+zugelassen.
+
+Zählerstände (MeterValues) werden nicht blockierend versendet. Ist das Backend nicht erreichbar oder noch mit einer
+vorherigen Nachricht beschäftigt, werden die Zählerstände einer Transaktion gesammelt und gemeinsam in einer Nachricht
+übertragen.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from helpermodules.utils.error_handling import ImportErrorContext
+with ImportErrorContext():
+    from ocpp.v16 import call, ChargePoint as OcppChargepoint
+with ImportErrorContext():
+    import websockets
+
+log = logging.getLogger(__name__)
+
+CONNECT_TIMEOUT = 5
+RESPONSE_TIMEOUT = 5
+# Wartezeit des aufrufenden Threads, enthält Verbindungsaufbau und Antwort
+CALL_TIMEOUT = CONNECT_TIMEOUT + RESPONSE_TIMEOUT + 1
+RECONNECT_BACKOFF_MIN = 1
+RECONNECT_BACKOFF_MAX = 60
+# maximale Anzahl gesammelter Zählerstände je Transaktion, ältere Werte werden verworfen
+MAX_PENDING_METER_VALUES = 100
+
+
+class OcppSession:
+    def __init__(self, url: str, version: str, chargebox_id: str) -> None:
+        self.url = url
+        self.version = version
+        self.chargebox_id = chargebox_id
+        self.connection = None
+        self.chargepoint = None
+        self.failed_connects = 0
+        self.next_connect = 0.0
+        self.last_error: Optional[Exception] = None
+        # (connector_id, transaction_id): gesammelte meter_value-Einträge
+        self.pending_meter_values: Dict[Tuple[int, int], List[Dict]] = {}
+        self._lock: Optional[asyncio.Lock] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._reader_task: Optional[asyncio.Task] = None
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        # Das Lock muss in der Event-Loop des Session-Managers erzeugt werden.
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _connect(self) -> None:
+        now = time.monotonic()
+        if now < self.next_connect:
+            raise ConnectionError(f"Nächster Verbindungsversuch zu Chargebox ID {self.chargebox_id} in "
+                                  f"{round(self.next_connect - now)}s")
+        try:
+            self.connection = await asyncio.wait_for(
+                websockets.connect(f"{self.url}{'' if self.url.endswith('/') else '/'}{self.chargebox_id}",
+                                   subprotocols=[self.version]),
+                CONNECT_TIMEOUT)
+        except Exception as e:
+            self.failed_connects += 1
+            self.next_connect = now + min(RECONNECT_BACKOFF_MIN * 2**(self.failed_connects - 1),
+                                          RECONNECT_BACKOFF_MAX)
+            self.last_error = e
+            raise
+        self.failed_connects = 0
+        self.next_connect = 0.0
+        self.last_error = None
+        self.chargepoint = OcppChargepoint(self.chargebox_id, self.connection, RESPONSE_TIMEOUT)
+        self._reader_task = asyncio.create_task(self._read(self.chargepoint))
+        log.debug(f"OCPP-Verbindung für Chargebox ID {self.chargebox_id} aufgebaut.")
+
+    async def _read(self, chargepoint: "OcppChargepoint") -> None:
+        try:
+            await chargepoint.start()
+        except websockets.exceptions.ConnectionClosed as e:
+            log.debug(f"OCPP-Verbindung für Chargebox ID {self.chargebox_id} geschlossen: {e}")
+        except Exception:
+            log.exception(f"Fehler beim Empfangen von OCPP-Nachrichten für Chargebox ID {self.chargebox_id}")
+        finally:
+            if self.chargepoint is chargepoint:
+                self.chargepoint = None
+                self.connection = None
+
+    async def call(self, payload: Any) -> Any:
+        async with self.lock:
+            return await self._call(payload)
+
+    async def _call(self, payload: Any) -> Any:
+        if self.chargepoint is None:
+            await self._connect()
+        try:
+            response = await self.chargepoint.call(payload)
+            self.last_error = None
+            return response
+        except websockets.exceptions.ConnectionClosed as e:
+            self.last_error = e
+            await self.close()
+            raise
+
+    def add_meter_values(self, connector_id: int, transaction_id: int, meter_value: List[Dict]) -> None:
+        pending = self.pending_meter_values.setdefault((connector_id, transaction_id), [])
+        pending.extend(meter_value)
+        del pending[:-MAX_PENDING_METER_VALUES]
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self.flush_meter_values())
+
+    async def flush_meter_values(self) -> None:
+        async with self.lock:
+            for key in list(self.pending_meter_values):
+                connector_id, transaction_id = key
+                meter_value = self.pending_meter_values.pop(key)
+                try:
+                    await self._call(call.MeterValues(connector_id=connector_id,
+                                                      transaction_id=transaction_id,
+                                                      meter_value=meter_value))
+                    log.debug(f"{len(meter_value)} Zählerstände an Chargebox ID: {self.chargebox_id} übermittelt.")
+                except Exception as e:
+                    # mit den Zählerständen der nächsten Übertragung erneut senden
+                    self.last_error = self.last_error or e
+                    self.pending_meter_values[key] = meter_value + self.pending_meter_values.get(key, [])
+                    del self.pending_meter_values[key][:-MAX_PENDING_METER_VALUES]
+                    log.debug(f"Zählerstände für Chargebox ID {self.chargebox_id} konnten nicht übermittelt "
+                              f"werden: {e}")
+                    return
+
+    async def close(self) -> None:
+        connection, self.connection, self.chargepoint = self.connection, None, None
+        if connection is not None:
+            await connection.close()
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+
+
+class OcppSessionManager:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sessions: Dict[str, OcppSession] = {}
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="OCPP Sessions", daemon=True).start()
+            return self._loop
+
+    def _get_session(self, url: str, version: str, chargebox_id: str) -> OcppSession:
+        loop = self._get_loop()
+        with self._lock:
+            session = self._sessions.get(chargebox_id)
+            if session is not None and (session.url != url or session.version != version):
+                # Konfiguration des Backends wurde geändert
+                asyncio.run_coroutine_threadsafe(session.close(), loop)
+                session = None
+            if session is None:
+                session = OcppSession(url, version, chargebox_id)
+                self._sessions[chargebox_id] = session
+            return session
+
+    def call(self, url: str, version: str, chargebox_id: str, payload: Any) -> Any:
+        """ sendet die Nachricht und wartet auf die Antwort des Backends."""
+        session = self._get_session(url, version, chargebox_id)
+        return asyncio.run_coroutine_threadsafe(session.call(payload), self._loop).result(CALL_TIMEOUT)
+
+    def send_meter_values(self, url: str, version: str, chargebox_id: str, connector_id: int, transaction_id: int,
+                          meter_value: List[Dict]) -> Optional[Exception]:
+        """ übergibt die Zählerstände zum Versenden, ohne auf die Antwort zu warten.
+
+        Return
+        ------
+        Fehler der letzten Übertragung an diese Chargebox ID
+        """
+        session = self._get_session(url, version, chargebox_id)
+        self._loop.call_soon_threadsafe(session.add_meter_values, connector_id, transaction_id, meter_value)
+        return session.last_error
+
+
+session_manager = OcppSessionManager()
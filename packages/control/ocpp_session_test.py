@@ -0,0 +1,68 @@
+import time
+
+import pytest
+from ocpp.v16 import call
+
+from control import ocpp_session
+from control.ocpp_session import OcppSessionManager
+from tools.ocpp_csms_stub import CsmsStub, OCPP_VERSION
+
+
+@pytest.fixture()
+def csms():
+    csms = CsmsStub().start()
+    yield csms
+    csms.stop()
+
+
+def wait_for(condition, timeout: float = 5) -> None:
+    end = time.monotonic() + timeout
+    while not condition() and time.monotonic() < end:
+        time.sleep(0.01)
+
+
+def meter_value(imported: int):
+    return [{"timestamp": "2026-01-01T00:00:00Z",
+             "sampledValue": [{"value": str(imported), "measurand": "Energy.Active.Import.Register", "unit": "Wh"}]}]
+
+
+def test_call_reuses_connection(csms: CsmsStub):
+    # setup
+    manager = OcppSessionManager()
+
+    # execution
+    responses = [manager.call(csms.url, OCPP_VERSION, "cp1", call.StartTransaction(
+        connector_id=1, id_tag="", meter_start=0, timestamp="2026-01-01T00:00:00Z")) for _ in range(3)]
+    manager.call(csms.url, OCPP_VERSION, "cp1", call.Heartbeat())
+
+    # evaluation
+    assert [response.transaction_id for response in responses] == [1, 2, 3]
+    assert csms.connections == {"cp1": 1}
+
+
+def test_meter_values_collected_while_unreachable(monkeypatch):
+    # setup
+    monkeypatch.setattr(ocpp_session, "RECONNECT_BACKOFF_MIN", 0)
+    manager = OcppSessionManager()
+    csms = CsmsStub().start()
+    url, port = csms.url, csms.port
+    csms.stop()
+    session = manager._get_session(url, OCPP_VERSION, "cp1")
+
+    # execution
+    manager.send_meter_values(url, OCPP_VERSION, "cp1", 1, 5, meter_value(100))
+    wait_for(lambda: session.last_error is not None)
+    last_error = manager.send_meter_values(url, OCPP_VERSION, "cp1", 1, 5, meter_value(200))
+    wait_for(lambda: session._flush_task is not None and session._flush_task.done())
+    csms = CsmsStub(port).start()
+    manager.send_meter_values(url, OCPP_VERSION, "cp1", 1, 5, meter_value(300))
+    wait_for(lambda: csms.received)
+    csms.stop()
+
+    # evaluation
+    assert last_error is not None
+    assert len(csms.received) == 1
+    action, payload = csms.received[0]
+    assert action == "MeterValues"
+    assert payload["transaction_id"] == 5
+    assert [value["sampled_value"][0]["value"] for value in payload["meter_value"]] == ["100", "200", "300"]
@@ -1,7 +1,6 @@
 """Optionale Module
 """
 import logging
-from math import ceil
 from threading import Thread
 from typing import Dict, List, Optional as TypingOptional, Union
 from datetime import datetime
@@ -9,6 +8,7 @@ from datetime import datetime
 from control import data
 from control.ocpp import OcppMixin
 from control.optional_data import FlexibleTariff, GridFee, OptionalData, PricingGet
+from control.price_timeline import PriceTimeline
 from helpermodules import hardware_configuration
 from helpermodules.constants import NO_ERROR
 from helpermodules.pub import Pub
@@ -29,6 +29,8 @@ class Optional(OcppMixin):
             self._flexible_tariff_module: TypingOptional[ConfigurableFlexibleTariff] = None
             self._grid_fee_module: TypingOptional[ConfigurableGridFee] = None
             self.monitoring_module: TypingOptional[ConfigurableMonitoring] = None
+            self._price_timeline: TypingOptional[PriceTimeline] = None
+            self._price_timeline_source: TypingOptional[Dict] = None
             self.data.dc_charging = hardware_configuration.get_hardware_configuration_setting("dc_charging")
             Pub().pub("openWB/optional/dc_charging", self.data.dc_charging)
         except Exception:
@@ -136,22 +138,20 @@ class Optional(OcppMixin):
             log.exception("Fehler im Optional-Modul: %s", e)
             return False
 
-    def __get_first_entry(self) -> tuple[str, float]:
+    @property
+    def price_timeline(self) -> PriceTimeline:
+        """ Zeitreihe der Strompreise. Sie wird nur neu aufgebaut, wenn die Preise neu empfangen wurden."""
         prices = self.data.electricity_pricing.get.prices
-        if prices is None or len(prices) == 0:
-            raise Exception("Keine Preisdaten für strompreisbasiertes Laden vorhanden.")
-        else:
-            timestamp, first = next(iter(prices.items()))
-            return timestamp, first
+        if self._price_timeline is None or prices is not self._price_timeline_source:
+            self._price_timeline = PriceTimeline(prices or {})
+            self._price_timeline_source = prices
+        return self._price_timeline
 
     def remove_outdated_prices(self):
         def remove(price_data: Dict, last_active_timestamp: int = 0) -> Dict:
-            now = timecheck.create_timestamp()
-            first_timestamp = (max([timestamp for timestamp in price_data.keys()
-                                    if float(timestamp) <= now], default=0))
-            return {int(timestamp): price for timestamp, price in price_data.items()
-                    if int(timestamp) >= int(first_timestamp) and
-                    (int(timestamp) <= last_active_timestamp if last_active_timestamp > 0 else True)}
+            timeline = (self.price_timeline if price_data is self.data.electricity_pricing.get.prices
+                        else PriceTimeline(price_data))
+            return timeline.get_prices_since(timecheck.create_timestamp(), last_active_timestamp)
 
         try:
             if self.data.electricity_pricing.configured:
@@ -164,26 +164,20 @@ class Optional(OcppMixin):
                 if self._grid_fee_module:
                     Pub().pub(f"{MQTT_PREFIX}/grid_fee/get/prices",
                               remove(ep.grid_fee.get.prices,
-                                     last_active_timestamp=int(max(ep.get.prices.keys()))
+                                     last_active_timestamp=self.price_timeline.timestamps[-1]
                                      if ep.get.prices else 0))
         except Exception as e:
             log.exception("Fehler beim Entfernen veralteter Preise: %s", e)
 
     def __get_current_timeslot_start(self) -> int:
-        timestamp = self.__get_first_entry()[0]
-        return int(timestamp)
+        return self.price_timeline.get_current_slot(timecheck.create_timestamp())[0]
 
     def ep_get_current_price(self) -> float:
         if self.data.electricity_pricing.configured:
-            first = self.__get_first_entry()[1]
-            return first
+            return self.price_timeline.get_current_slot(timecheck.create_timestamp())[1]
         else:
             raise Exception("Kein Anbieter für strompreisbasiertes Laden konfiguriert.")
 
-    def __calculate_price_timeslot_length(self, prices: dict) -> int:
-        first_timestamps = sorted(list(prices.keys()))[:2]
-        return float(first_timestamps[1]) - float(first_timestamps[0])
-
     def ep_get_loading_hours(self, duration: float, remaining_time: float) -> List[int]:
         """
         Parameter
@@ -199,44 +193,20 @@ class Optional(OcppMixin):
         if self.data.electricity_pricing.configured is False:
             raise Exception("Kein Anbieter für strompreisbasiertes Laden konfiguriert.")
         try:
-            prices = self.data.electricity_pricing.get.prices
+            timeline = self.price_timeline
             log.debug("Berechne günstige Zeit-Slots für strompreisbasiertes Laden, "
                       "benötigte Ladezeit: %.2f Sekunden, Restzeit bis Termin: %.2f Sekunden",
                       duration, remaining_time)
-            log.debug("Verfügbare Preise: %s", prices)
-            price_timeslot_seconds = self.__calculate_price_timeslot_length(prices)
-            log.debug("Preis-Zeitslot-Länge: %.2f Sekunden", price_timeslot_seconds)
+            log.debug("Verfügbare Preise: %s", self.data.electricity_pricing.get.prices)
+            log.debug("Preis-Zeitslot-Länge: %.2f Sekunden", timeline.slot_length)
             now = timecheck.create_timestamp()
-            price_candidates = {
-                timestamp: price
-                for timestamp, price in prices.items()
-                if (
-                    # is current timeslot or futur
-                    float(timestamp) + price_timeslot_seconds > now and
-                    # ends before plan target time
-                    not float(timestamp) >= now + remaining_time
-                )
-            }
-            log.debug("%s Preis-Kandidaten in %s Sekunden zwischen %s Uhr und %s Uhr von %s Uhr bis %s Uhr",
-                      len(price_candidates),
+            selected_time_slots = timeline.get_cheapest_slots(duration, remaining_time, now)
+            log.debug("%s Zeit-Slots für %s Sekunden zwischen %s Uhr und %s Uhr ausgewählt",
+                      len(selected_time_slots),
                       duration,
                       datetime.fromtimestamp(now),
-                      datetime.fromtimestamp(now + remaining_time),
-                      datetime.fromtimestamp(float(min(price_candidates, default=0))),
-                      datetime.fromtimestamp(float(max(price_candidates, default=0))+price_timeslot_seconds))
-            ordered_by_date_reverse = reversed(sorted(price_candidates.items(), key=lambda x: x[0]))
-            ordered_by_price = sorted(ordered_by_date_reverse, key=lambda x: x[1])
-            selected_time_slots = {float(i[0]): float(i[1])
-                                   for i in ordered_by_price[:1 + ceil(duration/price_timeslot_seconds)]}
-            selected_lenght = (
-                price_timeslot_seconds * (len(selected_time_slots)-1) -
-                (float(now) - min(selected_time_slots, default=now))
-            )
-            return sorted(selected_time_slots.keys()
-                          if not (min(selected_time_slots, default=0) > now or duration <= selected_lenght)
-                          else [timestamp[0] for timestamp in iter(selected_time_slots.items())][:-1]
-                          )
-            # if sum() sorted([int(i[0]) for i in ordered_by_price][:ceil(duration/price_timeslot_seconds)])
+                      datetime.fromtimestamp(now + remaining_time))
+            return selected_time_slots
         except Exception as e:
             log.exception("Fehler im Optional-Modul: %s", e)
             return []
@@ -257,7 +227,7 @@ class Optional(OcppMixin):
         self._set_ep_configured()
         if self.data.electricity_pricing.configured is False:
             return False
-        if len(self.data.electricity_pricing.get.prices) == 0:
+        if len(self.price_timeline) == 0:
             return True
         return ((self._flexible_tariff_module is not None and
                 self._is_et_price_update_required_for_module(self.data.electricity_pricing.flexible_tariff)) or
@@ -0,0 +1,96 @@
+""" Zeitreihe der Strompreise.
+
+Die Preise werden per MQTT als Dictionary mit Unix-Timestamps (als String) und Preisen in €/Wh empfangen. Die Zeitreihe
+hält die Zeitslots sortiert als Zahlen vor, damit der aktuelle Preis per Binärsuche ermittelt und die günstigen
+Zeitslots bis zu einem Termin ausgewählt werden können, ohne die Schlüssel bei jedem Aufruf erneut umzuwandeln und zu
+sortieren.
+"""
+from bisect import bisect_left, bisect_right
+import heapq
+from itertools import accumulate
+from math import ceil
+from typing import Dict, List, Optional, Tuple
+
+
+class PriceTimeline:
+    def __init__(self, prices: Dict) -> None:
+        slots = sorted((int(float(timestamp)), float(price)) for timestamp, price in prices.items())
+        self.timestamps: List[int] = [timestamp for timestamp, _ in slots]
+        self.prices: List[float] = [price for _, price in slots]
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def slot_length(self) -> int:
+        """ Länge eines Zeitslots in Sekunden (Abstand der beiden ersten Zeitslots)"""
+        if len(self.timestamps) < 2:
+            raise ValueError("Für die Länge der Zeitslots werden mindestens zwei Preise benötigt.")
+        return self.timestamps[1] - self.timestamps[0]
+
+    def get_current_slot(self, now: float) -> Tuple[int, float]:
+        """ Return: Beginn und Preis des Zeitslots, in dem now liegt. Liegen alle Zeitslots in der Zukunft, wird wie
+        bisher der erste Zeitslot verwendet."""
+        if len(self.timestamps) == 0:
+            raise Exception("Keine Preisdaten für strompreisbasiertes Laden vorhanden.")
+        index = max(bisect_right(self.timestamps, now) - 1, 0)
+        return self.timestamps[index], self.prices[index]
+
+    def get_prices_since(self, now: float, last_timestamp: int = 0) -> Dict[int, float]:
+        """ Return: Preise ab dem aktuellen Zeitslot, bei Angabe von last_timestamp bis einschließlich dieses
+        Zeitslots"""
+        start = max(bisect_right(self.timestamps, now) - 1, 0)
+        end = bisect_right(self.timestamps, last_timestamp) if last_timestamp > 0 else len(self.timestamps)
+        return dict(zip(self.timestamps[start:end], self.prices[start:end]))
+
+    def _get_candidates(self, now: float, remaining_time: float) -> range:
+        """ Positionen der Zeitslots, die noch nicht abgelaufen sind und vor dem Termin beginnen"""
+        start = bisect_right(self.timestamps, now - self.slot_length)
+        end = bisect_left(self.timestamps, now + remaining_time)
+        return range(start, max(start, end))
+
+    def get_cheapest_slots(self, duration: float, remaining_time: float, now: float) -> List[int]:
+        """ wählt die günstigsten Zeitslots bis zum Termin aus. Bei gleichem Preis werden spätere Zeitslots bevorzugt.
+        Es wird ein Zeitslot mehr ausgewählt als für die Ladezeit benötigt und wieder verworfen, wenn die Ladezeit
+        auch ohne ihn erreicht wird (zB weil der aktuelle, bereits angebrochene Zeitslot nicht ausgewählt wurde).
+
+        Parameter
+        ---------
+        duration: float
+            benötigte Ladezeit in Sekunden
+        remaining_time: float
+            Zeit bis zum Termin in Sekunden
+        Return
+        ------
+        list: Beginn der ausgewählten Zeitslots (Unix-Sekunden), aufsteigend sortiert
+        """
+        slot_length = self.slot_length
+        selected = heapq.nsmallest(1 + ceil(duration / slot_length), self._get_candidates(now, remaining_time),
+                                   key=lambda index: (self.prices[index], -index))
+        if len(selected) == 0:
+            return []
+        first_selected = self.timestamps[min(selected)]
+        selected_length = slot_length * (len(selected) - 1) - (now - first_selected)
+        if first_selected > now or duration <= selected_length:
+            # Der teuerste ausgewählte Zeitslot wird nicht benötigt.
+            selected = selected[:-1]
+        return sorted(self.timestamps[index] for index in selected)
+
+    def get_cheapest_window(self, duration: float, remaining_time: float, now: float) -> Optional[List[int]]:
+        """ wählt die zusammenhängenden Zeitslots bis zum Termin mit dem niedrigsten Durchschnittspreis aus, zB für
+        Verbraucher, deren Betrieb nicht unterbrochen werden soll. Der aktuelle Zeitslot wird mit berücksichtigt.
+
+        Return
+        ------
+        list: Beginn der Zeitslots (Unix-Sekunden), aufsteigend sortiert, None, wenn bis zum Termin nicht genug
+        Zeitslots vorhanden sind
+        """
+        candidates = self._get_candidates(now, remaining_time)
+        number = max(ceil(duration / self.slot_length), 1)
+        if len(candidates) < number:
+            return None
+        sums = [0.0] + list(accumulate(self.prices[candidates.start:candidates.stop]))
+        # Bei gleichem Preis wird das frühere Fenster gewählt.
+        offset = min(range(len(candidates) - number + 1), key=lambda i: sums[i + number] - sums[i])
+        start = candidates.start + offset
+        return self.timestamps[start:start + number]
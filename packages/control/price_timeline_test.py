@@ -0,0 +1,111 @@
+from math import ceil
+from typing import Dict, List
+
+import pytest
+
+from control.price_timeline import PriceTimeline
+
+ONE_HOUR_SECONDS = 3600
+START = 1698188400  # 25.10.2023 00:00 Uhr
+# Stundenpreise eines Tages in ct/kWh (aufgezeichneter Börsenstrompreis inkl. Aufschlägen)
+HOURLY_PRICES = [26.91, 26.12, 25.84, 25.52, 25.67, 26.83, 30.47, 35.12, 36.98, 34.21, 31.05, 29.77,
+                 28.93, 28.41, 29.12, 30.84, 33.57, 37.93, 40.11, 38.64, 34.07, 31.48, 30.12, 28.37]
+# Viertelstundenpreise eines Tages in ct/kWh
+QUARTER_HOUR_PRICES = [price + offset for price in HOURLY_PRICES for offset in (0.42, -0.18, 0.07, -0.31)]
+
+
+def to_prices(prices_ct: List[float], slot_length: int) -> Dict[str, float]:
+    return {str(START + i * slot_length): price / 100000 for i, price in enumerate(prices_ct)}
+
+
+def legacy_loading_hours(prices: Dict[str, float], duration: float, remaining_time: float, now: float) -> List[int]:
+    """ bisherige Auswahl der Zeitslots aus Optional.ep_get_loading_hours"""
+    first_timestamps = sorted(list(prices.keys()))[:2]
+    price_timeslot_seconds = float(first_timestamps[1]) - float(first_timestamps[0])
+    price_candidates = {timestamp: price for timestamp, price in prices.items()
+                        if float(timestamp) + price_timeslot_seconds > now and
+                        not float(timestamp) >= now + remaining_time}
+    ordered_by_date_reverse = reversed(sorted(price_candidates.items(), key=lambda x: x[0]))
+    ordered_by_price = sorted(ordered_by_date_reverse, key=lambda x: x[1])
+    selected_time_slots = {float(i[0]): float(i[1])
+                           for i in ordered_by_price[:1 + ceil(duration/price_timeslot_seconds)]}
+    selected_lenght = (price_timeslot_seconds * (len(selected_time_slots)-1) -
+                       (float(now) - min(selected_time_slots, default=now)))
+    return sorted(selected_time_slots.keys()
+                  if not (min(selected_time_slots, default=0) > now or duration <= selected_lenght)
+                  else [timestamp[0] for timestamp in iter(selected_time_slots.items())][:-1])
+
+
+@pytest.mark.parametrize("prices", [pytest.param(to_prices(HOURLY_PRICES, ONE_HOUR_SECONDS), id="Stundenpreise"),
+                                    pytest.param(to_prices(QUARTER_HOUR_PRICES, 900), id="Viertelstundenpreise"),
+                                    pytest.param(to_prices([30.0] * 48, 900), id="gleiche Preise")])
+def test_cheapest_slots_as_before(prices: Dict[str, float]):
+    # setup
+    timeline = PriceTimeline(prices)
+
+    for now in range(START - 600, START + 20 * ONE_HOUR_SECONDS, 1300):
+        for duration in (600, ONE_HOUR_SECONDS, 2.5 * ONE_HOUR_SECONDS, 7 * ONE_HOUR_SECONDS):
+            for remaining_time in (duration / 2, duration, 4 * ONE_HOUR_SECONDS, 30 * ONE_HOUR_SECONDS):
+                # execution
+                selected = timeline.get_cheapest_slots(duration, remaining_time, now)
+
+                # evaluation
+                assert selected == legacy_loading_hours(prices, duration, remaining_time, now)
+
+
+@pytest.mark.parametrize("now, expected", [
+    pytest.param(START - 10, (START, 0.0002691), id="vor dem ersten Zeitslot"),
+    pytest.param(START, (START, 0.0002691), id="Beginn des ersten Zeitslots"),
+    pytest.param(START + 2 * ONE_HOUR_SECONDS + 1, (START + 2 * ONE_HOUR_SECONDS, 0.0002584),
+                 id="veraltete Preise noch nicht entfernt"),
+    pytest.param(START + 30 * ONE_HOUR_SECONDS, (START + 23 * ONE_HOUR_SECONDS, 0.0002837), id="nach dem letzten"),
+])
+def test_get_current_slot(now, expected):
+    assert PriceTimeline(to_prices(HOURLY_PRICES, ONE_HOUR_SECONDS)).get_current_slot(now) == pytest.approx(expected)
+
+
+def test_get_current_slot_without_prices():
+    with pytest.raises(Exception):
+        PriceTimeline({}).get_current_slot(START)
+
+
+@pytest.mark.parametrize("last_timestamp, expected", [
+    pytest.param(0, [START + 2 * ONE_HOUR_SECONDS + 900 * i for i in range(4)], id="alle folgenden"),
+    pytest.param(START + 2 * ONE_HOUR_SECONDS + 900, [START + 2 * ONE_HOUR_SECONDS, START + 2 * ONE_HOUR_SECONDS + 900],
+                 id="bis zum letzten aktiven Zeitslot"),
+])
+def test_get_prices_since(last_timestamp, expected):
+    # setup
+    prices = {str(START + 900 * i): 0.0003 for i in range(12)}
+
+    # execution
+    result = PriceTimeline(prices).get_prices_since(START + 2 * ONE_HOUR_SECONDS + 100, last_timestamp)
+
+    # evaluation
+    assert list(result.keys()) == expected
+
+
+@pytest.mark.parametrize("duration, remaining_time", [(ONE_HOUR_SECONDS, 8 * ONE_HOUR_SECONDS),
+                                                      (3 * ONE_HOUR_SECONDS, 20 * ONE_HOUR_SECONDS),
+                                                      (2 * ONE_HOUR_SECONDS + 60, 30 * ONE_HOUR_SECONDS)])
+def test_cheapest_window(duration, remaining_time):
+    # setup
+    timeline = PriceTimeline(to_prices(QUARTER_HOUR_PRICES, 900))
+    now = START + 1000
+    number = ceil(duration / 900)
+    candidates = [i for i, timestamp in enumerate(timeline.timestamps)
+                  if timestamp + 900 > now and timestamp < now + remaining_time]
+    windows = [candidates[i:i + number] for i in range(len(candidates) - number + 1)]
+    cheapest = min(windows, key=lambda window: sum(timeline.prices[i] for i in window))
+
+    # execution
+    result = timeline.get_cheapest_window(duration, remaining_time, now)
+
+    # evaluation
+    assert result == [timeline.timestamps[i] for i in cheapest]
+    assert all(b - a == 900 for a, b in zip(result, result[1:]))
+
+
+def test_cheapest_window_too_short():
+    assert PriceTimeline(to_prices(HOURLY_PRICES, ONE_HOUR_SECONDS)).get_cheapest_window(
+        3 * ONE_HOUR_SECONDS, 2 * ONE_HOUR_SECONDS, START) is None
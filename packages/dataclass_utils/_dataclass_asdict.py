@@ -1,5 +1,6 @@
 from enum import Enum
 import logging
+from typing import Any, Callable, Dict
 
 
 log = logging.getLogger(__name__)
@@ -12,12 +13,46 @@ def asdict(value):
     is introduced, because openWB still requires compatibility with Python 3.5
     This function should be replaced when switching to actual Python 3.7 dataclasses.
     """
-    if isinstance(value, (str, int, float)):
-        return value
-    if isinstance(value, Enum):
-        return value.value
-    if isinstance(value, (list, tuple)):
-        return [None if v is None else asdict(v) for v in value]
-    if not isinstance(value, dict):
-        value = vars(value)
+    value_type = type(value)
+    try:
+        serializer = _serializers[value_type]
+    except KeyError:
+        serializer = _serializers[value_type] = _get_serializer(value_type)
+    return serializer(value)
+
+
+def _serialize_value(value):
+    return value
+
+
+def _serialize_enum(value):
+    return value.value
+
+
+def _serialize_list(value):
+    return [None if v is None else asdict(v) for v in value]
+
+
+def _serialize_dict(value):
     return {key: None if value is None else asdict(value) for key, value in value.items()}
+
+
+def _serialize_object(value):
+    return _serialize_dict(vars(value))
+
+
+def _get_serializer(value_type: type) -> Callable[[Any], Any]:
+    # Die Reihenfolge der Prüfungen entscheidet z.B. bei IntEnum, das sowohl int als auch Enum ist.
+    if issubclass(value_type, (str, int, float)):
+        return _serialize_value
+    if issubclass(value_type, Enum):
+        return _serialize_enum
+    if issubclass(value_type, (list, tuple)):
+        return _serialize_list
+    if issubclass(value_type, dict):
+        return _serialize_dict
+    return _serialize_object
+
+
+# Die Art der Umwandlung hängt nur vom Typ ab und wird daher je Typ einmalig ermittelt.
+_serializers: Dict[type, Callable[[Any], Any]] = {}
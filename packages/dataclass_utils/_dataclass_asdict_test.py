@@ -1,3 +1,5 @@
+from enum import IntEnum
+
 import pytest
 
 from dataclass_utils import asdict
@@ -9,6 +11,10 @@ class SingleValue:
         self.value = value
 
 
+class IntValues(IntEnum):
+    ONE = 1
+
+
 class MultiValue:
     def __init__(self, a, b):
         self.a = a
@@ -25,6 +31,9 @@ class MultiValue:
     pytest.param(SingleValue((None, "a", 2)), {"value": [None, "a", 2]}, id="single tuple"),
     pytest.param(SingleValue({"a": "a", "b": 2}), {"value": {"a": "a", "b": 2}}, id="single object"),
 
+    pytest.param(SingleValue(True), {"value": True}, id="single bool"),
+    pytest.param(SingleValue(IntValues.ONE), {"value": IntValues.ONE}, id="single int enum"),
+
     # Test nesting:
     pytest.param(SingleValue(SingleValue("nested")), {"value": {"value": "nested"}}, id="nested object"),
     pytest.param({"a": SingleValue(42)}, {"a": {"value": 42}}, id="dict with nested dataclass"),
@@ -1,10 +1,17 @@
 from enum import Enum
 import inspect
 from inspect import FullArgSpec, isclass
-from typing import TypeVar, Type, Union, get_args, get_origin
+from typing import Any, Callable, Dict, List, Tuple, TypeVar, Type, Union, get_args, get_origin
 
 T = TypeVar('T')
 
+# Die Auswertung von Konstruktor-Signatur und Typ-Annotationen ist aufwändig und ergibt für eine Klasse immer das
+# gleiche Ergebnis. Daher wird je Klasse bzw. Typ einmalig eine Funktion erzeugt und zwischengespeichert, die nur noch
+# die Werte umwandelt.
+_builders: Dict[Any, Callable[[Any], Any]] = {}
+_converters: Dict[Any, Callable[[Any], Any]] = {}
+_NO_DEFAULT = object()
+
 
 def dataclass_from_dict(cls: Type[T], args: Union[dict, T]) -> T:
     """Creates a @dataclass or normal class from a dictionary with constructor arguments
@@ -15,58 +22,107 @@ def dataclass_from_dict(cls: Type[T], args: Union[dict, T]) -> T:
 
     In case the supplied `args` is already of the desired type, `args` is returned unchanged
     """
+    try:
+        builder = _builders[cls]
+    except KeyError:
+        builder = _builders[cls] = _compile_builder(cls)
+    except TypeError:
+        # nicht hashbarer Typ
+        builder = _compile_builder(cls)
+    return builder(args)
+
+
+def _compile_builder(cls: Type[T]) -> Callable[[Any], T]:
     if isclass(cls):
-        if isinstance(args, cls):
-            return args
+        def is_instance(args) -> bool:
+            return isinstance(args, cls)
     elif get_origin(cls):
         # Generische Typen wie Dict[int, float] - aber nicht Union, da isinstance mit Union fehlschlägt
         origin = get_origin(cls)
-        if origin != Union and isinstance(args, origin):
-            return args
-    elif isinstance(args, type(cls)):
-        return args
+
+        def is_instance(args) -> bool:
+            return origin != Union and isinstance(args, origin)
+    else:
+        def is_instance(args) -> bool:
+            return isinstance(args, type(cls))
     arg_spec = inspect.getfullargspec(cls.__init__)
-    return cls(*[_get_argument_value(arg_spec, index, args) for index in range(1, len(arg_spec.args))])
+    arguments: List[Tuple[str, Any, Callable[[Any], Any]]] = [
+        (name, _get_default(arg_spec, index), _get_converter(arg_spec.annotations.get(name)))
+        for index, name in enumerate(arg_spec.args) if index > 0]
+
+    def build(parameters: Union[dict, T]) -> T:
+        if is_instance(parameters):
+            return parameters
+        values = []
+        for argument_name, default, converter in arguments:
+            try:
+                value = parameters[argument_name]
+            except KeyError:
+                if default is _NO_DEFAULT:
+                    raise Exception(
+                        "Cannot determine value for parameter %s: not given in %s and no default value specified" % (
+                            argument_name, parameters))
+                value = default
+            values.append(converter(value))
+        return cls(*values)
+    return build
 
 
-def _get_argument_value(arg_spec: FullArgSpec, index: int, parameters: dict):
-    argument_name = arg_spec.args[index]
+def _get_default(arg_spec: FullArgSpec, index: int):
     try:
-        value = parameters[argument_name]
+        return arg_spec.defaults[-len(arg_spec.args) + index]
+    except (IndexError, TypeError):
+        # If none of the parameters have a default value, then `arg_spec.defaults` is None and we get a `TypeError`.
+        # If there are parameters with default value, but not the one requested, we get an `IndexError`.
+        return _NO_DEFAULT
+
+
+def _get_converter(requested_type) -> Callable[[Any], Any]:
+    try:
+        converter = _converters[requested_type]
     except KeyError:
-        try:
-            value = arg_spec.defaults[-len(arg_spec.args) + index]
-        except (IndexError, TypeError):
-            # If none of the parameters have a default value, then `arg_spec.defaults` is None and we get a `TypeError`.
-            # If there are parameters with default value, but not the one requested, we get an `IndexError`.
-            raise Exception(
-                "Cannot determine value for parameter %s: not given in %s and no default value specified" % (
-                    argument_name, parameters))
-    return _dataclass_from_dict_recurse(value, arg_spec.annotations.get(argument_name))
-
-
-def _dataclass_from_dict_recurse(value, requested_type: Type[T]):
+        converter = _converters[requested_type] = _compile_converter(requested_type)
+    except TypeError:
+        # nicht hashbarer Typ
+        converter = _compile_converter(requested_type)
+    return converter
+
+
+def _compile_converter(requested_type: Type[T]) -> Callable[[Any], Any]:
     # Handle Optional types (Union[X, None]) - extract the actual type
     actual_type = requested_type
+    optional = False
     if get_origin(requested_type) == Union:
         args = get_args(requested_type)
         if len(args) == 2 and args[1].__name__ == 'NoneType':
-            if value is None:
-                return None
+            optional = True
             actual_type = args[0]  # Extract X from Optional[X]
 
-    if get_origin(actual_type) == list:
+    if get_origin(actual_type) == list and get_args(actual_type):
         # Extrahiere den generischen Typ der Liste
-        if get_args(actual_type):
-            generic_type = get_args(actual_type)[0]
-            # Konvertiere jedes Element der Liste in den generischen Typ
-            return [_dataclass_from_dict_recurse(item, generic_type) for item in value]
+        item_converter = _get_converter(get_args(actual_type)[0])
 
-    # Handle dict types (both direct and Optional[dict])
-    if isinstance(value, dict) and isclass(actual_type) and not issubclass(actual_type, dict):
-        return dataclass_from_dict(actual_type, value)
+        def convert(value):
+            # Konvertiere jedes Element der Liste in den generischen Typ
+            return [item_converter(item) for item in value]
+    else:
+        # Handle dict types (both direct and Optional[dict])
+        nested_class = isclass(actual_type) and not issubclass(actual_type, dict)
+        # Handle Enum types (both direct and Optional[Enum])
+        enum = isinstance(actual_type, type) and issubclass(actual_type, Enum)
+        if nested_class is False and enum is False:
+            def convert(value):
+                return value
+        else:
+            def convert(value):
+                if nested_class and isinstance(value, dict):
+                    return dataclass_from_dict(actual_type, value)
+                if enum:
+                    return actual_type(value)
+                return value
 
-    # Handle Enum types (both direct and Optional[Enum])
-    if isinstance(actual_type, type) and issubclass(actual_type, Enum):
-        return actual_type(value)
-    return value
+    if optional:
+        def convert_optional(value):
+            return None if value is None else convert(value)
+        return convert_optional
+    return convert
@@ -1,4 +1,6 @@
+import inspect
 from typing import Dict, Generic, Optional, Type, TypeVar
+from unittest.mock import Mock
 
 import pytest
 
@@ -190,3 +192,18 @@ def test_dataclass_from_dict():
 
     # evaluation
     assert vars(actual_dict) == vars(MyDataclass())
+
+
+def test_from_dict_compiles_class_once(monkeypatch):
+    # setup
+    dataclass_from_dict(NestedSample, {"normal": "normalValue", "nested": {"a": "aValue"}})
+    getfullargspec_mock = Mock(side_effect=AssertionError)
+    monkeypatch.setattr(inspect, "getfullargspec", getfullargspec_mock)
+
+    # execution
+    actual = dataclass_from_dict(NestedSample, {"normal": "normalValue", "nested": {"a": "aValue2"}})
+
+    # evaluation
+    assert actual.nested.a == "aValue2"
+    assert actual.nested.b == "bDefault"
+    assert getfullargspec_mock.call_count == 0
@@ -0,0 +1,131 @@
+"""Dauerhaftes Abonnement von Topics des internen Brokers.
+
+Module, die ihre Werte per MQTT erhalten, haben bisher in jedem Zyklus eine neue Verbindung zum Broker aufgebaut und
+eine Sekunde auf die retained Topics gewartet. Der BrokerTopicCache hält stattdessen eine Verbindung, abonniert die
+angefragten Topics beim ersten Zugriff und speichert die empfangenen Werte zusammen mit dem Empfangszeitpunkt. Nur
+beim ersten Zugriff auf ein Topic wird gewartet, bis der Broker die retained Topics gesendet hat. Dazu wird nach dem
+Abonnieren ein nicht abonniertes Topic abbestellt. Der Broker bearbeitet die Anfragen der Reihe nach, daher sind mit
+der Bestätigung der Abbestellung alle retained Topics des Abonnements empfangen.
+
+Die Werte laufen nicht von selbst ab. Damit ein ausgefallener Publisher nicht dauerhaft seinen letzten Wert liefert,
+übergeben die Module mit max_age das maximale Alter der Werte.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from paho.mqtt.client import MQTT_ERR_SUCCESS, topic_matches_sub
+
+from helpermodules.broker import BrokerClient
+from helpermodules.utils.topic_parser import decode_payload
+
+log = logging.getLogger(__name__)
+
+SYNC_TOPIC = "openWB/internal/broker_cache/sync"
+# maximale Wartezeit beim ersten Zugriff, entspricht der bisherigen Wartezeit je Zyklus
+FIRST_READ_TIMEOUT = 1
+# Werte, die seit so vielen Regelintervallen nicht aktualisiert wurden, gelten als ausgefallen.
+MAX_AGE_CONTROL_INTERVALS = 3
+
+
+class BrokerTopicCache:
+    def __init__(self, name: str = "topic-cache") -> None:
+        self.name = name
+        # RLock, da paho Callbacks auch im aufrufenden Thread ausführen kann
+        self._lock = threading.RLock()
+        self._connected = threading.Event()
+        self._client: Optional[BrokerClient] = None
+        # je Filter ein Event, das gesetzt wird, sobald die retained Topics des Abonnements empfangen wurden
+        self._filters: Dict[str, threading.Event] = {}
+        self._values: Dict[str, Tuple[Any, float]] = {}
+        self._sync_events: Dict[int, threading.Event] = {}
+
+    def get(self, topic_filter: str, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """ liefert die zuletzt empfangenen Werte aller Topics, die auf topic_filter passen.
+
+        Parameter
+        ---------
+        topic_filter: Topic, ggf. mit Wildcards
+        max_age: Werte, die vor mehr als max_age Sekunden empfangen wurden, werden nicht geliefert.
+        """
+        self._subscribe(topic_filter)
+        now = time.time()
+        with self._lock:
+            return {topic: value for topic, (value, timestamp) in self._values.items()
+                    if topic_matches_sub(topic_filter, topic) and (max_age is None or now - timestamp <= max_age)}
+
+    def get_timestamp(self, topic: str) -> Optional[float]:
+        """ Empfangszeitpunkt des zuletzt empfangenen Werts"""
+        with self._lock:
+            entry = self._values.get(topic)
+            return entry[1] if entry else None
+
+    def _subscribe(self, topic_filter: str) -> None:
+        with self._lock:
+            synced = self._filters.get(topic_filter)
+            if synced is None:
+                synced = self._filters[topic_filter] = threading.Event()
+                first_read = True
+            else:
+                first_read = False
+            if self._client is None:
+                self._client = BrokerClient(self.name, self._on_connect, self._on_message)
+                self._client.client.on_disconnect = self._on_disconnect
+                self._client.client.on_unsubscribe = self._on_unsubscribe
+                self._client.client.loop_start()
+        if first_read:
+            try:
+                self._first_subscribe(topic_filter)
+            finally:
+                synced.set()
+        # Ein gleichzeitiger Zugriff wartet, bis der erste Zugriff die retained Topics empfangen hat.
+        elif synced.wait(2 * FIRST_READ_TIMEOUT) is False:
+            log.warning(f"Retained Topics für {topic_filter} wurden noch nicht empfangen.")
+
+    def _first_subscribe(self, topic_filter: str) -> None:
+        if self._connected.wait(FIRST_READ_TIMEOUT) is False:
+            log.error(f"Keine Verbindung zum Broker, Topics {topic_filter} werden nach dem Verbindungsaufbau "
+                      "empfangen.")
+            return
+        # Wurde das Topic bereits in on_connect abonniert, ist das erneute Abonnieren unschädlich.
+        self._client.client.subscribe(topic_filter)
+        self._wait_for_retained(topic_filter)
+
+    def _wait_for_retained(self, topic_filter: str) -> None:
+        with self._lock:
+            rc, mid = self._client.client.unsubscribe(SYNC_TOPIC)
+            if rc != MQTT_ERR_SUCCESS:
+                return
+            event = self._sync_events.setdefault(mid, threading.Event())
+        if event.wait(FIRST_READ_TIMEOUT) is False:
+            log.warning(f"Retained Topics für {topic_filter} wurden nicht innerhalb von {FIRST_READ_TIMEOUT}s "
+                        "empfangen.")
+        with self._lock:
+            self._sync_events.pop(mid, None)
+
+    def _on_connect(self, client, userdata, flags: dict, rc: int) -> None:
+        with self._lock:
+            filters = list(self._filters)
+        for topic_filter in filters:
+            client.subscribe(topic_filter)
+        self._connected.set()
+
+    def _on_disconnect(self, client, userdata, rc: int) -> None:
+        self._connected.clear()
+        log.warning(f"Verbindung von {self.name} zum Broker getrennt, rc {rc}")
+
+    def _on_unsubscribe(self, client, userdata, mid: int) -> None:
+        with self._lock:
+            self._sync_events.setdefault(mid, threading.Event()).set()
+
+    def _on_message(self, client, userdata, message) -> None:
+        with self._lock:
+            if message.payload:
+                self._values[message.topic] = (decode_payload(message.payload), time.time())
+            else:
+                # gelöschtes retained Topic
+                self._values.pop(message.topic, None)
+
+
+topic_cache = BrokerTopicCache()
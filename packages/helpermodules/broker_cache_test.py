@@ -0,0 +1,107 @@
+import threading
+from unittest.mock import Mock
+
+import pytest
+from paho.mqtt.client import MQTT_ERR_SUCCESS, MQTTMessage
+
+from helpermodules import broker_cache
+from helpermodules.broker_cache import BrokerTopicCache
+
+
+def message(topic: str, payload: bytes) -> MQTTMessage:
+    msg = MQTTMessage(topic=topic.encode())
+    msg.payload = payload
+    return msg
+
+
+@pytest.fixture
+def cache(monkeypatch) -> BrokerTopicCache:
+    cache = BrokerTopicCache()
+    client = Mock()
+    client.subscribe.side_effect = lambda topic_filter: cache._on_message(
+        client, None, message(topic_filter.replace("#", "get/power"), b"1500"))
+
+    def unsubscribe(topic):
+        # Der Broker bestätigt die Abbestellung nach den retained Topics des Abonnements.
+        cache._on_unsubscribe(client, None, 7)
+        return MQTT_ERR_SUCCESS, 7
+    client.unsubscribe.side_effect = unsubscribe
+
+    def create_broker_client(name, on_connect, on_message):
+        on_connect(client, None, {}, 0)
+        return Mock(client=client)
+    monkeypatch.setattr(broker_cache, "BrokerClient", Mock(side_effect=create_broker_client))
+    return cache
+
+
+def test_get_waits_for_retained_topics_once(cache: BrokerTopicCache):
+    # execution
+    first = cache.get("openWB/mqtt/counter/1/#")
+    subscriptions = cache._client.client.subscribe.call_count
+    cache._on_message(None, None, message("openWB/mqtt/counter/1/get/power", b"-200"))
+    second = cache.get("openWB/mqtt/counter/1/#")
+
+    # evaluation
+    assert first == {"openWB/mqtt/counter/1/get/power": 1500}
+    assert second == {"openWB/mqtt/counter/1/get/power": -200}
+    assert broker_cache.BrokerClient.call_count == 1
+    assert cache._client.client.subscribe.call_count == subscriptions
+
+
+def test_get_filters_topics_and_stale_values(cache: BrokerTopicCache, monkeypatch):
+    # setup
+    cache.get("openWB/mqtt/counter/1/#")
+    cache._on_message(None, None, message("openWB/mqtt/counter/1/get/imported", b"100"))
+    cache._on_message(None, None, message("openWB/mqtt/counter/12/get/power", b"300"))
+    monkeypatch.setattr(broker_cache.time, "time", Mock(return_value=cache.get_timestamp(
+        "openWB/mqtt/counter/1/get/imported") + 60))
+
+    # execution
+    values = cache.get("openWB/mqtt/counter/1/#", max_age=30)
+
+    # evaluation
+    assert values == {}
+    assert cache.get("openWB/mqtt/counter/1/#") == {
+        "openWB/mqtt/counter/1/get/power": 1500, "openWB/mqtt/counter/1/get/imported": 100}
+
+
+def test_deleted_retained_topic_is_removed(cache: BrokerTopicCache):
+    # setup
+    cache.get("openWB/mqtt/counter/1/#")
+
+    # execution
+    cache._on_message(None, None, message("openWB/mqtt/counter/1/get/power", b""))
+
+    # evaluation
+    assert cache.get("openWB/mqtt/counter/1/#") == {}
+
+
+def test_concurrent_get_waits_for_first_sync(cache: BrokerTopicCache):
+    # setup
+    cache.get("openWB/mqtt/counter/2/#")
+    client = cache._client.client
+    unsubscribed = threading.Event()
+    client.subscribe.side_effect = None
+    client.unsubscribe.side_effect = lambda topic: unsubscribed.set() or (MQTT_ERR_SUCCESS, 8)
+    results = {}
+
+    def get(name: str):
+        results[name] = cache.get("openWB/mqtt/counter/1/#")
+
+    # execution
+    first = threading.Thread(target=get, args=("first",))
+    first.start()
+    assert unsubscribed.wait(1)
+    second = threading.Thread(target=get, args=("second",))
+    second.start()
+    second.join(0.1)
+    second_returned_early = not second.is_alive()
+    cache._on_message(client, None, message("openWB/mqtt/counter/1/get/power", b"1500"))
+    cache._on_unsubscribe(client, None, 8)
+    first.join(1)
+    second.join(1)
+
+    # evaluation
+    assert second_returned_early is False
+    assert results == {"first": {"openWB/mqtt/counter/1/get/power": 1500},
+                       "second": {"openWB/mqtt/counter/1/get/power": 1500}}
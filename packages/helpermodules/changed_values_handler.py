@@ -1,12 +1,13 @@
-from dataclasses import fields, is_dataclass
+import copy
+from dataclasses import Field, fields, is_dataclass
 from enum import Enum
 import logging
-from threading import Event
-from typing import Dict, List, Tuple
+from threading import Lock
+from typing import Any, Callable, Dict, List, Tuple
 from control import data
 
-from control.data import Data
 from dataclass_utils._dataclass_asdict import asdict
+from helpermodules.cycle_profiler import cycle_profiler
 from helpermodules.pub import Pub
 
 
@@ -62,87 +63,224 @@ log = logging.getLogger(__name__)
 # class Sample:
 #     def __init__(self) -> None:
 #         self.data = SampleData()
+#
+# Geänderte Werte werden nicht durch den Vergleich mit einer Kopie aller Daten ermittelt. Beim Betreten des
+# Kontextmanagers werden die Instanzen registriert und der __setattr__ der Klassen erweitert. Bei der ersten Zuweisung
+# an ein Feld mit Topic wird der vorherige Wert gemerkt. Beim Verlassen werden nur die zugewiesenen Felder verglichen.
+# Listen, Dictionaries und Klassen können auch ohne Zuweisung verändert werden (zB list.append), daher wird von diesen
+# Feldern beim Betreten eine Kopie erstellt.
+
+
+_FieldsOfClass = Dict[str, Tuple[int, Field]]
+_fields_cache: Dict[type, _FieldsOfClass] = {}
+
+
+def _get_fields(cls: type) -> _FieldsOfClass:
+    try:
+        return _fields_cache[cls]
+    except KeyError:
+        # Die Field-Instanzen werden gespeichert, nicht die Topics, da die Metadaten zur Laufzeit gesetzt werden können
+        # (siehe create_pricing_get_with_topics).
+        _fields_cache[cls] = {f.name: (i, f) for i, f in enumerate(fields(cls))}
+        return _fields_cache[cls]
+
+
+def _is_mutable(value) -> bool:
+    return not isinstance(value, (str, int, float, bool, Enum, type(None)))
+
+
+def _changed(previous_value, value) -> bool:
+    if isinstance(value, Enum):
+        value = value.value
+    if isinstance(previous_value, Enum):
+        previous_value = previous_value.value
+    if isinstance(value, (bool, type(None))):
+        return previous_value is not value
+    return previous_value != value
+
+
+def _payload(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (str, int, float, bool, Dict, List, Tuple, type(None))):
+        return value
+    return asdict(value)
+
+
+class ChangeTracker:
+    """ Merkt sich für registrierte Instanzen die Werte der Felder mit Topic vor der ersten Zuweisung."""
+
+    def __init__(self) -> None:
+        self.active = False
+        self.lock = Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        # id der Instanz: (Reihenfolge, Topic-Prefix, Instanz, Felder mit Kopie)
+        self.instances: Dict[int, Tuple[int, str, Any, Dict[str, Any]]] = {}
+        # (id der Instanz, Feld): Wert vor der ersten Zuweisung
+        self.assigned: Dict[Tuple[int, str], Any] = {}
+        # (id der Instanz, Feld): durch eine neue Instanz ersetzte Klasse ohne eigenes Topic
+        self.replaced: Dict[Tuple[int, str], Any] = {}
+
+    def register(self, topic_prefix: str, inst) -> None:
+        """ registriert die Instanz und alle verschachtelten Klassen ohne eigenes Topic."""
+        _install_hook(type(inst))
+        mutable_values = {}
+        self.instances[id(inst)] = (len(self.instances), topic_prefix, inst, mutable_values)
+        for name, (_, f) in _get_fields(type(inst)).items():
+            value = getattr(inst, name)
+            if f.metadata.get("topic"):
+                if _is_mutable(value):
+                    mutable_values[name] = copy.deepcopy(value)
+            elif is_dataclass(value) and id(value) not in self.instances:
+                self.register(topic_prefix, value)
+
+    def on_setattr(self, inst, name: str) -> None:
+        if id(inst) not in self.instances:
+            return
+        with self.lock:
+            key = (id(inst), name)
+            if key in self.assigned or key in self.replaced:
+                return
+            mutable_values = self.instances[id(inst)][3]
+            field_ = _get_fields(type(inst)).get(name)
+            if field_ is None or name in mutable_values:
+                return
+            previous_value = getattr(inst, name, None)
+            if field_[1].metadata.get("topic"):
+                self.assigned[key] = previous_value
+            elif is_dataclass(previous_value):
+                self.replaced[key] = previous_value
+
+    def previous_value(self, inst, name: str):
+        """ Wert des Feldes beim Registrieren der Instanz"""
+        key = (id(inst), name)
+        if key in self.assigned:
+            return self.assigned[key]
+        elif key in self.replaced:
+            return self.replaced[key]
+        entry = self.instances.get(id(inst))
+        if entry is not None and name in entry[3]:
+            return entry[3][name]
+        return getattr(inst, name)
+
+    def collect_changes(self) -> List[Tuple[str, Any, Any]]:
+        """ gibt die geänderten Werte sortiert nach Registrierung und Feldreihenfolge zurück."""
+        changes: List[Tuple[Tuple[int, ...], str, Any, Any]] = []
+        with self.lock:
+            for (inst_id, name), previous_value in self.assigned.items():
+                order, topic_prefix, inst, _ = self.instances[inst_id]
+                self._add_if_changed(changes, (order,), topic_prefix, inst, name, previous_value)
+            for order, topic_prefix, inst, mutable_values in self.instances.values():
+                for name, previous_value in mutable_values.items():
+                    self._add_if_changed(changes, (order,), topic_prefix, inst, name, previous_value)
+            for (inst_id, name), previous_inst in self.replaced.items():
+                order, topic_prefix, inst, _ = self.instances[inst_id]
+                value = getattr(inst, name)
+                if is_dataclass(value):
+                    self._collect_replaced(changes, (order, _get_fields(type(inst))[name][0]), topic_prefix,
+                                           previous_inst, value)
+        changes.sort(key=lambda change: change[0])
+        return [change[1:] for change in changes]
+
+    def _add_if_changed(self, changes: List, order: Tuple[int, ...], topic_prefix: str, inst, name: str,
+                        previous_value) -> None:
+        index, field_ = _get_fields(type(inst))[name]
+        value = getattr(inst, name)
+        if _changed(previous_value, value):
+            changes.append((order + (index,), f"{topic_prefix}{field_.metadata['topic']}", value, previous_value))
+
+    def _collect_replaced(self, changes: List, order: Tuple[int, ...], topic_prefix: str, previous_inst, inst) -> None:
+        # Wurde eine verschachtelte Klasse ohne Topic ersetzt, wird die neue Instanz mit den ursprünglichen Werten
+        # der alten Instanz verglichen.
+        for name, (index, field_) in _get_fields(type(inst)).items():
+            value = getattr(inst, name)
+            try:
+                previous_value = self.previous_value(previous_inst, name)
+            except AttributeError:
+                previous_value = None
+            if field_.metadata.get("topic"):
+                if _changed(previous_value, value):
+                    changes.append((order + (index,), f"{topic_prefix}{field_.metadata['topic']}",
+                                    value, previous_value))
+            elif is_dataclass(value) and is_dataclass(previous_value):
+                self._collect_replaced(changes, order + (index,), topic_prefix, previous_value, value)
+
+
+_tracker = ChangeTracker()
+
+
+def _install_hook(cls: type) -> None:
+    if getattr(cls.__setattr__, "_changed_values_hook", False):
+        return
+    original_setattr: Callable = cls.__setattr__
+
+    def __setattr__(self, name, value):
+        if _tracker.active:
+            _tracker.on_setattr(self, name)
+        original_setattr(self, name, value)
+    __setattr__._changed_values_hook = True
+    cls.__setattr__ = __setattr__
 
 
 class ChangedValuesHandler:
-    def __init__(self, event_module_update_completed: Event) -> None:
-        self.prev_data: Data = Data(event_module_update_completed)
+    def __init__(self) -> None:
+        self.tracker = _tracker
 
     def store_initial_values(self):
         try:
-            # speichern der Daten zum Zyklus-Beginn, um später die geänderten Werte zu ermitteln
-            self.prev_data.copy_data()
+            # registrieren der Daten zum Zyklus-Beginn, um später die geänderten Werte zu ermitteln
+            self.tracker.clear()
+            self._register("openWB/set/bat/", data.data.bat_all_data.data)
+            self._register("openWB/set/chargepoint/", data.data.cp_all_data.data.get)
+            self._register("openWB/set/counter/", data.data.counter_all_data.data)
+            self._register("openWB/set/optional/", data.data.optional_data.data)
+            for value in data.data.cp_data.values():
+                self._register(f"openWB/set/chargepoint/{value.num}/", value.data)
+            for value in data.data.bat_data.values():
+                self._register(f"openWB/set/bat/{value.num}/", value.data)
+            for value in data.data.counter_data.values():
+                self._register(f"openWB/set/counter/{value.num}/", value.data)
+            # chargepoint, ev template, autolock, time and scheduled charging plans mutable_by_algorithm immer false
+            self.tracker.active = True
+        except Exception as e:
+            log.exception(e)
+
+    def _register(self, topic_prefix: str, data_inst) -> None:
+        try:
+            self.tracker.register(topic_prefix, data_inst)
         except Exception as e:
             log.exception(e)
 
     def pub_changed_values(self):
         try:
             # veröffentlichen der geänderten Werte
-            self._update_value("openWB/set/bat/", self.prev_data.bat_all_data.data, data.data.bat_all_data.data)
-            self._update_value("openWB/set/chargepoint/", self.prev_data.cp_all_data.data.get,
-                               data.data.cp_all_data.data.get)
-            self._update_value("openWB/set/counter/", self.prev_data.counter_all_data.data,
-                               data.data.counter_all_data.data)
-            self._update_value("openWB/set/optional/", self.prev_data.optional_data.data,
-                               data.data.optional_data.data)
-            for key, value in data.data.cp_data.items():
-                self._update_value(f"openWB/set/chargepoint/{value.num}/", self.prev_data.cp_data[key].data, value.data)
-            for key, value in data.data.bat_data.items():
-                self._update_value(f"openWB/set/bat/{value.num}/", self.prev_data.bat_data[key].data, value.data)
-            for key, value in data.data.counter_data.items():
-                self._update_value(f"openWB/set/counter/{value.num}/",
-                                   self.prev_data.counter_data[key].data, value.data)
-            # chargepoint, ev template, autolock, time and scheduled charging plans mutable_by_algorithm immer false
+            self.tracker.active = False
+            for topic, value, previous_value in self.tracker.collect_changes():
+                self._pub(topic, value, previous_value)
         except Exception as e:
             log.exception(e)
+        finally:
+            self.tracker.clear()
 
-    def _update_value(self, topic_prefix, data_inst_previous, data_inst):
+    def _pub(self, topic: str, value, previous_value) -> None:
         try:
-            for f in fields(data_inst):
-                try:
-                    changed = False
-                    value = getattr(data_inst, f.name)
-                    if isinstance(value, Enum):
-                        value = value.value
-                    previous_value = getattr(data_inst_previous, f.name)
-                    if isinstance(previous_value, Enum):
-                        previous_value = previous_value.value
-                    if hasattr(f, "metadata"):
-                        if f.metadata.get("topic"):
-                            if isinstance(value, (str, int, float, Dict, List, Tuple)):
-                                if previous_value != value:
-                                    changed = True
-                            elif isinstance(value, (bool, type(None))):
-                                if previous_value is not value:
-                                    changed = True
-                            else:
-                                dict_prev = dict(asdict(previous_value))
-                                dict_current = dict(asdict(value))
-                                if dict_prev != dict_current:
-                                    changed = True
-                                    value = asdict(value)
-                                    previous_value = asdict(previous_value)
-
-                            if changed:
-                                topic = f"{topic_prefix}{f.metadata['topic']}"
-                                Pub().pub(topic, value)
-                                log.debug(f"Topic {topic}, Payload {value}, vorherige Payload: {previous_value}")
-                            continue
-                    if is_dataclass(value):
-                        self._update_value(topic_prefix, previous_value, value)
-                except Exception as e:
-                    log.exception(e)
+            value = _payload(value)
+            Pub().pub(topic, value)
+            log.debug(f"Topic {topic}, Payload {value}, vorherige Payload: {_payload(previous_value)}")
         except Exception as e:
             log.exception(e)
 
 
 class ChangedValuesContext:
-    def __init__(self, event_module_update_completed: Event):
-        self.changed_values_handler = ChangedValuesHandler(event_module_update_completed)
+    def __init__(self):
+        self.changed_values_handler = ChangedValuesHandler()
 
     def __enter__(self):
         self.changed_values_handler.store_initial_values()
 
     def __exit__(self, exception_type, exception, exception_traceback) -> bool:
-        self.changed_values_handler.pub_changed_values()
+        with cycle_profiler.phase("changed_values"):
+            self.changed_values_handler.pub_changed_values()
         return False
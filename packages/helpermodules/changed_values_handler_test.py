@@ -1,4 +1,4 @@
-from dataclasses import asdict, dataclass, field
+from dataclasses import asdict, dataclass, field, fields
 from enum import IntEnum
 from typing import Dict, List, Optional, Tuple
 from unittest.mock import Mock
@@ -103,14 +103,75 @@ cases = [
 
 
 @pytest.mark.parametrize("params", cases, ids=[c.name for c in cases])
-def test_update_value(params: Params, mock_pub: Mock, monkeypatch):
+def test_assigned_field_published(params: Params, mock_pub: Mock):
     # setup
-    handler = ChangedValuesHandler(Mock())
+    handler = ChangedValuesHandler()
+    sample = SampleData()
+    handler.tracker.clear()
+    handler.tracker.register("openWB/", sample)
+    handler.tracker.active = True
 
     # execution
-    handler._update_value("openWB/", SampleData(), params.sample_data)
+    for field_ in fields(SampleData):
+        setattr(sample, field_.name, getattr(params.sample_data, field_.name))
+    handler.pub_changed_values()
 
     # evaluation
-    assert len(mock_pub.method_calls) - 1 == params.expected_calls
+    assert len(mock_pub.method_calls) == params.expected_calls
     if params.expected_calls > 0:
-        assert mock_pub.method_calls[1].args == params.expected_pub_call
+        assert mock_pub.method_calls[0].args == params.expected_pub_call
+
+
+def test_tracker_assigned_values(mock_pub: Mock):
+    # setup
+    handler = ChangedValuesHandler()
+    sample = SampleData()
+    handler.tracker.clear()
+    handler.tracker.register("openWB/", sample)
+    handler.tracker.active = True
+
+    # execution
+    sample.sample_field_int = 2
+    sample.sample_field_int = 3
+    sample.sample_field_str = "Hi"
+    sample.sample_field_nested.parameter1 = True
+    sample.sample_field_list[0] = 16
+    handler.pub_changed_values()
+
+    # evaluation
+    assert [c.args for c in mock_pub.method_calls] == [("openWB/get/field_int", 3),
+                                                       ("openWB/get/field_list", [16, 0, 0]),
+                                                       ("openWB/get/nested1", True)]
+
+
+def test_tracker_replaced_nested_class(mock_pub: Mock):
+    # setup
+    handler = ChangedValuesHandler()
+    sample = SampleData(sample_field_nested=SampleNested(parameter1=True))
+    handler.tracker.clear()
+    handler.tracker.register("openWB/", sample)
+    handler.tracker.active = True
+
+    # execution
+    sample.sample_field_nested = SampleNested(parameter1=True, parameter2=4)
+    handler.pub_changed_values()
+
+    # evaluation
+    assert [c.args for c in mock_pub.method_calls] == [("openWB/get/nested2", 4)]
+
+
+def test_tracker_ignores_unregistered_instances(mock_pub: Mock):
+    # setup
+    handler = ChangedValuesHandler()
+    handler.tracker.clear()
+    handler.tracker.register("openWB/", SampleData())
+    handler.tracker.active = True
+
+    # execution
+    SampleData().sample_field_int = 5
+    assigned = dict(handler.tracker.assigned)
+    handler.pub_changed_values()
+
+    # evaluation
+    assert assigned == {}
+    assert mock_pub.method_calls == []
@@ -30,6 +30,7 @@ from helpermodules.broker import BrokerClient
 from helpermodules.data_migration.data_migration import MigrateData
 from helpermodules.measurement_logging.process_log import (convert_legacy_units, get_daily_log, get_monthly_log,
                                                            get_yearly_log)
+from helpermodules.measurement_logging.write_log import export_pending_json
 from helpermodules.messaging import MessageType, pub_user_message
 from helpermodules.mosquitto_dynsec.mosquitto_dynsec import (generate_password_reset_token, get_user_email,
                                                              send_password_reset_to_server, verify_password_reset_token)
@@ -961,6 +962,8 @@ class Command:
         pub_user_message(payload, connection_id, "Sicherung wird erstellt...", MessageType.INFO)
         parent_file = Path(__file__).resolve().parents[2]
         try:
+            # Die Sicherung enthält nur die JSON-Logs.
+            export_pending_json()
             result = run_command([
                 str(parent_file / "runs" / "backup.sh"),
                 "1" if "use_extended_filename" in payload["data"] and payload["data"]["use_extended_filename"] else "0"
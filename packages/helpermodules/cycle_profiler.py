@@ -0,0 +1,265 @@
+"""Laufzeitmessung des Regelzyklus.
+
+Bisher war nur erkennbar, dass ein Regelzyklus zu lange dauert, wenn monitor_handler_locks nach mehr als 30s die
+Stack-Traces ins Log schreibt. Der CycleProfiler misst die Dauer der einzelnen Abschnitte des 10s-Handlers (Kopieren der
+Daten, Ebenen von loadvars, Abfragen der Geräte, Algorithmus, ...) und veröffentlicht Median, 95. Perzentil und
+Maximum der letzten Zyklen unter openWB/system/perf/timing/<Abschnitt>.
+
+Zusätzlich kann für eine Anzahl Zyklen ein Profil in die Ramdisk geschrieben werden:
+- "cprofile": cProfile des Threads, der den Zyklus ausführt (ramdisk/perf/cycle_<Zeitpunkt>.prof und .txt)
+- "sampling": die Stacks aller Threads werden regelmäßig abgetastet und im Format von flamegraph.pl bzw. speedscope
+  gespeichert (ramdisk/perf/cycle_<Zeitpunkt>.folded).
+
+Die Konfiguration erfolgt über openWB/set/system/perf/config. Ist die Messung deaktiviert, prüfen die Abschnitte nur ein
+Flag.
+"""
+import cProfile
+from collections import Counter, deque
+from contextlib import contextmanager
+import io
+import logging
+import math
+from pathlib import Path
+import pstats
+import sys
+import threading
+import time
+from typing import Deque, Dict, Iterator, Optional
+
+from helpermodules.pub import Pub
+
+log = logging.getLogger(__name__)
+
+PERF_TOPIC = "openWB/system/perf"
+# Anzahl der Zyklen, über die Median, 95. Perzentil und Maximum gebildet werden
+WINDOW = 60
+# Die Messwerte werden nach dieser Anzahl Zyklen veröffentlicht.
+PUBLISH_INTERVAL = 6
+MAX_PROFILE_CYCLES = 60
+SAMPLING_INTERVAL = 0.01
+PROFILE_MODES = ("cprofile", "sampling")
+
+
+def _get_profile_path() -> Path:
+    return Path(__file__).resolve().parents[2]/"ramdisk"/"perf"
+
+
+def _topic_suffix(name: str) -> str:
+    return name.replace(" ", "_").replace("+", "_").replace("#", "_")
+
+
+def _percentile(sorted_values, percent: float) -> float:
+    # Nearest-Rank-Methode
+    return sorted_values[max(math.ceil(percent / 100 * len(sorted_values)) - 1, 0)]
+
+
+class _NoPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception, exception_traceback) -> bool:
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+class _Phase:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: "CycleProfiler", name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exception_type, exception, exception_traceback) -> bool:
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class StackSampler:
+    """ tastet die Stacks aller Threads ab und zählt gleiche Stacks im Format "Thread;Funktion;Funktion Anzahl"."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="perf sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def sample(self) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            functions = []
+            while frame is not None:
+                functions.append(f"{frame.f_code.co_name} ({Path(frame.f_code.co_filename).name}:"
+                                 f"{frame.f_code.co_firstlineno})")
+                frame = frame.f_back
+            functions.append(names.get(ident, str(ident)).replace(";", ","))
+            self.stacks[";".join(reversed(functions))] += 1
+
+    def _run(self) -> None:
+        while self._stop.wait(self.interval) is False:
+            self.sample()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class CycleProfiler:
+    def __init__(self) -> None:
+        self.active = False
+        self.profile_cycles = 0
+        self.profile_mode = "sampling"
+        self._lock = threading.Lock()
+        self._cycle_active = False
+        self._cycles = 0
+        self._timings: Dict[str, Deque[float]] = {}
+        self._published_phases = set()
+        self._profile_remaining = 0
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[StackSampler] = None
+
+    def configure(self, config: Dict) -> None:
+        """ übernimmt die Konfiguration aus openWB/system/perf/config"""
+        active = bool(config.get("active", False))
+        profile_mode = config.get("profile_mode", "sampling")
+        if profile_mode not in PROFILE_MODES:
+            log.error(f"Ungültiger Profil-Modus {profile_mode}, gültig sind {PROFILE_MODES}")
+            profile_mode = "sampling"
+        with self._lock:
+            if self.active and not active:
+                self._clear_timings()
+            self.active = active
+            self.profile_mode = profile_mode
+            self.profile_cycles = min(max(int(config.get("profile_cycles", 0)), 0), MAX_PROFILE_CYCLES)
+
+    def phase(self, name: str):
+        """ Kontextmanager, der die Dauer des Abschnitts misst. Außerhalb eines gemessenen Zyklus ohne Wirkung."""
+        if self._cycle_active:
+            return _Phase(self, name)
+        return _NO_PHASE
+
+    def record(self, name: str, duration: float) -> None:
+        if self._cycle_active:
+            with self._lock:
+                try:
+                    timings = self._timings[name]
+                except KeyError:
+                    timings = self._timings[name] = deque(maxlen=WINDOW)
+                timings.append(duration)
+
+    @contextmanager
+    def cycle(self) -> Iterator[None]:
+        """ umschließt einen Regelzyklus. Misst die Gesamtdauer und erstellt ggf. ein Profil."""
+        if not self.active and self.profile_cycles == 0 and self._profile_remaining == 0:
+            yield
+            return
+        self._start_profile()
+        self._cycle_active = self.active
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record("cycle", time.perf_counter() - start)
+            self._cycle_active = False
+            self._stop_profile()
+            if self.active:
+                self._cycles += 1
+                if self._cycles % PUBLISH_INTERVAL == 0:
+                    self.publish()
+
+    def statistics(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            timings = {name: sorted(values) for name, values in self._timings.items() if values}
+        return {name: {"p50": round(_percentile(values, 50), 4),
+                       "p95": round(_percentile(values, 95), 4),
+                       "max": round(values[-1], 4),
+                       "count": len(values)}
+                for name, values in timings.items()}
+
+    def publish(self) -> None:
+        try:
+            for name, statistics in self.statistics().items():
+                Pub().pub(f"{PERF_TOPIC}/timing/{_topic_suffix(name)}", statistics)
+                self._published_phases.add(name)
+        except Exception:
+            log.exception("Fehler beim Veröffentlichen der Laufzeiten")
+
+    def _clear_timings(self) -> None:
+        self._timings.clear()
+        self._cycles = 0
+        for name in self._published_phases:
+            Pub().pub(f"{PERF_TOPIC}/timing/{_topic_suffix(name)}", "")
+        self._published_phases.clear()
+
+    def _start_profile(self) -> None:
+        if self._profile_remaining == 0 and self.profile_cycles > 0:
+            self._profile_remaining = self.profile_cycles
+            self._profile_start = time.strftime("%Y%m%d_%H%M%S")
+            self._profile_mode = self.profile_mode
+            if self._profile_mode == "cprofile":
+                self._cprofile = cProfile.Profile()
+            else:
+                self._sampler = StackSampler(SAMPLING_INTERVAL)
+        if self._profile_remaining > 0:
+            if self._cprofile is not None:
+                self._cprofile.enable()
+            if self._sampler is not None:
+                self._sampler.start()
+
+    def _stop_profile(self) -> None:
+        if self._profile_remaining == 0:
+            return
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        self._profile_remaining -= 1
+        if self._profile_remaining == 0:
+            self._write_profile()
+            # Profil nur einmal erstellen
+            self.profile_cycles = 0
+            Pub().pub("openWB/set/system/perf/config",
+                      {"active": self.active, "profile_cycles": 0, "profile_mode": self.profile_mode})
+
+    def _write_profile(self) -> None:
+        try:
+            path = _get_profile_path()
+            path.mkdir(parents=True, exist_ok=True)
+            file_name = path/f"cycle_{self._profile_start}"
+            if self._cprofile is not None:
+                self._cprofile.dump_stats(f"{file_name}.prof")
+                summary = io.StringIO()
+                pstats.Stats(self._cprofile, stream=summary).sort_stats("cumulative").print_stats(50)
+                with open(f"{file_name}.txt", "w") as f:
+                    f.write(summary.getvalue())
+                log.info(f"Profil des Regelzyklus gespeichert: {file_name}.prof")
+            if self._sampler is not None:
+                with open(f"{file_name}.folded", "w") as f:
+                    f.write(self._sampler.folded())
+                log.info(f"Abgetastete Stacks des Regelzyklus gespeichert: {file_name}.folded")
+        except Exception:
+            log.exception("Fehler beim Speichern des Profils")
+        finally:
+            self._cprofile = None
+            self._sampler = None
+
+
+cycle_profiler = CycleProfiler()
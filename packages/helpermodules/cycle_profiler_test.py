@@ -0,0 +1,81 @@
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from helpermodules import cycle_profiler
+from helpermodules.cycle_profiler import CycleProfiler, PUBLISH_INTERVAL
+
+
+def test_disabled_records_nothing():
+    # setup
+    profiler = CycleProfiler()
+
+    # execution
+    with profiler.cycle():
+        with profiler.phase("algorithm"):
+            pass
+        profiler.record("loadvars/device1", 0.5)
+
+    # evaluation
+    assert profiler.statistics() == {}
+
+
+def test_statistics_published(mock_pub: Mock):
+    # setup
+    profiler = CycleProfiler()
+    profiler.configure({"active": True})
+
+    # execution
+    for i in range(PUBLISH_INTERVAL):
+        with profiler.cycle():
+            profiler.record("loadvars/set values cp3", 0.1 * (i + 1))
+    # außerhalb eines Zyklus wird nichts gemessen
+    profiler.record("loadvars/set values cp3", 10)
+
+    # evaluation
+    statistics = profiler.statistics()
+    assert statistics["loadvars/set values cp3"] == {"p50": 0.3, "p95": 0.6, "max": 0.6, "count": PUBLISH_INTERVAL}
+    assert statistics["cycle"]["count"] == PUBLISH_INTERVAL
+    topics = [c.args[0] for c in mock_pub.pub.call_args_list]
+    assert "openWB/system/perf/timing/loadvars/set_values_cp3" in topics
+    assert "openWB/system/perf/timing/cycle" in topics
+
+
+def test_deactivate_clears_topics(mock_pub: Mock):
+    # setup
+    profiler = CycleProfiler()
+    profiler.configure({"active": True})
+    for _ in range(PUBLISH_INTERVAL):
+        with profiler.cycle():
+            pass
+    mock_pub.pub.reset_mock()
+
+    # execution
+    profiler.configure({"active": False})
+
+    # evaluation
+    mock_pub.pub.assert_called_once_with("openWB/system/perf/timing/cycle", "")
+    assert profiler.statistics() == {}
+
+
+@pytest.mark.parametrize("mode, suffixes", [pytest.param("cprofile", {".prof", ".txt"}, id="cprofile"),
+                                            pytest.param("sampling", {".folded"}, id="sampling")])
+def test_profile_written_to_ramdisk(mode, suffixes, tmp_path, monkeypatch, mock_pub: Mock):
+    # setup
+    monkeypatch.setattr(cycle_profiler, "_get_profile_path", lambda: tmp_path)
+    monkeypatch.setattr(cycle_profiler, "SAMPLING_INTERVAL", 0.001)
+    profiler = CycleProfiler()
+    profiler.configure({"profile_cycles": 2, "profile_mode": mode})
+    event = threading.Event()
+
+    # execution
+    for _ in range(2):
+        with profiler.cycle():
+            event.wait(0.05)
+
+    # evaluation
+    assert {f.suffix for f in tmp_path.iterdir()} == suffixes
+    assert profiler.profile_cycles == 0
+    mock_pub.pub.assert_called_once_with("openWB/set/system/perf/config",
+                                         {"active": False, "profile_cycles": 0, "profile_mode": mode})
@@ -1,17 +1,129 @@
+from collections import deque
 from dataclasses import dataclass, field
+import itertools
 import json
 from pathlib import Path
 import time
 import datetime
 import logging
+from typing import Deque, List, Optional, Tuple
 
 from control import data
 from helpermodules.pub import Pub
-from helpermodules.utils.run_command import run_command
 from modules.common.fault_state import FaultStateLevel
 
 log = logging.getLogger(__name__)
 
+# Die Live-Daten werden in Blöcken zu CHUNK_SIZE Zeilen unter openWB/graph/alllivevaluesJson1 bis
+# openWB/graph/alllivevaluesJson<CHUNKS> veröffentlicht. Die Web-Themes erwarten genau CHUNKS Blöcke.
+CHUNK_SIZE = 50
+CHUNKS = 16
+# Einträge je Minute bei einem Regelintervall von 10s
+SAMPLES_PER_MINUTE = 6
+LIVE_GRAPH_TOPIC = "openWB/graph/alllivevaluesJson"
+
+
+def _get_snapshot_path() -> Path:
+    return Path(__file__).resolve().parents[2]/"ramdisk"/"graph_live.json"
+
+
+class LiveGraphBuffer:
+    """ Ringpuffer der Live-Daten.
+
+    Die Blöcke sind an der fortlaufenden Nummer der Einträge ausgerichtet (Eintrag n liegt im Block n // CHUNK_SIZE),
+    daher ändert sich je Regelzyklus nur der neueste und ggf. der älteste Block. Erst wenn der älteste Block vollständig
+    entfernt wurde, verschieben sich die Nummern der Topics und alle Blöcke werden neu veröffentlicht.
+
+    Als Sicherung für einen Neustart des Prozesses werden die Einträge in der Ramdisk angehängt. Die Datei wird gekürzt,
+    sobald sie doppelt so viele Einträge wie der Puffer enthält.
+    """
+
+    def __init__(self, snapshot_path: Optional[Path] = None) -> None:
+        self.snapshot_path = snapshot_path
+        self.lines: Deque[str] = deque()
+        # fortlaufende Nummer des ältesten Eintrags
+        self.first_index = 0
+        # veröffentlichte Einträge je Topic als (erster, letzter + 1) Eintrag
+        self.published: List[Optional[Tuple[int, int]]] = [None] * CHUNKS
+        self.published_first_block: Optional[int] = None
+        self.snapshot_lines = 0
+        self._load_snapshot()
+
+    @staticmethod
+    def capacity(duration: int) -> int:
+        return min(duration * SAMPLES_PER_MINUTE, CHUNK_SIZE * CHUNKS)
+
+    def append(self, line: str, capacity: int) -> None:
+        self.lines.append(line)
+        last_index = self.first_index + len(self.lines) - 1
+        while (len(self.lines) > capacity or
+               last_index // CHUNK_SIZE - self.first_index // CHUNK_SIZE >= CHUNKS):
+            self.lines.popleft()
+            self.first_index += 1
+        self._write_snapshot(line, capacity)
+
+    def changed_chunks(self) -> List[Tuple[str, str]]:
+        """ gibt Topic und Payload der Blöcke zurück, die sich seit der letzten Veröffentlichung geändert haben."""
+        first_block = self.first_index // CHUNK_SIZE
+        end_index = self.first_index + len(self.lines)
+        if first_block != self.published_first_block:
+            self.published = [None] * CHUNKS
+            self.published_first_block = first_block
+        chunks = []
+        for i in range(CHUNKS):
+            start = max(self.first_index, (first_block + i) * CHUNK_SIZE)
+            end = max(start, min(end_index, (first_block + i + 1) * CHUNK_SIZE))
+            if self.published[i] != (start, end):
+                self.published[i] = (start, end)
+                chunks.append((f"{LIVE_GRAPH_TOPIC}{i + 1}", self._payload(start, end)))
+        return chunks
+
+    def latest(self) -> str:
+        start = max(0, len(self.lines) - CHUNK_SIZE)
+        return "\n".join(itertools.islice(self.lines, start, None))
+
+    def _payload(self, start: int, end: int) -> str:
+        payload = "\n".join(itertools.islice(self.lines, start - self.first_index, end - self.first_index))
+        # wie bisher graphing.sh: leere Blöcke als "-"
+        return payload if len(payload) >= 10 else "-"
+
+    def _load_snapshot(self) -> None:
+        if self.snapshot_path is None or self.snapshot_path.is_file() is False:
+            return
+        try:
+            with open(self.snapshot_path, "r") as f:
+                lines = [line.rstrip("\n") for line in f if line.startswith("{")]
+            self.lines.extend(lines[-CHUNK_SIZE * CHUNKS:])
+            self.snapshot_lines = len(lines)
+        except Exception:
+            log.exception("Fehler beim Lesen der Live-Daten")
+
+    def _write_snapshot(self, line: str, capacity: int) -> None:
+        if self.snapshot_path is None:
+            return
+        try:
+            if self.snapshot_lines >= 2 * capacity:
+                with open(self.snapshot_path, "w") as f:
+                    f.writelines(f"{entry}\n" for entry in self.lines)
+                self.snapshot_lines = len(self.lines)
+            else:
+                with open(self.snapshot_path, "a") as f:
+                    f.write(f"{line}\n")
+                self.snapshot_lines += 1
+        except Exception:
+            log.exception("Fehler beim Schreiben der Live-Daten")
+
+
+_live_graph: Optional[LiveGraphBuffer] = None
+
+
+def _get_live_graph() -> LiveGraphBuffer:
+    # Graph wird je Regelzyklus kopiert, daher liegt der Puffer im Modul.
+    global _live_graph
+    if _live_graph is None:
+        _live_graph = LiveGraphBuffer(_get_snapshot_path())
+    return _live_graph
+
 
 @dataclass
 class Config:
@@ -32,7 +144,8 @@ class Graph:
         self.data = GraphData()
 
     def pub_graph_data(self):
-        """ schreibt die Graph-Daten, sodass sie zu dem 1.9er graphing.sh passen.
+        """ veröffentlicht den aktuellen Eintrag und die geänderten Blöcke der Live-Daten im Format des 1.9er
+        graphing.sh.
         """
         def _convert_to_kW(value): return round(value/1000, 3)
 
@@ -62,9 +175,11 @@ class Graph:
 
             Pub().pub("openWB/set/graph/lastlivevaluesJson", data_line)
             Pub().pub("openWB/set/system/lastlivevaluesJson", data_line)
-            with open(str(Path(__file__).resolve().parents[2] / "ramdisk"/"graph_live.json"), "a") as f:
-                f.write(f"{json.dumps(data_line, separators=(',', ':'))}\n")
-            run_command([str(Path(__file__).resolve().parents[2] / "runs"/"graphing.sh"),
-                         str(self.data.config.duration*6)])
+            live_graph = _get_live_graph()
+            live_graph.append(json.dumps(data_line, separators=(',', ':')),
+                              LiveGraphBuffer.capacity(self.data.config.duration))
+            Pub().pub(LIVE_GRAPH_TOPIC, live_graph.latest(), no_json=True)
+            for topic, payload in live_graph.changed_chunks():
+                Pub().pub(topic, payload, no_json=True)
         except Exception:
             log.exception("Fehler im Graph-Modul")
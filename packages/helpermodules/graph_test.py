@@ -0,0 +1,83 @@
+from pathlib import Path
+
+from helpermodules.graph import CHUNK_SIZE, CHUNKS, LIVE_GRAPH_TOPIC, LiveGraphBuffer
+
+
+def line(i: int) -> str:
+    return f'{{"timestamp":{i},"grid":1.5}}'
+
+
+def test_only_changed_chunks_published():
+    # setup
+    buffer = LiveGraphBuffer()
+    for i in range(CHUNK_SIZE + 10):
+        buffer.append(line(i), 800)
+    initial = dict(buffer.changed_chunks())
+
+    # execution
+    buffer.append(line(CHUNK_SIZE + 10), 800)
+    changed = buffer.changed_chunks()
+
+    # evaluation
+    assert initial[f"{LIVE_GRAPH_TOPIC}1"] == "\n".join(line(i) for i in range(CHUNK_SIZE))
+    assert initial[f"{LIVE_GRAPH_TOPIC}2"] == "\n".join(line(i) for i in range(CHUNK_SIZE, CHUNK_SIZE + 10))
+    assert initial[f"{LIVE_GRAPH_TOPIC}3"] == "-"
+    assert len(initial) == CHUNKS
+    assert changed == [(f"{LIVE_GRAPH_TOPIC}2", "\n".join(line(i) for i in range(CHUNK_SIZE, CHUNK_SIZE + 11)))]
+    assert buffer.latest() == "\n".join(line(i) for i in range(11, CHUNK_SIZE + 11))
+
+
+def test_capacity():
+    # setup
+    buffer = LiveGraphBuffer()
+    for i in range(100):
+        buffer.append(line(i), 60)
+    buffer.changed_chunks()
+
+    # execution
+    buffer.append(line(100), 60)
+    changed = dict(buffer.changed_chunks())
+    for i in range(101, 110):
+        buffer.append(line(i), 60)
+    shifted = dict(buffer.changed_chunks())
+
+    # evaluation
+    # ältester und neuester Block haben sich geändert
+    assert changed == {f"{LIVE_GRAPH_TOPIC}1": "\n".join(line(i) for i in range(41, 50)),
+                       f"{LIVE_GRAPH_TOPIC}3": line(100)}
+    # der älteste Block wurde vollständig entfernt, daher verschieben sich die Topics
+    assert list(buffer.lines) == [line(i) for i in range(50, 110)]
+    assert len(shifted) == CHUNKS
+    assert shifted[f"{LIVE_GRAPH_TOPIC}1"] == "\n".join(line(i) for i in range(50, 100))
+    assert shifted[f"{LIVE_GRAPH_TOPIC}3"] == "-"
+
+
+def test_no_more_chunks_than_topics():
+    # setup
+    buffer = LiveGraphBuffer()
+
+    # execution
+    for i in range(CHUNK_SIZE * CHUNKS + 1):
+        buffer.append(line(i), 1440)
+
+    # evaluation
+    assert len(buffer.lines) == CHUNK_SIZE * (CHUNKS - 1) + 1
+    assert len(buffer.changed_chunks()) == CHUNKS
+
+
+def test_snapshot(tmp_path: Path):
+    # setup
+    snapshot = tmp_path / "graph_live.json"
+    buffer = LiveGraphBuffer(snapshot)
+    for i in range(10):
+        buffer.append(line(i), 6)
+
+    # execution
+    restarted = LiveGraphBuffer(snapshot)
+    for i in range(10, 13):
+        restarted.append(line(i), 6)
+
+    # evaluation
+    assert list(restarted.lines) == [line(i) for i in range(7, 13)]
+    # die Datei wird gekürzt, sobald sie doppelt so viele Einträge wie der Puffer enthält
+    assert snapshot.read_text().splitlines() == [line(i) for i in range(7, 13)]
@@ -1,14 +1,15 @@
+from collections import deque
 import functools
 import logging
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
+import queue
 import sys
 import threading
+from typing import Deque, Dict, Optional
 import typing_extensions
 import re
-import io
 import os
-import shutil
 
 FORMAT_STR_DETAILED = '%(asctime)s - {%(name)s:%(lineno)s} - {%(levelname)s:%(threadName)s} - %(message)s'
 FORMAT_STR_SHORT = '%(asctime)s - %(message)s'
@@ -112,47 +113,102 @@ class InMemoryLogHandler(logging.Handler):
     def __init__(self, base_handler=None, max_size_mb=50):
         super().__init__()
         self.base_handler = base_handler
-        self.log_stream = io.StringIO()
+        self.lines: Deque[str] = deque()
         self.has_warning_or_error = False
         self.max_size_bytes = max_size_mb * 1024 * 1024  # Convert MB to bytes
-        self.line_count = 0
+        # Größe wird je Zeile mitgezählt, damit der Puffer nicht für jede Prüfung kodiert werden muss.
+        self.size_bytes = 0
+
+    @property
+    def line_count(self) -> int:
+        return len(self.lines)
 
     def emit(self, record):
         if self.base_handler is None or self.base_handler.filter(record):
-            msg = self.format(record)
-            self.log_stream.write(msg + '\n')
-            self.line_count += 1
-
-            # Check size every 100 lines to avoid performance overhead
-            if self.line_count % 100 == 0:
-                current_size = len(self.log_stream.getvalue().encode('utf-8'))
-                if current_size > self.max_size_bytes:
-                    self._truncate_logs()
+            msg = self.format(record) + '\n'
+            self.lines.append(msg)
+            self.size_bytes += len(msg.encode('utf-8'))
+            if self.size_bytes > self.max_size_bytes:
+                self._truncate_logs()
 
             if record.levelno >= logging.WARNING:
                 self.has_warning_or_error = True
 
     def _truncate_logs(self):
         """Keep only the last 25% of logs when size limit is exceeded"""
-        current_logs = self.log_stream.getvalue()
-        lines = current_logs.split('\n')
-
-        # Keep only the last 25% of lines
-        keep_count = max(100, len(lines) // 4)  # At least 100 lines
-        kept_lines = lines[-keep_count:]
-
-        # Reset the stream with truncated content
-        self.log_stream = io.StringIO()
-        self.log_stream.write('\n'.join(kept_lines))
-        self.line_count = len(kept_lines)
+        keep_count = max(100, len(self.lines) // 4)  # At least 100 lines
+        while len(self.lines) > keep_count:
+            self.size_bytes -= len(self.lines.popleft().encode('utf-8'))
 
     def get_logs(self):
-        return self.log_stream.getvalue()
+        # emit wird unter dem Lock des Handlers aufgerufen, ggf. aus anderen Threads.
+        with self.lock:
+            return "".join(self.lines)
 
     def clear(self):
-        self.log_stream = io.StringIO()
-        self.has_warning_or_error = False
-        self.line_count = 0
+        with self.lock:
+            self.lines = deque()
+            self.has_warning_or_error = False
+            self.size_bytes = 0
+
+
+class LogWriter:
+    """ schreibt die Logs der Durchläufe in einem eigenen Thread, damit die Regelung nicht auf die Dateien wartet.
+
+    Je Log werden die Logs der letzten NUMBER_OF_LOGFILES Durchläufe im Speicher gehalten. Daraus werden
+    <name>.current.log (letzter Durchlauf), <name>.latest.log (letzte Durchläufe) und ggf. <name>.latest-warning.log
+    geschrieben, ohne die Dateien der vorherigen Durchläufe umzubenennen und erneut einzulesen.
+    """
+    MAX_PENDING = 100
+
+    def __init__(self, base_path: str) -> None:
+        self.base_path = base_path
+        self.queue: queue.Queue = queue.Queue(maxsize=self.MAX_PENDING)
+        self.cycles: Dict[str, Deque[str]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+    def write(self, name: str, logs: str, has_warning_or_error: bool) -> None:
+        self._start()
+        try:
+            self.queue.put_nowait((name, logs, has_warning_or_error))
+        except queue.Full:
+            logging.getLogger(__name__).warning(f"Log {name} wird verworfen, da das Schreiben der Logs hängt.")
+
+    def flush(self) -> None:
+        """ wartet, bis alle Logs geschrieben wurden."""
+        self.queue.join()
+
+    def _start(self) -> None:
+        with self._thread_lock:
+            if self._thread is None or self._thread.is_alive() is False:
+                self._thread = threading.Thread(target=self._run, name="log writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            name, logs, has_warning_or_error = self.queue.get()
+            try:
+                self._write_files(name, logs, has_warning_or_error)
+            except Exception:
+                logging.getLogger(__name__).exception(f"Fehler beim Schreiben des Logs {name}")
+            finally:
+                self.queue.task_done()
+
+    def _write_files(self, name: str, logs: str, has_warning_or_error: bool) -> None:
+        cycles = self.cycles.setdefault(name, deque(maxlen=NUMBER_OF_LOGFILES))
+        cycles.append(logs)
+        with open(os.path.join(self.base_path, f'{name}.current.log'), 'w') as f:
+            f.write(logs)
+        with open(os.path.join(self.base_path, f'{name}.latest.log'), 'w') as f:
+            f.writelines(cycles)
+        # If any warning or error messages were logged, create a -warning copy
+        if has_warning_or_error:
+            with open(os.path.join(self.base_path, f'{name}.latest-warning.log'), 'w') as f:
+                f.write(logs)
+
+
+log_writer = LogWriter(RAMDISK_PATH)
 
 
 def clear_in_memory_log_handler(logger_name: str = None) -> None:
@@ -168,60 +224,20 @@ def clear_in_memory_log_handler(logger_name: str = None) -> None:
 
 
 def write_logs_to_file(logger_name: str = None) -> None:
+    """ übergibt die Logs des Durchlaufs an den LogWriter, die Dateien werden im Hintergrund geschrieben."""
     global in_memory_log_handlers
-
-    def rotate_logs(base_path: str, name: str):
-        # Rotate the log files
-        for i in range(NUMBER_OF_LOGFILES-1, 0, -1):
-            src = os.path.join(base_path, f'{name}.previous{i}.log')
-            dst = os.path.join(base_path, f'{name}.previous{i+1}.log')
-            if os.path.exists(src):
-                shutil.move(src, dst)
-        # Move the current log to previous1
-        current_log = os.path.join(base_path, f'{name}.current.log')
-        if os.path.exists(current_log):
-            shutil.move(current_log, os.path.join(base_path, f'{name}.previous1.log'))
-
-    def combine_logs(base_path: str, name: str):
-        latest_log_path = os.path.join(base_path, f'{name}.latest.log')
-        with open(latest_log_path, 'w') as latest_log:
-            for i in range(NUMBER_OF_LOGFILES-1, -1, -1):
-                log_file = os.path.join(
-                    base_path, f'{name}.previous{i}.log') if i > 0 else os.path.join(base_path, f'{name}.current.log')
-                if os.path.exists(log_file):
-                    with open(log_file, 'r') as f:
-                        latest_log.write(f.read())
-
     if logger_name is None:
         # Write logs for all in-memory log handlers
-        for name, handler in in_memory_log_handlers.items():
-            logs = handler.get_logs()
-            if logs:
-                rotate_logs(RAMDISK_PATH, name)
-                with open(os.path.join(RAMDISK_PATH, f'{name}.current.log'), 'w') as f:
-                    f.write(logs)
-                combine_logs(RAMDISK_PATH, name)
-
-                # If any warning or error messages were logged, create a -warning copy
-                if handler.has_warning_or_error:
-                    with open(os.path.join(RAMDISK_PATH, f'{name}.latest-warning.log'), 'w') as f:
-                        f.write(logs)
-
-    else:
+        handlers = in_memory_log_handlers.items()
+    elif logger_name in in_memory_log_handlers:
         # Write logs for specified in-memory log handler
-        if logger_name in in_memory_log_handlers:
-            handler = in_memory_log_handlers[logger_name]
-            logs = handler.get_logs()
-            if logs:
-                rotate_logs(RAMDISK_PATH, logger_name)
-                with open(os.path.join(RAMDISK_PATH, f'{logger_name}.current.log'), 'w') as f:
-                    f.write(logs)
-                combine_logs(RAMDISK_PATH, logger_name)
-
-                # If any warning or error messages were logged, create a -warning copy
-                if handler.has_warning_or_error:
-                    with open(os.path.join(RAMDISK_PATH, f'{logger_name}.latest-warning.log'), 'w') as f:
-                        f.write(logs)
+        handlers = [(logger_name, in_memory_log_handlers[logger_name])]
+    else:
+        handlers = []
+    for name, handler in handlers:
+        logs = handler.get_logs()
+        if logs:
+            log_writer.write(name, logs, handler.has_warning_or_error)
 
 
 def setup_logging() -> None:
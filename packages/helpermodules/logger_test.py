@@ -0,0 +1,39 @@
+import logging
+from pathlib import Path
+
+from helpermodules.logger import InMemoryLogHandler, LogWriter
+
+
+def record(msg: str, level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord("test", level, __file__, 1, msg, None, None)
+
+
+def test_in_memory_log_handler_truncates_by_tracked_size():
+    # setup
+    handler = InMemoryLogHandler(max_size_mb=1)
+
+    # execution
+    for i in range(2000):
+        handler.emit(record(f"{i:04d}" + "ä" * 600))
+
+    # evaluation
+    logs = handler.get_logs()
+    assert handler.size_bytes == len(logs.encode("utf-8"))
+    assert handler.size_bytes <= handler.max_size_bytes
+    assert logs.endswith("1999" + "ä" * 600 + "\n")
+    assert handler.has_warning_or_error is False
+
+
+def test_log_writer_keeps_last_cycles(tmp_path: Path):
+    # setup
+    writer = LogWriter(str(tmp_path))
+
+    # execution
+    for i in range(4):
+        writer.write("main", f"cycle {i}\n", i == 1)
+    writer.flush()
+
+    # evaluation
+    assert (tmp_path / "main.current.log").read_text() == "cycle 3\n"
+    assert (tmp_path / "main.latest.log").read_text() == "cycle 1\ncycle 2\ncycle 3\n"
+    assert (tmp_path / "main.latest-warning.log").read_text() == "cycle 1\n"
@@ -0,0 +1,165 @@
+"""Append-only Speicher für die Einträge des Tages- und Monats-Logs.
+
+Jeder Datensatz besteht aus einem Kopf mit fester Länge (Art, Länge, CRC32, Zeitstempel) und dem Eintrag als kompaktes
+JSON. Neue Einträge werden nur angehängt und mit fsync geschrieben, die Datei wird nicht neu geschrieben. Beim Lesen
+werden per mmap nur die Köpfe durchlaufen, um den Index nach Zeitstempel aufzubauen. Die Einträge werden erst beim
+Zugriff dekodiert. Ein unvollständig geschriebener Datensatz am Dateiende (zB durch Stromausfall) wird ignoriert und
+beim nächsten Anhängen überschrieben.
+
+Einen Index nach Komponente gibt es bewusst nicht: Ein Eintrag enthält die Zählerstände aller Komponenten zu einem
+Zeitpunkt, und alle Auswertungen (Tages-, Monats- und Jahres-Log, Energiequellen der Ladevorgänge) benötigen die
+Werte aller Komponenten, um zB Netzbezug, PV-Anteil und Speicheranteil zu berechnen. Ein Index nach Komponente hätte
+keinen Leser und müsste bei jedem Anhängen zusätzlich gepflegt werden.
+"""
+import bisect
+from enum import IntEnum
+import json
+import logging
+import mmap
+import os
+from pathlib import Path
+import struct
+import zlib
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+log = logging.getLogger(__name__)
+
+HEADER = struct.Struct("<BIIq")
+
+
+class RecordKind(IntEnum):
+    ENTRY = 1
+    # Namen der Komponenten, der letzte Datensatz ist gültig.
+    NAMES = 2
+    # Größe und Änderungszeitpunkt des zuletzt exportierten JSON-Logs
+    EXPORT = 3
+
+
+class _Record(NamedTuple):
+    kind: int
+    timestamp: int
+    offset: int
+    length: int
+
+
+class EntryStore:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._records: List[_Record] = []
+        self._entry_timestamps: List[int] = []
+        self._entry_records: List[_Record] = []
+        # Größe der Datei bis zum Ende des letzten vollständigen Datensatzes
+        self._valid_size = 0
+        self._scanned_size: Optional[int] = None
+
+    def exists(self) -> bool:
+        return self.path.is_file()
+
+    def _scan(self) -> None:
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if size == self._scanned_size:
+            return
+        self._records, self._entry_timestamps, self._entry_records = [], [], []
+        self._valid_size = 0
+        if size > 0:
+            with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                offset = 0
+                while offset + HEADER.size <= size:
+                    kind, length, crc, timestamp = HEADER.unpack_from(mm, offset)
+                    start = offset + HEADER.size
+                    if start + length > size or zlib.crc32(mm[start:start + length]) != crc:
+                        log.warning(f"Unvollständiger Datensatz in {self.path} an Position {offset} wird ignoriert.")
+                        break
+                    self._add_record(_Record(kind, timestamp, start, length))
+                    offset = start + length
+                self._valid_size = offset
+        self._scanned_size = size
+
+    def _add_record(self, record: _Record) -> None:
+        self._records.append(record)
+        if record.kind == RecordKind.ENTRY:
+            self._entry_timestamps.append(record.timestamp)
+            self._entry_records.append(record)
+
+    def _read(self, records: Iterable[_Record]) -> List[Any]:
+        records = list(records)
+        if not records:
+            return []
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return [json.loads(mm[r.offset:r.offset + r.length]) for r in records]
+
+    @staticmethod
+    def _encode(kind: RecordKind, timestamp: int, payload: Any) -> bytes:
+        data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        return HEADER.pack(kind, len(data), zlib.crc32(data), timestamp) + data
+
+    def append(self, kind: RecordKind, timestamp: int, payload: Any) -> None:
+        self._scan()
+        record = self._encode(kind, timestamp, payload)
+        self.path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+        with open(self.path, "ab") as f:
+            if os.fstat(f.fileno()).st_size > self._valid_size:
+                # unvollständigen Datensatz verwerfen
+                f.truncate(self._valid_size)
+            f.write(record)
+            f.flush()
+            os.fsync(f.fileno())
+        self._add_record(_Record(kind, timestamp, self._valid_size + HEADER.size, len(record) - HEADER.size))
+        self._valid_size += len(record)
+        self._scanned_size = self._valid_size
+
+    def append_entry(self, entry: Dict) -> None:
+        self.append(RecordKind.ENTRY, int(entry["timestamp"]), entry)
+
+    def replace(self, entries: List[Dict], names: Dict) -> None:
+        """ ersetzt den Inhalt des Speichers, zB wenn das JSON-Log außerhalb geändert wurde."""
+        tmp_path = self.path.with_suffix(".tmp")
+        self.path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            for entry in entries:
+                f.write(self._encode(RecordKind.ENTRY, int(entry.get("timestamp", 0)), entry))
+            f.write(self._encode(RecordKind.NAMES, 0, names))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._scanned_size = None
+
+    def entries(self) -> List[Dict]:
+        self._scan()
+        return self._read(self._entry_records)
+
+    def entries_between(self, start: int, end: int) -> List[Dict]:
+        """ Einträge mit start <= timestamp <= end"""
+        self._scan()
+        first = bisect.bisect_left(self._entry_timestamps, start)
+        last = bisect.bisect_right(self._entry_timestamps, end)
+        return self._read(self._entry_records[first:last])
+
+    def first_entry(self) -> Optional[Dict]:
+        self._scan()
+        return self._read(self._entry_records[:1])[0] if self._entry_records else None
+
+    def last_entry(self) -> Optional[Dict]:
+        self._scan()
+        return self._read(self._entry_records[-1:])[0] if self._entry_records else None
+
+    def _last_of_kind(self, kind: RecordKind) -> Optional[Any]:
+        self._scan()
+        for record in reversed(self._records):
+            if record.kind == kind:
+                return self._read([record])[0]
+        return None
+
+    def names(self) -> Dict:
+        return self._last_of_kind(RecordKind.NAMES) or {}
+
+    def last_export(self) -> Optional[Dict]:
+        return self._last_of_kind(RecordKind.EXPORT)
+
+    def is_exported(self) -> bool:
+        """ Return: True, wenn seit dem letzten Export des JSON-Logs keine Datensätze hinzugekommen sind"""
+        self._scan()
+        return len(self._records) > 0 and self._records[-1].kind == RecordKind.EXPORT
@@ -0,0 +1,155 @@
+import json
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from helpermodules.measurement_logging import write_log
+from helpermodules.measurement_logging.entry_store import EntryStore, RecordKind
+from helpermodules.measurement_logging.write_log import LogType, get_entry_store
+
+
+def entry(timestamp: int) -> dict:
+    return {"timestamp": timestamp, "date": "08:40", "cp": {"all": {"imported": timestamp, "exported": 0}}}
+
+
+def test_append_and_read(tmp_path: Path):
+    # setup
+    store = EntryStore(tmp_path / "20220516.bin")
+
+    # execution
+    for timestamp in (100, 400, 700):
+        store.append_entry(entry(timestamp))
+    store.append(RecordKind.NAMES, 700, {"cp3": "Ladepunkt"})
+
+    # evaluation
+    store = EntryStore(tmp_path / "20220516.bin")
+    assert store.entries() == [entry(100), entry(400), entry(700)]
+    assert store.first_entry() == entry(100)
+    assert store.last_entry() == entry(700)
+    assert store.entries_between(300, 700) == [entry(400), entry(700)]
+    assert store.names() == {"cp3": "Ladepunkt"}
+
+
+def test_incomplete_record_is_overwritten(tmp_path: Path):
+    # setup
+    path = tmp_path / "20220516.bin"
+    store = EntryStore(path)
+    store.append_entry(entry(100))
+    with open(path, "ab") as f:
+        f.write(b"\x01\x20\x00")
+
+    # execution
+    store = EntryStore(path)
+    store.append_entry(entry(400))
+
+    # evaluation
+    assert EntryStore(path).entries() == [entry(100), entry(400)]
+
+
+@pytest.fixture
+def data_path(tmp_path: Path, monkeypatch) -> Path:
+    monkeypatch.setattr(write_log, "_get_data_path", lambda: tmp_path)
+    (tmp_path / "daily_log").mkdir()
+    return tmp_path
+
+
+def test_get_entry_store_missing(data_path: Path):
+    with pytest.raises(FileNotFoundError):
+        get_entry_store(LogType.DAILY, "20220516")
+
+
+def test_get_entry_store_rebuilds_from_changed_json(data_path: Path):
+    # setup
+    store = get_entry_store_with_export(data_path, [entry(100)])
+    json_path = data_path / "daily_log" / "20220516.json"
+
+    # execution
+    # zB Korrektur durch eine Migration
+    with open(json_path, "w") as f:
+        json.dump({"entries": [entry(100), entry(200)], "names": {"cp3": "LP"}}, f)
+    store = get_entry_store(LogType.DAILY, "20220516")
+
+    # evaluation
+    assert store.entries() == [entry(100), entry(200)]
+    assert store.names() == {"cp3": "LP"}
+
+
+def test_get_entry_store_keeps_entries_of_invalid_json(data_path: Path):
+    # setup
+    get_entry_store_with_export(data_path, [entry(100)])
+    json_path = data_path / "daily_log" / "20220516.json"
+
+    # execution
+    with open(json_path, "w") as f:
+        f.write("{\"entries\": [")
+    store = get_entry_store(LogType.DAILY, "20220516")
+
+    # evaluation
+    assert store.entries() == [entry(100)]
+    assert (data_path / "daily_log" / "20220516_invalid.json").is_file()
+
+
+def get_entry_store_with_export(data_path: Path, entries: list) -> EntryStore:
+    store = EntryStore(data_path / "log_store" / "daily" / "20220516.bin")
+    for e in entries:
+        store.append_entry(e)
+    write_log._export_json(LogType.DAILY, "20220516", store, {"entries": entries, "names": {}})
+    assert get_entry_store(LogType.DAILY, "20220516").entries() == entries
+    return store
+
+
+@pytest.fixture
+def save_log_mocks(data_path: Path, monkeypatch) -> Mock:
+    create_timestamp = Mock(return_value="20220516")
+    monkeypatch.setattr(write_log.timecheck, "create_timestamp_YYYYMMDD", create_timestamp)
+    monkeypatch.setattr(write_log, "LegacySmartHomeLogData", Mock(return_value=Mock(sh_names={})))
+    monkeypatch.setattr(write_log, "create_entry", Mock(side_effect=[entry(100), entry(400), entry(700)]))
+    monkeypatch.setattr(write_log, "get_names", Mock(return_value={"cp3": "LP"}))
+    return create_timestamp
+
+
+def test_save_log_writes_store_only(save_log_mocks: Mock, data_path: Path):
+    # execution
+    write_log.save_log(LogType.DAILY)
+    entries = write_log.save_log(LogType.DAILY)
+
+    # evaluation
+    assert entries == [entry(100), entry(400)]
+    assert write_log.create_entry.call_args.args[2] == entry(100)
+    assert list((data_path / "daily_log").iterdir()) == []
+    assert write_log.get_log_content(LogType.DAILY, "20220516") == {"entries": entries, "names": {"cp3": "LP"}}
+
+
+def test_save_log_exports_previous_day(save_log_mocks: Mock, data_path: Path):
+    # setup
+    write_log.save_log(LogType.DAILY)
+    write_log.save_log(LogType.DAILY)
+    save_log_mocks.return_value = "20220517"
+
+    # execution
+    write_log.save_log(LogType.DAILY)
+
+    # evaluation
+    with open(data_path / "daily_log" / "20220516.json", "r") as f:
+        assert json.load(f) == {"entries": [entry(100), entry(400)], "names": {"cp3": "LP"}}
+    assert not (data_path / "daily_log" / "20220517.json").exists()
+    # erster Eintrag des Tages wird mit dem letzten Eintrag des Vortags plausibilisiert
+    assert write_log.create_entry.call_args.args[2] == entry(400)
+
+
+def test_export_pending_json(save_log_mocks: Mock, data_path: Path):
+    # setup
+    write_log.save_log(LogType.DAILY)
+    json_path = data_path / "daily_log" / "20220516.json"
+
+    # execution
+    write_log.export_pending_json()
+    json_stat = write_log._get_json_stat(json_path)
+    write_log.export_pending_json()
+
+    # evaluation
+    assert get_entry_store(LogType.DAILY, "20220516").is_exported()
+    assert write_log._get_json_stat(json_path) == json_stat
+    with open(json_path, "r") as f:
+        assert json.load(f)["entries"] == [entry(100)]
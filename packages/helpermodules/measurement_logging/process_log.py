@@ -2,11 +2,13 @@ from enum import Enum
 import json
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
 from helpermodules import timecheck
 from helpermodules.measurement_logging.write_log import (LegacySmartHomeLogData, LogType, create_entry,
+                                                         get_entry_store, get_log_content, get_log_files,
                                                          get_previous_entry)
+from helpermodules.measurement_logging.rollup_cache import RollupCache
 from helpermodules.messaging import MessageType, pub_system_message
 from helpermodules.utils.precision_math import decimal_add, decimal_divide, decimal_multiply, decimal_subtract
 
@@ -231,6 +233,13 @@ def get_totals(entries: List, process_entries: bool = True) -> Dict:
 
 
 def get_daily_log(date: str):
+    next_date = timecheck.get_relative_date_string(date, day_offset=1)
+    return _get_cached_log(LogType.DAILY.value, date, date < timecheck.create_timestamp_YYYYMMDD(),
+                           get_log_files(LogType.DAILY, date),
+                           (LogType.DAILY, next_date), _get_daily_log)
+
+
+def _get_daily_log(date: str):
     data = _collect_daily_log_data(date)
     data["entries"] = _process_entries(data["entries"], CalculationType.ALL)
     data["totals"] = get_totals(data["entries"], False)
@@ -240,29 +249,29 @@ def get_daily_log(date: str):
 
 def _collect_daily_log_data(date: str):
     try:
-        parent_file = Path(__file__).resolve().parents[3] / "data"/"daily_log"
-        with open(str(parent_file / (date+".json")), "r") as json_file:
-            log_data = json.load(json_file)
-            if date == timecheck.create_timestamp_YYYYMMDD():
-                # beim aktuellen Tag den aktuellen Datensatz ergänzen
-                log_data["entries"].append(create_entry(
-                    LogType.DAILY, LegacySmartHomeLogData(), get_previous_entry(parent_file, log_data)))
-            else:
-                # bei älteren als letzten Datensatz den des nächsten Tags
-                try:
-                    next_date = timecheck.get_relative_date_string(date, day_offset=1)
-                    with open(str(parent_file / (next_date+".json")),
-                              "r") as next_json_file:
-                        next_log_data = json.load(next_json_file)
-                        log_data["entries"].append(next_log_data["entries"][0])
-                except FILE_ERRORS:
-                    pass
+        log_data = get_log_content(LogType.DAILY, date)
+        if date == timecheck.create_timestamp_YYYYMMDD():
+            # beim aktuellen Tag den aktuellen Datensatz ergänzen
+            log_data["entries"].append(create_entry(
+                LogType.DAILY, LegacySmartHomeLogData(), get_previous_entry(LogType.DAILY, date, log_data["entries"])))
+        else:
+            # bei älteren als letzten Datensatz den des nächsten Tags
+            next_entry = _get_first_entry(LogType.DAILY, timecheck.get_relative_date_string(date, day_offset=1))
+            if next_entry is not None:
+                log_data["entries"].append(next_entry)
     except FILE_ERRORS:
         log_data = {"entries": [], "names": {}}
     return log_data
 
 
 def get_monthly_log(date: str):
+    next_date = timecheck.get_relative_date_string(date, month_offset=1)
+    return _get_cached_log(LogType.MONTHLY.value, date, date < timecheck.create_timestamp_YYYYMM(),
+                           get_log_files(LogType.MONTHLY, date),
+                           (LogType.MONTHLY, next_date), _get_monthly_log)
+
+
+def _get_monthly_log(date: str):
     data = _collect_monthly_log_data(date)
     data["entries"] = _process_entries(data["entries"], CalculationType.ENERGY)
     data["totals"] = get_totals(data["entries"], False)
@@ -272,36 +281,29 @@ def get_monthly_log(date: str):
 
 def _collect_monthly_log_data(date: str):
     try:
-        with open(f"{_get_data_folder_path()}/monthly_log/{date}.json", "r") as jsonFile:
-            log_data = json.load(jsonFile)
+        log_data = get_log_content(LogType.MONTHLY, date)
         this_month = timecheck.create_timestamp_YYYYMM()
         if date == this_month:
             # add last entry of current day, if current month is requested
-            try:
-                today = timecheck.create_timestamp_YYYYMMDD()
-                with open(f"{_get_data_folder_path()}/daily_log/{today}.json",
-                          "r") as todayJsonFile:
-                    today_log_data = json.load(todayJsonFile)
-                    if len(today_log_data["entries"]) > 0:
-                        log_data["entries"].append(today_log_data["entries"][-1])
-            except FILE_ERRORS:
-                pass
+            last_entry = _get_last_entry(LogType.DAILY, timecheck.create_timestamp_YYYYMMDD())
         else:
             # add first entry of next month
-            try:
-                next_date = timecheck.get_relative_date_string(date, month_offset=1)
-                with open(f"{_get_data_folder_path()}/monthly_log/{next_date}.json",
-                          "r") as nextJsonFile:
-                    next_log_data = json.load(nextJsonFile)
-                    log_data["entries"].append(next_log_data["entries"][0])
-            except FILE_ERRORS:
-                pass
+            last_entry = _get_first_entry(LogType.MONTHLY, timecheck.get_relative_date_string(date, month_offset=1))
+        if last_entry is not None:
+            log_data["entries"].append(last_entry)
     except FILE_ERRORS:
         log_data = {"entries": [], "names": {}}
     return log_data
 
 
 def get_yearly_log(year: str):
+    return _get_cached_log("yearly", year, year < timecheck.create_timestamp_YYYY(),
+                           [log_file for month in range(1, 13)
+                            for log_file in get_log_files(LogType.MONTHLY, f"{year}{month:02}")],
+                           (LogType.MONTHLY, f"{int(year)+1}01"), _get_yearly_log)
+
+
+def _get_yearly_log(year: str):
     data = _collect_yearly_log_data(year)
     data["entries"] = _process_entries(data["entries"], CalculationType.ENERGY)
     data["totals"] = get_totals(data["entries"], False)
@@ -311,30 +313,28 @@ def get_yearly_log(year: str):
 
 def _collect_yearly_log_data(year: str):
     def add_monthly_log(month: str, check_next_month: bool = False) -> None:
-        monthly_log_path = Path(__file__).resolve().parents[3]/"data"/"monthly_log"
         try:
-            with open(monthly_log_path / f"{month}.json", "r") as jsonFile:
-                content = json.load(jsonFile)
-                entries.append(content["entries"][0])
+            # nur der erste und ggf. der letzte Eintrag werden benötigt, daher nicht das gesamte JSON-Log lesen
+            store = get_entry_store(LogType.MONTHLY, month)
+            first_entry = store.first_entry()
+            if first_entry is None:
+                raise FileNotFoundError(f"Keine Einträge für Monat {month}")
+            entries.append(first_entry)
             # add last entry of current file if next file is missing
             if check_next_month:
                 next_month = timecheck.get_relative_date_string(month, month_offset=1)
-                if not (monthly_log_path / (next_month+".json")).is_file():
-                    entries.append(content["entries"][-1])
+                if _get_first_entry(LogType.MONTHLY, next_month) is None:
+                    entries.append(store.last_entry())
                     log.debug(f"Keine Logdatei für Monat {next_month} gefunden, "
                               f"füge letzten Datensatz von {month} ein: {entries[-1]['date']}")
-            names.update(content["names"])
+            names.update(store.names())
         except FILE_ERRORS:
             log.debug(f"Kein Log für Monat {month} gefunden.")
 
     def add_daily_log(day: str) -> None:
-        try:
-            with open(f"{_get_data_folder_path()}/daily_log/{day}.json", "r") as dayJsonFile:
-                day_log_data = json.load(dayJsonFile)
-                if len(day_log_data["entries"]) > 0:
-                    entries.append(day_log_data["entries"][-1])
-        except FILE_ERRORS:
-            pass
+        last_entry = _get_last_entry(LogType.DAILY, day)
+        if last_entry is not None:
+            entries.append(last_entry)
 
     entries = []
     names = {}
@@ -664,3 +664,44 @@ def _calculate_average_power(time_diff: float, current_imported: float = 0, next
 
 def _get_data_folder_path() -> str:
     return str(Path(__file__).resolve().parents[3] / "data")
+
+
+rollup_cache = RollupCache(Path(_get_data_folder_path())/"log_store"/"rollups")
+
+
+def _get_cached_log(kind: str, date: str, closed: bool, log_files: List[Path], next_log: Tuple[LogType, str],
+                    get_log: Callable[[str], Dict]) -> Dict:
+    """ Abgeschlossene Zeiträume werden aus dem Zwischenspeicher geliefert, solange sich weder ihre Log-Dateien noch
+    der erste Eintrag des folgenden Zeitraums, der für die Berechnung des letzten Eintrags benötigt wird, ändern.
+    """
+    fingerprints = [_get_file_fingerprint(log_file) for log_file in log_files]
+    if closed is False or all(fingerprint is None for fingerprint in fingerprints):
+        return get_log(date)
+    return rollup_cache.get(kind, date, [fingerprints, _get_first_timestamp(*next_log)], lambda: get_log(date))
+
+
+def _get_file_fingerprint(path: Path) -> Optional[List[int]]:
+    try:
+        stat = path.stat()
+        return [stat.st_mtime_ns, stat.st_size]
+    except FileNotFoundError:
+        return None
+
+
+def _get_first_entry(log_type: LogType, file_name: str) -> Optional[Dict]:
+    try:
+        return get_entry_store(log_type, file_name).first_entry()
+    except FILE_ERRORS:
+        return None
+
+
+def _get_last_entry(log_type: LogType, file_name: str) -> Optional[Dict]:
+    try:
+        return get_entry_store(log_type, file_name).last_entry()
+    except FILE_ERRORS:
+        return None
+
+
+def _get_first_timestamp(log_type: LogType, file_name: str) -> Optional[int]:
+    first_entry = _get_first_entry(log_type, file_name)
+    return first_entry["timestamp"] if first_entry else None
@@ -1,10 +1,13 @@
 from copy import deepcopy
 import json
 import os
-from typing import Dict
-from unittest.mock import Mock, mock_open
+from pathlib import Path
+from typing import Dict, List
+from unittest.mock import Mock
 import pytest
 
+from helpermodules.measurement_logging import write_log
+from helpermodules.measurement_logging.entry_store import EntryStore, RecordKind
 from helpermodules.measurement_logging.process_log import (
     analyse_percentage,
     _calculate_average_power,
@@ -278,30 +281,32 @@ def test_convert(daily_log_entry_processed, daily_log_sample):
     assert entry == daily_log_entry_processed
 
 
-def test_collect_daily_log_data_current_day(monkeypatch):
+@pytest.fixture
+def data_path(tmp_path: Path, monkeypatch) -> Path:
+    monkeypatch.setattr(write_log, "_get_data_path", lambda: tmp_path)
+    return tmp_path
+
+
+def create_store(data_path: Path, file_name: str, entries: List[Dict]) -> None:
+    store = EntryStore(data_path / "log_store" / "daily" / f"{file_name}.bin")
+    for entry in entries:
+        store.append_entry(entry)
+    store.append(RecordKind.NAMES, 0, {})
+
+
+def test_collect_daily_log_data_current_day(data_path, monkeypatch):
     # setup
     test_date = "20240422"
-    mock_log_data = {
-        "entries": [{"timestamp": 1234567890, "data": "test"}],
-        "names": {}
-    }
+    create_store(data_path, test_date, [{"timestamp": 1234567890, "data": "test"}])
     mock_current_entry = {"timestamp": 1234567999, "data": "current"}
 
     mock_timecheck = Mock()
     mock_timecheck.create_timestamp_YYYYMMDD.return_value = test_date
     monkeypatch.setattr('helpermodules.measurement_logging.process_log.timecheck', mock_timecheck)
 
-    mock_json_load = Mock(return_value=mock_log_data)
-    monkeypatch.setattr('helpermodules.measurement_logging.process_log.json.load', mock_json_load)
-
     mock_create_entry = Mock(return_value=mock_current_entry)
     monkeypatch.setattr('helpermodules.measurement_logging.process_log.create_entry', mock_create_entry)
 
-    mock_get_previous_entry = Mock(return_value={"timestamp": 1234567800, "data": "previous"})
-    monkeypatch.setattr('helpermodules.measurement_logging.process_log.get_previous_entry', mock_get_previous_entry)
-
-    monkeypatch.setattr('builtins.open', mock_open(read_data=json.dumps(mock_log_data)))
-
     # execution
     result = _collect_daily_log_data(test_date)
 
@@ -314,30 +319,24 @@ def test_collect_daily_log_data_current_day(monkeypatch):
         "names": {}
     }
     assert result == expected_result
+    # der letzte Eintrag des Speichers wird zur Plausibilisierung des aktuellen Eintrags verwendet
+    assert mock_create_entry.call_args.args[2] == {"timestamp": 1234567890, "data": "test"}
+    assert not (data_path / "daily_log" / f"{test_date}.json").exists()
 
 
-def test_collect_daily_log_data_past_date_with_next_day(monkeypatch):
+def test_collect_daily_log_data_past_date_with_next_day(data_path, monkeypatch):
     # setup
     test_date = "20240422"
     next_date = "20240423"
-    mock_current_log_data = {
-        "entries": [{"timestamp": 1234567890, "data": "test"}],
-        "names": {}
-    }
-    mock_next_log_data = {
-        "entries": [{"timestamp": 1234567999, "data": "next_day"}]
-    }
+    create_store(data_path, test_date, [{"timestamp": 1234567890, "data": "test"}])
+    create_store(data_path, next_date, [{"timestamp": 1234567999, "data": "next_day"},
+                                        {"timestamp": 1234568299, "data": "next_day_2"}])
 
     mock_timecheck = Mock()
     mock_timecheck.create_timestamp_YYYYMMDD.return_value = "20240425"
     mock_timecheck.get_relative_date_string.return_value = next_date
     monkeypatch.setattr('helpermodules.measurement_logging.process_log.timecheck', mock_timecheck)
 
-    mock_json_load = Mock(side_effect=[mock_current_log_data, mock_next_log_data])
-    monkeypatch.setattr('helpermodules.measurement_logging.process_log.json.load', mock_json_load)
-
-    monkeypatch.setattr('builtins.open', mock_open())
-
     # execution
     result = _collect_daily_log_data(test_date)
 
@@ -352,7 +351,7 @@ def test_collect_daily_log_data_past_date_with_next_day(monkeypatch):
     assert result == expected_result
 
 
-def test_collect_daily_log_data_file_not_found(monkeypatch):
+def test_collect_daily_log_data_file_not_found(data_path, monkeypatch):
     # setup
     test_date = "20240422"
 
@@ -360,11 +359,6 @@ def test_collect_daily_log_data_file_not_found(monkeypatch):
     mock_timecheck.create_timestamp_YYYYMMDD.return_value = "20240425"
     monkeypatch.setattr('helpermodules.measurement_logging.process_log.timecheck', mock_timecheck)
 
-    def mock_open_side_effect(*args, **kwargs):
-        raise FileNotFoundError()
-
-    monkeypatch.setattr('builtins.open', mock_open_side_effect)
-
     # execution
     result = _collect_daily_log_data(test_date)
 
@@ -373,19 +367,16 @@ def test_collect_daily_log_data_file_not_found(monkeypatch):
     assert result == expected_result
 
 
-def test_collect_daily_log_data_json_decode_error(monkeypatch):
+def test_collect_daily_log_data_json_decode_error(data_path, monkeypatch):
     # setup
     test_date = "20240422"
+    (data_path / "daily_log").mkdir()
+    (data_path / "daily_log" / f"{test_date}.json").write_text("invalid json")
 
     mock_timecheck = Mock()
     mock_timecheck.create_timestamp_YYYYMMDD.return_value = "20240425"
     monkeypatch.setattr('helpermodules.measurement_logging.process_log.timecheck', mock_timecheck)
 
-    mock_json_load = Mock(side_effect=json.JSONDecodeError("msg", "doc", 1))
-    monkeypatch.setattr('helpermodules.measurement_logging.process_log.json.load', mock_json_load)
-
-    monkeypatch.setattr('builtins.open', mock_open(read_data="invalid json"))
-
     # execution
     result = _collect_daily_log_data(test_date)
 
@@ -0,0 +1,103 @@
+"""Zwischenspeicher für die aufbereiteten Tages-, Monats- und Jahres-Logs.
+
+Die Aufbereitung eines abgeschlossenen Zeitraums ändert sich nicht mehr, solange sich die zugrunde liegenden Log-Dateien
+nicht ändern. Das Ergebnis wird daher zusammen mit einem Fingerabdruck der Log-Dateien gespeichert und nur neu
+berechnet, wenn sich der Fingerabdruck unterscheidet. Die zuletzt verwendeten Ergebnisse werden im Speicher gehalten,
+alle weiteren als Datei. Werden die Grenzen überschritten, werden die am längsten nicht verwendeten Einträge verworfen.
+"""
+from collections import OrderedDict
+import json
+import logging
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+
+log = logging.getLogger(__name__)
+
+# Bei Änderungen an der Aufbereitung erhöhen, damit gespeicherte Ergebnisse verworfen werden.
+CACHE_VERSION = 1
+MAX_MEMORY_ENTRIES = 32
+MAX_FILE_ENTRIES = 1000
+
+
+class RollupCache:
+    def __init__(self, path: Path,
+                 max_memory_entries: int = MAX_MEMORY_ENTRIES,
+                 max_file_entries: int = MAX_FILE_ENTRIES) -> None:
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_file_entries = max_file_entries
+        self._lock = Lock()
+        # Das Ergebnis wird serialisiert gehalten, da die Aufrufer das zurückgegebene Dictionary verändern.
+        self._memory: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+
+    def get(self, kind: str, date: str, fingerprint: Any, compute: Callable[[], Dict]) -> Dict:
+        """ liefert das gespeicherte Ergebnis, wenn der Fingerabdruck übereinstimmt, sonst wird es mit compute
+        berechnet und gespeichert.
+        """
+        key = f"{kind}/{date}"
+        fingerprint = json.loads(json.dumps([CACHE_VERSION, fingerprint]))
+        cached = self._get_cached(key, fingerprint)
+        if cached is not None:
+            return json.loads(cached)
+        data = compute()
+        serialized = json.dumps(data)
+        with self._lock:
+            self._remember(key, {"fingerprint": fingerprint, "data": serialized})
+        self._write_file(key, fingerprint, serialized)
+        return data
+
+    def _get_cached(self, key: str, fingerprint: Any) -> Optional[str]:
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None and cached["fingerprint"] == fingerprint:
+                self._memory.move_to_end(key)
+                return cached["data"]
+        cached = self._read_file(key)
+        if cached is not None and cached["fingerprint"] == fingerprint:
+            with self._lock:
+                self._remember(key, cached)
+            return cached["data"]
+        return None
+
+    def _remember(self, key: str, cached: Dict[str, Any]) -> None:
+        self._memory[key] = cached
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _file_path(self, key: str) -> Path:
+        return self.path / f"{key}.json"
+
+    def _read_file(self, key: str) -> Optional[Dict[str, Any]]:
+        file_path = self._file_path(key)
+        try:
+            with open(file_path, "r") as f:
+                cached = json.load(f)
+            # Zeitpunkt der letzten Verwendung für die Verdrängung
+            os.utime(file_path)
+            return {"fingerprint": cached["fingerprint"], "data": json.dumps(cached["data"])}
+        except FileNotFoundError:
+            return None
+        except Exception:
+            log.exception(f"Fehler beim Lesen des zwischengespeicherten Logs {file_path}")
+            return None
+
+    def _write_file(self, key: str, fingerprint: Any, serialized: str) -> None:
+        file_path = self._file_path(key)
+        tmp_path = file_path.with_suffix(".tmp")
+        try:
+            file_path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                f.write(f'{{"fingerprint": {json.dumps(fingerprint)}, "data": {serialized}}}')
+            os.replace(tmp_path, file_path)
+            self._evict_files()
+        except Exception:
+            log.exception(f"Fehler beim Speichern des aufbereiteten Logs {file_path}")
+
+    def _evict_files(self) -> None:
+        files = [(f.stat().st_mtime, f) for f in self.path.glob("*/*.json")]
+        if len(files) > self.max_file_entries:
+            for _, file_path in sorted(files)[:len(files) - self.max_file_entries]:
+                file_path.unlink(missing_ok=True)
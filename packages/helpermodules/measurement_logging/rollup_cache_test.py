@@ -0,0 +1,60 @@
+import os
+from pathlib import Path
+from unittest.mock import Mock
+
+from helpermodules.measurement_logging.rollup_cache import RollupCache
+
+
+def test_get_computes_once(tmp_path: Path):
+    # setup
+    cache = RollupCache(tmp_path)
+    compute = Mock(return_value={"entries": [{"timestamp": 100}], "names": {}})
+
+    # execution
+    data = cache.get("daily", "20220516", [[1, 2], None], compute)
+    data["entries"].append({"timestamp": 400})
+    cached = cache.get("daily", "20220516", [[1, 2], None], compute)
+
+    # evaluation
+    assert compute.call_count == 1
+    assert cached == {"entries": [{"timestamp": 100}], "names": {}}
+
+
+def test_get_recomputes_on_changed_fingerprint(tmp_path: Path):
+    # setup
+    cache = RollupCache(tmp_path)
+    cache.get("daily", "20220516", [[1, 2], None], Mock(return_value={"entries": [1]}))
+
+    # execution
+    data = cache.get("daily", "20220516", [[1, 2], 1652738400], Mock(return_value={"entries": [2]}))
+
+    # evaluation
+    assert data == {"entries": [2]}
+
+
+def test_get_from_file(tmp_path: Path):
+    # setup
+    RollupCache(tmp_path).get("monthly", "202205", [[1, 2], None], Mock(return_value={"entries": [1]}))
+    compute = Mock()
+
+    # execution
+    data = RollupCache(tmp_path).get("monthly", "202205", [[1, 2], None], compute)
+
+    # evaluation
+    assert data == {"entries": [1]}
+    compute.assert_not_called()
+
+
+def test_evict_least_recently_used(tmp_path: Path):
+    # setup
+    cache = RollupCache(tmp_path, max_memory_entries=1, max_file_entries=2)
+    for i, date in enumerate(("20220514", "20220515")):
+        cache.get("daily", date, None, Mock(return_value={}))
+        os.utime(tmp_path / "daily" / f"{date}.json", (i, i))
+
+    # execution
+    cache.get("daily", "20220516", None, Mock(return_value={}))
+
+    # evaluation
+    assert list(cache._memory) == ["daily/20220516"]
+    assert sorted(f.name for f in (tmp_path / "daily").iterdir()) == ["20220515.json", "20220516.json"]
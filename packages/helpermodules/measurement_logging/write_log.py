@@ -6,14 +6,14 @@ from math import isnan
 from pathlib import Path
 import re
 import string
-from paho.mqtt.client import Client as MqttClient, MQTTMessage
-from typing import Dict, Optional
+from threading import Lock
+from typing import Dict, List, Optional, Set
 
 from control import data
-from helpermodules.broker import BrokerClient
+from helpermodules.broker_cache import topic_cache
 from helpermodules import timecheck
-from helpermodules.utils.json_file_handler import write_and_check
-from helpermodules.utils.topic_parser import decode_payload, get_index
+from helpermodules.measurement_logging.entry_store import EntryStore, RecordKind
+from helpermodules.utils.topic_parser import get_index
 from modules.common.utils.component_parser import get_component_name_by_id
 
 log = logging.getLogger(__name__)
@@ -91,6 +91,10 @@ log = logging.getLogger(__name__)
 #         }],
 #      "names": "names": {"sh1": "", "cp1": "", "counter2": "", "pv3": ""}
 #      }
+#
+# Die Einträge werden in einem append-only Speicher (data/log_store) abgelegt, siehe entry_store, und daraus gelesen.
+# Das JSON-Log wird nicht bei jedem Eintrag neu geschrieben, sondern aus dem Speicher exportiert: das Tages-Log beim
+# Tageswechsel, beim Start und vor einer Sicherung, das Monats-Log bei jedem (täglichen) Eintrag.
 
 
 class LogType(Enum):
@@ -98,36 +102,142 @@ class LogType(Enum):
     MONTHLY = "monthly"
 
 
+_store_lock = Lock()
+
+
+def _get_data_path() -> Path:
+    return Path(__file__).resolve().parents[3] / "data"
+
+
+def _get_log_folder(log_type: LogType) -> Path:
+    return _get_data_path() / ("daily_log" if log_type == LogType.DAILY else "monthly_log")
+
+
+def _get_store_path(log_type: LogType, file_name: str) -> Path:
+    return _get_data_path() / "log_store" / log_type.value / f"{file_name}.bin"
+
+
+def get_log_files(log_type: LogType, file_name: str) -> List[Path]:
+    """ Return: JSON-Log und Speicher des Logs, zB um Änderungen zu erkennen"""
+    return [_get_log_folder(log_type) / f"{file_name}.json", _get_store_path(log_type, file_name)]
+
+
+def _get_log_names(log_type: LogType) -> Set[str]:
+    """ Return: Namen aller Logs, die als JSON-Log oder im Speicher vorhanden sind"""
+    paths = list(_get_log_folder(log_type).glob("*.json")) + list(_get_store_path(log_type, "*").parent.glob("*.bin"))
+    return {path.stem for path in paths if path.stem.isdigit()}
+
+
+def _get_json_stat(json_path: Path) -> Optional[Dict]:
+    try:
+        stat = os.stat(json_path)
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    except FileNotFoundError:
+        return None
+
+
+def get_entry_store(log_type: LogType, file_name: str) -> EntryStore:
+    """ liefert den Speicher für das Log. Wurde das JSON-Log außerhalb geändert (zB durch eine Migration oder
+    Wiederherstellung), wird der Speicher aus dem JSON-Log neu aufgebaut.
+
+    Raises
+    ------
+    FileNotFoundError, wenn weder Speicher noch JSON-Log vorhanden sind.
+    """
+    with _store_lock:
+        json_path = _get_log_folder(log_type) / f"{file_name}.json"
+        store = EntryStore(_get_store_path(log_type, file_name))
+        json_stat = _get_json_stat(json_path)
+        if json_stat is None:
+            if not store.exists():
+                raise FileNotFoundError(f"Kein Log für {file_name} vorhanden.")
+        elif store.last_export() != json_stat:
+            try:
+                with open(json_path, "r") as json_file:
+                    content = json.load(json_file)
+                store.replace(content["entries"], content.get("names", {}))
+                store.append(RecordKind.EXPORT, 0, json_stat)
+            except json.JSONDecodeError:
+                # Der Speicher enthält die Einträge bis zum letzten Export, das JSON-Log wird beim nächsten Export
+                # daraus neu geschrieben.
+                log.error(f"Ungültiges JSON-Log {json_path}, verwende gespeicherte Einträge.")
+                os.rename(json_path, json_path.with_name(f"{file_name}_invalid.json"))
+        return store
+
+
+def _export_json(log_type: LogType, file_name: str, store: EntryStore, content: Dict) -> None:
+    """ schreibt das JSON-Log. Der Inhalt wird nicht erneut gelesen und geprüft, da die Einträge im Speicher
+    gesichert sind und das JSON-Log jederzeit daraus neu erstellt werden kann."""
+    json_path = _get_log_folder(log_type) / f"{file_name}.json"
+    json_path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+    tmp_path = json_path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as json_file:
+        json.dump(content, json_file)
+    os.replace(tmp_path, json_path)
+    store.append(RecordKind.EXPORT, 0, _get_json_stat(json_path))
+
+
+def get_log_content(log_type: LogType, file_name: str) -> Dict:
+    """ liefert Einträge und Namen des Logs aus dem Speicher.
+
+    Raises
+    ------
+    FileNotFoundError, wenn das Log nicht vorhanden ist.
+    """
+    store = get_entry_store(log_type, file_name)
+    return {"entries": store.entries(), "names": store.names()}
+
+
+def export_json(log_type: LogType, file_name: str) -> bool:
+    """ schreibt das JSON-Log aus dem Speicher, wenn seit dem letzten Export Einträge hinzugekommen sind.
+
+    Return: True, wenn das JSON-Log geschrieben wurde.
+    """
+    store = get_entry_store(log_type, file_name)
+    with _store_lock:
+        if store.is_exported():
+            return False
+        _export_json(log_type, file_name, store, {"entries": store.entries(), "names": store.names()})
+        return True
+
+
+def export_pending_json(log_type: Optional[LogType] = None) -> None:
+    """ exportiert die JSON-Logs, die noch nicht exportierte Einträge enthalten, zB vor einer Sicherung oder bevor
+    beim Start die JSON-Logs migriert werden. Die Logs werden vom neuesten an exportiert. Da beim Export immer alle
+    älteren Logs mit exportiert werden, sind ab dem ersten bereits exportierten Log auch alle älteren exportiert."""
+    for type_ in [log_type] if log_type else list(LogType):
+        for path in sorted(_get_store_path(type_, "*").parent.glob("*.bin"), reverse=True):
+            try:
+                if export_json(type_, path.stem) is False:
+                    break
+            except Exception:
+                log.exception(f"Fehler beim Exportieren des JSON-Logs {path.stem}")
+
+
 class LegacySmartHomeLogData:
     def __init__(self) -> None:
         self.all_received_topics: Dict = {}
         self.sh_dict: Dict = {}
         self.sh_names: Dict = {}
         try:
-            BrokerClient("smart-home-logging", self.on_connect, self.on_message).start_finite_loop()
+            self.all_received_topics = topic_cache.get("openWB/LegacySmartHome/#")
             for topic, payload in self.all_received_topics.items():
                 if re.search("openWB/LegacySmartHome/config/get/Devices/[1-9]/device_configured", topic) is not None:
-                    if decode_payload(payload) == 1:
+                    if payload == 1:
                         index = get_index(topic)
                         self.sh_dict.update({f"sh{index}": {}})
                         for topic, payload in self.all_received_topics.items():
                             if f"openWB/LegacySmartHome/Devices/{index}/Wh" == topic:
-                                self.sh_dict[f"sh{index}"].update({"imported": decode_payload(payload), "exported": 0})
+                                self.sh_dict[f"sh{index}"].update({"imported": payload, "exported": 0})
                             for sensor_id in range(0, 3):
                                 if f"openWB/LegacySmartHome/Devices/{index}/TemperatureSensor{sensor_id}" == topic:
-                                    self.sh_dict[f"sh{index}"].update({f"temp{sensor_id}": decode_payload(payload)})
+                                    self.sh_dict[f"sh{index}"].update({f"temp{sensor_id}": payload})
                         for topic, payload in self.all_received_topics.items():
                             if f"openWB/LegacySmartHome/config/get/Devices/{index}/device_name" == topic:
-                                self.sh_names.update({f"sh{index}": decode_payload(payload)})
+                                self.sh_names.update({f"sh{index}": payload})
         except Exception:
             log.exception("Fehler im Werte-Logging-Modul für SmartHome")
 
-    def on_connect(self, client: MqttClient, userdata, flags: dict, rc: int):
-        client.subscribe("openWB/LegacySmartHome/#", 2)
-
-    def on_message(self, client: MqttClient, userdata, msg: MQTTMessage):
-        self.all_received_topics.update({msg.topic: msg.payload})
-
 
 def save_log(log_type: LogType):
     """ Parameter
@@ -136,57 +246,49 @@ def save_log(log_type: LogType):
         gibt an, ob ein Tages-oder Monats-Log-Eintrag erstellt werden soll.
     """
     try:
-        parent_file = Path(__file__).resolve().parents[3] / "data" / \
-            ("daily_log" if log_type == LogType.DAILY else "monthly_log")
+        parent_file = _get_log_folder(log_type)
         parent_file.mkdir(mode=0o755, parents=True, exist_ok=True)
         if log_type == LogType.DAILY:
             file_name = timecheck.create_timestamp_YYYYMMDD()
         else:
             file_name = timecheck.create_timestamp_YYYYMM()
-        filepath = str(parent_file / f"{file_name}.json")
 
         try:
-            with open(filepath, "r") as jsonFile:
-                content = json.load(jsonFile)
+            store = get_entry_store(log_type, file_name)
         except FileNotFoundError:
-            content = {"entries": [], "names": {}}
-        except json.JSONDecodeError:
-            new_filepath = str(parent_file / f"{file_name}_invalid.json")
-            os.rename(filepath, new_filepath)
-            content = {"entries": [], "names": {}}
-
-        previous_entry = get_previous_entry(parent_file, content)
+            if log_type == LogType.DAILY:
+                # Tageswechsel: das Log des Vortags ist abgeschlossen und wird als JSON-Log exportiert.
+                export_pending_json(LogType.DAILY)
+            store = EntryStore(_get_store_path(log_type, file_name))
+        entries = store.entries()
+        previous_entry = get_previous_entry(log_type, file_name, entries)
 
         sh_log_data = LegacySmartHomeLogData()
         new_entry = create_entry(log_type, sh_log_data, previous_entry)
 
-        # json-Objekt in Datei einfügen
-
-        entries = content["entries"]
-        entries.append(new_entry)
-        content["names"] = get_names(content["entries"][-1], sh_log_data.sh_names)
-        write_and_check(filepath, content)
-        return content["entries"]
+        with _store_lock:
+            store.append_entry(new_entry)
+            names = get_names(new_entry, sh_log_data.sh_names)
+            if names != store.names():
+                store.append(RecordKind.NAMES, new_entry["timestamp"], names)
+            if log_type == LogType.MONTHLY:
+                _export_json(log_type, file_name, store, {"entries": entries + [new_entry], "names": names})
+        return entries + [new_entry]
     except Exception:
         log.exception("Fehler beim Speichern des Log-Eintrags")
         return None
 
 
-def get_previous_entry(parent_file: Path, content: Dict) -> Optional[Dict]:
+def get_previous_entry(log_type: LogType, file_name: str, entries: List[Dict]) -> Optional[Dict]:
+    """ Return: letzter Eintrag des Logs, wenn das Log noch keine Einträge enthält, der letzte Eintrag des
+    vorherigen Logs"""
+    if len(entries) > 0:
+        return entries[-1]
+    previous_names = [name for name in _get_log_names(log_type) if name < file_name]
     try:
-        previous_entry = content["entries"][-1]
-    except IndexError:
-        # get all files in Folder
-        path_list = parent_file.glob('*.json')
-        # sort path list by name
-        path_list = sorted(path_list, key=lambda x: x.name)
-        try:
-            with open(path_list[-2], "r") as jsonFile:
-                content = json.load(jsonFile)
-            previous_entry = content["entries"][-1]
-        except (IndexError, FileNotFoundError, json.decoder.JSONDecodeError):
-            previous_entry = None
-    return previous_entry
+        return get_entry_store(log_type, max(previous_names)).last_entry()
+    except (ValueError, FileNotFoundError):
+        return None
 
 
 def create_entry(log_type: LogType, sh_log_data: LegacySmartHomeLogData, previous_entry: Optional[Dict]) -> Dict:
@@ -115,6 +115,8 @@ NOT_PERSISTENT_TOPICS = ['openWB/system/messages/[^/]+',
                          'openWB/command/[^/]+/messages/.*',
                          'openWB/system/serial_number',
                          'openWB/system/mac_address',
+                         'openWB/system/perf/timing/.*',
+                         'openWB/system/device/[^/]+/polling',
                          'openWB/optional/dc_charging',
                          'others/.*',
                          '$CONTROL/dynamic-security/.*',
@@ -1,5 +1,10 @@
+from collections import OrderedDict
+from dataclasses import dataclass
 import json
 import logging
+from threading import Lock, local
+import time
+from typing import Dict, Optional, Tuple
 import paho.mqtt.publish as publish
 
 from helpermodules.broker import InternalBrokerPublisher
@@ -7,17 +12,108 @@ from helpermodules.broker import InternalBrokerPublisher
 
 log = logging.getLogger(__name__)
 
+# Unveränderte Werte werden spätestens nach dieser Zeit erneut veröffentlicht.
+SUPPRESS_UNCHANGED_MAX_AGE = 300
+
+# Der Puffer gilt nur für den Thread, der ihn gestartet hat. Andere Threads (zB SetData, SubData, Geräte-Threads)
+# veröffentlichen weiterhin sofort.
+_thread_local = local()
+
+
+@dataclass
+class PubCounters:
+    sent: int = 0
+    suppressed: int = 0
+    coalesced: int = 0
+
 
 class PubSingleton:
     def __init__(self) -> None:
         self.publisher = InternalBrokerPublisher()
         self.publisher.start_loop()
+        self.lock = Lock()
+        self.counters = PubCounters()
+        # Topic: (Hash des Payloads, Zeitpunkt der Veröffentlichung)
+        self.last_published: Dict[str, Tuple[int, float]] = {}
+        # Anzahl der Nachrichten an openWB/set/, die von SetData verarbeitet werden müssen, bevor sie in SubData
+        # ankommen. Bleibt die Nummer unverändert, muss nicht auf eine erneute Rückmeldung des Brokers gewartet werden.
+        # Gezählt werden nur gesendete Nachrichten, nicht die leeren Payloads, mit denen SetData die verarbeiteten
+        # Topics löscht.
+        self.set_sequence = 0
+
+    @property
+    def batch(self) -> Optional["OrderedDict[str, Tuple[str, int, bool, bool]]"]:
+        """ Puffer des aktuellen Threads, Topic: (Payload, qos, retain, suppress_unchanged)"""
+        return getattr(_thread_local, "batch", None)
+
+    def pub(self, topic: str, payload, qos: int = 0, retain: bool = True, no_json: bool = False,
+            suppress_unchanged: bool = False) -> None:
+        """ veröffentlicht den Payload. Ist ein Puffer aktiv, wird der Payload bis zum Ende des Puffers
+        zurückgehalten und mehrfache Werte für das selbe Topic zum letzten Wert zusammengefasst.
+
+        suppress_unchanged: Wenn der zuletzt veröffentlichte Wert des Topics identisch ist, wird der Payload nicht
+        erneut veröffentlicht. Darf nur für Topics verwendet werden, die nur von openWB selbst geschrieben werden.
+        """
+        self._pub(topic, payload, qos, retain, no_json, suppress_unchanged, self.batch)
+
+    def pub_immediately(self, topic: str, payload, qos: int = 0, retain: bool = True) -> None:
+        """ veröffentlicht den Payload auch bei aktivem Puffer sofort, zB eine Rückmeldung, auf die der Thread wartet.
+        Die gepufferten Werte werden vorher veröffentlicht, damit der Payload sie nicht überholt."""
+        self.flush()
+        self._pub(topic, payload, qos, retain, False, False, None)
 
-    def pub(self, topic: str, payload, qos: int = 0, retain: bool = True, no_json: bool = False) -> None:
-        if payload == "" or no_json:
-            self.publisher.client.publish(topic, payload, qos=qos, retain=retain)
+    def _pub(self, topic: str, payload, qos: int, retain: bool, no_json: bool, suppress_unchanged: bool,
+             batch: Optional["OrderedDict[str, Tuple[str, int, bool, bool]]"]) -> None:
+        if payload != "" and not no_json:
+            payload = json.dumps(payload)
+        with self.lock:
+            if batch is not None:
+                if batch.pop(topic, None) is not None:
+                    self.counters.coalesced += 1
+                batch[topic] = (payload, qos, retain, suppress_unchanged)
+                return
+            self._publish(topic, payload, qos, retain, suppress_unchanged)
+
+    def _publish(self, topic: str, payload: str, qos: int, retain: bool, suppress_unchanged: bool) -> None:
+        if payload == "":
+            # Löschen eines Topics (zB durch SetData nach der Verarbeitung), der zuletzt veröffentlichte Wert bleibt für
+            # suppress_unchanged erhalten.
+            pass
+        elif retain:
+            payload_hash = hash(payload)
+            now = time.time()
+            last = self.last_published.get(topic)
+            if (suppress_unchanged and last is not None and last[0] == payload_hash and
+                    now - last[1] < SUPPRESS_UNCHANGED_MAX_AGE):
+                self.counters.suppressed += 1
+                return
+            self.last_published[topic] = (payload_hash, now)
         else:
-            self.publisher.client.publish(topic, payload=json.dumps(payload), qos=qos, retain=retain)
+            self.last_published.pop(topic, None)
+        if topic.startswith("openWB/set/") and payload != "":
+            # erst beim Senden zählen, gepufferte und unveränderte Werte erreichen SetData (noch) nicht
+            self.set_sequence += 1
+        self.publisher.client.publish(topic, payload, qos=qos, retain=retain)
+        self.counters.sent += 1
+
+    def start_batch(self) -> None:
+        if self.batch is None:
+            _thread_local.batch = OrderedDict()
+
+    def flush(self) -> None:
+        """ veröffentlicht alle gepufferten Werte des aktuellen Threads, der Puffer bleibt aktiv."""
+        batch = self.batch
+        if batch:
+            with self.lock:
+                for topic, (payload, qos, retain, suppress_unchanged) in batch.items():
+                    self._publish(topic, payload, qos, retain, suppress_unchanged)
+                batch.clear()
+
+    def end_batch(self) -> None:
+        self.flush()
+        _thread_local.batch = None
+        log.debug(f"Veröffentlicht: {self.counters.sent}, unverändert: {self.counters.suppressed}, "
+                  f"zusammengefasst: {self.counters.coalesced}")
 
 
 class Pub:
@@ -31,6 +127,19 @@ class Pub:
         return getattr(self.instance, name)
 
 
+class PubBatchContext:
+    """ Puffert alle Nachrichten, die der aktuelle Thread während des Kontexts veröffentlicht, und veröffentlicht sie
+    beim Verlassen."""
+
+    def __enter__(self):
+        Pub().start_batch()
+        return None
+
+    def __exit__(self, exception_type, exception, exception_traceback) -> bool:
+        Pub().end_batch()
+        return False
+
+
 def pub_single(topic: str, payload, hostname: str = "localhost", port: int = 1883,
                no_json: bool = False, retain: bool = True):
     """ Sendet eine einzelne Nachricht an einen Host.
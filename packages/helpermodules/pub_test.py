@@ -0,0 +1,89 @@
+from threading import Event, Thread
+from unittest.mock import Mock
+
+import paho.mqtt.client as mqtt
+import pytest
+
+from helpermodules import pub
+from helpermodules.pub import PubSingleton
+from helpermodules.setdata import SetData
+from modules.common.store._broker import pub_to_broker
+
+
+@pytest.fixture
+def pub_singleton(monkeypatch) -> PubSingleton:
+    monkeypatch.setattr(pub, "InternalBrokerPublisher", Mock())
+    return PubSingleton()
+
+
+def published(pub_singleton: PubSingleton):
+    return [(c.args[0], c.args[1]) for c in pub_singleton.publisher.client.publish.call_args_list]
+
+
+def test_batch_coalesces_topics(pub_singleton: PubSingleton):
+    # setup
+    pub_singleton.start_batch()
+
+    # execution
+    pub_singleton.pub("openWB/set/counter/0/get/power", 100)
+    pub_singleton.pub("openWB/set/counter/0/get/imported", 5)
+    pub_singleton.pub("openWB/set/counter/0/get/power", 200)
+    before_flush = published(pub_singleton)
+    pub_singleton.end_batch()
+
+    # evaluation
+    assert before_flush == []
+    assert published(pub_singleton) == [("openWB/set/counter/0/get/imported", "5"),
+                                        ("openWB/set/counter/0/get/power", "200")]
+    assert pub_singleton.counters.coalesced == 1
+    assert pub_singleton.counters.sent == 2
+
+
+def test_suppress_unchanged(pub_singleton: PubSingleton):
+    # execution
+    pub_singleton.pub("openWB/set/counter/0/get/power", 100, suppress_unchanged=True)
+    pub_singleton.pub("openWB/set/counter/0/get/power", 100, suppress_unchanged=True)
+    pub_singleton.pub("openWB/set/counter/0/get/power", 100)
+    pub_singleton.pub("openWB/set/counter/0/get/power", 200, suppress_unchanged=True)
+
+    # evaluation
+    assert published(pub_singleton) == [("openWB/set/counter/0/get/power", "100"),
+                                        ("openWB/set/counter/0/get/power", "100"),
+                                        ("openWB/set/counter/0/get/power", "200")]
+    assert pub_singleton.counters.suppressed == 1
+
+
+def test_other_threads_bypass_batch(pub_singleton: PubSingleton):
+    # setup
+    pub_singleton.start_batch()
+
+    # execution
+    thread = Thread(target=pub_singleton.pub, args=("openWB/set/counter/1/get/power", 300))
+    thread.start()
+    thread.join()
+    pub_singleton.pub("openWB/set/counter/0/get/power", 100)
+
+    # evaluation
+    assert published(pub_singleton) == [("openWB/set/counter/1/get/power", "300")]
+    pub_singleton.end_batch()
+    assert published(pub_singleton)[-1] == ("openWB/set/counter/0/get/power", "100")
+
+
+def test_suppress_unchanged_after_setdata_clear(pub_singleton: PubSingleton, monkeypatch):
+    # setup
+    monkeypatch.setattr(pub.Pub, "instance", pub_singleton)
+    setdata = SetData(Event(), Event(), Event(), Event())
+    topic = "openWB/set/counter/set/home_consumption"
+    msg = mqtt.MQTTMessage(topic=topic.encode())
+    msg.payload = b"100.5"
+
+    # execution
+    for _ in range(3):
+        pub_to_broker(topic, 100.5)
+        # SetData verarbeitet den Wert und löscht das set-Topic
+        setdata.on_message(None, None, msg)
+
+    # evaluation
+    assert published(pub_singleton).count((topic, "100.5")) == 1
+    assert published(pub_singleton).count((topic, "")) == 3
+    assert pub_singleton.counters.suppressed == 2
@@ -15,6 +15,7 @@ from helpermodules import hardware_configuration, subdata
 from helpermodules.broker import BrokerClient
 from helpermodules.pub import Pub
 from helpermodules.utils.topic_parser import decode_payload, get_index, get_index_position
+from helpermodules.utils.topic_router import TopicRouter
 from helpermodules.update_config import UpdateConfig
 import dataclass_utils
 
@@ -35,6 +36,7 @@ class SetData:
         self.event_soc = event_soc
         self.event_subdata_initialized = event_subdata_initialized
         self.heartbeat = False
+        self.router = self._create_router()
 
     def set_data(self):
         self.internal_broker_client = BrokerClient("mqttset", self.on_connect, self.on_message)
@@ -66,45 +68,36 @@ class SetData:
         self.heartbeat = True
         if decode_payload(msg.payload) != "":
             mqtt_log.debug(f"Topic: {msg.topic}, Payload: {decode_payload(msg.payload)}")
-            if "openWB/set/vehicle/" in msg.topic:
-                if "openWB/set/vehicle/template/ev_template/" in msg.topic:
-                    self.event_ev_template.wait(5)
-                    self.process_vehicle_ev_template_topic(msg)
-                elif "openWB/set/vehicle/template/charge_template/" in msg.topic:
-                    self.process_vehicle_charge_template_topic(msg)
-                else:
-                    self.process_vehicle_topic(msg)
-            elif "openWB/set/chargepoint/" in msg.topic:
-                if "openWB/set/chargepoint/" in msg.topic and "/set/charge_template" in msg.topic:
-                    self.process_vehicle_charge_template_topic(msg)
-                else:
-                    self.process_chargepoint_topic(msg)
-            elif "openWB/set/pv/" in msg.topic:
-                self.process_pv_topic(msg)
-            elif "openWB/set/bat/" in msg.topic:
-                self.process_bat_topic(msg)
-            elif "openWB/set/general/" in msg.topic:
-                self.process_general_topic(msg)
-            elif ("openWB/set/io/" in msg.topic or "openWB/set/internal_io/" in msg.topic):
-                self.process_io_topic(msg)
-            elif "openWB/set/mqtt/" in msg.topic:
-                self.process_mqtt_topic(msg)
-            elif "openWB/set/optional/" in msg.topic:
-                self.process_optional_topic(msg)
-            elif "openWB/set/counter/" in msg.topic:
-                self.process_counter_topic(msg)
-            elif "openWB/set/log/" in msg.topic:
-                self.process_log_topic(msg)
-            elif "openWB/set/graph/" in msg.topic:
-                self.process_graph_topic(msg)
-            elif "openWB/set/system/" in msg.topic:
-                self.process_system_topic(msg)
-            elif "openWB/set/command/" in msg.topic:
-                self.process_command_topic(msg)
-            elif "openWB/set/internal_chargepoint/" in msg.topic:
-                self.process_internal_chargepoint_topic(msg)
-            elif "openWB/set/LegacySmartHome/" in msg.topic:
-                self.process_legacy_smart_home_topic(msg)
+            route = self.router.match(msg.topic)
+            if route is not None:
+                route.handler(msg)
+
+    def _create_router(self) -> TopicRouter:
+        router = TopicRouter()
+        router.register("openWB/set/vehicle/template/ev_template/+/#", self._on_ev_template_message)
+        router.register("openWB/set/vehicle/template/charge_template/+/#", self.process_vehicle_charge_template_topic)
+        router.register("openWB/set/vehicle/+/#", self.process_vehicle_topic)
+        router.register("openWB/set/chargepoint/+/set/charge_template/#", self.process_vehicle_charge_template_topic)
+        router.register("openWB/set/chargepoint/+/#", self.process_chargepoint_topic)
+        router.register("openWB/set/pv/+/#", self.process_pv_topic)
+        router.register("openWB/set/bat/+/#", self.process_bat_topic)
+        router.register("openWB/set/general/+/#", self.process_general_topic)
+        router.register("openWB/set/io/+/#", self.process_io_topic)
+        router.register("openWB/set/internal_io/+/#", self.process_io_topic)
+        router.register("openWB/set/mqtt/+/#", self.process_mqtt_topic)
+        router.register("openWB/set/optional/+/#", self.process_optional_topic)
+        router.register("openWB/set/counter/+/#", self.process_counter_topic)
+        router.register("openWB/set/log/+/#", self.process_log_topic)
+        router.register("openWB/set/graph/+/#", self.process_graph_topic)
+        router.register("openWB/set/system/+/#", self.process_system_topic)
+        router.register("openWB/set/command/+/#", self.process_command_topic)
+        router.register("openWB/set/internal_chargepoint/+/#", self.process_internal_chargepoint_topic)
+        router.register("openWB/set/LegacySmartHome/+/#", self.process_legacy_smart_home_topic)
+        return router
+
+    def _on_ev_template_message(self, msg: mqtt.MQTTMessage) -> None:
+        self.event_ev_template.wait(5)
+        self.process_vehicle_ev_template_topic(msg)
 
     def _validate_value(self, msg: mqtt.MQTTMessage, data_type, ranges=[], collection=None, pub_json=False,
                         retain: bool = True):
@@ -1066,6 +1059,8 @@ class SetData:
                     Pub().pub(msg.topic, "")
             elif "openWB/set/system/debug_level" in msg.topic:
                 self._validate_value(msg, int, [(10, 10), (20, 20), (30, 30)])
+            elif "openWB/set/system/perf/config" == msg.topic:
+                self._validate_value(msg, "json")
             elif ("openWB/set/system/ip_address" in msg.topic or
                   "openWB/set/system/hostname" in msg.topic or
                   "openWB/set/system/release_train" in msg.topic):
@@ -4,7 +4,7 @@ import importlib
 import logging
 from pathlib import Path
 from threading import Event
-from typing import Dict, Union
+from typing import Dict, Optional, Tuple, Union
 import re
 import subprocess
 import paho.mqtt.client as mqtt
@@ -15,6 +15,7 @@ from control.chargepoint.chargepoint_all import AllChargepoints
 from control.chargepoint.chargepoint_data import Log
 from control.chargepoint.chargepoint_state_update import ChargepointStateUpdate
 from control.chargepoint.chargepoint_template import CpTemplate, CpTemplateData
+from control.data_snapshot import SnapshotVersions
 from control.ev.charge_template import ChargeTemplate, ChargeTemplateData
 from control.ev import ev
 from control.ev.ev_template import EvTemplate, EvTemplateData
@@ -22,12 +23,14 @@ from control.limiting_value import LoadmanagementLimit
 from control.optional_data import Ocpp
 from helpermodules import graph, system
 from helpermodules.broker import BrokerClient
+from helpermodules.cycle_profiler import cycle_profiler
 from helpermodules.messaging import MessageType, pub_system_message
 from helpermodules.mosquitto_dynsec.role_handler import add_acl_role, remove_acl_role
 from helpermodules.mosquitto_dynsec.user_handler import remove_display_user, create_display_user
 from helpermodules.utils import ProcessingCounter
 from helpermodules.utils.run_command import run_command
 from helpermodules.utils.topic_parser import decode_payload, get_index, get_second_index
+from helpermodules.utils.topic_router import TopicRouter
 from helpermodules.pub import Pub
 from dataclass_utils import asdict, dataclass_from_dict
 from modules.common.abstract_vehicle import CalculatedSocState, GeneralVehicleConfig
@@ -42,6 +45,11 @@ log = logging.getLogger(__name__)
 mqtt_log = logging.getLogger("mqtt")
 
 
+def _get_index(wildcards: Tuple[str, ...]) -> Optional[str]:
+    """ Index aus der ersten Wildcard des Routers, None, wenn die Ebene keine Zahl ist (zB openWB/pv/get/...)"""
+    return wildcards[0] if wildcards and wildcards[0].isdigit() else None
+
+
 class SubData:
     """ Klasse, die die benötigten Topics abonniert, die Instanzen erstellt, wenn z.b. ein Modul neu konfiguriert
     wird, Instanzen löscht, wenn Module gelöscht werden, und die Werte in die Attribute der Instanzen schreibt.
@@ -71,6 +79,8 @@ class SubData:
     optional_data = optional.Optional()
     system_data = {"system": system.System()}
     graph_data = graph.Graph()
+    # Versionen der Kategorien, die beim Kopieren in die Regel-Daten nur bei Änderungen neu kopiert werden
+    snapshot_versions = SnapshotVersions()
 
     def __init__(self,
                  event_ev_template: Event,
@@ -110,6 +120,7 @@ class SubData:
         # Wenn subdata_initialized empfangen wird, wird der Zäheler runtergezählt. Erst wenn alle subdata_initialized
         # empfangen wurden, wurden auch die vorher subskribierten Topics empfangen und der Algorithmus kann starten.
         self.processing_counter = ProcessingCounter(self.event_subdata_initialized)
+        self.router = self._create_router()
 
     def sub_topics(self):
         self.internal_broker_client = BrokerClient("mqttsub", self.on_connect, self.on_message)
@@ -149,6 +160,7 @@ class SubData:
             ("openWB/system/device/+/config", 2),
             ("openWB/system/io/#", 2),
             ("openWB/system/security/#", 2),
+            ("openWB/system/perf/config", 2),
             ("openWB/LegacySmartHome/Status/wattnichtHaus", 2),
             ("openWB/io/#", 2),
         ])
@@ -161,43 +173,74 @@ class SubData:
         mqtt_log.debug("Topic: "+str(msg.topic) +
                        ", Payload: "+str(msg.payload.decode("utf-8")))
         self.heartbeat = True
-        if "openWB/vehicle/template/charge_template/" in msg.topic:
-            self.process_vehicle_charge_template_topic(
-                self.ev_charge_template_data, msg)
-        elif "openWB/vehicle/template/ev_template/" in msg.topic:
-            self.process_vehicle_ev_template_topic(self.ev_template_data, msg)
-        elif "openWB/vehicle/" in msg.topic:
-            self.process_vehicle_topic(client, self.ev_data, msg)
-        elif "openWB/chargepoint/template/" in msg.topic:
-            self.process_chargepoint_template_topic(self.cp_template_data, msg)
-        elif "openWB/chargepoint/" in msg.topic:
-            self.process_chargepoint_topic(self.cp_data, msg)
-        elif "openWB/pv/" in msg.topic:
-            self.process_pv_topic(self.pv_data, msg)
-        elif "openWB/bat/" in msg.topic:
-            self.process_bat_topic(self.bat_data, msg)
-        elif "openWB/general/" in msg.topic:
-            self.process_general_topic(self.general_data, msg)
-        elif "openWB/graph/" in msg.topic:
-            self.process_graph_topic(self.graph_data, msg)
-        elif "openWB/io/action" in msg.topic:
-            self.process_io_topic(self.io_actions, msg)
-        elif "openWB/io/states" in msg.topic or "openWB/internal_io/states" in msg.topic:
-            self.process_io_topic(self.io_states, msg)
-        elif "openWB/internal_chargepoint/" in msg.topic:
-            self.process_internal_chargepoint_topic(client, self.internal_chargepoint_data, msg)
-        elif "openWB/optional/" in msg.topic:
-            self.process_optional_topic(self.optional_data, msg)
-        elif "openWB/counter/" in msg.topic:
-            self.process_counter_topic(self.counter_data, msg)
-        elif "openWB/system/" in msg.topic:
-            self.process_system_topic(client, self.system_data, msg)
-        elif "openWB/LegacySmartHome/" in msg.topic:
-            self.process_legacy_smarthome_topic(client, self.counter_all_data, msg)
-        elif "openWB/command/command_completed" == msg.topic:
-            self.event_command_completed.set()
-        else:
+        route = self.router.match(msg.topic)
+        if route is None:
             log.warning("unknown subdata-topic: "+str(msg.topic))
+        else:
+            route.handler(client, msg, route.wildcards)
+
+    def _create_router(self) -> TopicRouter:
+        """ Die Handler erhalten die vom Router extrahierten Wildcards, sodass der Index nicht erneut per regulärem
+        Ausdruck aus dem Topic ermittelt werden muss."""
+        router = TopicRouter()
+        router.register("openWB/vehicle/template/charge_template/+/#", self._on_charge_template_message)
+        router.register("openWB/vehicle/template/ev_template/+/#", self._on_ev_template_message)
+        router.register("openWB/vehicle/+/#",
+                        lambda client, msg, wildcards: self.process_vehicle_topic(
+                            client, self.ev_data, msg, _get_index(wildcards)))
+        router.register("openWB/chargepoint/template/+/#", self._on_cp_template_message)
+        router.register("openWB/chargepoint/+/#",
+                        lambda client, msg, wildcards: self.process_chargepoint_topic(
+                            self.cp_data, msg, _get_index(wildcards)))
+        router.register("openWB/pv/+/#",
+                        lambda client, msg, wildcards: self.process_pv_topic(self.pv_data, msg, _get_index(wildcards)))
+        router.register("openWB/bat/+/#",
+                        lambda client, msg, wildcards: self.process_bat_topic(
+                            self.bat_data, msg, _get_index(wildcards)))
+        router.register("openWB/general/+/#",
+                        lambda client, msg, wildcards: self.process_general_topic(self.general_data, msg))
+        router.register("openWB/graph/+/#", self._on_graph_message)
+        router.register("openWB/io/action/#",
+                        lambda client, msg, wildcards: self.process_io_topic(self.io_actions, msg))
+        router.register("openWB/io/states/#",
+                        lambda client, msg, wildcards: self.process_io_topic(self.io_states, msg))
+        router.register("openWB/internal_io/states/#",
+                        lambda client, msg, wildcards: self.process_io_topic(self.io_states, msg))
+        router.register("openWB/internal_chargepoint/+/#",
+                        lambda client, msg, wildcards: self.process_internal_chargepoint_topic(
+                            client, self.internal_chargepoint_data, msg))
+        router.register("openWB/optional/+/#",
+                        lambda client, msg, wildcards: self.process_optional_topic(self.optional_data, msg))
+        router.register("openWB/counter/+/#",
+                        lambda client, msg, wildcards: self.process_counter_topic(
+                            self.counter_data, msg, _get_index(wildcards)))
+        router.register("openWB/system/+/#",
+                        lambda client, msg, wildcards: self.process_system_topic(client, self.system_data, msg))
+        router.register("openWB/LegacySmartHome/+/#",
+                        lambda client, msg, wildcards: self.process_legacy_smarthome_topic(
+                            client, self.counter_all_data, msg))
+        router.register("openWB/command/command_completed",
+                        lambda client, msg, wildcards: self.event_command_completed.set())
+        return router
+
+    def _on_charge_template_message(self, client: mqtt.Client, msg: mqtt.MQTTMessage,
+                                    wildcards: Tuple[str, ...]) -> None:
+        self.process_vehicle_charge_template_topic(self.ev_charge_template_data, msg, _get_index(wildcards))
+        self.snapshot_versions.touch("ev_charge_template_data")
+
+    def _on_ev_template_message(self, client: mqtt.Client, msg: mqtt.MQTTMessage,
+                                wildcards: Tuple[str, ...]) -> None:
+        self.process_vehicle_ev_template_topic(self.ev_template_data, msg, _get_index(wildcards))
+        self.snapshot_versions.touch("ev_template_data")
+
+    def _on_cp_template_message(self, client: mqtt.Client, msg: mqtt.MQTTMessage,
+                                wildcards: Tuple[str, ...]) -> None:
+        self.process_chargepoint_template_topic(self.cp_template_data, msg, _get_index(wildcards))
+        self.snapshot_versions.touch("cp_template_data")
+
+    def _on_graph_message(self, client: mqtt.Client, msg: mqtt.MQTTMessage, wildcards: Tuple[str, ...]) -> None:
+        self.process_graph_topic(self.graph_data, msg)
+        self.snapshot_versions.touch("graph_data")
 
     def set_json_payload(self, dict: Dict, msg: mqtt.MQTTMessage) -> None:
         """ dekodiert das JSON-Objekt und setzt diesen für den Value in das übergebene Dictionary, als Key wird der
@@ -259,7 +302,8 @@ class SubData:
         except Exception:
             log.exception("Fehler im subdata-Modul")
 
-    def process_vehicle_topic(self, client: mqtt.Client, var: Dict[str, ev.Ev], msg: mqtt.MQTTMessage):
+    def process_vehicle_topic(self, client: mqtt.Client, var: Dict[str, ev.Ev], msg: mqtt.MQTTMessage,
+                              index: Optional[str] = None):
         """ Handler für die EV-Topics
 
         Parameter
@@ -268,12 +312,14 @@ class SubData:
             enthält aktuelle Daten
         msg :
             enthält Topic und Payload
+        index :
+            vom Router ermittelter Index, wird sonst aus dem Topic gelesen
         """
         try:
             if "openWB/vehicle/set/vehicle_update_completed" in msg.topic:
                 self.event_vehicle_update_completed.set()
-            elif re.search("/vehicle/[0-9]+/", msg.topic) is not None:
-                index = get_index(msg.topic)
+            elif index is not None or re.search("/vehicle/[0-9]+/", msg.topic) is not None:
+                index = index or get_index(msg.topic)
                 if decode_payload(msg.payload) == "":
                     if re.search("/vehicle/[0-9]+/soc_module/config$", msg.topic) is not None:
                         var["ev"+index].soc_module = None
@@ -339,7 +385,8 @@ class SubData:
         except Exception:
             log.exception("Fehler im subdata-Modul")
 
-    def process_vehicle_charge_template_topic(self, var: Dict[str, ChargeTemplate], msg: mqtt.MQTTMessage):
+    def process_vehicle_charge_template_topic(self, var: Dict[str, ChargeTemplate], msg: mqtt.MQTTMessage,
+                                              index: Optional[str] = None):
         """ Handler für die EV-Topics
 
         Parameter
@@ -348,9 +395,11 @@ class SubData:
             enthält aktuelle Daten
         msg :
             enthält Topic und Payload
+        index :
+            vom Router ermittelter Index, wird sonst aus dem Topic gelesen
         """
         try:
-            index = get_index(msg.topic)
+            index = index or get_index(msg.topic)
             if re.search("/vehicle/template/charge_template/[0-9]+$", msg.topic) is not None:
                 if decode_payload(msg.payload) == "":
                     if "ct"+index in var:
@@ -378,7 +427,8 @@ class SubData:
         except Exception:
             log.exception("Fehler im subdata-Modul")
 
-    def process_vehicle_ev_template_topic(self, var: Dict[str, EvTemplate], msg: mqtt.MQTTMessage):
+    def process_vehicle_ev_template_topic(self, var: Dict[str, EvTemplate], msg: mqtt.MQTTMessage,
+                                          index: Optional[str] = None):
         """ Handler für die EV-Topics
 
         Parameter
@@ -387,9 +437,11 @@ class SubData:
             enthält aktuelle Daten
         msg :
             enthält Topic und Payload
+        index :
+            vom Router ermittelter Index, wird sonst aus dem Topic gelesen
         """
         try:
-            index = get_index(msg.topic)
+            index = index or get_index(msg.topic)
             if re.search("/vehicle/template/ev_template/[0-9]+$", msg.topic) is not None:
                 if decode_payload(msg.payload) == "":
                     if "et"+index in var:
@@ -402,7 +454,8 @@ class SubData:
         except Exception:
             log.exception("Fehler im subdata-Modul")
 
-    def process_chargepoint_topic(self, var: Dict[str, chargepoint.Chargepoint], msg: mqtt.MQTTMessage):
+    def process_chargepoint_topic(self, var: Dict[str, chargepoint.Chargepoint], msg: mqtt.MQTTMessage,
+                                  index: Optional[str] = None):
         """ Handler für die Ladepunkt-Topics
 
         Parameter
@@ -411,10 +464,12 @@ class SubData:
             enthält aktuelle Daten
         msg :
             enthält Topic und Payload
+        index :
+            vom Router ermittelter Index, wird sonst aus dem Topic gelesen
         """
         try:
-            if re.search("/chargepoint/[0-9]+/", msg.topic) is not None:
-                index = get_index(msg.topic)
+            if index is not None or re.search("/chargepoint/[0-9]+/", msg.topic) is not None:
+                index = index or get_index(msg.topic)
                 if decode_payload(msg.payload) == "":
                     if re.search("/chargepoint/[0-9]+/config", msg.topic) is not None:
                         log.debug("Stop des Handlers für den internen Ladepunkt.")
@@ -470,7 +525,7 @@ class SubData:
                         else:
                             self.set_json_payload_class(var["cp"+index].chargepoint.data.get, msg)
                     elif re.search("/chargepoint/[0-9]+/config$", msg.topic) is not None:
-                        self.process_chargepoint_config_topic(var, msg)
+                        self.process_chargepoint_config_topic(var, msg, index)
                     elif re.search("/chargepoint/[0-9]+/control_parameter/", msg.topic) is not None:
                         if re.search("/chargepoint/[0-9]+/control_parameter/limit", msg.topic) is not None:
                             payload = decode_payload(msg.payload)
@@ -483,8 +538,8 @@ class SubData:
         except Exception:
             log.exception("Fehler im subdata-Modul")
 
-    def process_chargepoint_config_topic(self, var: Dict[str, chargepoint.CpTemplate], msg: mqtt.MQTTMessage):
-        index = get_index(msg.topic)
+    def process_chargepoint_config_topic(self, var: Dict[str, chargepoint.CpTemplate], msg: mqtt.MQTTMessage,
+                                         index: str):
         payload = decode_payload(msg.payload)
         if (payload["type"] == "external_openwb"):
             old_ip = var["cp"+index].chargepoint.data.config.configuration.get("ip_address", None)
@@ -521,7 +576,8 @@ class SubData:
         self.set_json_payload_class(var["cp"+index].chargepoint.data.config, msg)
         self.event_cp_config.set()
 
-    def process_chargepoint_template_topic(self, var: Dict[str, chargepoint.CpTemplate], msg: mqtt.MQTTMessage):
+    def process_chargepoint_template_topic(self, var: Dict[str, chargepoint.CpTemplate], msg: mqtt.MQTTMessage,
+                                           index: Optional[str] = None):
         """ Handler für die Ladepunkt-Topics
 
         Parameter
@@ -530,9 +586,11 @@ class SubData:
             enthält aktuelle Daten
         msg :
             enthält Topic und Payload
+        index :
+            vom Router ermittelter Index, wird sonst aus dem Topic gelesen
         """
         try:
-            index = get_index(msg.topic)
+            index = index or get_index(msg.topic)
             payload = decode_payload(msg.payload)
             if payload == "":
                 var.pop("cpt"+index)
@@ -543,7 +601,7 @@ class SubData:
         except Exception:
             log.exception("Fehler im subdata-Modul")
 
-    def process_pv_topic(self, var: Dict[str, pv.Pv], msg: mqtt.MQTTMessage):
+    def process_pv_topic(self, var: Dict[str, pv.Pv], msg: mqtt.MQTTMessage, index: Optional[str] = None):
         """ Handler für die PV-Topics
 
         Parameter
@@ -552,10 +610,12 @@ class SubData:
             enthält aktuelle Daten
         msg :
             enthält Topic und Payload
+        index :
+            vom Router ermittelter Index, wird sonst aus dem Topic gelesen
         """
         try:
-            if re.search("/pv/[0-9]+/", msg.topic) is not None:
-                index = get_index(msg.topic)
+            if index is not None or re.search("/pv/[0-9]+/", msg.topic) is not None:
+                index = index or get_index(msg.topic)
                 if decode_payload(msg.payload) == "":
                     if "pv"+index in var:
                         var.pop("pv"+index)
@@ -576,7 +636,7 @@ class SubData:
         except Exception:
             log.exception("Fehler im subdata-Modul")
 
-    def process_bat_topic(self, var: Dict[str, bat.Bat], msg: mqtt.MQTTMessage):
+    def process_bat_topic(self, var: Dict[str, bat.Bat], msg: mqtt.MQTTMessage, index: Optional[str] = None):
         """ Handler für die Hausspeicher-Hardware_Topics
 
         Parameter
@@ -585,10 +645,12 @@ class SubData:
             enthält aktuelle Daten
         msg :
             enthält Topic und Payload
+        index :
+            vom Router ermittelter Index, wird sonst aus dem Topic gelesen
         """
         try:
-            if re.search("/bat/[0-9]+/", msg.topic) is not None:
-                index = get_index(msg.topic)
+            if index is not None or re.search("/bat/[0-9]+/", msg.topic) is not None:
+                index = index or get_index(msg.topic)
                 if decode_payload(msg.payload) == "":
                     if "bat"+index in var:
                         var.pop("bat"+index)
@@ -819,7 +881,8 @@ class SubData:
         except Exception:
             log.exception("Fehler im subdata-Modul")
 
-    def process_counter_topic(self, var: Dict[str, counter.Counter], msg: mqtt.MQTTMessage):
+    def process_counter_topic(self, var: Dict[str, counter.Counter], msg: mqtt.MQTTMessage,
+                              index: Optional[str] = None):
         """ Handler für die Zähler-Topics
 
         Parameter
@@ -828,10 +891,12 @@ class SubData:
             enthält aktuelle Daten
         msg :
             enthält Topic und Payload
+        index :
+            vom Router ermittelter Index, wird sonst aus dem Topic gelesen
         """
         try:
-            if re.search("/counter/[0-9]+/", msg.topic) is not None:
-                index = get_index(msg.topic)
+            if index is not None or re.search("/counter/[0-9]+/", msg.topic) is not None:
+                index = index or get_index(msg.topic)
                 if decode_payload(msg.payload) == "":
                     if "counter"+index in var:
                         var.pop("counter"+index)
@@ -849,6 +914,9 @@ class SubData:
                     self.set_json_payload_class(self.counter_all_data.data.config, msg)
                 elif re.search("/counter/get", msg.topic) is not None:
                     self.set_json_payload_class(self.counter_all_data.data.get, msg)
+                    # Index bei Änderung der Hierarchie erstellen, damit er mit den Daten kopiert wird und nicht in
+                    # jedem Zyklus neu erstellt werden muss.
+                    self.counter_all_data.get_hierarchy_index()
                 elif re.search("/counter/set/simulation", msg.topic) is not None:
                     self.counter_all_data.sim_counter.data = dataclass_from_dict(
                         SimCounterState,
@@ -1063,6 +1131,8 @@ class SubData:
                         MessageType.WARNING
                     )
                 self.set_json_payload(var["system"].data["security"], msg)
+            elif "openWB/system/perf/config" == msg.topic:
+                cycle_profiler.configure(decode_payload(msg.payload) or {})
             else:
                 if "module_update_completed" in msg.topic:
                     self.event_module_update_completed.set()
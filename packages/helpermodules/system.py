@@ -11,6 +11,7 @@ from typing import Optional
 
 from helpermodules import pub
 from control import data
+from helpermodules.measurement_logging.write_log import export_pending_json
 from helpermodules.utils import thread_handler
 from helpermodules.utils.run_command import run_command
 from modules.common.configurable_backup_cloud import ConfigurableBackupCloud
@@ -98,6 +99,7 @@ class System:
 
     def create_backup(self) -> str:
         try:
+            export_pending_json()
             result = run_command([str(self._get_parent_file() / "runs" / "backup.sh"), "1"], process_exception=False)
             file_name = result.rstrip('\n')
             return file_name
@@ -515,6 +515,7 @@ class UpdateConfig:
         "^openWB/system/installAssistantDone$",
         "^openWB/system/datastore_version",
         "^openWB/system/debug_level$",
+        "^openWB/system/perf/config$",
         "^openWB/system/device/[0-9]+/component/[0-9]+/config$",
         "^openWB/system/device/[0-9]+/component/[0-9]+/simulation$",
         "^openWB/system/device/[0-9]+/component/[0-9]+/simulation/power_present$",
@@ -654,6 +655,7 @@ class UpdateConfig:
         ("openWB/system/datastore_version", list(range(DATASTORE_VERSION))),
         ("openWB/system/usage_terms_acknowledged", False),
         ("openWB/system/debug_level", 30),
+        ("openWB/system/perf/config", {"active": False, "profile_cycles": 0, "profile_mode": "sampling"}),
         ("openWB/system/device/module_update_completed", True),
         ("openWB/system/hostname", "unknown"),
         ("openWB/system/ip_address", "unknown"),
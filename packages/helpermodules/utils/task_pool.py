@@ -0,0 +1,141 @@
+import bisect
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from helpermodules.cycle_profiler import cycle_profiler
+
+log = logging.getLogger(__name__)
+
+# Obergrenzen der Buckets in Sekunden
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10)
+
+
+@dataclass
+class Task:
+    # eindeutiger Name, zB device1, darf nicht erneut gestartet werden, solange die Aufgabe noch läuft
+    key: str
+    target: Callable
+    args: Tuple = ()
+
+
+class LatencyHistogram:
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, duration: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, duration)] += 1
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+
+    def __str__(self) -> str:
+        buckets = ", ".join(f"<={bound}s: {count}" for bound, count in zip(LATENCY_BUCKETS, self.counts) if count)
+        if self.counts[-1]:
+            buckets += f"{', ' if buckets else ''}>{LATENCY_BUCKETS[-1]}s: {self.counts[-1]}"
+        return (f"Anzahl {self.count}, Mittel {round(self.total / self.count, 3) if self.count else 0}s, "
+                f"Max {round(self.max, 3)}s ({buckets})")
+
+
+class TaskPool:
+    """ Führt Aufgaben in einem dauerhaft bestehenden Thread-Pool aus. Aufgaben, die beim Ablauf des Timeouts noch
+    laufen, werden bis zu ihrem Ende unter ihrem Namen vermerkt und bis dahin nicht erneut gestartet. Belegen solche
+    Aufgaben alle Threads, werden keine weiteren Aufgaben angenommen.
+    """
+
+    def __init__(self, name: str, max_workers: int) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._running: Dict[str, Future] = {}
+        self.latencies: Dict[str, LatencyHistogram] = {}
+
+    def run(self, tasks: Iterable[Task], timeout: Optional[float]) -> List[str]:
+        """ startet die Aufgaben und wartet, bis alle beendet sind oder der Timeout abgelaufen ist.
+
+        Return
+        ------
+        Namen der Aufgaben, die nicht gestartet wurden, weil sie noch aus einem vorherigen Aufruf laufen, oder die
+        nicht innerhalb des Timeouts beendet wurden.
+        """
+        not_finished = []
+        futures = self._submit(tasks, not_finished, log.error)
+        if futures:
+            _, pending = wait(futures, timeout)
+            for future in pending:
+                key = futures[future]
+                if future.cancel():
+                    log.error(f"{key} konnte nicht gestartet werden, da alle Threads belegt sind.")
+                else:
+                    log.error(f"{key} konnte nicht innerhalb des Timeouts abgearbeitet werden.")
+                not_finished.append(key)
+        return not_finished
+
+    def start(self, tasks: Iterable[Task]) -> List[str]:
+        """ startet die Aufgaben, ohne auf ihr Ende zu warten.
+
+        Return
+        ------
+        Namen der Aufgaben, die nicht gestartet wurden, weil sie noch aus einem vorherigen Aufruf laufen.
+        """
+        still_running: List[str] = []
+        self._submit(tasks, still_running, log.debug)
+        return still_running
+
+    def _submit(self, tasks: Iterable[Task], not_started: List[str], log_running: Callable) -> Dict[Future, str]:
+        futures: Dict[Future, str] = {}
+        with self._lock:
+            tasks = list(tasks)
+            busy = [key for key, future in self._running.items() if not future.done()]
+            if len(busy) >= self.max_workers:
+                log.error(f"Alle {self.max_workers} Threads von {self.name} sind durch noch laufende Aufgaben "
+                          f"belegt ({', '.join(busy)}), {', '.join(task.key for task in tasks)} werden nicht "
+                          "gestartet.")
+                not_started.extend(task.key for task in tasks)
+                return futures
+            if busy and len(busy) + len(tasks) > self.max_workers:
+                log.warning(f"{len(busy)} von {self.max_workers} Threads von {self.name} sind durch noch laufende "
+                            f"Aufgaben belegt ({', '.join(busy)}), neue Aufgaben müssen warten.")
+            for task in tasks:
+                running = self._running.get(task.key)
+                if running is not None and not running.done():
+                    log_running(f"{task.key} ist bereits aktiv und wird nicht erneut gestartet.")
+                    not_started.append(task.key)
+                    continue
+                future = self._executor.submit(self._run_task, task)
+                self._running[task.key] = future
+                futures[future] = task.key
+        return futures
+
+    def is_running(self, key: str) -> bool:
+        with self._lock:
+            running = self._running.get(key)
+            return running is not None and not running.done()
+
+    def _run_task(self, task: Task) -> None:
+        # Log-Meldungen sollen der Aufgabe und nicht dem Worker-Thread zugeordnet werden.
+        thread = threading.current_thread()
+        thread_name = thread.name
+        thread.name = task.key
+        start = time.monotonic()
+        try:
+            task.target(*task.args)
+        except Exception:
+            log.exception(f"Fehler in {task.key}")
+        finally:
+            thread.name = thread_name
+            duration = time.monotonic() - start
+            with self._lock:
+                self.latencies.setdefault(task.key, LatencyHistogram()).add(duration)
+            cycle_profiler.record(f"{self.name}/{task.key}", duration)
+
+    def latency_report(self) -> str:
+        with self._lock:
+            return "\n".join(f"{key}: {histogram}" for key, histogram in sorted(self.latencies.items()))
@@ -0,0 +1,120 @@
+import threading
+from threading import Event
+from unittest.mock import Mock
+
+from helpermodules.utils.task_pool import LatencyHistogram, Task, TaskPool
+
+
+def test_run_collects_results():
+    # setup
+    pool = TaskPool("test", max_workers=4)
+    targets = [Mock(), Mock(side_effect=Exception("Fehler"))]
+
+    # execution
+    not_finished = pool.run([Task(f"device{i}", target, (i,)) for i, target in enumerate(targets)], 1)
+
+    # evaluation
+    assert not_finished == []
+    targets[0].assert_called_once_with(0)
+    targets[1].assert_called_once_with(1)
+    assert pool.latencies["device0"].count == 1
+    assert pool.latencies["device1"].count == 1
+
+
+def test_run_timeout_and_still_running():
+    # setup
+    pool = TaskPool("test", max_workers=4)
+    release = Event()
+    quick = Mock()
+
+    # execution
+    first = pool.run([Task("device0", release.wait, (5,)), Task("device1", quick)], 0.1)
+    second = pool.run([Task("device0", quick)], 0.1)
+    release.set()
+
+    # evaluation
+    assert first == ["device0"]
+    assert second == ["device0"]
+    assert quick.call_count == 1
+
+
+def test_run_cancels_queued_tasks():
+    # setup
+    pool = TaskPool("test", max_workers=1)
+    release = Event()
+    queued = Mock()
+
+    # execution
+    not_finished = pool.run([Task("device0", release.wait, (5,)), Task("device1", queued)], 0.1)
+    release.set()
+    pool._running["device0"].result(1)
+    later = pool.run([Task("device1", queued)], 1)
+
+    # evaluation
+    assert sorted(not_finished) == ["device0", "device1"]
+    assert later == []
+    assert queued.call_count == 1
+
+
+def test_latency_histogram():
+    # setup
+    histogram = LatencyHistogram()
+
+    # execution
+    for duration in (0.05, 0.3, 0.3, 20):
+        histogram.add(duration)
+
+    # evaluation
+    assert histogram.counts == [1, 0, 2, 0, 0, 0, 0, 1]
+    assert str(histogram) == "Anzahl 4, Mittel 5.162s, Max 20s (<=0.1s: 1, <=0.5s: 2, >10s: 1)"
+
+
+def test_start_does_not_wait():
+    # setup
+    pool = TaskPool("test", max_workers=2)
+    release = Event()
+
+    # execution
+    first = pool.start([Task("device0", release.wait, (5,))])
+    second = pool.start([Task("device0", release.wait, (5,))])
+    running = pool.is_running("device0")
+    release.set()
+
+    # evaluation
+    assert first == []
+    assert second == ["device0"]
+    assert running is True
+
+
+def test_run_task_uses_key_as_thread_name():
+    # setup
+    pool = TaskPool("test", max_workers=1)
+    names = []
+
+    # execution
+    pool.run([Task("device0", lambda: names.append(threading.current_thread().name))], 1)
+    pool.run([Task("device1", lambda: names.append(threading.current_thread().name))], 1)
+    worker_name = pool._executor._threads.copy().pop().name
+
+    # evaluation
+    assert names == ["device0", "device1"]
+    assert worker_name.startswith("test")
+
+
+def test_refuses_tasks_if_all_threads_busy():
+    # setup
+    pool = TaskPool("test", max_workers=1)
+    release = Event()
+    quick = Mock()
+
+    # execution
+    started = pool.start([Task("device0", release.wait, (5,))])
+    refused = pool.run([Task("device1", quick)], 0.1)
+    release.set()
+    pool._running["device0"].result(1)
+    pool.run([Task("device0", quick)], 1)
+
+    # evaluation
+    assert started == []
+    assert refused == ["device1"]
+    assert quick.call_count == 1
@@ -0,0 +1,87 @@
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Die Anzahl der Topics ist durch die Konfiguration begrenzt, der Cache wird nur zur Sicherheit begrenzt.
+MAX_CACHED_TOPICS = 20000
+
+
+@dataclass(frozen=True)
+class TopicMatch:
+    handler: Callable
+    # Topic-Ebenen, die durch + abgedeckt wurden, zB die Indizes
+    wildcards: Tuple[str, ...] = field(default_factory=tuple)
+
+    @property
+    def index(self) -> str:
+        return self.wildcards[0]
+
+
+class _Node:
+    __slots__ = ("children", "plus", "hash_handler", "handler")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _Node] = {}
+        self.plus: Optional[_Node] = None
+        self.hash_handler: Optional[Callable] = None
+        self.handler: Optional[Callable] = None
+
+
+class TopicRouter:
+    """ Ordnet Topics über einen Präfix-Baum den registrierten Handlern zu. Die Filter verwenden die MQTT-Syntax
+    (+ für eine Ebene, # für alle folgenden Ebenen). Passen mehrere Filter, wird auf jeder Ebene eine exakte
+    Übereinstimmung vor + und + vor # bevorzugt, dh der spezifischere Filter gewinnt.
+    Da die selben Topics in jedem Zyklus erneut empfangen werden, wird das Ergebnis je Topic zwischengespeichert.
+    """
+
+    def __init__(self) -> None:
+        self._root = _Node()
+        self._cache: Dict[str, Optional[TopicMatch]] = {}
+
+    def register(self, topic_filter: str, handler: Callable) -> None:
+        self._cache.clear()
+        node = self._root
+        levels = topic_filter.split("/")
+        for i, level in enumerate(levels):
+            if level == "#":
+                if i != len(levels) - 1:
+                    raise ValueError(f"# muss die letzte Ebene des Filters {topic_filter} sein.")
+                node.hash_handler = handler
+                return
+            elif level == "+":
+                if node.plus is None:
+                    node.plus = _Node()
+                node = node.plus
+            else:
+                node = node.children.setdefault(level, _Node())
+        node.handler = handler
+
+    def match(self, topic: str) -> Optional[TopicMatch]:
+        try:
+            return self._cache[topic]
+        except KeyError:
+            pass
+        wildcards: List[str] = []
+        handler = self._match(self._root, topic.split("/"), 0, wildcards)
+        route = None if handler is None else TopicMatch(handler, tuple(wildcards))
+        if len(self._cache) >= MAX_CACHED_TOPICS:
+            self._cache.clear()
+        self._cache[topic] = route
+        return route
+
+    def _match(self, node: _Node, levels: List[str], pos: int, wildcards: List[str]) -> Optional[Callable]:
+        if pos == len(levels):
+            # "a/#" passt auch auf "a"
+            return node.handler or node.hash_handler
+        level = levels[pos]
+        child = node.children.get(level)
+        if child is not None:
+            handler = self._match(child, levels, pos + 1, wildcards)
+            if handler is not None:
+                return handler
+        if node.plus is not None:
+            wildcards.append(level)
+            handler = self._match(node.plus, levels, pos + 1, wildcards)
+            if handler is not None:
+                return handler
+            wildcards.pop()
+        return node.hash_handler
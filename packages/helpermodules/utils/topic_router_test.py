@@ -0,0 +1,60 @@
+import pytest
+
+from helpermodules.utils.topic_router import TopicRouter
+
+
+@pytest.fixture
+def router() -> TopicRouter:
+    router = TopicRouter()
+    router.register("openWB/vehicle/template/charge_template/+/#", "charge_template")
+    router.register("openWB/vehicle/+/#", "vehicle")
+    router.register("openWB/chargepoint/+/set/charge_template/#", "cp_charge_template")
+    router.register("openWB/chargepoint/+/#", "chargepoint")
+    router.register("openWB/io/action/#", "io_action")
+    router.register("openWB/command/command_completed", "command_completed")
+    return router
+
+
+@pytest.mark.parametrize(
+    "topic, expected_handler, expected_wildcards",
+    [
+        pytest.param("openWB/vehicle/template/charge_template/3", "charge_template", ["3"], id="template"),
+        pytest.param("openWB/vehicle/template/charge_template/3/chargemode/scheduled_charging/plans/1",
+                     "charge_template", ["3"], id="template subtopic"),
+        pytest.param("openWB/vehicle/template/charge_template", "vehicle", ["template"], id="without index"),
+        pytest.param("openWB/vehicle/2/get/soc", "vehicle", ["2"], id="vehicle"),
+        pytest.param("openWB/chargepoint/4/set/charge_template", "cp_charge_template", ["4"],
+                     id="more specific filter"),
+        pytest.param("openWB/chargepoint/4/get/power", "chargepoint", ["4"], id="chargepoint"),
+        pytest.param("openWB/io/action/1/config", "io_action", [], id="hash"),
+        pytest.param("openWB/io/action", "io_action", [], id="hash matches parent"),
+        pytest.param("openWB/command/command_completed", "command_completed", [], id="exact"),
+    ])
+def test_match(topic, expected_handler, expected_wildcards, router: TopicRouter):
+    # execution
+    route = router.match(topic)
+
+    # evaluation
+    assert route.handler == expected_handler
+    assert route.wildcards == tuple(expected_wildcards)
+
+
+@pytest.mark.parametrize("topic", ["openWB/vehicle", "openWB/command/command_completed/1", "openWB/pv/1/get/power"])
+def test_no_match(topic, router: TopicRouter):
+    assert router.match(topic) is None
+
+
+def test_hash_not_last_level():
+    with pytest.raises(ValueError):
+        TopicRouter().register("openWB/#/get", "invalid")
+
+
+def test_register_clears_cache(router: TopicRouter):
+    # setup
+    router.match("openWB/chargepoint/4/get/power")
+
+    # execution
+    router.register("openWB/chargepoint/+/get/power", "power")
+
+    # evaluation
+    assert router.match("openWB/chargepoint/4/get/power").handler == "power"
@@ -20,21 +20,23 @@ import time
 from threading import Event, Thread, enumerate
 import traceback
 from control.chargelog.chargelog import calc_energy_costs, calculate_charged_energy_by_source
+from control.chargelog.energy_cost_accumulator import energy_cost_accumulator
 
 from control import data, prepare, process
 from control.algorithm import algorithm
 from helpermodules import command, setdata, subdata, timecheck, update_config
 from helpermodules.changed_values_handler import ChangedValuesContext
+from helpermodules.cycle_profiler import cycle_profiler
 from helpermodules.mosquitto_dynsec.mosquitto_dynsec import check_roles_at_start
 from helpermodules.measurement_logging.update_yields import update_daily_yields, update_pv_monthly_yearly_yields
-from helpermodules.measurement_logging.write_log import LogType, save_log
+from helpermodules.measurement_logging.write_log import LogType, export_pending_json, save_log
 from helpermodules.modbusserver import start_modbus_server
-from helpermodules.pub import Pub
+from helpermodules.pub import Pub, PubBatchContext
 from modules import configuration, loadvars, update_soc
 from modules.internal_chargepoint_handler.internal_chargepoint_handler import GeneralInternalChargepointHandler
 from modules.internal_chargepoint_handler.gpio import InternalGpioHandler
 from modules.internal_chargepoint_handler.rfid import RfidReader
-from modules.utils import wait_for_module_update_completed
+from modules.utils import log_barrier_statistics, wait_for_module_update_completed
 from smarthome.smarthome import readmq, smarthome_handler
 
 
@@ -135,23 +137,35 @@ class HandlerAlgorithm:
         try:
             def handler_with_control_interval():
                 if (data.data.general_data.data.control_interval / 10) == self.interval_counter:
-                    data.data.copy_data()
-                    loadvars_.get_values()
-                    wait_for_module_update_completed(loadvars_.event_module_update_completed,
-                                                     "openWB/set/system/device/module_update_completed")
-                    data.data.copy_data()
-                    with ChangedValuesContext(loadvars_.event_module_update_completed):
-                        self.heartbeat = True
-                        if data.data.system_data["system"].data["perform_update"]:
-                            data.data.system_data["system"].perform_update()
-                            return
-                        elif data.data.system_data["system"].data["update_in_progress"]:
-                            log.info("Regelung pausiert, da ein Update durchgeführt wird.")
-                        event_global_data_initialized.set()
-                        prep.setup_algorithm()
-                        control.calc_current()
-                        proc.process_algorithm_results()
-                        data.data.graph_data.pub_graph_data()
+                    with cycle_profiler.cycle():
+                        with cycle_profiler.phase("copy_data"):
+                            data.data.copy_data()
+                        with cycle_profiler.phase("loadvars"):
+                            # Die Geräte veröffentlichen ihre Werte in den Threads des TaskPools, daher wird hier nicht
+                            # gepuffert.
+                            loadvars_.get_values()
+                        with cycle_profiler.phase("wait_module_update"):
+                            wait_for_module_update_completed(loadvars_.event_module_update_completed,
+                                                             "openWB/set/system/device/module_update_completed")
+                        with cycle_profiler.phase("copy_data_after_loadvars"):
+                            data.data.copy_data()
+                        with PubBatchContext(), ChangedValuesContext():
+                            self.heartbeat = True
+                            if data.data.system_data["system"].data["perform_update"]:
+                                data.data.system_data["system"].perform_update()
+                                return
+                            elif data.data.system_data["system"].data["update_in_progress"]:
+                                log.info("Regelung pausiert, da ein Update durchgeführt wird.")
+                            event_global_data_initialized.set()
+                            with cycle_profiler.phase("setup_algorithm"):
+                                prep.setup_algorithm()
+                            with cycle_profiler.phase("algorithm"):
+                                control.calc_current()
+                            with cycle_profiler.phase("process"):
+                                proc.process_algorithm_results()
+                            with cycle_profiler.phase("graph"):
+                                data.data.graph_data.pub_graph_data()
+                    log_barrier_statistics()
                     self.interval_counter = 1
                 else:
                     self.interval_counter = self.interval_counter + 1
@@ -179,8 +193,9 @@ class HandlerAlgorithm:
         ausführt, die nur alle 5 Minuten ausgeführt werden müssen.
         """
         try:
-            with ChangedValuesContext(loadvars_.event_module_update_completed):
+            with ChangedValuesContext():
                 totals = save_log(LogType.DAILY)
+                energy_cost_accumulator.update(totals)
                 update_daily_yields(totals)
                 update_pv_monthly_yearly_yields()
                 for cp in data.data.cp_data.values():
@@ -279,6 +294,8 @@ try:
     old_memory_usage = 0
     loadvars_ = loadvars.Loadvars()
     data.data_init(loadvars_.event_module_update_completed)
+    # Die Migrationen bearbeiten die JSON-Logs, daher vorher die noch nicht exportierten Einträge exportieren.
+    export_pending_json()
     update_config.UpdateConfig().update()
     configuration.pub_configurable()
 
@@ -1,9 +1,9 @@
 import logging
 
-from helpermodules.broker import BrokerClient
+from control import data
+from helpermodules.broker_cache import MAX_AGE_CONTROL_INTERVALS, topic_cache
 from helpermodules.pub import Pub
 from helpermodules.utils._get_default import get_default
-from helpermodules.utils.topic_parser import decode_payload
 from modules.chargepoints.mqtt.config import Mqtt
 from modules.common.abstract_chargepoint import AbstractChargepoint
 from modules.common.abstract_device import DeviceDescriptor
@@ -22,15 +22,7 @@ class ChargepointModule(AbstractChargepoint):
         self.store = get_chargepoint_value_store(self.config.id)
         self.fault_state = FaultState(ComponentInfo(self.config.id, "Ladepunkt", "chargepoint"))
 
-        def on_connect(client, userdata, flags, rc):
-            client.subscribe(f"openWB/mqtt/chargepoint/{self.config.id}/#")
-
-        def on_message(client, userdata, message):
-            received_topics.update({message.topic: decode_payload(message.payload)})
-
-        received_topics = {}
-        BrokerClient(f"subscribeMqttChargepointInit{self.config.id}",
-                     on_connect, on_message).start_finite_loop()
+        received_topics = topic_cache.get(f"openWB/mqtt/chargepoint/{self.config.id}/#")
         phases_to_use = received_topics.get(f"openWB/mqtt/chargepoint/{self.config.id}/set/phases_to_use")
 
         if phases_to_use == 0:
@@ -49,15 +41,8 @@ class ChargepointModule(AbstractChargepoint):
         def parse_received_topics(value: str):
             return received_topics.get(f"{topic_prefix}{value}", get_default(ChargepointState, value))
         with SingleComponentUpdateContext(self.fault_state):
-            def on_connect(client, userdata, flags, rc):
-                client.subscribe(f"openWB/mqtt/chargepoint/{self.config.id}/get/#")
-
-            def on_message(client, userdata, message):
-                received_topics.update({message.topic: decode_payload(message.payload)})
-
-            received_topics = {}
-            BrokerClient(f"subscribeMqttChargepoint{self.config.id}",
-                         on_connect, on_message).start_finite_loop()
+            max_age = MAX_AGE_CONTROL_INTERVALS * data.data.general_data.data.control_interval
+            received_topics = topic_cache.get(f"openWB/mqtt/chargepoint/{self.config.id}/get/#", max_age=max_age)
 
             if received_topics:
                 log.debug(f"Empfange MQTT Daten für Ladepunkt {self.config.id}: {received_topics}")
@@ -94,9 +79,9 @@ class ChargepointModule(AbstractChargepoint):
                 except KeyError:
                     raise KeyError("Es wurden nicht alle notwendigen Daten empfangen.")
             else:
-                self.fault_state.warning(f"Keine MQTT-Daten für Ladepunkt {self.config.name} empfangen oder es werden "
-                                         "veraltete, abwärtskompatible Topics verwendet. Bitte die Doku in den "
-                                         "Einstellungen beachten.")
+                raise Exception(f"Keine MQTT-Daten für Ladepunkt {self.config.name} in den letzten {max_age}s "
+                                "empfangen oder es werden veraltete, abwärtskompatible Topics verwendet. Bitte die "
+                                "Doku in den Einstellungen beachten.")
 
     def switch_phases(self, phases_to_use: int) -> None:
         Pub().pub(f"openWB/mqtt/chargepoint/{self.config.id}/set/phases_to_use", phases_to_use)
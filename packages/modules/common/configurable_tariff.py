@@ -10,6 +10,8 @@ from modules.common.component_context import SingleComponentUpdateContext
 from modules.common.component_state import TariffState
 from modules.common.component_type import ComponentType
 from modules.common.fault_state import ComponentInfo, FaultState
+from modules.common import tariff_cache
+from modules.common.tariff_cache import TariffCache
 from control.optional_data import OptionalData, PricingGet
 
 
@@ -42,23 +44,56 @@ class ConfigurableTariff(Generic[T_TARIFF_CONFIG]):
         self.fault_state.store_error()
         with SingleComponentUpdateContext(self.fault_state):
             self._component_updater = component_initializer(config)
+        self._cache = TariffCache(tariff_cache.CACHE_PATH / f"{tariff_type}.json", config)
+        if hasattr(self, "_component_updater"):
+            self.__restore_cached_prices()
+
+    def __restore_cached_prices(self) -> None:
+        """ veröffentlicht nach einem Neustart die gespeicherten Preise, solange sie gültig sind. Der Anbieter wird
+        erst zum gespeicherten Zeitpunkt des nächsten Abrufs wieder abgefragt."""
+        now = timecheck.create_timestamp()
+        prices = self._cache.get_valid_prices(now)
+        if len(prices) == 0:
+            return
+        log.debug(f"Gespeicherte {self.tariff_type} Preise mit {len(prices)} Einträgen werden verwendet.")
+        self.__store_and_publish_updated_data(TariffState(prices=prices))
+        if self._cache.next_query_time is not None and self._cache.next_query_time > now:
+            self.get.next_query_time = self._cache.next_query_time
+            Pub().pub(f"openWB/set/optional/ep/{self.tariff_type}/get/next_query_time", self.get.next_query_time)
 
     def update(self) -> None:
         if hasattr(self, "_component_updater"):
             if self.get.next_query_time is None or self.get.next_query_time <= timecheck.create_timestamp():
                 log.debug(f"Tarifaktualisierung für {self.tariff_type}")
                 try:
+                    updated = False
                     with SingleComponentUpdateContext(self.fault_state):
                         tariff_state, timeslot_length_seconds = self.__update_et_provider_data()
                         self.__store_and_publish_updated_data(tariff_state)
+                        self._cache.save(tariff_state.prices, self.get.next_query_time)
                         self.__log_and_publish_progress(timeslot_length_seconds, tariff_state)
+                        updated = True
+                    if updated is False:
+                        # Der Fehler wurde bereits im Fehlerstatus gespeichert, die gespeicherten Preise bleiben
+                        # bis zum nächsten Abruf gültig.
+                        self.__schedule_retry()
                 except Exception as e:
                     log.exception(f"Fehler beim Aktualisieren der Tarifdaten {e}")
-                    self.fault_state.warning("Error updating tariff data, retry in 5 minutes")
+                    retry_delay = self.__schedule_retry()
+                    self.fault_state.warning(
+                        f"Error updating tariff data, retry in {math.ceil(retry_delay / 60)} minutes")
             else:
                 log.info(f"nächste Tarifaktualisierung für {self.tariff_type}" +
                          f" um {datetime.fromtimestamp(self.get.next_query_time)}")
 
+    def __schedule_retry(self) -> int:
+        retry_delay = self._cache.get_retry_delay()
+        self.get.next_query_time = timecheck.create_timestamp() + retry_delay
+        log.info(f"Abruf der {self.tariff_type} Strompreise fehlgeschlagen, nächster Versuch um "
+                 f"{datetime.fromtimestamp(self.get.next_query_time)}")
+        Pub().pub(f"openWB/set/optional/ep/{self.tariff_type}/get/next_query_time", self.get.next_query_time)
+        return retry_delay
+
     def __update_et_provider_data(self) -> tuple[TariffState, int]:
         tariff_state = self.__call_component_updater()
         timeslot_length_seconds = self.__calculate_price_timeslot_length(tariff_state)
@@ -99,6 +134,8 @@ class ConfigurableTariff(Generic[T_TARIFF_CONFIG]):
     def __call_component_updater(self) -> TariffState:
         last_known_timestamp = datetime.fromtimestamp(max((int(ts) for ts in self.get.prices.keys()), default=0))
         tariff_state = self._component_updater()
+        if tariff_state.prices is not None:
+            tariff_state.prices = self._cache.merge(tariff_state.prices)
         latest_price_timestamp = datetime.fromtimestamp(max((int(ts) for ts in tariff_state.prices.keys()), default=0))
         if last_known_timestamp < latest_price_timestamp:
             self._calculate_next_query_time(latest_price_timestamp)
@@ -0,0 +1,234 @@
+"""Gemeinsamer Verbindungspool für HTTP-Abfragen.
+
+Alle Sessions aus req.get_http_session verwenden denselben Adapter. Die Verbindungen werden je Host im Pool gehalten
+(Keep-Alive) und über die Regelzyklen hinweg wiederverwendet, sodass nicht bei jeder Abfrage eine neue TCP- bzw.
+TLS-Verbindung aufgebaut wird. Header, Cookies und Zugangsdaten bleiben in der jeweiligen Session. Anfragen mit
+verify=False verwenden einen eigenen Pool: requests vor 2.32 übernimmt sonst die abgeschaltete Zertifikatsprüfung für
+alle weiteren Anfragen an denselben Host (CVE-2024-35195).
+
+GET-Antworten, die der Server mit ETag, Last-Modified oder Cache-Control versieht, werden zwischengespeichert. Solange
+eine Antwort laut Cache-Control gültig ist, wird sie ohne Abfrage ausgeliefert. Danach wird mit If-None-Match bzw.
+If-Modified-Since nachgefragt und bei 304 die gespeicherte Antwort verwendet.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from requests import PreparedRequest, Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from helpermodules.utils.task_pool import LatencyHistogram
+
+log = logging.getLogger(__name__)
+
+# Anzahl der Hosts, für die Verbindungen gehalten werden
+POOL_CONNECTIONS = 50
+# Anzahl der Verbindungen, die je Host für die Wiederverwendung gehalten werden
+POOL_MAXSIZE = 10
+CACHE_SIZE = 128
+# größere Antworten werden nicht zwischengespeichert
+MAX_CACHED_CONTENT = 1024 * 1024
+# Enthält die Anfrage einen dieser Header, prüft der Aufrufer selbst auf Änderungen und der Cache wird umgangen.
+CONDITIONAL_HEADERS = ("If-None-Match", "If-Modified-Since")
+
+
+@dataclass
+class CacheEntry:
+    status_code: int
+    reason: str
+    headers: CaseInsensitiveDict
+    content: bytes
+    # Zeitpunkt (time.monotonic), bis zu dem die Antwort ohne Nachfrage verwendet werden darf
+    expires: float
+
+
+@dataclass
+class HostStatistics:
+    # Anfragen, die an den Server gesendet wurden
+    requests: int = 0
+    # Antworten aus dem Cache ohne Anfrage an den Server
+    cache_hits: int = 0
+    # Antworten 304, für die die gespeicherte Antwort verwendet wurde
+    not_modified: int = 0
+    latencies: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def __str__(self) -> str:
+        return (f"Anfragen {self.requests}, aus Cache {self.cache_hits}, unverändert {self.not_modified}, "
+                f"Laufzeit: {self.latencies}")
+
+
+def _parse_cache_control(headers) -> Dict[str, Optional[str]]:
+    directives: Dict[str, Optional[str]] = {}
+    for directive in headers.get("Cache-Control", "").split(","):
+        name, _, value = directive.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') or None
+    return directives
+
+
+def _get_max_age(directives: Dict[str, Optional[str]], headers) -> float:
+    if "no-cache" in directives:
+        return 0
+    try:
+        return max(float(directives["max-age"]) - float(headers.get("Age", 0)), 0)
+    except (KeyError, TypeError, ValueError):
+        return 0
+
+
+def _get_host(url: str) -> str:
+    parts = urlsplit(url)
+    # ohne Zugangsdaten, damit diese nicht im Log erscheinen
+    return f"{parts.hostname}:{parts.port}" if parts.port else str(parts.hostname)
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    def __init__(self,
+                 pool_connections: int = POOL_CONNECTIONS,
+                 pool_maxsize: int = POOL_MAXSIZE,
+                 cache_size: int = CACHE_SIZE) -> None:
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        # Verbindungen ohne Zertifikatsprüfung dürfen nicht für Anfragen mit Prüfung wiederverwendet werden.
+        self._unverified = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple, CacheEntry]" = OrderedDict()
+        self._statistics: Dict[str, HostStatistics] = {}
+        self._lock = threading.Lock()
+
+    def send(self, request: PreparedRequest, stream: bool = False, **kwargs) -> Response:
+        host = _get_host(request.url)
+        verify = kwargs.get("verify", True)
+        key = self._get_cache_key(request, stream, verify)
+        entry = self._get_cache_entry(key)
+        if entry is not None:
+            if entry.expires > time.monotonic():
+                with self._lock:
+                    self._get_statistics(host).cache_hits += 1
+                return self._build_cached_response(entry, request)
+            if "ETag" in entry.headers:
+                request.headers["If-None-Match"] = entry.headers["ETag"]
+            if "Last-Modified" in entry.headers:
+                request.headers["If-Modified-Since"] = entry.headers["Last-Modified"]
+        start = time.monotonic()
+        try:
+            if verify is False:
+                response = self._unverified.send(request, stream=stream, **kwargs)
+            else:
+                response = super().send(request, stream=stream, **kwargs)
+        finally:
+            with self._lock:
+                statistics = self._get_statistics(host)
+                statistics.requests += 1
+                statistics.latencies.add(time.monotonic() - start)
+        if key is None:
+            return response
+        if entry is not None and response.status_code == 304:
+            # leeren Inhalt lesen, damit die Verbindung für die Wiederverwendung freigegeben wird
+            response.content
+            max_age = _get_max_age(_parse_cache_control(response.headers), response.headers)
+            with self._lock:
+                entry.headers.update(response.headers)
+                entry.expires = time.monotonic() + max_age
+                self._get_statistics(host).not_modified += 1
+            return self._build_cached_response(entry, request)
+        self._store(key, response)
+        return response
+
+    def close(self) -> None:
+        """ Der Adapter wird von allen Sessions gemeinsam verwendet. Schließt eine Session, bleiben die Verbindungen
+        für die übrigen Sessions bestehen."""
+        pass
+
+    def close_all(self) -> None:
+        super().close()
+        self._unverified.close()
+        with self._lock:
+            self._cache.clear()
+
+    def statistics(self) -> Dict[str, HostStatistics]:
+        with self._lock:
+            return dict(self._statistics)
+
+    def connections(self) -> Dict[str, int]:
+        """ Anzahl der je Host aufgebauten Verbindungen"""
+        connections: Dict[str, int] = {}
+        for poolmanager in (self.poolmanager, self._unverified.poolmanager):
+            for pool_key in list(poolmanager.pools.keys()):
+                pool = poolmanager.pools.get(pool_key)
+                if pool is not None:
+                    host = f"{pool.host}:{pool.port}"
+                    connections[host] = connections.get(host, 0) + pool.num_connections
+        return connections
+
+    def statistics_report(self) -> str:
+        return "\n".join(f"{host}: {statistics}" for host, statistics in sorted(self.statistics().items()))
+
+    def _get_statistics(self, host: str) -> HostStatistics:
+        statistics = self._statistics.get(host)
+        if statistics is None:
+            statistics = self._statistics[host] = HostStatistics()
+        return statistics
+
+    @staticmethod
+    def _get_cache_key(request: PreparedRequest, stream: bool,
+                       verify: Union[bool, str]) -> Optional[Tuple]:
+        if request.method != "GET" or stream or request.body is not None:
+            return None
+        if any(header in request.headers for header in CONDITIONAL_HEADERS):
+            return None
+        request_directives = _parse_cache_control(request.headers)
+        if "no-store" in request_directives or "no-cache" in request_directives:
+            return None
+        # Zugangsdaten und Cookies sind in den Headern enthalten, Antworten werden daher nur für identische Anfragen
+        # verwendet. Ohne Zertifikatsprüfung empfangene Antworten werden nicht für Anfragen mit Prüfung verwendet.
+        headers = tuple(sorted((name.lower(), value) for name, value in request.headers.items()))
+        return (request.url, verify is False, headers)
+
+    def _get_cache_entry(self, key: Optional[Tuple]) -> Optional[CacheEntry]:
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+            return entry
+
+    def _store(self, key: Tuple, response: Response) -> None:
+        if response.status_code != 200:
+            return
+        directives = _parse_cache_control(response.headers)
+        max_age = _get_max_age(directives, response.headers)
+        if ("no-store" in directives or response.headers.get("Vary") == "*" or
+                (max_age == 0 and "ETag" not in response.headers and "Last-Modified" not in response.headers)):
+            return
+        content = response.content
+        if len(content) > MAX_CACHED_CONTENT:
+            return
+        entry = CacheEntry(response.status_code, response.reason, CaseInsensitiveDict(response.headers), content,
+                           time.monotonic() + max_age)
+        with self._lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _build_cached_response(self, entry: CacheEntry, request: PreparedRequest) -> Response:
+        response = Response()
+        response.status_code = entry.status_code
+        response.reason = entry.reason
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = entry.content
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+
+http_adapter = PooledHTTPAdapter()
@@ -0,0 +1,127 @@
+import socket
+from threading import Thread
+from typing import Dict, Iterator, List, Tuple
+
+import pytest
+
+from modules.common import req
+from modules.common.http_connection_pool import PooledHTTPAdapter
+
+
+class StandInServer:
+    """ einfacher HTTP/1.1-Server mit Keep-Alive, der die Verbindungen und Anfragen zählt (http.server ist in den
+    Tests der Module nicht verfügbar, da socketserver in conftest.py ersetzt wird)"""
+
+    def __init__(self) -> None:
+        self.connections = 0
+        self.requests: List[Dict[str, str]] = []
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen()
+        self.url = f"http://127.0.0.1:{self.sock.getsockname()[1]}"
+        Thread(target=self._accept, daemon=True).start()
+
+    def close(self) -> None:
+        self.sock.close()
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                connection, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def _serve(self, connection: socket.socket) -> None:
+        with connection, connection.makefile("rb") as reader:
+            while True:
+                request_line = reader.readline().decode()
+                if not request_line:
+                    return
+                headers = {}
+                for line in iter(lambda: reader.readline().decode().strip(), ""):
+                    name, _, value = line.partition(":")
+                    headers[name.strip()] = value.strip()
+                self.requests.append(headers)
+                status, body, response_headers = self._respond(request_line.split()[1], headers)
+                response = f"HTTP/1.1 {status} OK\r\nContent-Length: {len(body)}\r\n"
+                response += "".join(f"{name}: {value}\r\n" for name, value in response_headers.items())
+                connection.sendall(response.encode() + b"\r\n" + body)
+
+    @staticmethod
+    def _respond(path: str, headers: Dict[str, str]) -> Tuple[int, bytes, Dict[str, str]]:
+        if path == "/etag":
+            if headers.get("If-None-Match") == '"v1"':
+                return 304, b"", {"ETag": '"v1"'}
+            return 200, b'{"power": 1000}', {"ETag": '"v1"'}
+        if path == "/max-age":
+            return 200, b'{"power": 1000}', {"Cache-Control": "max-age=60"}
+        return 200, b'{"power": 1000}', {}
+
+
+@pytest.fixture
+def server() -> Iterator[StandInServer]:
+    server = StandInServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def adapter(monkeypatch) -> PooledHTTPAdapter:
+    adapter = PooledHTTPAdapter()
+    monkeypatch.setattr(req, "http_adapter", adapter)
+    return adapter
+
+
+def test_sessions_share_connections(server: StandInServer, adapter: PooledHTTPAdapter):
+    # execution
+    for _ in range(5):
+        with req.get_http_session() as session:
+            session.get(f"{server.url}/plain")
+
+    # evaluation
+    assert server.connections == 1
+    host = server.url.replace("http://", "")
+    assert adapter.connections() == {host: 1}
+    assert adapter.statistics()[host].requests == 5
+    assert adapter.statistics()[host].cache_hits == 0
+
+
+def test_etag_revalidated(server: StandInServer, adapter: PooledHTTPAdapter):
+    # execution
+    first = req.get_http_session().get(f"{server.url}/etag")
+    second = req.get_http_session().get(f"{server.url}/etag")
+
+    # evaluation
+    assert server.requests[1]["If-None-Match"] == '"v1"'
+    assert second.status_code == 200
+    assert second.json() == first.json() == {"power": 1000}
+    assert adapter.statistics()[server.url.replace("http://", "")].not_modified == 1
+
+
+def test_fresh_response_served_from_cache(server: StandInServer, adapter: PooledHTTPAdapter):
+    # execution
+    first = req.get_http_session().get(f"{server.url}/max-age")
+    second = req.get_http_session().get(f"{server.url}/max-age")
+    other_credentials = req.get_http_session().get(f"{server.url}/max-age", auth=("user", "password"))
+
+    # evaluation
+    assert len(server.requests) == 2
+    assert second.json() == first.json()
+    assert other_credentials.status_code == 200
+    assert adapter.statistics()[server.url.replace("http://", "")].cache_hits == 1
+
+
+def test_unverified_requests_use_own_pool(server: StandInServer, adapter: PooledHTTPAdapter):
+    # execution
+    req.get_http_session().get(f"{server.url}/max-age", verify=False)
+    verified = req.get_http_session().get(f"{server.url}/max-age")
+    req.get_http_session().get(f"{server.url}/plain", verify=False)
+
+    # evaluation
+    assert server.connections == 2
+    assert adapter.connections() == {server.url.replace("http://", ""): 2}
+    # die ohne Zertifikatsprüfung empfangene Antwort wird nicht aus dem Cache geliefert
+    assert len(server.requests) == 3
+    assert verified.status_code == 200
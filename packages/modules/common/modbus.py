@@ -2,8 +2,10 @@
 """Modul für einfache Modbus-Operationen.
 
 Das Modul baut eine Modbus-TCP-Verbindung auf. Es gibt verschiedene Funktionen, um die gelesenen Register zu
-formatieren.
+formatieren. Modbus-TCP-Verbindungen werden über den Verbindungs-Pool gemeinsam genutzt und bleiben über die
+Regelzyklen hinweg bestehen.
 """
+from contextlib import contextmanager
 import logging
 import struct
 from enum import Enum
@@ -14,9 +16,12 @@ import pymodbus
 from pymodbus.client.sync import ModbusTcpClient, ModbusUdpClient, ModbusSerialClient
 from pymodbus.constants import Endian
 from pymodbus.payload import BinaryPayloadBuilder, BinaryPayloadDecoder
+from pymodbus.pdu import ExceptionResponse
 from pymodbus.transaction import ModbusSocketFramer
 from urllib3.util import parse_url
 
+from modules.common.modbus_connection_pool import PooledConnection, connection_pool
+
 log = logging.getLogger(__name__)
 
 
@@ -48,39 +53,82 @@ NO_VALUES = ("TCP-Client {}:{} konnte keinen Wert abfragen. Falls vorhanden, par
              "beenden und bei anhaltender Fehlermeldung Zähler neu starten.")
 
 
+class ModbusExceptionResponse(Exception):
+    """ Das Gerät hat die Abfrage mit einer Modbus-Fehlerantwort abgelehnt, zB wegen einer ungültigen Adresse."""
+
+
+def _raise_error_response(response) -> None:
+    if isinstance(response, ExceptionResponse):
+        raise ModbusExceptionResponse(__name__+" "+str(response))
+    raise Exception(__name__+" "+str(response))
+
+
 class ModbusClient:
     def __init__(self,
                  delegate: Union[ModbusSerialClient, ModbusTcpClient, ModbusUdpClient],
                  address: str, port: int = 502,
-                 sleep_after_connect: Optional[int] = 0):
+                 sleep_after_connect: Optional[int] = 0,
+                 connection: Optional[PooledConnection] = None):
         self._delegate = delegate
         self.address = address
         self.port = port
         self.sleep_after_connect = sleep_after_connect
+        self._connection = connection
 
     def __enter__(self):
         try:
-            self._delegate.__enter__()
-            time.sleep(self.sleep_after_connect)
+            if self._connection is None:
+                self._delegate.__enter__()
+                time.sleep(self.sleep_after_connect)
+            else:
+                # Die Verbindung bleibt für die Dauer des Kontexts exklusiv für diesen Client reserviert.
+                self._connection.lock.acquire()
+                try:
+                    self.connect()
+                except Exception:
+                    self._connection.lock.release()
+                    raise
         except pymodbus.exceptions.ConnectionException as e:
             e.args += (NO_CONNECTION.format(self.address, self.port),)
             raise e
         return self
 
     def __exit__(self, exc_type, exc_value, exc_traceback):
-        self._delegate.__exit__(exc_type, exc_value, exc_traceback)
+        if self._connection is None:
+            self._delegate.__exit__(exc_type, exc_value, exc_traceback)
+        else:
+            # Die Verbindung wird nicht geschlossen, sondern im nächsten Zyklus weiterverwendet.
+            self._connection.touch()
+            self._connection.lock.release()
+            connection_pool.close_idle()
 
     def connect(self) -> None:
-        self._delegate.connect()
-        time.sleep(self.sleep_after_connect)
+        if self._connection is None:
+            self._delegate.connect()
+            time.sleep(self.sleep_after_connect)
+        elif self._connection.connect():
+            time.sleep(self.sleep_after_connect)
 
     def close(self) -> None:
         try:
             log.debug("Close Modbus TCP connection")
-            self._delegate.close()
+            if self._connection is None:
+                self._delegate.close()
+            else:
+                self._connection.close()
         except Exception as e:
             raise Exception(__name__+" "+str(type(e))+" " + str(e)) from e
 
+    @contextmanager
+    def _locked(self):
+        if self._connection is None:
+            yield
+        else:
+            with self._connection.lock:
+                # Auch Clients, die ohne Kontext verwendet werden, halten die Verbindung bei jeder Abfrage offen.
+                self._connection.touch()
+                yield
+
     def is_socket_open(self) -> bool:
         return self._delegate.is_socket_open()
 
@@ -90,37 +138,40 @@ class ModbusClient:
                          byteorder: Endian = Endian.Big,
                          wordorder: Endian = Endian.Big,
                          **kwargs):
-        if self.is_socket_open() is False:
-            self.connect()
-        try:
-            multi_request = isinstance(types, Iterable)
-            if not multi_request:
-                types = [types]
-
-            def divide_rounding_up(numerator: int, denominator: int):
-                return -(-numerator // denominator)
-
-            number_of_addresses = sum(divide_rounding_up(
-                t.bits, _MODBUS_HOLDING_REGISTER_SIZE) for t in types)
-            response = read_register_method(
-                address, number_of_addresses, **kwargs)
-            if response.isError():
-                raise Exception(__name__+" "+str(response))
-            decoder = BinaryPayloadDecoder.fromRegisters(response.registers, byteorder, wordorder)
-            result = [struct.unpack(">e", struct.pack(">H", decoder.decode_16bit_uint())) if t ==
-                      ModbusDataType.FLOAT_16 else getattr(decoder, t.decoding_method)() for t in types]
-            return result if multi_request else result[0]
-        except pymodbus.exceptions.ConnectionException as e:
-            self.close()
-            e.args += (NO_CONNECTION.format(self.address, self.port),)
-            raise e
-        except pymodbus.exceptions.ModbusIOException as e:
-            self.close()
-            e.args += (NO_VALUES.format(self.address, self.port),)
-            raise e
-        except Exception as e:
-            self.close()
-            raise Exception(__name__+" "+str(type(e))+" " + str(e)) from e
+        with self._locked():
+            try:
+                if self.is_socket_open() is False:
+                    self.connect()
+                multi_request = isinstance(types, Iterable)
+                if not multi_request:
+                    types = [types]
+
+                def divide_rounding_up(numerator: int, denominator: int):
+                    return -(-numerator // denominator)
+
+                number_of_addresses = sum(divide_rounding_up(
+                    t.bits, _MODBUS_HOLDING_REGISTER_SIZE) for t in types)
+                response = read_register_method(
+                    address, number_of_addresses, **kwargs)
+                if response.isError():
+                    _raise_error_response(response)
+                decoder = BinaryPayloadDecoder.fromRegisters(response.registers, byteorder, wordorder)
+                result = [struct.unpack(">e", struct.pack(">H", decoder.decode_16bit_uint())) if t ==
+                          ModbusDataType.FLOAT_16 else getattr(decoder, t.decoding_method)() for t in types]
+                return result if multi_request else result[0]
+            except pymodbus.exceptions.ConnectionException as e:
+                self.close()
+                e.args += (NO_CONNECTION.format(self.address, self.port),)
+                raise e
+            except pymodbus.exceptions.ModbusIOException as e:
+                self.close()
+                e.args += (NO_VALUES.format(self.address, self.port),)
+                raise e
+            except ModbusExceptionResponse:
+                raise
+            except Exception as e:
+                # Fehlerantworten des Geräts und Fehler beim Dekodieren erfordern keinen neuen Verbindungsaufbau.
+                raise Exception(__name__+" "+str(type(e))+" " + str(e)) from e
 
     @overload
     def read_holding_registers(self, address: int, types: Iterable[ModbusDataType], byteorder: Endian = Endian.Big,
@@ -176,7 +227,8 @@ class ModbusClient:
 
     def read_coils(self, address: int, count: int, **kwargs):
         try:
-            response = self._delegate.read_coils(address, count, **kwargs)
+            with self._locked():
+                response = self._delegate.read_coils(address, count, **kwargs)
             if response.isError():
                 raise Exception(__name__+" "+str(response))
             return response.bits[0] if count == 1 else response.bits[:count]
@@ -211,16 +263,18 @@ class ModbusClient:
                                                     ModbusDataType.FLOAT_32,
                                                     ModbusDataType.FLOAT_64]:
                 registers = self._build_binary_payload(value, data_type, byteorder, wordorder)
-                self._delegate.write_registers(address, registers, **kwargs)
             else:
                 # Einfache 16-bit oder kleinere Werte können direkt geschrieben werden
-                self._delegate.write_registers(address, [value], **kwargs)
+                registers = [value]
         else:
             # Fallback für bestehenden Code ohne data_type
-            self._delegate.write_registers(address, value, **kwargs)
+            registers = value
+        with self._locked():
+            self._delegate.write_registers(address, registers, **kwargs)
 
     def write_single_coil(self, address: int, value: Any, **kwargs):
-        self._delegate.write_coil(address, value, **kwargs)
+        with self._locked():
+            self._delegate.write_coil(address, value, **kwargs)
 
     def __read_bulk(self,
                     read_register_method: Callable,
@@ -232,36 +286,39 @@ class ModbusClient:
         Liest einen Registerbereich und gibt ein dict mit reg als Key und dekodiertem Wert als Value zurück.
         mapping: Liste von Tupeln (reg, ModbusDataType)
         """
-        if self.is_socket_open() is False:
-            self.connect()
-        try:
-            response = read_register_method(start_address, count, **kwargs)
-            if response.isError():
-                raise Exception(__name__+" "+str(response))
-            decoder = BinaryPayloadDecoder.fromRegisters(response.registers, byteorder, wordorder)
-            results = {}
-            for register_address, data_type in mapping:
-                multiple_register_requested = isinstance(data_type, Iterable)
-                if not multiple_register_requested:
-                    data_type = [data_type]
-                offset = register_address - start_address
-                decoder.reset()
-                decoder.skip_bytes(offset * 2)
-                val = [struct.unpack(">e", struct.pack(">H", decoder.decode_16bit_uint())) if t ==
-                       ModbusDataType.FLOAT_16 else getattr(decoder, t.decoding_method)() for t in data_type]
-                results[register_address] = val if multiple_register_requested else val[0]
-            return results
-        except pymodbus.exceptions.ConnectionException as e:
-            self.close()
-            e.args += (NO_CONNECTION.format(self.address, self.port),)
-            raise e
-        except pymodbus.exceptions.ModbusIOException as e:
-            self.close()
-            e.args += (NO_VALUES.format(self.address, self.port),)
-            raise e
-        except Exception as e:
-            self.close()
-            raise Exception(__name__+" "+str(type(e))+" " + str(e)) from e
+        with self._locked():
+            try:
+                if self.is_socket_open() is False:
+                    self.connect()
+                response = read_register_method(start_address, count, **kwargs)
+                if response.isError():
+                    _raise_error_response(response)
+                decoder = BinaryPayloadDecoder.fromRegisters(response.registers, byteorder, wordorder)
+                results = {}
+                for register_address, data_type in mapping:
+                    multiple_register_requested = isinstance(data_type, Iterable)
+                    if not multiple_register_requested:
+                        data_type = [data_type]
+                    offset = register_address - start_address
+                    decoder.reset()
+                    decoder.skip_bytes(offset * 2)
+                    val = [struct.unpack(">e", struct.pack(">H", decoder.decode_16bit_uint())) if t ==
+                           ModbusDataType.FLOAT_16 else getattr(decoder, t.decoding_method)() for t in data_type]
+                    results[register_address] = val if multiple_register_requested else val[0]
+                return results
+            except pymodbus.exceptions.ConnectionException as e:
+                self.close()
+                e.args += (NO_CONNECTION.format(self.address, self.port),)
+                raise e
+            except pymodbus.exceptions.ModbusIOException as e:
+                self.close()
+                e.args += (NO_VALUES.format(self.address, self.port),)
+                raise e
+            except ModbusExceptionResponse:
+                raise
+            except Exception as e:
+                # Fehlerantworten des Geräts und Fehler beim Dekodieren erfordern keinen neuen Verbindungsaufbau.
+                raise Exception(__name__+" "+str(type(e))+" " + str(e)) from e
 
     def read_input_registers_bulk(self,
                                   start_address: int,
@@ -305,7 +362,8 @@ class ModbusTcpClient_(ModbusClient):
         host = parsed_url.host
         if parsed_url.port is not None:
             port = parsed_url.port
-        super().__init__(ModbusTcpClient(host, port, framer, **kwargs), address, port, sleep_after_connect)
+        connection = connection_pool.get(host, port, framer, **kwargs)
+        super().__init__(connection.delegate, address, port, sleep_after_connect, connection)
 
 
 class ModbusUdpClient_(ModbusClient):
@@ -0,0 +1,127 @@
+"""Pool für Modbus-TCP-Verbindungen.
+
+Die Verbindung zu einem Modbus-TCP-Server bleibt über die Regelzyklen hinweg bestehen und wird von allen Clients,
+die denselben Server (zB ein Gateway mit mehreren Geräten) abfragen, gemeinsam genutzt. Die Modbus-ID wird wie
+bisher bei jeder Abfrage übergeben. Der Zugriff auf eine Verbindung wird über ein Lock serialisiert, da die Geräte
+in eigenen Threads abgefragt werden.
+"""
+import logging
+import socket
+import threading
+import time
+from typing import Dict, Hashable, Tuple
+
+from pymodbus.client.sync import ModbusTcpClient
+from pymodbus.exceptions import ConnectionException
+from pymodbus.transaction import ModbusSocketFramer
+
+log = logging.getLogger(__name__)
+
+# Unbenutzte Verbindungen werden nach dieser Zeit geschlossen, damit der Server die Verbindung für andere Clients
+# freigibt.
+IDLE_TIMEOUT = 120
+RECONNECT_BACKOFF_MIN = 1
+RECONNECT_BACKOFF_MAX = 60
+KEEPALIVE_IDLE = 30
+KEEPALIVE_INTERVAL = 10
+KEEPALIVE_COUNT = 3
+
+
+def _enable_keepalive(sock: socket.socket) -> None:
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, KEEPALIVE_IDLE)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, KEEPALIVE_INTERVAL)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, KEEPALIVE_COUNT)
+    except OSError:
+        log.debug("TCP-Keepalive konnte nicht aktiviert werden.", exc_info=True)
+
+
+class PooledConnection:
+    def __init__(self, delegate: ModbusTcpClient) -> None:
+        self.delegate = delegate
+        self.lock = threading.RLock()
+        self.last_used = time.time()
+        self.failed_connects = 0
+        self.next_connect = 0.0
+
+    def connect(self) -> bool:
+        """ baut die Verbindung auf, falls sie nicht besteht. Schlägt der Verbindungsaufbau fehl, wird der nächste
+        Versuch mit wachsendem Abstand zugelassen.
+
+        Return
+        ------
+        True, wenn eine neue Verbindung aufgebaut wurde.
+        """
+        with self.lock:
+            if self.delegate.is_socket_open():
+                return False
+            now = time.time()
+            if now < self.next_connect:
+                raise ConnectionException(
+                    f"Nächster Verbindungsversuch zu {self.delegate.host}:{self.delegate.port} in "
+                    f"{round(self.next_connect - now)}s")
+            if not self.delegate.connect():
+                self.failed_connects += 1
+                self.next_connect = now + min(RECONNECT_BACKOFF_MIN * 2**(self.failed_connects - 1),
+                                              RECONNECT_BACKOFF_MAX)
+                raise ConnectionException(f"Failed to connect[{self.delegate}]")
+            self.failed_connects = 0
+            self.next_connect = 0.0
+            _enable_keepalive(self.delegate.socket)
+            log.debug(f"Modbus-TCP-Verbindung zu {self.delegate.host}:{self.delegate.port} aufgebaut")
+            return True
+
+    def close(self) -> None:
+        with self.lock:
+            self.delegate.close()
+
+    def touch(self) -> None:
+        self.last_used = time.time()
+
+    def close_if_idle(self, now: float) -> None:
+        # Verbindungen, die gerade verwendet werden, nicht blockieren
+        if self.lock.acquire(blocking=False):
+            try:
+                if self.delegate.is_socket_open() and now - self.last_used > IDLE_TIMEOUT:
+                    log.debug(f"Schließe unbenutzte Modbus-TCP-Verbindung zu {self.delegate.host}:"
+                              f"{self.delegate.port}")
+                    self.delegate.close()
+            finally:
+                self.lock.release()
+
+
+class ModbusConnectionPool:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._connections: Dict[Tuple[Hashable, ...], PooledConnection] = {}
+
+    def get(self,
+            host: str,
+            port: int,
+            framer: type[ModbusSocketFramer] = ModbusSocketFramer,
+            **kwargs) -> PooledConnection:
+        key = (host, port, framer, repr(sorted(kwargs.items())))
+        with self._lock:
+            connection = self._connections.get(key)
+            if connection is None:
+                connection = PooledConnection(ModbusTcpClient(host, port, framer, **kwargs))
+                self._connections[key] = connection
+        return connection
+
+    def close_idle(self) -> None:
+        now = time.time()
+        with self._lock:
+            connections = list(self._connections.values())
+        for connection in connections:
+            connection.close_if_idle(now)
+
+    def close_all(self) -> None:
+        with self._lock:
+            connections = list(self._connections.values())
+        for connection in connections:
+            connection.close()
+
+
+connection_pool = ModbusConnectionPool()
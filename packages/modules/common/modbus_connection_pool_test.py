@@ -0,0 +1,96 @@
+from unittest.mock import Mock
+
+import pytest
+from pymodbus.exceptions import ConnectionException
+
+from modules.common import modbus_connection_pool
+from modules.common.modbus import ModbusClient
+from modules.common.modbus_connection_pool import ModbusConnectionPool, PooledConnection
+
+
+@pytest.fixture
+def delegate() -> Mock:
+    delegate = Mock(host="192.168.0.10", port=502, socket=Mock())
+    delegate.is_socket_open.return_value = False
+    return delegate
+
+
+def test_get_shares_connection_per_server():
+    # setup
+    pool = ModbusConnectionPool()
+
+    # execution
+    first = pool.get("192.168.0.10", 502)
+    second = pool.get("192.168.0.10", 502)
+    other = pool.get("192.168.0.11", 502)
+
+    # evaluation
+    assert first is second
+    assert first is not other
+
+
+def test_connect_backoff(monkeypatch, delegate: Mock):
+    # setup
+    now = Mock(return_value=1000)
+    monkeypatch.setattr(modbus_connection_pool.time, "time", now)
+    delegate.connect.return_value = False
+    connection = PooledConnection(delegate)
+
+    # execution & evaluation
+    with pytest.raises(ConnectionException):
+        connection.connect()
+    with pytest.raises(ConnectionException):
+        connection.connect()
+    assert delegate.connect.call_count == 1
+
+    now.return_value = 1001
+    delegate.connect.return_value = True
+    assert connection.connect() is True
+    assert connection.failed_connects == 0
+    delegate.socket.setsockopt.assert_called()
+
+
+def test_connect_keeps_open_connection(delegate: Mock):
+    # setup
+    delegate.is_socket_open.return_value = True
+    connection = PooledConnection(delegate)
+
+    # execution
+    new_connection = connection.connect()
+
+    # evaluation
+    assert new_connection is False
+    delegate.connect.assert_not_called()
+
+
+@pytest.mark.parametrize("last_used, expected_close", [pytest.param(990, False, id="in use"),
+                                                       pytest.param(800, True, id="idle")])
+def test_close_if_idle(last_used: float, expected_close: bool, delegate: Mock):
+    # setup
+    delegate.is_socket_open.return_value = True
+    connection = PooledConnection(delegate)
+    connection.last_used = last_used
+
+    # execution
+    connection.close_if_idle(1000)
+
+    # evaluation
+    assert delegate.close.called is expected_close
+
+
+def test_client_without_context_keeps_connection(monkeypatch, delegate: Mock):
+    # setup
+    now = Mock(return_value=1000)
+    monkeypatch.setattr(modbus_connection_pool.time, "time", now)
+    delegate.is_socket_open.return_value = True
+    connection = PooledConnection(delegate)
+    client = ModbusClient(delegate, "192.168.0.10", connection=connection)
+    now.return_value = 1100
+
+    # execution
+    client.write_single_coil(1, True, unit=1)
+    connection.close_if_idle(1200)
+
+    # evaluation
+    assert connection.last_used == 1100
+    delegate.close.assert_not_called()
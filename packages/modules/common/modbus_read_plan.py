@@ -0,0 +1,163 @@
+"""Zusammenfassen von Modbus-Abfragen.
+
+Eine Komponente beschreibt die benötigten Register als Liste von (Adresse, Datentyp, Name). Der ReadPlan fasst
+benachbarte Register zu möglichst wenigen Abfragen zusammen und dekodiert die Antworten. Die Zusammenfassung wird
+zwischengespeichert. Lehnt das Gerät eine Abfrage mit einer Modbus-Fehlerantwort ab (zB ungültige Adresse), werden die
+Abfragen verkleinert und die kleinere Aufteilung für alle weiteren Abfragen beibehalten. Bei Übertragungsfehlern (zB
+Timeout) wird die Aufteilung nicht geändert. Da sich der ReadPlan diesen Zustand merkt, benötigt jedes Gerät eine
+eigene Instanz.
+"""
+import logging
+from dataclasses import dataclass
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from pymodbus.constants import Endian
+from pymodbus.exceptions import ConnectionException
+
+from modules.common.modbus import ModbusClient, ModbusDataType, ModbusExceptionResponse
+
+log = logging.getLogger(__name__)
+
+# Laut Modbus-Spezifikation können maximal 125 Register mit einer Abfrage gelesen werden.
+MAX_SPAN = 125
+
+DataTypes = Union[ModbusDataType, Iterable[ModbusDataType]]
+
+
+@dataclass(frozen=True)
+class PlannedRegister:
+    address: int
+    data_type: DataTypes
+    name: str
+
+    @property
+    def count(self) -> int:
+        types = self.data_type if isinstance(self.data_type, Iterable) else [self.data_type]
+        return sum(-(-t.bits // 16) for t in types)
+
+    @property
+    def end(self) -> int:
+        return self.address + self.count
+
+
+@dataclass(frozen=True)
+class ReadRequest:
+    start_address: int
+    count: int
+    registers: Tuple[PlannedRegister, ...]
+
+    @property
+    def mapping(self) -> List[Tuple[int, DataTypes]]:
+        return [(register.address, register.data_type) for register in self.registers]
+
+
+class ReadPlan:
+    def __init__(self,
+                 registers: Iterable[Tuple[int, DataTypes, str]],
+                 max_span: int = MAX_SPAN,
+                 max_gap: int = 0,
+                 request_delay: float = 0) -> None:
+        """
+        Parameter
+        ---------
+        registers: Liste von Tupeln (Adresse, ModbusDataType oder Liste von ModbusDataType, Name)
+        max_span: maximale Anzahl Register je Abfrage
+        max_gap: maximale Anzahl nicht benötigter Register zwischen zwei Einträgen, die mitgelesen werden
+        request_delay: Wartezeit in Sekunden vor jeder Abfrage, zB für Zähler am RS485-Bus
+        """
+        self.registers = sorted((PlannedRegister(*register) for register in registers), key=lambda r: r.address)
+        if len({register.name for register in self.registers}) != len(self.registers):
+            raise ValueError("Die Namen der Register im ReadPlan müssen eindeutig sein.")
+        self.max_span = min(max_span, MAX_SPAN)
+        self.max_gap = max_gap
+        self.request_delay = request_delay
+        self._requests: Optional[List[ReadRequest]] = None
+
+    @property
+    def requests(self) -> List[ReadRequest]:
+        if self._requests is None:
+            self._requests = self._build_requests()
+        return self._requests
+
+    def _build_requests(self) -> List[ReadRequest]:
+        requests: List[ReadRequest] = []
+        current: List[PlannedRegister] = []
+        for register in self.registers:
+            if current:
+                start = current[0].address
+                end = max(r.end for r in current)
+                if register.address - end <= self.max_gap and max(end, register.end) - start <= self.max_span:
+                    current.append(register)
+                    continue
+                requests.append(self._create_request(current))
+            current = [register]
+        if current:
+            requests.append(self._create_request(current))
+        return requests
+
+    @staticmethod
+    def _create_request(registers: List[PlannedRegister]) -> ReadRequest:
+        start = registers[0].address
+        return ReadRequest(start, max(r.end for r in registers) - start, tuple(registers))
+
+    def reduce(self) -> bool:
+        """ verkleinert die Abfragen: zuerst werden keine Lücken mehr mitgelesen, danach wird die maximale Anzahl
+        Register je Abfrage halbiert.
+
+        Return
+        ------
+        False, wenn jedes Register bereits einzeln gelesen wird.
+        """
+        if self.max_gap > 0:
+            self.max_gap = 0
+        elif any(len(request.registers) > 1 for request in self.requests):
+            self.max_span = max(self.max_span // 2, 1)
+        else:
+            return False
+        self._requests = None
+        return True
+
+    def read_input_registers(self, client: ModbusClient, byteorder: Endian = Endian.Big,
+                             wordorder: Endian = Endian.Big, **kwargs) -> Dict[str, Any]:
+        return self._read(client.read_input_registers_bulk, byteorder, wordorder, **kwargs)
+
+    def read_holding_registers(self, client: ModbusClient, byteorder: Endian = Endian.Big,
+                               wordorder: Endian = Endian.Big, **kwargs) -> Dict[str, Any]:
+        return self._read(client.read_holding_registers_bulk, byteorder, wordorder, **kwargs)
+
+    def _read(self, read_bulk_method: Callable, byteorder: Endian, wordorder: Endian, **kwargs) -> Dict[str, Any]:
+        values: Dict[str, Any] = {}
+        retried = False
+        while True:
+            try:
+                self._read_requests(values, read_bulk_method, byteorder, wordorder, **kwargs)
+                return values
+            except ConnectionException:
+                raise
+            except ModbusExceptionResponse:
+                # Die Fehlerantwort kommt ohne Timeout, daher wird im selben Durchlauf so lange verkleinert, bis die
+                # Abfragen gelingen.
+                if self.reduce() is False:
+                    raise
+                log.exception(f"Abfrage wurde abgelehnt, verkleinere Abfragen auf max. {self.max_span} Register.")
+            except Exception:
+                # Nur einen weiteren Versuch im selben Durchlauf, damit ein nicht erreichbares Gerät den Zyklus nicht
+                # mit mehreren Timeouts verzögert.
+                if retried:
+                    raise
+                retried = True
+                log.exception("Fehler bei der Abfrage, erneuter Versuch.")
+
+    def _read_requests(self, values: Dict[str, Any], read_bulk_method: Callable, byteorder: Endian,
+                       wordorder: Endian, **kwargs) -> None:
+        for request in self.requests:
+            # Bereits gelesene Werte werden nicht erneut abgefragt.
+            if all(register.name in values for register in request.registers):
+                continue
+            if self.request_delay:
+                time.sleep(self.request_delay)
+            response = read_bulk_method(request.start_address, request.count, request.mapping,
+                                        byteorder, wordorder, **kwargs)
+            for register in request.registers:
+                values[register.name] = response[register.address]
@@ -0,0 +1,138 @@
+from unittest.mock import Mock
+
+import pytest
+from pymodbus.exceptions import ConnectionException, ModbusIOException
+from pymodbus.pdu import ExceptionResponse
+
+from modules.common import modbus
+from modules.common.modbus import ModbusClient, ModbusDataType, ModbusExceptionResponse
+from modules.common.modbus_read_plan import ReadPlan
+
+REGISTERS = [(0x0C, [ModbusDataType.FLOAT_32]*3, "powers"),
+             (0x00, [ModbusDataType.FLOAT_32]*3, "voltages"),
+             (0x06, [ModbusDataType.FLOAT_32]*3, "currents"),
+             (0x1E, [ModbusDataType.FLOAT_32]*3, "power_factors"),
+             (0x46, ModbusDataType.FLOAT_32, "frequency"),
+             (0x48, ModbusDataType.FLOAT_32, "imported"),
+             (0x4A, ModbusDataType.FLOAT_32, "exported")]
+
+
+def fake_read_bulk(start_address, count, mapping, byteorder, wordorder, **kwargs):
+    return {address: address for address, _ in mapping}
+
+
+@pytest.mark.parametrize(
+    "max_span, max_gap, expected_requests",
+    [pytest.param(125, 0, [(0x00, 18), (0x1E, 6), (0x46, 6)], id="adjacent only"),
+     pytest.param(125, 12, [(0x00, 36), (0x46, 6)], id="gap"),
+     pytest.param(125, 50, [(0x00, 0x4C)], id="single request"),
+     pytest.param(12, 0, [(0x00, 12), (0x0C, 6), (0x1E, 6), (0x46, 6)], id="span"),
+     pytest.param(1, 0, [(0x00, 6), (0x06, 6), (0x0C, 6), (0x1E, 6), (0x46, 2), (0x48, 2), (0x4A, 2)],
+                  id="span smaller than register")])
+def test_requests(max_span, max_gap, expected_requests):
+    # execution
+    plan = ReadPlan(REGISTERS, max_span=max_span, max_gap=max_gap)
+
+    # evaluation
+    assert [(request.start_address, request.count) for request in plan.requests] == expected_requests
+
+
+def test_read_decodes_by_name():
+    # setup
+    client = Mock(read_input_registers_bulk=Mock(side_effect=fake_read_bulk))
+    plan = ReadPlan(REGISTERS, max_gap=12)
+
+    # execution
+    values = plan.read_input_registers(client, unit=1)
+
+    # evaluation
+    assert values == {"voltages": 0x00, "currents": 0x06, "powers": 0x0C, "power_factors": 0x1E,
+                      "frequency": 0x46, "imported": 0x48, "exported": 0x4A}
+    assert client.read_input_registers_bulk.call_count == 2
+    assert client.read_input_registers_bulk.call_args.kwargs == {"unit": 1}
+
+
+def test_read_falls_back_to_smaller_requests():
+    # setup
+    def reject_large_reads(start_address, count, mapping, byteorder, wordorder, **kwargs):
+        if count > 18:
+            raise ModbusExceptionResponse("Illegal data address")
+        return fake_read_bulk(start_address, count, mapping, byteorder, wordorder)
+    client = Mock(read_holding_registers_bulk=Mock(side_effect=reject_large_reads))
+    plan = ReadPlan(REGISTERS, max_gap=12)
+
+    # execution
+    values = plan.read_holding_registers(client)
+
+    # evaluation
+    assert len(values) == len(REGISTERS)
+    assert plan.max_gap == 0
+    # die verkleinerte Aufteilung wird beibehalten
+    client.read_holding_registers_bulk.reset_mock()
+    plan.read_holding_registers(client)
+    assert client.read_holding_registers_bulk.call_count == 3
+
+
+def test_exception_response_of_client_reduces_requests(monkeypatch):
+    # setup
+    monkeypatch.setattr(modbus, "BinaryPayloadDecoder", Mock())
+
+    def read_input_registers(address, count, **kwargs):
+        if count > 18:
+            # Illegal Data Address
+            return ExceptionResponse(0x04, 0x02)
+        return Mock(isError=Mock(return_value=False), registers=[0] * count)
+    delegate = Mock(is_socket_open=Mock(return_value=True), read_input_registers=Mock(side_effect=read_input_registers))
+    plan = ReadPlan(REGISTERS, max_gap=12)
+
+    # execution
+    plan.read_input_registers(ModbusClient(delegate, "192.168.0.10"))
+
+    # evaluation
+    assert plan.max_gap == 0
+    assert [call.args[:2] for call in delegate.read_input_registers.call_args_list] == [
+        (0x00, 36), (0x00, 18), (0x1E, 6), (0x46, 6)]
+
+
+def test_read_retries_transient_error_without_fallback():
+    # setup
+    client = Mock(read_input_registers_bulk=Mock(side_effect=[ModbusIOException("Timeout"), fake_read_bulk(
+        0x00, 36, [(0x00, None), (0x06, None), (0x0C, None), (0x1E, None)], None, None), fake_read_bulk(
+        0x46, 6, [(0x46, None), (0x48, None), (0x4A, None)], None, None)]))
+    plan = ReadPlan(REGISTERS, max_gap=12)
+
+    # execution
+    values = plan.read_input_registers(client)
+
+    # evaluation
+    assert len(values) == len(REGISTERS)
+    assert plan.max_gap == 12
+    assert client.read_input_registers_bulk.call_count == 3
+
+
+def test_read_persistent_transient_error():
+    # setup
+    client = Mock(read_input_registers_bulk=Mock(side_effect=ModbusIOException("Timeout")))
+    plan = ReadPlan(REGISTERS, max_gap=12)
+
+    # execution & evaluation
+    with pytest.raises(ModbusIOException):
+        plan.read_input_registers(client)
+    assert client.read_input_registers_bulk.call_count == 2
+    assert plan.max_gap == 12
+
+
+def test_read_connection_error_without_fallback():
+    # setup
+    client = Mock(read_input_registers_bulk=Mock(side_effect=ConnectionException("offline")))
+    plan = ReadPlan(REGISTERS, max_gap=12)
+
+    # execution & evaluation
+    with pytest.raises(ConnectionException):
+        plan.read_input_registers(client)
+    assert plan.max_gap == 12
+
+
+def test_duplicate_names():
+    with pytest.raises(ValueError):
+        ReadPlan([(0, ModbusDataType.UINT_16, "a"), (1, ModbusDataType.UINT_16, "a")])
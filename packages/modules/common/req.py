@@ -5,6 +5,8 @@ import urllib3
 from functools import wraps
 import warnings
 
+from modules.common.http_connection_pool import http_adapter
+
 log = logging.getLogger(__name__)
 
 
@@ -30,6 +32,9 @@ class CustomSession(Session):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.default_timeout = 5
+        # Verbindungen werden im gemeinsamen Pool gehalten und von allen Sessions wiederverwendet.
+        self.mount("http://", http_adapter)
+        self.mount("https://", http_adapter)
 
     @disable_insecure_request_warning
     def request(self, method, url, *args, **kwargs):
@@ -40,6 +45,8 @@ class CustomSession(Session):
         """die deepcopy-methode von python kopiert keine Klassenattribute, daher wird hier eine eigene deepcopy-Methode
         implementiert"""
         new_copy = self.__class__()
+        # Der gemeinsame Adapter wird nicht kopiert.
+        memo[id(http_adapter)] = http_adapter
         new_copy.default_timeout = self.default_timeout
         for k, v in self.__dict__.items():
             if k != 'default_timeout':
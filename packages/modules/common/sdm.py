@@ -10,6 +10,7 @@ from modules.common.component_state import CounterState
 from modules.common.fault_state import FaultState
 from modules.common.hardware_check import check_meter_values
 from modules.common.modbus import ModbusDataType
+from modules.common.modbus_read_plan import ReadPlan
 
 log = logging.getLogger(__name__)
 
@@ -18,7 +19,6 @@ class Sdm(AbstractCounter):
     def __init__(self, modbus_id: int, client: modbus.ModbusTcpClient_) -> None:
         self.client = client
         self.id = modbus_id
-        self.fast_mode = True
         with client:
             self.serial_number = str(self.client.read_holding_registers(0xFC00, ModbusDataType.UINT_32, unit=self.id))
 
@@ -39,20 +39,22 @@ class SdmRegister(IntEnum):
 
 
 class Sdm630_72(Sdm):
-    REG_MAPPING_BULK_1 = (
-        (SdmRegister.VOLTAGE_L1, [ModbusDataType.FLOAT_32]*3),
-        (SdmRegister.CURRENT_L1, [ModbusDataType.FLOAT_32]*3),
-        (SdmRegister.POWER_L1, [ModbusDataType.FLOAT_32]*3)
-    )
-    REG_MAPPING_BULK_2 = (
-        (SdmRegister.FREQUENCY, ModbusDataType.FLOAT_32),
-        (SdmRegister.IMPORTED, ModbusDataType.FLOAT_32),
-        (SdmRegister.EXPORTED, ModbusDataType.FLOAT_32),
+    # entgegen der Doku können nicht bei allen SDM72 80 Register auf einmal gelesen werden, manche können auch nur 10.
+    # Lehnt der Zähler eine Abfrage ab, verkleinert der ReadPlan die Abfragen.
+    REGISTERS = (
+        (SdmRegister.VOLTAGE_L1, [ModbusDataType.FLOAT_32]*3, "voltages"),
+        (SdmRegister.CURRENT_L1, [ModbusDataType.FLOAT_32]*3, "currents"),
+        (SdmRegister.POWER_L1, [ModbusDataType.FLOAT_32]*3, "powers"),
+        (SdmRegister.POWER_FACTOR_L1, [ModbusDataType.FLOAT_32]*3, "power_factors"),
+        (SdmRegister.FREQUENCY, ModbusDataType.FLOAT_32, "frequency"),
+        (SdmRegister.IMPORTED, ModbusDataType.FLOAT_32, "imported"),
+        (SdmRegister.EXPORTED, ModbusDataType.FLOAT_32, "exported"),
     )
 
     def __init__(self, modbus_id: int, client: modbus.ModbusTcpClient_, fault_state: FaultState) -> None:
         super().__init__(modbus_id, client)
         self.fault_state = fault_state
+        self.read_plan = ReadPlan(self.REGISTERS, request_delay=0.1)
 
     def get_power(self) -> Tuple[List[float], float]:
         # smarthome legacy
@@ -67,60 +69,18 @@ class Sdm630_72(Sdm):
         return self.client.read_input_registers(0x00, [ModbusDataType.FLOAT_32]*3, unit=self.id)
 
     def get_counter_state(self) -> CounterState:
-        # entgegen der Doku können nicht bei allen SDM72 80 Register auf einmal gelesen werden,
-        # manche können auch nur 10
-        if self.fast_mode:
-            try:
-                time.sleep(0.1)
-                bulk_1 = self.client.read_input_registers_bulk(
-                    SdmRegister.VOLTAGE_L1, 18, mapping=self.REG_MAPPING_BULK_1, unit=self.id)
-                time.sleep(0.1)
-                power_factors = self.client.read_input_registers(
-                    SdmRegister.POWER_FACTOR_L1, [ModbusDataType.FLOAT_32]*3, unit=self.id)
-                time.sleep(0.1)
-                bulk_2 = self.client.read_input_registers_bulk(
-                    SdmRegister.FREQUENCY, 6, mapping=self.REG_MAPPING_BULK_2, unit=self.id)
-                resp = {**bulk_1, **bulk_2}
-            except Exception:
-                log.exception("Fehler beim Auslesen des Zählers")
-                self.client.read_input_registers(
-                    SdmRegister.VOLTAGE_L1, [ModbusDataType.FLOAT_32]*3, unit=self.id)
-                self.fast_mode = False
-        if self.fast_mode is False:
-            # im gleichen Durchlauf noch im slow mode versuchen, sonst schlägt der Hardware-Check fehl
-            log.debug("Auslesung des Zählers im Kompatibilitäts-Modus")
-            resp = {}
-            time.sleep(0.1)
-            resp[SdmRegister.VOLTAGE_L1] = self.client.read_input_registers(
-                SdmRegister.VOLTAGE_L1, [ModbusDataType.FLOAT_32]*3, unit=self.id)
-            time.sleep(0.1)
-            resp[SdmRegister.CURRENT_L1] = self.client.read_input_registers(
-                SdmRegister.CURRENT_L1, [ModbusDataType.FLOAT_32]*3, unit=self.id)
-            time.sleep(0.1)
-            resp[SdmRegister.POWER_L1] = self.client.read_input_registers(
-                SdmRegister.POWER_L1, [ModbusDataType.FLOAT_32]*3, unit=self.id)
-            time.sleep(0.1)
-            power_factors = self.client.read_input_registers(
-                SdmRegister.POWER_FACTOR_L1, [ModbusDataType.FLOAT_32]*3, unit=self.id)
-            time.sleep(0.1)
-            # frequency noch mit auslesen klappt nicht
-            resp[SdmRegister.IMPORTED], resp[SdmRegister.EXPORTED] = self.client.read_input_registers(
-                SdmRegister.IMPORTED, [ModbusDataType.FLOAT_32]*2, unit=self.id)
-            time.sleep(0.1)
-            resp[SdmRegister.FREQUENCY] = self.client.read_input_registers(
-                SdmRegister.FREQUENCY, ModbusDataType.FLOAT_32, unit=self.id)
-
-        frequency = resp[SdmRegister.FREQUENCY]
+        resp = self.read_plan.read_input_registers(self.client, unit=self.id)
+        frequency = resp["frequency"]
         if frequency > 100:
             frequency = frequency / 10
         counter_state = CounterState(
-            imported=resp[SdmRegister.IMPORTED]*1000,
-            exported=resp[SdmRegister.EXPORTED]*1000,
-            power=sum(resp[SdmRegister.POWER_L1]),
-            voltages=resp[SdmRegister.VOLTAGE_L1],
-            currents=resp[SdmRegister.CURRENT_L1],
-            powers=resp[SdmRegister.POWER_L1],
-            power_factors=power_factors,
+            imported=resp["imported"]*1000,
+            exported=resp["exported"]*1000,
+            power=sum(resp["powers"]),
+            voltages=resp["voltages"],
+            currents=resp["currents"],
+            powers=resp["powers"],
+            power_factors=resp["power_factors"],
             frequency=frequency,
             serial_number=self.serial_number
         )
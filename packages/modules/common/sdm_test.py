@@ -0,0 +1,71 @@
+from typing import Iterable, List, Tuple
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from modules.common import modbus_read_plan, sdm
+from modules.common.modbus import ModbusExceptionResponse
+
+VALUES = {0x00: 230.5, 0x02: 231.0, 0x04: 229.5,
+          0x06: 10.0, 0x08: 12.0, 0x0A: 8.0,
+          0x0C: 2300.0, 0x0E: 2760.0, 0x10: 1840.0,
+          0x1E: 0.5, 0x20: 0.75, 0x22: 1.0,
+          0x46: 50.0,
+          0x48: 1234.5,
+          0x4A: 12.5}
+
+
+class FakeSdm72:
+    """ SDM72, der Abfragen mit mehr als max_count Registern mit einer Modbus-Fehlerantwort ablehnt"""
+
+    def __init__(self, max_count: int) -> None:
+        self.max_count = max_count
+        self.requests: List[Tuple[int, int]] = []
+
+    def read_input_registers_bulk(self, start_address: int, count: int, mapping: List, byteorder, wordorder,
+                                  **kwargs):
+        self.requests.append((start_address, count))
+        if count > self.max_count:
+            raise ModbusExceptionResponse("Exception Response(132, 4, IllegalAddress)")
+        return {address: ([VALUES[address + 2 * i] for i in range(len(data_type))]
+                          if isinstance(data_type, Iterable) else VALUES[address])
+                for address, data_type in mapping}
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch) -> None:
+    monkeypatch.setattr(modbus_read_plan.time, "sleep", Mock())
+
+
+def create_sdm(device: FakeSdm72) -> sdm.Sdm630_72:
+    client = MagicMock(read_input_registers_bulk=Mock(side_effect=device.read_input_registers_bulk),
+                       read_holding_registers=Mock(return_value=1234))
+    return sdm.Sdm630_72(105, client, Mock())
+
+
+@pytest.mark.parametrize("max_count, expected_requests",
+                         [pytest.param(125, [(0x00, 18), (0x1E, 6), (0x46, 6)], id="Bulk-Abfragen"),
+                          pytest.param(10, [(0x00, 6), (0x06, 6), (0x0C, 6), (0x1E, 6), (0x46, 6)],
+                                       id="max. 10 Register")])
+def test_get_counter_state(max_count, expected_requests):
+    # setup
+    device = FakeSdm72(max_count)
+    meter = create_sdm(device)
+
+    # execution
+    counter_state = meter.get_counter_state()
+    device.requests.clear()
+    meter.get_counter_state()
+
+    # evaluation
+    assert counter_state.voltages == [230.5, 231.0, 229.5]
+    assert counter_state.currents == [10.0, 12.0, 8.0]
+    assert counter_state.powers == [2300.0, 2760.0, 1840.0]
+    assert counter_state.power == 6900.0
+    assert counter_state.power_factors == [0.5, 0.75, 1.0]
+    assert counter_state.frequency == 50.0
+    assert counter_state.imported == 1234500.0
+    assert counter_state.exported == 12500.0
+    assert counter_state.serial_number == "1234"
+    # die verkleinerte Aufteilung wird beibehalten, der Zähler lehnt keine weitere Abfrage ab
+    assert device.requests == expected_requests
@@ -5,10 +5,12 @@ from modules.common.store._util import get_rounding_function_by_digits
 
 
 def pub_to_broker(topic: str, value, digits: Union[int, None] = None) -> None:
+    # Die Werte der Module werden nur von openWB geschrieben, daher müssen unveränderte Werte nicht erneut
+    # veröffentlicht werden.
     rounding = get_rounding_function_by_digits(digits)
     if value is None:
-        Pub().pub(topic, value)
+        Pub().pub(topic, value, suppress_unchanged=True)
     elif isinstance(value, list):
-        Pub().pub(topic, [rounding(v) for v in value])
+        Pub().pub(topic, [rounding(v) for v in value], suppress_unchanged=True)
     else:
-        Pub().pub(topic, rounding(value))
+        Pub().pub(topic, rounding(value), suppress_unchanged=True)
@@ -0,0 +1,92 @@
+""" Zwischenspeicher für die Preise der Stromtarife und Netzentgelte.
+
+Die zuletzt erfolgreich abgerufenen Preise und der Zeitpunkt des nächsten Abrufs werden je Tarif-Art in
+data/modules/tariff_cache gespeichert. Nach einem Neustart werden die gespeicherten Preise verwendet, solange sie
+gültig sind, ohne den Anbieter erneut abzufragen. Liefert der Anbieter nur einen Teil der Preise (zB nur den
+Folgetag), werden die neuen Preise mit den gespeicherten zusammengeführt. Die Konfiguration wird nur als Hash
+gespeichert, damit keine Zugangsdaten im Zwischenspeicher stehen.
+"""
+import hashlib
+import json
+import logging
+from pathlib import Path
+import random
+from typing import Dict, Optional
+
+from dataclass_utils import asdict
+from helpermodules.utils.json_file_handler import write_and_check
+
+log = logging.getLogger(__name__)
+
+CACHE_PATH = Path(__file__).resolve().parents[3] / "data" / "modules" / "tariff_cache"
+# Wartezeit nach einem fehlgeschlagenen Abruf, wird bei jedem weiteren Fehler verdoppelt
+RETRY_DELAY_MIN = 300
+RETRY_DELAY_MAX = 3600
+
+
+def _get_config_key(config) -> str:
+    return hashlib.sha256(json.dumps(asdict(config), sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _get_slot_length(prices: Dict[str, float]) -> Optional[int]:
+    timestamps = sorted(int(timestamp) for timestamp in prices)[:2]
+    return timestamps[1] - timestamps[0] if len(timestamps) == 2 else None
+
+
+class TariffCache:
+    def __init__(self, path: Path, config) -> None:
+        self.path = path
+        self.config_key = _get_config_key(config)
+        self.prices: Dict[str, float] = {}
+        self.next_query_time: Optional[int] = None
+        self.failures = 0
+        self._load()
+
+    def get_valid_prices(self, now: float) -> Dict[str, float]:
+        """ Return: gespeicherte Preise, wenn der letzte Zeitslot noch nicht abgelaufen ist, sonst ein leeres Dict"""
+        slot_length = _get_slot_length(self.prices)
+        if slot_length is None or max(int(timestamp) for timestamp in self.prices) + slot_length <= now:
+            return {}
+        return dict(self.prices)
+
+    def merge(self, prices: Dict) -> Dict[str, float]:
+        """ ergänzt die neuen Preise um die gespeicherten Zeitslots, die der Anbieter nicht mehr oder noch nicht
+        geliefert hat. Bei gleichen Zeitslots gilt der neue Preis."""
+        prices = {str(int(float(timestamp))): price for timestamp, price in prices.items()}
+        if len(self.prices) == 0 or _get_slot_length(prices) not in (None, _get_slot_length(self.prices)):
+            merged = prices
+        else:
+            merged = {**self.prices, **prices}
+        return dict(sorted(merged.items(), key=lambda item: int(item[0])))
+
+    def save(self, prices: Dict[str, float], next_query_time: Optional[int]) -> None:
+        self.prices = dict(prices)
+        self.next_query_time = next_query_time
+        self.failures = 0
+        try:
+            self.path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+            write_and_check(str(self.path), {"config": self.config_key, "prices": self.prices,
+                                             "next_query_time": self.next_query_time})
+        except Exception:
+            log.exception(f"Fehler beim Speichern der Preise in {self.path}")
+
+    def get_retry_delay(self) -> int:
+        """ Return: Wartezeit in Sekunden bis zum nächsten Abruf nach einem Fehler. Die Wartezeit wird zufällig
+        verkürzt, damit nicht alle Systeme den Anbieter zur gleichen Zeit erneut abfragen."""
+        self.failures += 1
+        delay = min(RETRY_DELAY_MIN * 2 ** (self.failures - 1), RETRY_DELAY_MAX)
+        return int(random.uniform(delay / 2, delay))
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                content = json.load(file)
+            if content.get("config") == self.config_key:
+                self.prices = content["prices"]
+                self.next_query_time = content["next_query_time"]
+            else:
+                log.debug(f"Konfiguration geändert, gespeicherte Preise in {self.path} werden verworfen.")
+        except FileNotFoundError:
+            pass
+        except Exception:
+            log.exception(f"Fehler beim Laden der gespeicherten Preise aus {self.path}")
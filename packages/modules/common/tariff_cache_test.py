@@ -0,0 +1,104 @@
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from helpermodules import timecheck
+from modules.common import tariff_cache
+from modules.common.component_state import TariffState
+from modules.common.configurable_tariff import ConfigurableFlexibleTariff
+from modules.common.tariff_cache import TariffCache
+from modules.electricity_pricing.flexible_tariffs.awattar.config import AwattarTariff
+
+NOW = 1652683252  # Montag 16.05.2022, 8:40:52
+TODAY = {str(1652652000 + 3600 * i): 0.0002 + i / 1000000 for i in range(24)}
+TOMORROW = {str(1652738400 + 3600 * i): 0.0003 + i / 1000000 for i in range(24)}
+
+
+@pytest.fixture(autouse=True)
+def cache_path(tmp_path: Path, monkeypatch) -> Path:
+    monkeypatch.setattr(tariff_cache, "CACHE_PATH", tmp_path)
+    monkeypatch.setattr(timecheck, "create_timestamp", Mock(return_value=NOW))
+    return tmp_path
+
+
+def create_tariff(prices=None, config=None) -> ConfigurableFlexibleTariff:
+    updater = Mock(return_value=TariffState(prices=dict(prices)) if prices else None)
+    return ConfigurableFlexibleTariff(config or AwattarTariff(), Mock(return_value=updater))
+
+
+def test_restart_uses_cached_prices(mock_pub: Mock):
+    # setup
+    create_tariff({**TODAY, **TOMORROW}).update()
+
+    # execution
+    tariff = create_tariff(TODAY)
+    tariff.update()
+
+    # evaluation
+    tariff._component_updater.assert_not_called()
+    published = {call.args[0]: call.args[1] for call in mock_pub.pub.call_args_list}
+    assert list(published["openWB/set/optional/ep/flexible_tariff/get/prices"].keys())[0] == "1652680800"
+    assert tariff.get.next_query_time > NOW
+
+
+def test_changed_configuration_discards_cache():
+    # setup
+    create_tariff({**TODAY, **TOMORROW}).update()
+    config = AwattarTariff()
+    config.configuration.country = "at"
+
+    # execution
+    tariff = create_tariff(TODAY, config)
+    tariff.update()
+
+    # evaluation
+    tariff._component_updater.assert_called_once()
+
+
+def test_partial_update_merged():
+    # setup
+    tariff = create_tariff(TODAY)
+    tariff.update()
+    tariff._component_updater.return_value = TariffState(prices=dict(TOMORROW))
+    tariff.get.next_query_time = NOW
+
+    # execution
+    tariff.update()
+
+    # evaluation
+    prices = tariff.store.delegate.state.prices
+    assert list(prices.keys()) == [ts for ts in {**TODAY, **TOMORROW} if int(ts) >= 1652680800]
+
+
+def test_error_backs_off_and_keeps_prices(monkeypatch):
+    # setup
+    monkeypatch.setattr(tariff_cache.random, "uniform", lambda low, high: high)
+    tariff = create_tariff(TODAY)
+    tariff.update()
+    tariff._component_updater.side_effect = Exception("Anbieter nicht erreichbar")
+    tariff.get.next_query_time = NOW
+
+    # execution
+    tariff.update()
+    first_retry = tariff.get.next_query_time
+    tariff.get.next_query_time = NOW
+    tariff.update()
+
+    # evaluation
+    assert first_retry == NOW + tariff_cache.RETRY_DELAY_MIN
+    assert tariff.get.next_query_time == NOW + 2 * tariff_cache.RETRY_DELAY_MIN
+    assert tariff.fault_state.fault_state.value == 2
+    assert list(tariff._cache.get_valid_prices(NOW).keys())[0] == "1652680800"
+
+
+def test_outdated_cache_not_used(cache_path: Path):
+    # setup
+    cache = TariffCache(cache_path / "flexible_tariff.json", AwattarTariff())
+    cache.save(TODAY, None)
+
+    # execution
+    valid_prices = TariffCache(cache_path / "flexible_tariff.json", AwattarTariff()).get_valid_prices(1652738400)
+
+    # evaluation
+    assert valid_prices == {}
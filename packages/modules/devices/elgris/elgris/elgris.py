@@ -1,5 +1,6 @@
 from modules.common import modbus
 from modules.common.fault_state import FaultState
+from modules.common.modbus_read_plan import ReadPlan
 from modules.common.sdm import Sdm630_72
 
 
@@ -9,4 +10,4 @@ class Elgris(Sdm630_72):
         self.id = modbus_id
         self.serial_number = ""
         self.fault_state = fault_state
-        self.fast_mode = True
+        self.read_plan = ReadPlan(self.REGISTERS, request_delay=0.1)
@@ -12,8 +12,9 @@ def setup_modbus_mocks(monkeypatch):
     """Setup common Modbus mocks für alle Tests"""
     mock_read_input_registers_bulk = Mock(side_effect=[
         {SdmRegister.VOLTAGE_L1: [231]*3, SdmRegister.CURRENT_L1: [0.5]*3, SdmRegister.POWER_L1: [115]*3},
+        {SdmRegister.POWER_FACTOR_L1: [0.99]*3},
         {SdmRegister.IMPORTED: 100, SdmRegister.EXPORTED: 200, SdmRegister.FREQUENCY: 50}])
-    mock_read_input_registers = Mock(side_effect=[[0.99]*3])
+    mock_read_input_registers = Mock()
 
     monkeypatch.setattr(ModbusTcpClient_, "__enter__", Mock())
     monkeypatch.setattr(ModbusTcpClient_, "__exit__", Mock())
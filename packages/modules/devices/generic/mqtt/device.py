@@ -2,8 +2,8 @@
 from typing import Iterable, Union
 import logging
 
-from helpermodules.broker import BrokerClient
-from helpermodules.utils.topic_parser import decode_payload
+from control import data
+from helpermodules.broker_cache import MAX_AGE_CONTROL_INTERVALS, topic_cache
 from modules.common.abstract_device import DeviceDescriptor
 from modules.common.component_context import SingleComponentUpdateContext
 from modules.common.component_type import type_to_topic_mapping
@@ -25,16 +25,12 @@ def create_device(device_config: Mqtt):
         return inverter.MqttInverter(component_config, device_id=device_config.id)
 
     def update_components(components: Iterable[Union[bat.MqttBat, counter.MqttCounter, inverter.MqttInverter]]):
-        def on_connect(client, userdata, flags, rc):
-            for component in components:
-                client.subscribe(f"openWB/mqtt/{type_to_topic_mapping(component.component_config.type)}/"
-                                 f"{component.component_config.id}/#")
-
-        def on_message(client, userdata, message):
-            received_topics.update({message.topic: decode_payload(message.payload)})
-
         received_topics = {}
-        BrokerClient(f"subscribeMqttDevice{device_config.id}", on_connect, on_message).start_finite_loop()
+        max_age = MAX_AGE_CONTROL_INTERVALS * data.data.general_data.data.control_interval
+        for component in components:
+            received_topics.update(topic_cache.get(
+                f"openWB/mqtt/{type_to_topic_mapping(component.component_config.type)}/"
+                f"{component.component_config.id}/#", max_age=max_age))
 
         if received_topics:
             log.debug(f"Empfange MQTT Daten für Gerät {device_config.id}: {received_topics}")
@@ -49,9 +45,10 @@ def create_device(device_config: Mqtt):
                         )
         else:
             for component in components:
-                component.fault_state.warning(
-                    f"Keine MQTT-Daten für Komponente {component.component_config.name} empfangen oder es werden "
-                    "veraltete, abwärtskompatible Topics verwendet. Bitte die Doku in den Einstellungen beachten.")
+                component.fault_state.error(
+                    f"Keine MQTT-Daten für Komponente {component.component_config.name} in den letzten {max_age}s "
+                    "empfangen oder es werden veraltete, abwärtskompatible Topics verwendet. Bitte die Doku in den "
+                    "Einstellungen beachten.")
 
     return ConfigurableDevice(
         device_config=device_config,
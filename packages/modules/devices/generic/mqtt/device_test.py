@@ -0,0 +1,25 @@
+from threading import Event
+from unittest.mock import Mock
+
+from control import data
+from modules.common.fault_state import FaultStateLevel
+from modules.devices.generic.mqtt import device
+from modules.devices.generic.mqtt.config import Mqtt, MqttCounterSetup
+
+
+def test_missing_data_sets_error(monkeypatch):
+    # setup
+    data.data_init(Event())
+    data.data.general_data.data.control_interval = 10
+    get_mock = Mock(return_value={})
+    monkeypatch.setattr(device.topic_cache, "get", get_mock)
+    mqtt_device = device.create_device(Mqtt())
+    mqtt_device.add_component(MqttCounterSetup(id=2))
+    component = mqtt_device.components["component2"]
+
+    # execution
+    mqtt_device.update()
+
+    # evaluation
+    get_mock.assert_called_once_with("openWB/mqtt/counter/2/#", max_age=30)
+    assert component.fault_state.fault_state == FaultStateLevel.ERROR
@@ -1,5 +1,6 @@
 import logging
-from threading import Event, Thread
+from threading import Event
+import time
 from typing import List
 
 from control import data
@@ -8,86 +9,100 @@ from modules.common.store._tariff import get_price_value_store
 from modules.utils import wait_for_module_update_completed
 from modules.common.abstract_device import AbstractDevice
 from modules.common.component_type import ComponentType, type_to_topic_mapping
+from modules.common.http_connection_pool import http_adapter
 from modules.common.store import update_values
 from modules.common.utils.component_parser import get_finished_component_obj_by_id
-from helpermodules.utils import joined_thread_handler
+from modules.polling_scheduler import PollingScheduler
+from helpermodules.utils import Task, TaskPool
 from helpermodules.constants import NO_ERROR
+from helpermodules.cycle_profiler import cycle_profiler
 from helpermodules.pub import Pub
 
 log = logging.getLogger(__name__)
 
+# Die Laufzeiten der Abfragen werden in diesem Abstand (in Sekunden) ins Log geschrieben.
+LATENCY_REPORT_INTERVAL = 600
+
 
 class Loadvars:
     def __init__(self) -> None:
         self.event_module_update_completed = Event()
         self.price_value_store = get_price_value_store()
+        self.task_pool = TaskPool("loadvars", max_workers=50)
+        self.polling_scheduler = PollingScheduler(self.task_pool)
+        self.last_latency_report = time.monotonic()
 
     def get_values(self) -> None:
         topic = "openWB/set/system/device/module_update_completed"
         try:
-            not_finished_threads = self._set_values()
+            with cycle_profiler.phase("loadvars/set_values"):
+                not_finished_threads = self._set_values()
             levels = data.data.counter_all_data.get_list_of_elements_per_level()
             levels.reverse()
-            for level in levels:
-                self._update_values_of_level_buttom_top(level, not_finished_threads)
+            for i, level in enumerate(levels):
+                with cycle_profiler.phase(f"loadvars/level{len(levels) - 1 - i}"):
+                    self._update_values_of_level_buttom_top(level, not_finished_threads)
+                    wait_for_module_update_completed(self.event_module_update_completed, topic)
+                    data.data.copy_module_data()
+            with cycle_profiler.phase("loadvars/virtual_counter"):
+                self._update_values_virtual_counter_uncounted_consumption(not_finished_threads)
                 wait_for_module_update_completed(self.event_module_update_completed, topic)
                 data.data.copy_module_data()
-            self._update_values_virtual_counter_uncounted_consumption(not_finished_threads)
-            wait_for_module_update_completed(self.event_module_update_completed, topic)
-            data.data.copy_module_data()
-            wait_for_module_update_completed(self.event_module_update_completed, topic)
-            joined_thread_handler(self._get_io(), data.data.general_data.data.control_interval/3)
-            joined_thread_handler(self._set_io(), data.data.general_data.data.control_interval/3)
-            wait_for_module_update_completed(self.event_module_update_completed, topic)
+            with cycle_profiler.phase("loadvars/io"):
+                wait_for_module_update_completed(self.event_module_update_completed, topic)
+                self.task_pool.run(self._get_io(), data.data.general_data.data.control_interval/3)
+                self.task_pool.run(self._set_io(), data.data.general_data.data.control_interval/3)
+                wait_for_module_update_completed(self.event_module_update_completed, topic)
             if (data.data.optional_data.data.electricity_pricing.configured):
-                self.ep_get_prices()
+                with cycle_profiler.phase("loadvars/prices"):
+                    self.ep_get_prices()
+            self._report_latencies()
         except Exception:
             log.exception("Fehler im loadvars-Modul")
 
+    def _report_latencies(self) -> None:
+        if time.monotonic() - self.last_latency_report > LATENCY_REPORT_INTERVAL:
+            self.last_latency_report = time.monotonic()
+            log.debug(f"Laufzeiten der Abfragen:\n{self.task_pool.latency_report()}")
+            log.debug(f"HTTP-Anfragen je Host:\n{http_adapter.statistics_report()}")
+
     def _set_values(self) -> List[str]:
-        """Threads, um Werte von Geräten abzufragen"""
-        modules_threads: List[Thread] = []
-        for item in data.data.system_data.values():
-            try:
-                if isinstance(item, AbstractDevice):
-                    modules_threads.append(Thread(target=item.update, args=(),
-                                           name=f"device{item.device_config.id}"))
-            except Exception:
-                log.exception(f"Fehler im loadvars-Modul bei Element {item}")
+        """Threads, um Werte von Geräten abzufragen. Welche Geräte abgefragt werden, legt der PollingScheduler fest.
+        Nicht abgefragte Geräte und Geräte, deren Abfrage im Hintergrund läuft, sind nicht in der Rückgabe enthalten,
+        für sie werden die zuletzt gelesenen Werte veröffentlicht."""
+        devices = [item for item in data.data.system_data.values() if isinstance(item, AbstractDevice)]
+        tasks = self.polling_scheduler.schedule(devices, data.data.general_data.data.control_interval)
         for cp in data.data.cp_data.values():
             try:
-                modules_threads.append(Thread(target=cp.chargepoint_module.get_values,
-                                       args=(), name=f"set values cp{cp.chargepoint_module.config.id}"))
+                tasks.append(Task(f"set values cp{cp.chargepoint_module.config.id}",
+                                  cp.chargepoint_module.get_values))
             except Exception:
                 log.exception(f"Fehler im loadvars-Modul bei Element {cp.num}")
-        return joined_thread_handler(modules_threads, data.data.general_data.data.control_interval/3)
+        return self.task_pool.run(tasks, data.data.general_data.data.control_interval/3)
 
     def _update_values_of_level_buttom_top(self, elements, not_finished_threads: List[str]) -> None:
         """Threads, um von der niedrigsten Ebene der Hierarchie beginnend Werte ggf. miteinander zu verrechnen und zu
         veröffentlichen"""
-        modules_threads: List[Thread] = []
+        tasks: List[Task] = []
         for element in elements:
             try:
                 if element["type"] == ComponentType.CHARGEPOINT.value:
                     chargepoint = data.data.cp_data[f'{type_to_topic_mapping(element["type"])}{element["id"]}']
                     thread_name = f"set values cp{chargepoint.chargepoint_module.config.id}"
                     if thread_name not in not_finished_threads:
-                        modules_threads.append(Thread(
-                            target=update_values,
-                            args=(chargepoint.chargepoint_module,),
-                            name=f"update values cp{chargepoint.chargepoint_module.config.id}"))
+                        tasks.append(Task(f"update values cp{chargepoint.chargepoint_module.config.id}",
+                                          update_values, (chargepoint.chargepoint_module,)))
                 else:
                     component = get_finished_component_obj_by_id(element["id"], not_finished_threads)
                     if component is None:
                         continue
-                    modules_threads.append(Thread(target=update_values, args=(
-                        component,), name=f"component{component.component_config.id}"))
+                    tasks.append(Task(f"component{component.component_config.id}", update_values, (component,)))
             except Exception:
                 log.exception(f"Fehler im loadvars-Modul bei Element {element}")
-        joined_thread_handler(modules_threads, data.data.general_data.data.control_interval/3)
+        self.task_pool.run(tasks, data.data.general_data.data.control_interval/3)
 
     def _update_values_virtual_counter_uncounted_consumption(self, not_finished_threads: List[str]) -> None:
-        modules_threads: List[Thread] = []
+        tasks: List[Task] = []
         for counter in data.data.counter_data.values():
             try:
                 component = get_finished_component_obj_by_id(counter.num, not_finished_threads)
@@ -95,49 +110,44 @@ class Loadvars:
                     if len(data.data.counter_all_data.get_entry_of_element(counter.num)["children"]) == 0:
                         thread_name = f"component{component.component_config.id}"
                         if thread_name not in not_finished_threads:
-                            modules_threads.append(Thread(
-                                target=update_values,
-                                args=(component,),
-                                name=f"component{component.component_config.id}"))
+                            tasks.append(Task(thread_name, update_values, (component,)))
             except Exception:
                 log.exception(f"Fehler im loadvars-Modul bei Zähler {counter}")
-        joined_thread_handler(modules_threads, data.data.general_data.data.control_interval/3)
+        self.task_pool.run(tasks, data.data.general_data.data.control_interval/3)
 
-    def _get_io(self) -> List[Thread]:
-        threads = []  # type: List[Thread]
+    def _get_io(self) -> List[Task]:
+        tasks = []  # type: List[Task]
         try:
             for io_device in data.data.system_data.values():
                 try:
                     if isinstance(io_device, AbstractIoDevice):
-                        threads.append(
-                            Thread(target=io_device.read, args=(), name="get io state"))
+                        tasks.append(Task(f"get io state {io_device.config.id}", io_device.read))
                 except Exception:
                     log.exception("Fehler im loadvars-Modul")
         except Exception:
             log.exception("Fehler im loadvars-Modul")
         finally:
-            return threads
+            return tasks
 
-    def _set_io(self) -> List[Thread]:
-        threads = []  # type: List[Thread]
+    def _set_io(self) -> List[Task]:
+        tasks = []  # type: List[Task]
         try:
             for io_device in data.data.system_data.values():
                 try:
                     if isinstance(io_device, AbstractIoDevice):
-                        threads.append(Thread(target=update_values, args=(io_device,), name="publish io state"))
+                        tasks.append(Task(f"publish io state {io_device.config.id}", update_values, (io_device,)))
                 except Exception:
                     log.exception("Fehler im loadvars-Modul")
         except Exception:
             log.exception("Fehler im loadvars-Modul")
         finally:
-            return threads
+            return tasks
 
     def ep_get_prices(self):
         def append_thread_set_values(module_name: str) -> None:
             module = getattr(data.data.optional_data, f"{module_name}_module")
             if module:
-                threads_set_values.append(Thread(target=module.update, args=(),
-                                          name=f"update values {module_name}_module"))
+                tasks.append(Task(f"update values {module_name}_module", module.update))
             else:
                 # Wenn kein Modul konfiguriert ist, Fehlerstatus zurücksetzen.
                 module_data = getattr(data.data.optional_data.data.electricity_pricing, f"{module_name}")
@@ -149,10 +159,10 @@ class Loadvars:
 
         try:
             if data.data.optional_data.et_price_update_required():
-                threads_set_values = []
+                tasks: List[Task] = []
                 append_thread_set_values("flexible_tariff")
                 append_thread_set_values("grid_fee")
-                joined_thread_handler(threads_set_values, None)
+                self.task_pool.run(tasks, None)
                 wait_for_module_update_completed(self.event_module_update_completed,
                                                  "openWB/set/optional/ep/module_update_completed")
                 data.data.copy_data()
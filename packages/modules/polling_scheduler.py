@@ -0,0 +1,179 @@
+""" Plant die Abfragen der Geräte. Jedes Gerät erhält eine Priorität und ein eigenes Abfrageintervall. Geräte, deren
+Werte die Regelung benötigt, werden in jedem Regelzyklus abgefragt. Geräte, deren Werte nur für Statistik und Anzeige
+verwendet werden, seltener. Für nicht abgefragte Geräte werden die zuletzt gelesenen Werte veröffentlicht.
+
+Die Dauer der Abfragen wird gemessen. Geräte, deren Abfrage länger als der Timeout im Regelzyklus dauert, werden zu
+Beginn des Regelzyklus im Hintergrund gestartet, ohne auf sie zu warten. Ihre Werte werden veröffentlicht, sobald die
+Abfrage beendet ist.
+"""
+from dataclasses import dataclass
+from enum import Enum
+import logging
+from threading import Lock
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from control import data
+from helpermodules import timecheck
+from helpermodules.pub import Pub
+from helpermodules.utils import Task, TaskPool
+from modules.common.abstract_device import AbstractDevice
+from modules.common.utils.component_parser import get_component_obj_by_id
+
+log = logging.getLogger(__name__)
+
+# Abfrageintervall in Sekunden für Geräte, deren Werte nicht für die Regelung benötigt werden
+RELAXED_PERIOD = 30
+# Gewichtung der letzten Abfragedauer im gleitenden Mittel der Abfragedauer
+LATENCY_WEIGHT = 0.3
+
+
+class PollingPriority(Enum):
+    CRITICAL = "critical"  # Werte werden für die Regelung benötigt
+    RELAXED = "relaxed"  # Werte werden nur für Statistik und Anzeige benötigt
+
+
+@dataclass
+class PollingState:
+    priority: PollingPriority
+    period: float
+    # gleitendes Mittel der Abfragedauer in Sekunden
+    latency: Optional[float] = None
+    # Zeitpunkte (time.monotonic) des letzten Starts und der letzten erfolgreichen Abfrage
+    last_start: Optional[float] = None
+    last_read: Optional[float] = None
+    # Zeitstempel der letzten erfolgreichen Abfrage für die Anzeige
+    timestamp: Optional[float] = None
+    background: bool = False
+    published: Optional[Dict] = None
+
+
+def _is_below_virtual_counter(id: int) -> bool:
+    """ Virtuelle Zähler berechnen ihre Werte aus den untergeordneten Komponenten, auch aus Wechselrichtern."""
+    for counter in data.data.counter_all_data.get_counters_to_check(id):
+        component = get_component_obj_by_id(int(counter[7:]))
+        if component is not None and component.component_config.type == "virtual":
+            return True
+    return False
+
+
+def get_priority(device: AbstractDevice) -> PollingPriority:
+    """ Wechselrichter werden für die Regelung benötigt, wenn ein Speicher konfiguriert ist (Hybrid-Systeme,
+    Speicherbegrenzung) oder ein übergeordneter virtueller Zähler aus ihnen berechnet wird, sonst dienen sie nur der
+    Statistik.
+    """
+    components = [component.component_config for component in device.components.values()]
+    if (components and all("inverter" in component.type for component in components) and
+            not data.data.bat_all_data.data.config.configured and
+            not any(_is_below_virtual_counter(component.id) for component in components)):
+        return PollingPriority.RELAXED
+    return PollingPriority.CRITICAL
+
+
+class PollingScheduler:
+    def __init__(self, task_pool: TaskPool) -> None:
+        self.task_pool = task_pool
+        self.states: Dict[str, PollingState] = {}
+        self._lock = Lock()
+
+    def schedule(self, devices: Iterable[AbstractDevice], control_interval: float) -> List[Task]:
+        """ startet die fälligen langsamen Geräte im Hintergrund.
+
+        Return
+        ------
+        Aufgaben der übrigen fälligen Geräte, die im Regelzyklus abgearbeitet werden müssen. Geräte, deren Werte die
+        Regelung benötigt, und langsame Geräte stehen vorne, damit sie zuerst gestartet werden.
+        """
+        now = time.monotonic()
+        timeout = control_interval / 3
+        foreground: List[Task] = []
+        background: List[Task] = []
+        sort_keys: Dict[str, tuple] = {}
+        keys = set()
+        states: Dict[int, PollingState] = {}
+        for device in devices:
+            try:
+                key = f"device{device.device_config.id}"
+                keys.add(key)
+                state = self._update_state(key, get_priority(device), control_interval)
+                states[device.device_config.id] = state
+                if not self._is_due(state, now, control_interval):
+                    log.debug(f"Gerät {device.device_config.name} wird nicht abgefragt, Werte von vor "
+                              f"{self.get_age(key, now)}s werden verwendet.")
+                    continue
+                task = Task(key, self._poll, (key, device.update))
+                if self.task_pool.is_running(key):
+                    # Abfrage läuft noch aus einem vorherigen Regelzyklus
+                    log.debug(f"Abfrage von Gerät {device.device_config.name} läuft noch, Werte von vor "
+                              f"{self.get_age(key, now)}s werden verwendet.")
+                    continue
+                state.last_start = now
+                state.background = state.latency is not None and state.latency > timeout
+                if state.background:
+                    background.append(task)
+                else:
+                    sort_keys[key] = (state.priority != PollingPriority.CRITICAL, -(state.latency or 0))
+                    foreground.append(task)
+            except Exception:
+                log.exception(f"Fehler bei der Abfrageplanung von Gerät {device}")
+        with self._lock:
+            for key in self.states.keys() - keys:
+                del self.states[key]
+        self.task_pool.start(background)
+        for device_id, state in states.items():
+            self._publish(device_id, state)
+        foreground.sort(key=lambda task: sort_keys[task.key])
+        return foreground
+
+    def get_age(self, key: str, now: Optional[float] = None) -> Optional[float]:
+        """ Alter der zuletzt gelesenen Werte in Sekunden"""
+        with self._lock:
+            state = self.states.get(key)
+            if state is None or state.last_read is None:
+                return None
+            return round((now or time.monotonic()) - state.last_read, 1)
+
+    def _update_state(self, key: str, priority: PollingPriority, control_interval: float) -> PollingState:
+        period = control_interval if priority == PollingPriority.CRITICAL else max(RELAXED_PERIOD, control_interval)
+        with self._lock:
+            state = self.states.get(key)
+            if state is None:
+                state = self.states[key] = PollingState(priority, period)
+            else:
+                state.priority, state.period = priority, period
+            return state
+
+    @staticmethod
+    def _is_due(state: PollingState, now: float, control_interval: float) -> bool:
+        # Der Regelzyklus wird nicht exakt im Regelintervall gestartet, daher ein halbes Intervall Toleranz.
+        return (state.priority == PollingPriority.CRITICAL or state.last_start is None or
+                now - state.last_start + control_interval / 2 >= state.period)
+
+    def _poll(self, key: str, update: Callable[[], None]) -> None:
+        start = time.monotonic()
+        try:
+            update()
+            with self._lock:
+                state = self.states.get(key)
+                if state is not None:
+                    state.last_read = time.monotonic()
+                    state.timestamp = timecheck.create_timestamp()
+        finally:
+            duration = time.monotonic() - start
+            with self._lock:
+                state = self.states.get(key)
+                if state is not None:
+                    state.latency = (duration if state.latency is None else
+                                     LATENCY_WEIGHT * duration + (1 - LATENCY_WEIGHT) * state.latency)
+
+    def _publish(self, device_id: int, state: PollingState) -> None:
+        with self._lock:
+            payload = {"priority": state.priority.value,
+                       "period": state.period,
+                       "latency": round(state.latency, 2) if state.latency is not None else None,
+                       "background": state.background,
+                       "timestamp": state.timestamp}
+            if payload == state.published:
+                return
+            state.published = payload
+        Pub().pub(f"openWB/system/device/{device_id}/polling", payload)
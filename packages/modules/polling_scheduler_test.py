@@ -0,0 +1,112 @@
+from threading import Event
+from types import SimpleNamespace
+from typing import List
+from unittest.mock import Mock
+
+import pytest
+
+from control import data
+from helpermodules.utils import TaskPool
+from modules.common.abstract_device import AbstractDevice
+from modules import polling_scheduler
+from modules.polling_scheduler import PollingPriority, PollingScheduler
+
+
+@pytest.fixture(autouse=True)
+def setup_data() -> None:
+    data.data_init(Mock())
+
+
+def device(id: int, types: List[str], update=None) -> SimpleNamespace:
+    components = {f"component{id * 10 + i}": SimpleNamespace(component_config=SimpleNamespace(type=t, id=id * 10 + i))
+                  for i, t in enumerate(types)}
+    return SimpleNamespace(device_config=SimpleNamespace(id=id, name=f"Gerät {id}"), components=components,
+                           update=update or Mock())
+
+
+@pytest.mark.parametrize("types, bat_configured, expected",
+                         [pytest.param(["counter", "inverter"], False, PollingPriority.CRITICAL, id="Zähler"),
+                          pytest.param(["inverter"], False, PollingPriority.RELAXED, id="nur Statistik"),
+                          pytest.param(["inverter"], True, PollingPriority.CRITICAL, id="Speicher vorhanden")])
+def test_get_priority(types, bat_configured, expected):
+    # setup
+    data.data.bat_all_data.data.config.configured = bat_configured
+
+    # execution
+    priority = polling_scheduler.get_priority(device(1, types))
+
+    # evaluation
+    assert priority == expected
+
+
+def test_inverter_below_virtual_counter_is_critical():
+    # setup
+    virtual_counter = Mock(spec=AbstractDevice, components={
+        "component2": SimpleNamespace(component_config=SimpleNamespace(type="virtual", id=2))})
+    data.data.system_data["device1"] = virtual_counter
+    data.data.counter_all_data.data.get.hierarchy = [
+        {"id": 0, "type": "counter", "children": [
+            {"id": 2, "type": "counter", "children": [{"id": 30, "type": "inverter", "children": []}]},
+            {"id": 40, "type": "inverter", "children": []}]}]
+
+    # execution
+    below_virtual_counter = polling_scheduler.get_priority(device(3, ["inverter"]))
+    below_grid_counter = polling_scheduler.get_priority(device(4, ["inverter"]))
+
+    # evaluation
+    assert below_virtual_counter == PollingPriority.CRITICAL
+    assert below_grid_counter == PollingPriority.RELAXED
+
+
+def test_relaxed_devices_serve_cached_values(monkeypatch, mock_pub: Mock):
+    # setup
+    now = Mock(return_value=100)
+    monkeypatch.setattr(polling_scheduler.time, "monotonic", now)
+    scheduler = PollingScheduler(TaskPool("test", max_workers=2))
+    devices = [device(1, ["counter"]), device(2, ["inverter"])]
+
+    # execution
+    first = scheduler.schedule(devices, 10)
+    for task in first:
+        task.target(*task.args)
+    now.return_value = 110
+    second = [task.key for task in scheduler.schedule(devices, 10)]
+    now.return_value = 130
+    third = [task.key for task in scheduler.schedule(devices, 10)]
+
+    # evaluation
+    assert [task.key for task in first] == ["device1", "device2"]
+    assert second == ["device1"]
+    assert third == ["device1", "device2"]
+    assert scheduler.get_age("device2", 130) == 30
+    topics = {c.args[0]: c.args[1] for c in mock_pub.pub.call_args_list}
+    assert topics["openWB/system/device/2/polling"]["priority"] == "relaxed"
+    assert topics["openWB/system/device/2/polling"]["period"] == 30
+
+
+def test_slow_device_runs_in_background():
+    # setup
+    pool = TaskPool("test", max_workers=2)
+    scheduler = PollingScheduler(pool)
+    release = Event()
+    slow = device(1, ["counter"], Mock(side_effect=lambda: release.wait(5)))
+    fast = device(2, ["counter"])
+    pool.run(scheduler.schedule([slow, fast], 0.3), 0.1)
+
+    # execution
+    second = scheduler.schedule([slow, fast], 0.3)
+    release.set()
+    pool.run(second, 1)
+    while pool.is_running("device1"):
+        release.wait(0.01)
+    third = scheduler.schedule([slow, fast], 0.3)
+    while pool.is_running("device1"):
+        release.wait(0.01)
+
+    # evaluation
+    # die erste Abfrage läuft noch, daher wird das langsame Gerät nicht erneut gestartet
+    assert [task.key for task in second] == ["device2"]
+    # das langsame Gerät wird im Hintergrund gestartet, ohne im Regelzyklus darauf zu warten
+    assert [task.key for task in third] == ["device2"]
+    assert scheduler.states["device1"].background is True
+    assert slow.update.call_count == 2
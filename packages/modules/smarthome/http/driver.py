@@ -0,0 +1,81 @@
+import logging
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from requests import Session
+from requests.exceptions import HTTPError, RequestException
+
+from modules.common import req
+
+log = logging.getLogger("http")
+
+TIMEOUT = 5
+
+
+def _add_scheme(url: str) -> str:
+    if not urlparse(url).scheme:
+        url = 'http://' + url
+    return url
+
+
+class HttpDriver:
+    def __init__(self, devicenumber: int, uberschuss: int, url: str, urlc: str = "none", urlstate: str = "none",
+                 session: Optional[Session] = None) -> None:
+        self.devicenumber = devicenumber
+        self.uberschuss = uberschuss
+        self.url = _add_scheme(url)
+        self.urlc = urlc
+        self.urlstate = urlstate if urlstate.startswith("none") else _add_scheme(urlstate)
+        self.session = session or req.get_http_session()
+
+    @classmethod
+    def from_args(cls, args: List[str], session: Optional[Session] = None) -> "HttpDriver":
+        """ Parameter wie beim Aufruf von watt.py, on.py und off.py: devicenumber, 0, uberschuss, url, urlc, 0, 0,
+        urlstate"""
+        try:
+            urlc = str(args[4])
+        except Exception:
+            urlc = "none"
+        try:
+            urlstate = str(args[7])
+        except Exception:
+            urlstate = "none"
+        return cls(int(args[0]), int(args[2]), str(args[3]), urlc, urlstate, session)
+
+    def _read_state(self) -> int:
+        stateurl_response: Any = 0
+        try:
+            stateurl_response = self.session.get(self.urlstate, timeout=TIMEOUT).text
+        except HTTPError as e:
+            log.info('watt StateURL HTTP Error: %d' % (e.response.status_code))
+        except RequestException as e:
+            log.info('watt StateURL URL Error: %s' % (e))
+        try:
+            return int(stateurl_response)
+        except ValueError:
+            log.info('watt StateURL delivered no integer but: %s' % (stateurl_response))
+            return 0
+
+    def watt(self) -> Dict[str, Any]:
+        urlrep = self.url.replace("<openwb-ueberschuss>", str(max(self.uberschuss, 0)))
+        log.info('watt devicenr %d orig url %s replaced url %s urlc %s urlstate %s' %
+                 (self.devicenumber, self.url, urlrep, self.urlc, self.urlstate))
+        state = 0 if self.urlstate.startswith("none") else self._read_state()
+        try:
+            aktpower = int(float(self.session.get(urlrep, timeout=TIMEOUT).text))
+        except HTTPError as e:
+            raise ValueError(f"Keine Daten von {urlrep}") from e
+        if state == 1 or aktpower > 50:
+            relais = 1
+        else:
+            relais = 0
+        if len(self.urlc) < 6:
+            powerc = 0
+        else:
+            powerc = int(float(self.session.get(_add_scheme(self.urlc), timeout=TIMEOUT).text))
+        return {"power": aktpower, "powerc": powerc, "on": relais}
+
+    def send(self) -> None:
+        """ ruft die übergebene Ein- bzw. Ausschalt-URL auf"""
+        log.info('on/off devicenr %d url %s' % (self.devicenumber, self.url))
+        self.session.get(self.url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=TIMEOUT)
@@ -0,0 +1,32 @@
+from typing import Any, Dict, List, Optional
+
+from requests import Session
+
+from modules.common import req
+
+TIMEOUT = 3
+
+
+class MystromDriver:
+    def __init__(self, ipadr: str, session: Optional[Session] = None) -> None:
+        self.ipadr = ipadr
+        self.session = session or req.get_http_session()
+
+    @classmethod
+    def from_args(cls, args: List[str], session: Optional[Session] = None) -> "MystromDriver":
+        """ Parameter wie beim Aufruf von watt.py, on.py und off.py: devicenumber, ipadr, uberschuss"""
+        return cls(str(args[1]), session)
+
+    def watt(self) -> Dict[str, Any]:
+        answer = self.session.get("http://"+str(self.ipadr)+"/report", timeout=TIMEOUT).json()
+        aktpower = int(answer['power'])
+        relaiss = str(answer['relay'])
+        if (relaiss.lower() == "true"):
+            relais = 1
+        else:
+            relais = 0
+        templong = str(float(answer['temperature']))
+        return {"power": aktpower, "powerc": 0, "on": relais, "temp0": templong[0:5]}
+
+    def switch(self, on: bool) -> None:
+        self.session.get("http://"+str(self.ipadr)+"/relay?state=" + ("1" if on else "0"), timeout=TIMEOUT)
@@ -1,28 +1,8 @@
 #!/usr/bin/python3
-import logging
-import sys
-import time
 import json
-import urllib.request
+import sys
 
-log = logging.getLogger(__name__)
+from modules.smarthome.mystrom.driver import MystromDriver
+from smarthome.smartret import writeret
 
-named_tuple = time.localtime()  # getstruct_time
-time_string = time.strftime("%m/%d/%Y, %H:%M:%S mystrom watty.py", named_tuple)
-devicenumber = str(sys.argv[1])
-ipadr = str(sys.argv[2])
-uberschuss = int(sys.argv[3])
-answer = json.loads(str(urllib.request.urlopen("http://"+str(ipadr)+"/report", timeout=3).read().decode("utf-8")))
-aktpower = int(answer['power'])
-relaiss = str(answer['relay'])
-if (relaiss.lower() == "true"):
-    relais = 1
-else:
-    relais = 0
-templong = str(float(answer['temperature']))
-temp = templong[0:5]
-powerc = 0
-answer = '{"power":' + str(aktpower) + ',"powerc":' + str(powerc) + ',"on":' + \
-    str(relais) + ',"temp0":' + str(temp) + '} '
-with open('/var/www/html/openWB/ramdisk/smarthome_device_ret' + str(devicenumber), 'w') as f1:
-    json.dump(answer, f1)
+writeret(json.dumps(MystromDriver.from_args(sys.argv[1:]).watt()), int(sys.argv[1]))
@@ -0,0 +1,181 @@
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from requests import Session
+
+from modules.common import req
+
+log = logging.getLogger(__name__)
+
+RAMDISK_PREFIX = '/var/www/html/openWB/ramdisk/smarthome_device_ret.'
+TIMEOUT = 3
+
+
+def totalPowerFromShellyJson(answer: Any, workchan: int) -> int:
+    if (workchan == 0):
+        if 'meters' in answer:
+            meters = answer['meters']   # shelly
+        else:
+            meters = answer['emeters']  # shellyEM & shelly3EM
+        total = 0
+        # shellyEM has one meter, shelly3EM has three meters:
+        for meter in meters:
+            total = total + meter['power']
+        return int(total)
+    workchan = workchan - 1
+    try:
+        total = int(answer['meters'][workchan]['power'])   # Abfrage shelly
+    except Exception:
+        total = int(answer['emeters'][workchan]['power'])  # Abfrage shellyEM
+    return int(total)
+
+
+class ShellyDriver:
+    # Generation und Modell je IP, damit die Datei in der Ramdisk nur einmal gelesen wird
+    _info: Dict[str, Tuple[str, str]] = {}
+
+    def __init__(self, ipadr: str, chan: int, shaut: int, user: str, pw: str,
+                 session: Optional[Session] = None) -> None:
+        self.ipadr = ipadr
+        # chan = 0 alle Meter, Kan 0
+        # chan = 1 meter 1, Kan 0
+        # chan = 2 meter 2, kan 1
+        self.chan = chan
+        self.auth = (user, pw) if shaut == 1 else None
+        self.session = session or req.get_http_session()
+
+    @classmethod
+    def from_args(cls, args: List[str], session: Optional[Session] = None) -> "ShellyDriver":
+        """ Parameter wie beim Aufruf von watt.py, on.py und off.py: devicenumber, ipadr, uberschuss, chan, shaut,
+        user, pw"""
+        try:
+            chan = int(args[3])
+        except Exception:
+            chan = 0
+        return cls(str(args[1]), chan, int(args[4]), str(args[5]), str(args[6]), session)
+
+    def _get(self, url: str, auth: bool = False) -> Any:
+        return self.session.get(url, timeout=TIMEOUT, auth=self.auth if auth else None).json()
+
+    def _read_info(self, fetch: bool) -> Tuple[str, str]:
+        """ lesen endpoint, gen bestimmen. gen 1 hat unter Umstaenden keinen Eintrag"""
+        info = self._info.get(self.ipadr)
+        if info is not None:
+            return info
+        gen = '1'
+        model = '???'
+        fnameg = RAMDISK_PREFIX + str(self.ipadr) + '_shelly_infogv1'
+        if os.path.isfile(fnameg):
+            with open(fnameg, 'r') as f:
+                jsonin = json.loads(f.read())
+                gen = str(jsonin['gen'])
+                model = str(jsonin['model'])
+        elif fetch:
+            agen = self._get("http://" + str(self.ipadr) + "/shelly")
+            with open(RAMDISK_PREFIX + str(self.ipadr) + '_shelly_info', 'w') as f:
+                json.dump(agen, f)
+            if 'gen' in agen:
+                gen = str(int(agen['gen']))
+            if 'model' in agen:
+                model = str(agen['model'])
+            elif 'type' in agen:
+                model = str(agen['type'])
+            with open(fnameg, 'w') as f:
+                f.write(json.dumps({"gen": str(gen), "model": str(model)}))
+        else:
+            return gen, model
+        self._info[self.ipadr] = (gen, model)
+        return gen, model
+
+    def watt(self) -> Dict[str, Any]:
+        # Setze Default-Werte, andernfalls wird der letzte Wert ewig fortgeschrieben.
+        # Insbesondere wichtig für aktuelle Leistung
+        # Zähler wird beim Neustart auf 0 gesetzt, darf daher nicht übergeben werden.
+        powerc = 0
+        temps = ['0.0', '0.0', '0.0']
+        aktpower = 0
+        relais = 0
+        gen, model = self._read_info(fetch=True)
+        answer: Any = None
+        # Versuche Daten von Shelly abzurufen.
+        try:
+            if (gen == "1"):
+                answer = self._get("http://" + str(self.ipadr) + "/status", auth=True)
+            else:
+                answer = self._get("http://" + str(self.ipadr) + "/rpc/Shelly.GetStatus")
+            with open(RAMDISK_PREFIX + str(self.ipadr) + '_shelly', 'w') as f:
+                f.write(str(answer))
+        except Exception:
+            log.debug("failed to connect to device on " + self.ipadr + ", setting all values to 0")
+        #  Versuche Werte aus der Antwort zu extrahieren.
+        if (self.chan > 0):
+            workchan = self.chan - 1
+        else:
+            workchan = self.chan
+        try:
+            if (gen == "1"):
+                aktpower = totalPowerFromShellyJson(answer, self.chan)
+            else:
+                sw = 'switch:' + str(workchan)
+                if ("SPEM-003CE" in model or "S3EM-003CXCEU63" in model):
+                    if (workchan == 1):
+                        aktpower = int(answer['em:0']['a_act_power'])
+                    elif (workchan == 2):
+                        aktpower = int(answer['em:0']['b_act_power'])
+                    elif (workchan == 3):
+                        aktpower = int(answer['em:0']['c_act_power'])
+                    else:
+                        aktpower = int(answer['em:0']['total_act_power'])
+                elif ("PM-001PCEU16" in model):
+                    #   "SNPM-001PCEU16" (gen 2) und "S3PM-001PCEU16" (gen 3)
+                    aktpower = int(answer['pm1:0']['apower'])
+                else:
+                    aktpower = int(answer[sw]['apower'])
+        except Exception:
+            pass
+
+        try:
+            if (gen == "1"):
+                relais = int(answer['relays'][workchan]['ison'])
+            else:
+                # shelly pro 3em mit add on hat fix id 100 als switch Kanal, das Device muss auf jeden fall mit
+                # separater Leistunsmessung erfasst werden, da die Leistung auf drei verschieden Kanäle angeliefert
+                # werden kann
+                sw = 'switch:' + str(100 if "SPEM-003CE" in model else workchan)
+                relais = int(answer[sw]['output'])
+        except Exception:
+            pass
+
+        for i in range(3):
+            try:
+                if gen == "1":
+                    temps[i] = str(answer['ext_temperature'][str(i)]['tC'])
+                else:
+                    temps[i] = str(answer['temperature:10' + str(i)]['tC'])
+            except Exception:
+                pass
+        return {"power": aktpower, "powerc": powerc, "on": relais, "temp0": temps[0], "temp1": temps[1],
+                "temp2": temps[2]}
+
+    def switch(self, on: bool) -> None:
+        gen, model = self._read_info(fetch=False)
+        chan = self.chan
+        if (gen == "1"):
+            if (chan == 0):
+                url = "http://" + str(self.ipadr) + "/relay/0?turn=" + ("on" if on else "off")
+            else:
+                chan = chan - 1
+                url = "http://" + str(self.ipadr) + "/relay/" + str(chan) + "?turn=" + ("on" if on else "off")
+        else:
+            if (chan > 0):
+                chan = chan - 1
+            # shelly pro 3em mit add on hat fix id 100 als switch Kanal, das Device muss auf jeden fall mit separater
+            # Leistunsmessung erfasst werden, da die Leistung auf drei verschiedenenen Kanälen angeliefert werden kann
+            if ("SPEM-003CE" in model):
+                chan = 100
+            # gen 2 will das als on cmd /rpc/Switch.Set?id=100&on=true
+            url = ("http://" + str(self.ipadr) + "/rpc/Switch.Set?id=" + str(chan) + "&on=" +
+                   ("true" if on else "false"))
+        self.session.get(url, timeout=TIMEOUT, auth=self.auth)
@@ -0,0 +1,37 @@
+from typing import Any, Dict, List, Optional
+
+from requests import Session
+
+from modules.common import req
+
+TIMEOUT = 3
+
+
+class TasmotaDriver:
+    def __init__(self, ipadr: str, session: Optional[Session] = None) -> None:
+        self.ipadr = ipadr
+        self.session = session or req.get_http_session()
+
+    @classmethod
+    def from_args(cls, args: List[str], session: Optional[Session] = None) -> "TasmotaDriver":
+        """ Parameter wie beim Aufruf von watt.py, on.py und off.py: devicenumber, ipadr, uberschuss"""
+        return cls(str(args[1]), session)
+
+    def watt(self) -> Dict[str, Any]:
+        relais = 0
+        try:
+            answer2 = self.session.get("http://"+str(self.ipadr)+"/cm?cmnd=Status", timeout=TIMEOUT).json()
+            r_status = int(answer2['Status']['Power'])
+        except Exception:
+            r_status = 0
+        answer = self.session.get("http://"+str(self.ipadr)+"/cm?cmnd=Status%208", timeout=TIMEOUT).json()
+        try:
+            aktpower = int(answer['StatusSNS']['ENERGY']['Power'])
+        except Exception:
+            aktpower = 0
+        if (aktpower > 50) or (r_status == 1):
+            relais = 1
+        return {"power": aktpower, "powerc": 0, "on": relais}
+
+    def switch(self, on: bool) -> None:
+        self.session.get("http://"+str(self.ipadr)+"/cm?cmnd=Power%20" + ("on" if on else "off"), timeout=TIMEOUT)
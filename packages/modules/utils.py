@@ -1,5 +1,8 @@
+from dataclasses import dataclass
 import logging
 from threading import Event
+import time
+from typing import Dict
 
 from control import data
 from helpermodules import pub
@@ -7,9 +10,46 @@ from helpermodules import pub
 log = logging.getLogger(__name__)
 
 
+@dataclass
+class BarrierStatistics:
+    waited: int = 0
+    skipped: int = 0
+    wait_time: float = 0
+
+
+# Topic der Rückmeldung: Sequenznummer der Nachrichten an openWB/set/, die mit der letzten Rückmeldung bestätigt wurde
+_confirmed_sequences: Dict[str, int] = {}
+barrier_statistics = BarrierStatistics()
+
+
 def wait_for_module_update_completed(event_module_update_completed: Event, topic: str):
+    """ wartet, bis alle zuvor veröffentlichten Werte von SetData verarbeitet und in SubData angekommen sind. Dazu
+    wird eine Rückmeldung über den Broker geschickt. Wurde seit der letzten bestätigten Rückmeldung keine Nachricht an
+    openWB/set/ veröffentlicht, liegen bereits alle Werte in SubData vor und das Warten entfällt.
+    """
+    sequence = pub.Pub().set_sequence
+    if event_module_update_completed.is_set() and _confirmed_sequences.get(topic) == sequence:
+        barrier_statistics.skipped += 1
+        return
     timeout = data.data.general_data.data.control_interval/2
+    start = time.monotonic()
     event_module_update_completed.clear()
-    pub.Pub().pub(topic, True)
+    # Die Rückmeldung darf nicht gepuffert werden, sonst wird sie erst nach dem Warten veröffentlicht.
+    pub.Pub().pub_immediately(topic, True)
     if event_module_update_completed.wait(timeout) is False:
         log.error("Daten wurden noch nicht vollständig empfangen. Timeout abgelaufen, fortsetzen der Regelung.")
+    else:
+        # Die Rückmeldung selbst erhöht die Sequenznummer. Hat ein anderer Thread in der Zwischenzeit veröffentlicht,
+        # stimmt die Nummer beim nächsten Aufruf nicht überein und es wird erneut gewartet.
+        _confirmed_sequences[topic] = sequence + 1
+        barrier_statistics.waited += 1
+        barrier_statistics.wait_time += time.monotonic() - start
+
+
+def log_barrier_statistics() -> None:
+    global barrier_statistics
+    stats = barrier_statistics
+    barrier_statistics = BarrierStatistics()
+    mean_wait_time = stats.wait_time / stats.waited if stats.waited else 0
+    log.debug(f"Rückmeldungen über den Broker: {stats.waited} abgewartet ({round(stats.wait_time, 3)}s), "
+              f"{stats.skipped} übersprungen (ca. {round(stats.skipped * mean_wait_time, 3)}s eingespart)")
@@ -0,0 +1,144 @@
+from threading import Event, Thread
+from unittest.mock import Mock
+
+import paho.mqtt.client as mqtt
+import pytest
+
+from control import data
+from helpermodules import pub
+from helpermodules.pub import PubBatchContext, PubSingleton
+from helpermodules.setdata import SetData
+from modules import utils
+from modules.utils import wait_for_module_update_completed
+
+TOPIC = "openWB/set/system/device/module_update_completed"
+
+
+@pytest.fixture(autouse=True)
+def setup(monkeypatch) -> Event:
+    data.data_init(Mock())
+    monkeypatch.setattr(utils, "_confirmed_sequences", {})
+    event = Event()
+
+    def publish(topic, payload):
+        pub.Pub.instance.set_sequence += 1
+        # SubData meldet den Empfang der Rückmeldung
+        event.set()
+    pub.Pub.instance.set_sequence = 0
+    pub.Pub.instance.pub_immediately = Mock(side_effect=publish)
+    return event
+
+
+def test_skips_round_trip_without_new_set_messages(setup: Event):
+    # execution
+    wait_for_module_update_completed(setup, TOPIC)
+    wait_for_module_update_completed(setup, TOPIC)
+
+    # evaluation
+    assert pub.Pub.instance.pub_immediately.call_count == 1
+
+
+def test_round_trip_after_new_set_message(setup: Event):
+    # setup
+    wait_for_module_update_completed(setup, TOPIC)
+
+    # execution
+    pub.Pub.instance.set_sequence += 1
+    wait_for_module_update_completed(setup, TOPIC)
+
+    # evaluation
+    assert pub.Pub.instance.pub_immediately.call_count == 2
+
+
+def test_round_trip_after_timeout(setup: Event):
+    # setup
+    data.data.general_data.data.control_interval = 0
+    pub.Pub.instance.pub_immediately = Mock()
+
+    # execution
+    wait_for_module_update_completed(setup, TOPIC)
+    wait_for_module_update_completed(setup, TOPIC)
+
+    # evaluation
+    assert pub.Pub.instance.pub_immediately.call_count == 2
+
+
+def test_skips_round_trip_with_setdata_clear(setup: Event, monkeypatch):
+    # setup
+    monkeypatch.setattr(pub, "InternalBrokerPublisher", Mock())
+    pub_singleton = PubSingleton()
+    monkeypatch.setattr(pub.Pub, "instance", pub_singleton)
+    monkeypatch.setattr(utils, "barrier_statistics", utils.BarrierStatistics())
+    setdata = SetData(Event(), Event(), Event(), Event())
+
+    def process(topic: str, payload: str) -> None:
+        # SetData verarbeitet die Nachricht und löscht das set-Topic, SubData meldet den Empfang der Rückmeldung.
+        msg = mqtt.MQTTMessage(topic=topic.encode())
+        msg.payload = payload.encode()
+        setdata.on_message(None, None, msg)
+        if topic == TOPIC:
+            setup.set()
+
+    def broker(topic, payload, qos, retain):
+        if topic.startswith("openWB/set/") and payload != "":
+            Thread(target=process, args=(topic, payload)).start()
+    pub_singleton.publisher.client.publish.side_effect = broker
+
+    # execution
+    wait_for_module_update_completed(setup, TOPIC)
+    wait_for_module_update_completed(setup, TOPIC)
+    pub_singleton.pub("openWB/set/counter/set/home_consumption", 100.5)
+    wait_for_module_update_completed(setup, TOPIC)
+
+    # evaluation
+    sentinels = [c for c in pub_singleton.publisher.client.publish.call_args_list if c.args == (TOPIC, "true")]
+    assert len(sentinels) == 2
+    assert utils.barrier_statistics.skipped == 1
+
+
+def test_round_trip_inside_batch(setup: Event, monkeypatch):
+    # setup
+    monkeypatch.setattr(pub, "InternalBrokerPublisher", Mock())
+    pub_singleton = PubSingleton()
+    monkeypatch.setattr(pub.Pub, "instance", pub_singleton)
+    monkeypatch.setattr(utils, "barrier_statistics", utils.BarrierStatistics())
+    data.data.general_data.data.control_interval = 1
+
+    def broker(topic, payload, qos, retain):
+        if topic == TOPIC:
+            setup.set()
+    pub_singleton.publisher.client.publish.side_effect = broker
+
+    # execution
+    with PubBatchContext():
+        pub_singleton.pub("openWB/set/counter/0/get/power", 1000)
+        wait_for_module_update_completed(setup, TOPIC)
+
+    # evaluation
+    assert [c.args[0] for c in pub_singleton.publisher.client.publish.call_args_list] == [
+        "openWB/set/counter/0/get/power", TOPIC]
+    assert utils.barrier_statistics.waited == 1
+
+
+def test_skips_round_trip_after_suppressed_publish(setup: Event, monkeypatch):
+    # setup
+    monkeypatch.setattr(pub, "InternalBrokerPublisher", Mock())
+    pub_singleton = PubSingleton()
+    monkeypatch.setattr(pub.Pub, "instance", pub_singleton)
+    monkeypatch.setattr(utils, "barrier_statistics", utils.BarrierStatistics())
+
+    def broker(topic, payload, qos, retain):
+        if topic == TOPIC:
+            setup.set()
+    pub_singleton.publisher.client.publish.side_effect = broker
+
+    # execution
+    pub_singleton.pub("openWB/set/counter/0/get/power", 1000, suppress_unchanged=True)
+    wait_for_module_update_completed(setup, TOPIC)
+    # unveränderter Wert wird nicht gesendet
+    pub_singleton.pub("openWB/set/counter/0/get/power", 1000, suppress_unchanged=True)
+    wait_for_module_update_completed(setup, TOPIC)
+
+    # evaluation
+    assert utils.barrier_statistics.waited == 1
+    assert utils.barrier_statistics.skipped == 1
@@ -1,8 +1,7 @@
 #!/usr/bin/env python3
 import logging
 
-from helpermodules.broker import BrokerClient
-from helpermodules.utils.topic_parser import decode_payload
+from helpermodules.broker_cache import topic_cache
 from modules.vehicles.mqtt.config import MqttSocSetup
 from modules.common.abstract_device import DeviceDescriptor
 from modules.common.abstract_vehicle import VehicleUpdateData
@@ -14,15 +13,10 @@ log = logging.getLogger(__name__)
 
 def create_vehicle(vehicle_config: MqttSocSetup, vehicle: int):
     def updater(vehicle_update_data: VehicleUpdateData) -> CarState:
-        def on_connect(client, userdata, flags, rc):
-            client.subscribe(f"openWB/mqtt/vehicle/{vehicle}/get/#")
-
-        def on_message(client, userdata, message):
-            received_topics.update({message.topic: decode_payload(message.payload)})
-
-        received_topics = {}
-        BrokerClient(f"subscribeMqttVehicle{vehicle}",
-                     on_connect, on_message).start_finite_loop()
+        # Der SoC wird nur im Abfrageintervall des Fahrzeugs aktualisiert.
+        max_age = max(configurable_vehicle.general_config.request_interval_charging,
+                      configurable_vehicle.general_config.request_interval_not_charging)
+        received_topics = topic_cache.get(f"openWB/mqtt/vehicle/{vehicle}/get/#", max_age=max_age)
 
         if received_topics:
             log.debug(f"Empfange MQTT Daten für Fahrzeug {vehicle}: {received_topics}")
@@ -32,11 +26,9 @@ def create_vehicle(vehicle_config: MqttSocSetup, vehicle: int):
                             soc_timestamp=received_topics.get(f"{topic_prefix}soc_timestamp"),
                             odometer=received_topics.get(f"{topic_prefix}odometer"))
         else:
-            configurable_vehicle.fault_state.warning(
-                f"Keine MQTT-Daten für Fahrzeug {vehicle_config.name} empfangen oder es werden "
-                "veraltete, abwärtskompatible Topics verwendet. Bitte die Doku in den "
-                "Einstellungen beachten.")
-            return None
+            raise Exception(f"Keine MQTT-Daten für Fahrzeug {vehicle_config.name} in den letzten {max_age}s "
+                            "empfangen oder es werden veraltete, abwärtskompatible Topics verwendet. Bitte die Doku "
+                            "in den Einstellungen beachten.")
     configurable_vehicle = ConfigurableVehicle(vehicle_config=vehicle_config,
                                                component_updater=updater,
                                                vehicle=vehicle,
@@ -3,8 +3,9 @@ import time
 import os
 import subprocess
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from typing import List
+from smarthome.smartdriver import get_driver
 log = logging.getLogger(__name__)
 
 
@@ -13,6 +14,9 @@ class Sbase0:
     _prefixpy = _basePath+'/packages/modules/smarthome/'
 
     def readret(self) -> Dict[str, Any]:
+        if self._driver_answer is not None:
+            answer, self._driver_answer = self._driver_answer, None
+            return answer
         with open(self._basePath+'/ramdisk/smarthome_device_ret' +
                   str(self.device_nummer), 'r') as f1:
             answer = json.loads(json.load(f1))
@@ -125,6 +129,8 @@ class Sbase0:
         self.btchange = 0
         self._mydevicemeasure = 'none'  # type: Any
         self.device_nummer = 0
+        # Antwort eines im Prozess ausgeführten Treibers
+        self._driver_answer = None  # type: Optional[Dict[str, Any]]
 
     def checkbefsend(self) -> int:
         newtime = int(time.time())
@@ -159,6 +165,17 @@ class Sbase0:
                         % (str(e1)))
 
     def callpro(self, argumentList: List[str]) -> None:
+        self._driver_answer = None
+        script = argumentList[1]
+        driver = get_driver(script[len(self._prefixpy):]) if script.startswith(self._prefixpy) else None
+        if driver is not None:
+            try:
+                self._driver_answer = driver(argumentList[2:])
+            except Exception:
+                log.exception("Treiber Fehlermeldung: argumentList %s " % argumentList[1])
+                # ohne Werte, damit nicht die letzte Antwort aus der Ramdisk verwendet wird
+                self._driver_answer = {}
+            return
         try:
             my_env = os.environ.copy()
             my_env["PYTHONPATH"] = "/var/www/html/openWB/packages"
@@ -0,0 +1,34 @@
+""" Treiber, die im Prozess des SmartHome-Handlers ausgeführt werden, statt für jede Messung und jedes Schalten ein
+Skript per python3 zu starten. Das Ergebnis wird direkt zurückgegeben und nicht über die Ramdisk ausgetauscht. Alle
+Treiber verwenden eine gemeinsame HTTP-Session, sodass die Verbindungen zu den Geräten wiederverwendet werden.
+Skripte ohne Eintrag werden weiterhin als eigener Prozess gestartet.
+"""
+from typing import Any, Callable, Dict, List, Optional
+
+from modules.common import req
+from modules.smarthome.http.driver import HttpDriver
+from modules.smarthome.mystrom.driver import MystromDriver
+from modules.smarthome.shelly.driver import ShellyDriver
+from modules.smarthome.tasmota.driver import TasmotaDriver
+
+session = req.get_http_session()
+
+# Skript relativ zu packages/modules/smarthome: Aufruf mit den Parametern des Skripts (ohne Skriptname)
+DRIVERS: Dict[str, Callable[[List[str]], Optional[Dict[str, Any]]]] = {
+    'shelly/watt.py': lambda args: ShellyDriver.from_args(args, session).watt(),
+    'shelly/on.py': lambda args: ShellyDriver.from_args(args, session).switch(True),
+    'shelly/off.py': lambda args: ShellyDriver.from_args(args, session).switch(False),
+    'tasmota/watt.py': lambda args: TasmotaDriver.from_args(args, session).watt(),
+    'tasmota/on.py': lambda args: TasmotaDriver.from_args(args, session).switch(True),
+    'tasmota/off.py': lambda args: TasmotaDriver.from_args(args, session).switch(False),
+    'mystrom/watt.py': lambda args: MystromDriver.from_args(args, session).watt(),
+    'mystrom/on.py': lambda args: MystromDriver.from_args(args, session).switch(True),
+    'mystrom/off.py': lambda args: MystromDriver.from_args(args, session).switch(False),
+    'http/watt.py': lambda args: HttpDriver.from_args(args, session).watt(),
+    'http/on.py': lambda args: HttpDriver.from_args(args, session).send(),
+    'http/off.py': lambda args: HttpDriver.from_args(args, session).send(),
+}
+
+
+def get_driver(script: str) -> Optional[Callable[[List[str]], Optional[Dict[str, Any]]]]:
+    return DRIVERS.get(script)
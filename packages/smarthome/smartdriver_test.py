@@ -0,0 +1,42 @@
+from unittest.mock import Mock
+
+import requests_mock
+
+from modules.smarthome.shelly import driver
+from modules.smarthome.shelly.driver import ShellyDriver
+from smarthome.smartbase0 import Sbase0
+from smarthome.smartmeas import Slshelly
+
+
+def test_shelly_measurement_in_process(monkeypatch, tmp_path):
+    # setup
+    monkeypatch.setattr(driver, "RAMDISK_PREFIX", str(tmp_path) + "/smarthome_device_ret.")
+    monkeypatch.setattr(ShellyDriver, "_info", {})
+    popen_mock = Mock()
+    monkeypatch.setattr("smarthome.smartbase0.subprocess.Popen", popen_mock)
+    measure = Slshelly()
+    measure.device_nummer = 1
+
+    # execution
+    with requests_mock.Mocker() as mock:
+        mock.get("http://192.168.1.10/shelly", json={"gen": 2, "model": "SNPM-001PCEU16"})
+        mock.get("http://192.168.1.10/rpc/Shelly.GetStatus",
+                 json={"pm1:0": {"apower": 1234.5}, "switch:0": {"output": True}})
+        measure._watt("192.168.1.10", 0, 0, "", "")
+
+    # evaluation
+    popen_mock.assert_not_called()
+    assert (measure.newwatt, measure.newwattk, measure.relais) == (1234, 0, 1)
+
+
+def test_driver_error_does_not_return_previous_answer(monkeypatch):
+    # setup
+    monkeypatch.setattr("smarthome.smartbase0.get_driver", Mock(return_value=Mock(side_effect=OSError)))
+    device = Sbase0()
+    device._driver_answer = {"power": 100}
+
+    # execution
+    device.callpro(['python3', Sbase0._prefixpy + 'shelly/watt.py', '1', '192.168.1.10'])
+
+    # evaluation
+    assert device.readret() == {}
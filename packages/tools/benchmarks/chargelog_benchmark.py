@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+""" Misst das Anhängen eines Eintrags an das Ladeprotokoll eines Monats mit 3000 Einträgen und die Abfrage des
+Ladeprotokolls mit Filter nach Ladepunkt bzw. Fahrzeug und ID-Tag. Die erste Abfrage baut den Index auf, die weiteren
+verwenden den zwischengespeicherten Index.
+
+Aufruf aus dem Repository-Verzeichnis: PYTHONPATH=packages python3 packages/tools/benchmarks/chargelog_benchmark.py
+"""
+# flake8: noqa: E402
+import json
+import logging
+from pathlib import Path
+import tempfile
+import time
+import timeit
+from unittest.mock import Mock
+
+from helpermodules import hardware_configuration, pub
+hardware_configuration._read_configuration = Mock(return_value={"dc_charging": False})
+pub.Pub.instance = Mock()
+
+from control.chargelog import chargelog, chargelog_store, process_chargelog
+from control.chargelog.chargelog_store import ChargeLogStore
+
+ENTRIES = 3000
+NUMBER = 50
+
+
+def entry(i: int) -> dict:
+    return {"chargepoint": {"id": i % 10, "name": f"LP {i % 10}", "serial_number": None, "imported_at_start": 1000 * i,
+                            "imported_at_end": 1000 * i + 5000, "exported_at_start": 0, "exported_at_end": 0},
+            "vehicle": {"id": i % 7, "name": f"EV {i % 7}", "chargemode": "instant_charging", "prio": False,
+                        "rfid": f"tag{i % 20}", "odometer": None, "soc_at_start": 20, "soc_at_end": 80,
+                        "range_at_start": 100, "range_at_end": 400},
+            "time": {"begin": f"01/{i % 28 + 1:02d}/2024, 15:00:00", "end": f"01/{i % 28 + 1:02d}/2024, 16:00:00",
+                     "time_charged": "1:00"},
+            "data": {"range_charged": 300, "exported_since_mode_switch": 0, "exported_since_plugged": 0,
+                     "imported_since_mode_switch": 5000, "imported_since_plugged": 5000, "power": 5000, "costs": 1.5,
+                     "power_source": {"grid": 0.5, "pv": 0.5, "bat": 0, "cp": 0}}}
+
+
+def measure(name: str, func, number: int = NUMBER) -> None:
+    duration = min(timeit.repeat(func, number=number, repeat=3)) / number
+    print(f"{name:<40} {duration * 1000:8.3f} ms")
+
+
+def main() -> None:
+    logging.disable(logging.CRITICAL)
+    chargelog_store.timecheck.create_timestamp_YYYYMM = lambda: "202401"
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp)
+        (path / "202401.json").write_text(json.dumps([entry(i) for i in range(ENTRIES)]))
+        store = chargelog.charge_log_store = process_chargelog.charge_log_store = ChargeLogStore(path)
+        measure("Eintrag anhängen", lambda: chargelog.write_new_entry(entry(ENTRIES)))
+        by_chargepoint = {"year": 2024, "month": "01", "filter": {"chargepoint": {"id": [3]}, "vehicle": {}}}
+        by_vehicle = {"year": 2024, "month": "01",
+                      "filter": {"chargepoint": {"id": []}, "vehicle": {"id": [2], "tag": ["tag5"]}}}
+        start = time.perf_counter()
+        process_chargelog.get_log_data(by_chargepoint)
+        print(f"{'erste Abfrage (Index aufbauen)':<40} {(time.perf_counter() - start) * 1000:8.3f} ms")
+        store.append(entry(ENTRIES))
+        measure("Abfrage Ladepunkt nach Anhängen", lambda: process_chargelog.get_log_data(by_chargepoint))
+        measure("Abfrage Fahrzeug und ID-Tag", lambda: process_chargelog.get_log_data(by_vehicle))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+""" Vergleicht die Laufzeit von Data.copy_data mit versionierten Kopien mit dem Kopieren aller Instanzen per deepcopy.
+
+Aufruf aus dem Repository-Verzeichnis: PYTHONPATH=packages python3 packages/tools/benchmarks/copy_data_benchmark.py
+"""
+# flake8: noqa: E402
+import sys
+import timeit
+from threading import Event
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from helpermodules import hardware_configuration, pub
+hardware_configuration._read_configuration = Mock(return_value={"dc_charging": False})
+pub.Pub.instance = Mock()
+
+from control import data
+from control.chargepoint.chargepoint import Chargepoint
+from control.chargepoint.chargepoint_template import CpTemplate
+from control.counter import Counter
+from control.ev.charge_template import ChargeTemplate, get_new_charge_template
+from control.ev.ev import Ev
+from control.ev.ev_template import EvTemplate
+from helpermodules.subdata import SubData
+
+CHARGEPOINTS = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+CYCLES = 50
+
+
+def setup_subdata() -> None:
+    for i in range(CHARGEPOINTS):
+        cp = Chargepoint(i, None)
+        cp.data.config.template = i
+        SubData.cp_data[f"cp{i}"] = SimpleNamespace(chargepoint=cp)
+        SubData.cp_template_data[f"cpt{i}"] = CpTemplate()
+        ev = Ev(i)
+        ev.data.charge_template = i
+        ev.data.ev_template = i
+        SubData.ev_data[f"ev{i}"] = ev
+        SubData.ev_template_data[f"et{i}"] = EvTemplate()
+        charge_template = ChargeTemplate()
+        charge_template.data.id = i
+        plan = get_new_charge_template()
+        charge_template.data.time_charging.plans = [plan] * 5
+        SubData.ev_charge_template_data[f"ct{i}"] = charge_template
+        SubData.counter_data[f"counter{i}"] = Counter(i)
+
+
+def main() -> None:
+    event = Event()
+    event.set()
+    data.data_init(event)
+    setup_subdata()
+
+    def cycle_deepcopy():
+        data.data.snapshot_cache.clear()
+        data.data.copy_data()
+
+    def cycle_snapshot():
+        data.data.copy_data()
+
+    deepcopy_time = timeit.timeit(cycle_deepcopy, number=CYCLES) / CYCLES
+    data.data.copy_data()
+    snapshot_time = timeit.timeit(cycle_snapshot, number=CYCLES) / CYCLES
+    print(f"{CHARGEPOINTS} Ladepunkte, {CYCLES} Zyklen")
+    print(f"ohne Cache:  {deepcopy_time*1000:.2f} ms je copy_data")
+    print(f"versioniert: {snapshot_time*1000:.2f} ms je copy_data")
+    print(f"kopiert: {data.data.snapshot_cache.copied}, geteilt: {data.data.snapshot_cache.shared}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+""" Misst die Abfragen der Zählerhierarchie, die Algorithmus und loadvars je Regelzyklus ausführen, für eine Hierarchie
+mit 100 Elementen. Je Zyklus werden für jeden Ladepunkt die Zähler im Zweig, für jeden Zähler die angeschlossenen
+Ladepunkte je Lademodus, Eintrag, übergeordnetes Element und Elemente für die Berechnung virtueller Zähler sowie die
+Ebenen abgefragt.
+
+Aufruf aus dem Repository-Verzeichnis: PYTHONPATH=packages python3 packages/tools/benchmarks/counter_hierarchy_benchmark.py
+"""
+# flake8: noqa: E402
+import copy
+import itertools
+import timeit
+from typing import Dict, List
+from unittest.mock import Mock
+
+from helpermodules import hardware_configuration, pub
+hardware_configuration._read_configuration = Mock(return_value={"dc_charging": False})
+pub.Pub.instance = Mock()
+
+from control import data  # noqa: F401, vermeidet zirkuläre Importe
+from control.counter_all import CounterAll
+from modules.common.component_type import ComponentType
+
+CYCLES = 200
+# Anzahl der Lademodi, für die je Zähler die Ladepunkte ermittelt werden
+MODES = 8
+
+
+def build_hierarchy() -> List[Dict]:
+    """ EVU-Zähler mit 6 Unterverteilungen, die je 3 Zähler mit 4 Ladepunkten haben, einem Hybrid-Wechselrichter und
+    einem Speicher: 1 + 6 * (1 + 3 * 5) + 3 = 100 Elemente"""
+    ids = itertools.count()
+
+    def element(type: ComponentType, children: List[Dict] = None) -> Dict:
+        return {"id": next(ids), "type": type.value, "children": children or []}
+    evu = element(ComponentType.COUNTER)
+    for _ in range(6):
+        distribution = element(ComponentType.COUNTER)
+        for _ in range(3):
+            distribution["children"].append(element(ComponentType.COUNTER, [
+                element(ComponentType.CHARGEPOINT) for _ in range(4)]))
+        evu["children"].append(distribution)
+    evu["children"].append(element(ComponentType.INVERTER, [element(ComponentType.BAT)]))
+    evu["children"].append(element(ComponentType.BAT))
+    return [evu]
+
+
+def main() -> None:
+    counter_all = CounterAll()
+    counter_all.data.get.hierarchy = build_hierarchy()
+    levels = counter_all.get_list_of_elements_per_level()
+    elements = [element for level in levels for element in level]
+    chargepoints = [e["id"] for e in elements if e["type"] == ComponentType.CHARGEPOINT.value]
+    counters = [e["id"] for e in elements if e["type"] == ComponentType.COUNTER.value]
+    print(f"{len(elements)} Elemente, {len(counters)} Zähler, {len(chargepoints)} Ladepunkte")
+
+    def cycle(counter_all: CounterAll):
+        counter_all.get_list_of_elements_per_level()
+        for num in chargepoints:
+            counter_all.get_counters_to_check(num)
+            counter_all.get_entry_of_parent(num)
+        for num in counters:
+            counter_all.get_entry_of_element(num)
+            counter_all.get_elements_for_downstream_calculation(num)
+            for _ in range(MODES):
+                counter_all.get_chargepoints_of_counter(f"counter{num}")
+
+    def copied_cycle():
+        # Die Regelung arbeitet mit einer Kopie der Daten.
+        cycle(copy.deepcopy(counter_all))
+
+    duration = min(timeit.repeat(copied_cycle, number=CYCLES, repeat=3)) / CYCLES
+    print(f"Kopie und Abfragen je Zyklus: {duration * 1000:.2f} ms")
+    duration = min(timeit.repeat(lambda: copy.deepcopy(counter_all), number=CYCLES, repeat=3)) / CYCLES
+    print(f"davon Kopie:                  {duration * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
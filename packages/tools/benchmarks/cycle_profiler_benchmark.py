@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+""" Misst den Aufwand der Laufzeitmessung je Abschnitt des Regelzyklus bei deaktivierter und aktivierter Messung. Ein
+Regelzyklus enthält etwa 30 Abschnitte und je Gerät bzw. Ladepunkt zwei Abfragen.
+
+Aufruf aus dem Repository-Verzeichnis: PYTHONPATH=packages python3 packages/tools/benchmarks/cycle_profiler_benchmark.py
+"""
+# flake8: noqa: E402
+import timeit
+from unittest.mock import Mock
+
+from helpermodules import pub
+pub.Pub.instance = Mock()
+
+from helpermodules.cycle_profiler import CycleProfiler
+
+NUMBER = 200000
+
+
+def measure(name: str, profiler: CycleProfiler) -> None:
+    def phase():
+        with profiler.phase("algorithm/surplus"):
+            pass
+
+    def cycle():
+        with profiler.cycle():
+            pass
+    print(f"{name:<12} Abschnitt: {min(timeit.repeat(phase, number=NUMBER, repeat=3)) / NUMBER * 1e9:6.0f} ns, "
+          f"Zyklus: {min(timeit.repeat(cycle, number=NUMBER, repeat=3)) / NUMBER * 1e9:6.0f} ns")
+
+
+def main() -> None:
+    profiler = CycleProfiler()
+    measure("deaktiviert", profiler)
+    profiler.configure({"active": True})
+    # Abschnitte werden nur innerhalb eines Zyklus gemessen
+    with profiler.cycle():
+        measure("aktiviert", profiler)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+""" Misst die Laufzeit von dataclass_from_dict und asdict für die Konfigurations-Dataclasses, die SubData bei jeder
+empfangenen Konfigurations-Nachricht umwandelt. Verglichen wird der erste Aufruf je Klasse, bei dem die Umwandlung
+erzeugt wird, mit den folgenden Aufrufen, die die zwischengespeicherte Umwandlung verwenden.
+
+Aufruf aus dem Repository-Verzeichnis: PYTHONPATH=packages python3 packages/tools/benchmarks/dataclass_utils_benchmark.py
+"""
+# flake8: noqa: E402
+import timeit
+from unittest.mock import Mock
+
+from helpermodules import hardware_configuration, pub
+hardware_configuration._read_configuration = Mock(return_value={"dc_charging": False})
+pub.Pub.instance = Mock()
+
+from control import data  # noqa: F401, vermeidet zirkuläre Importe
+from control.chargepoint.chargepoint_template import CpTemplateData
+from control.ev.charge_template import ChargeTemplateData
+from control.ev.ev_template import EvTemplateData
+from control.optional_data import Ocpp
+from dataclass_utils import _dataclass_asdict, _dataclass_from_dict, asdict, dataclass_from_dict
+from helpermodules.abstract_plans import ScheduledChargingPlan, TimeChargingPlan
+from modules.chargepoints.mqtt.config import Mqtt
+from modules.common.abstract_vehicle import GeneralVehicleConfig
+from modules.devices.fronius.fronius.config import Fronius, FroniusInverterSetup, FroniusSmCounterSetup
+from modules.devices.generic.mqtt.config import Mqtt as MqttDevice
+
+NUMBER = 2000
+
+
+def config_objects():
+    charge_template = ChargeTemplateData()
+    charge_template.time_charging.plans = [TimeChargingPlan() for _ in range(5)]
+    charge_template.chargemode.scheduled_charging.plans = [ScheduledChargingPlan() for _ in range(5)]
+    return [charge_template, EvTemplateData(), CpTemplateData(), Ocpp(), GeneralVehicleConfig(), Mqtt(), Fronius(),
+            FroniusInverterSetup(), FroniusSmCounterSetup(), MqttDevice()]
+
+
+def clear_caches() -> None:
+    _dataclass_from_dict._builders.clear()
+    _dataclass_from_dict._converters.clear()
+    _dataclass_asdict._serializers.clear()
+
+
+def measure(name: str, func, clear: bool) -> None:
+    def run():
+        if clear:
+            clear_caches()
+        func()
+    duration = min(timeit.repeat(run, number=NUMBER, repeat=3)) / NUMBER
+    print(f"{name:<40} {duration * 1e6:8.1f} µs")
+
+
+def main() -> None:
+    objects = config_objects()
+    payloads = [(type(o), asdict(o)) for o in objects]
+
+    def from_dict():
+        for cls, payload in payloads:
+            dataclass_from_dict(cls, payload)
+
+    def to_dict():
+        for o in objects:
+            asdict(o)
+
+    print(f"{len(objects)} Konfigurationen je Durchlauf")
+    measure("dataclass_from_dict, erster Aufruf", from_dict, True)
+    measure("dataclass_from_dict, zwischengespeichert", from_dict, False)
+    measure("asdict, erster Aufruf", to_dict, True)
+    measure("asdict, zwischengespeichert", to_dict, False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+""" Misst die Abfragen der Ladepunkte je Lademodus und Zähler, die der Algorithmus je Regelzyklus ausführt, für 200
+Ladepunkte an 10 Unterverteilungen. Die Daten werden wie in control/algorithm/integration_test/conftest.py aufgebaut.
+Verglichen wird die Abfrage mit dem Index des Regelzyklus mit der Abfrage ohne Index sowie ein vollständiger Durchlauf
+des Algorithmus.
+
+Aufruf aus dem Repository-Verzeichnis: PYTHONPATH=packages python3 packages/tools/benchmarks/filter_chargepoints_benchmark.py
+"""
+# flake8: noqa: E402
+import logging
+import timeit
+from unittest.mock import Mock
+
+from helpermodules import hardware_configuration, pub
+hardware_configuration._read_configuration = Mock(return_value={"dc_charging": False})
+pub.Pub.instance = Mock()
+
+from control import data, loadmanagement
+from control.algorithm import common, filter_chargepoints
+from control.algorithm.algorithm import Algorithm
+from control.algorithm.chargemodes import (CONSIDERED_CHARGE_MODES_ADDITIONAL_CURRENT,
+                                           CONSIDERED_CHARGE_MODES_MIN_CURRENT, CONSIDERED_CHARGE_MODES_SURPLUS)
+from control.bat_all import BatAll
+from control.chargemode import Chargemode
+from control.chargepoint.chargepoint import Chargepoint
+from control.chargepoint.chargepoint_state import ChargepointState
+from control.chargepoint.chargepoint_template import CpTemplate
+from control.counter import Counter
+from control.counter_all import CounterAll
+from control.ev.ev import Ev
+from control.io_device import IoActions
+from control.pv import Pv
+
+DISTRIBUTIONS = 10
+CHARGEPOINTS_PER_DISTRIBUTION = 20
+NUMBER = 20
+# Lademodus, Submodus, Priorität
+MODES = ((Chargemode.INSTANT_CHARGING, Chargemode.INSTANT_CHARGING, False),
+         (Chargemode.PV_CHARGING, Chargemode.PV_CHARGING, False),
+         (Chargemode.SCHEDULED_CHARGING, Chargemode.INSTANT_CHARGING, True),
+         (Chargemode.ECO_CHARGING, Chargemode.PV_CHARGING, True),
+         (Chargemode.STOP, Chargemode.STOP, False))
+
+
+def setup_data() -> None:
+    data.data_init(Mock())
+    hierarchy = [{"id": 0, "type": "counter", "children": []}]
+    data.data.counter_data["counter0"] = Counter(0)
+    cp_num = 1000
+    for distribution in range(1, DISTRIBUTIONS + 1):
+        hierarchy[0]["children"].append({"id": distribution, "type": "counter", "children": []})
+        data.data.counter_data[f"counter{distribution}"] = Counter(distribution)
+        for _ in range(CHARGEPOINTS_PER_DISTRIBUTION):
+            cp_num += 1
+            hierarchy[0]["children"][-1]["children"].append({"id": cp_num, "type": "cp", "children": []})
+            cp = data.data.cp_data[f"cp{cp_num}"] = Chargepoint(cp_num, None)
+            cp.template = CpTemplate()
+            cp.data.config.phase_1 = cp_num % 3 + 1
+            cp.data.set.charging_ev_data = Ev(cp_num)
+            cp.data.set.charging_ev_data.ev_template.data.max_current_single_phase = 32
+            cp.data.get.plug_state = True
+            cp.data.get.charge_state = True
+            cp.data.get.currents = [16]*3
+            cp.data.set.plug_time = f"12/01/2022, 15:{cp_num % 60:02d}:11"
+            cp.data.set.log.imported_since_plugged = cp_num % 7
+            control_parameter = cp.data.control_parameter
+            control_parameter.chargemode, control_parameter.submode, control_parameter.prio = MODES[cp_num % 5]
+            control_parameter.min_current = 6
+            control_parameter.required_current = 16
+            control_parameter.required_currents = [16]*3
+            control_parameter.state = ChargepointState.CHARGING_ALLOWED
+    for counter in data.data.counter_data.values():
+        counter.data.get.currents = [10]*3
+        counter.data.get.power = 6900
+        counter.data.config.max_currents = [400]*3
+        counter.data.config.max_total_power = 300000
+        counter.data.set.raw_power_left = 300000
+        counter.data.set.raw_currents_left = [400]*3
+    data.data.bat_data.update({"all": BatAll()})
+    data.data.pv_data.update({"all": Pv(0)})
+    data.data.counter_all_data = CounterAll()
+    data.data.counter_all_data.data.get.hierarchy = hierarchy
+    data.data.io_actions = IoActions()
+
+
+def filter_cycle() -> None:
+    # Abfragen von MinCurrent, AdditionalCurrent und SurplusControlled
+    for modes in (CONSIDERED_CHARGE_MODES_MIN_CURRENT, CONSIDERED_CHARGE_MODES_ADDITIONAL_CURRENT,
+                  CONSIDERED_CHARGE_MODES_SURPLUS):
+        for mode_tuple, counter in common.mode_and_counter_generator(modes):
+            filter_chargepoints.get_preferenced_chargepoint_charging(
+                filter_chargepoints.get_chargepoints_by_mode_and_counter(mode_tuple, f"counter{counter.num}"))
+
+
+def measure(name: str, func) -> None:
+    duration = min(timeit.repeat(func, number=NUMBER, repeat=3)) / NUMBER
+    print(f"{name:<34} {duration * 1000:8.2f} ms")
+
+
+def main() -> None:
+    logging.disable(logging.CRITICAL)
+    loadmanagement.get_component_name_by_id = Mock(return_value="Garage")
+    setup_data()
+    print(f"{len(data.data.cp_data)} Ladepunkte, {len(data.data.counter_data)} Zähler")
+    filter_chargepoints.clear_index()
+    measure("Abfragen ohne Index", filter_cycle)
+
+    def indexed_filter_cycle():
+        filter_chargepoints.build_index()
+        filter_cycle()
+        filter_chargepoints.clear_index()
+    measure("Abfragen mit Index", indexed_filter_cycle)
+    measure("Algorithmus", Algorithm().calc_current)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+""" Misst einen Regelzyklus, in dem 10 Geräte je eine neue Session über req.get_http_session anlegen und einen lokalen
+HTTP-Server abfragen. Verglichen werden eine eigene Verbindung je Session (bisheriges Verhalten), der gemeinsame
+Verbindungspool und der Pool mit einer Antwort, die der Server mit ETag versieht. Gezählt werden die vom Server
+angenommenen Verbindungen. Bei HTTPS entfällt mit dem Pool zusätzlich der TLS-Handshake.
+
+Aufruf aus dem Repository-Verzeichnis: PYTHONPATH=packages python3 packages/tools/benchmarks/http_pool_benchmark.py
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import socket
+from threading import Thread
+import timeit
+
+from requests.adapters import HTTPAdapter
+
+from modules.common import req
+from modules.common.http_connection_pool import http_adapter
+
+DEVICES = 10
+NUMBER = 50
+BODY = b'{"power": 1000, "imported": 123456.7, "exported": 2345.6}' * 20
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+
+    def setup(self) -> None:
+        super().setup()
+        # Header und Inhalt werden getrennt geschrieben, ohne TCP_NODELAY verzögert der Nagle-Algorithmus bei Keep-Alive
+        # jede Antwort.
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        Handler.connections += 1
+
+    def do_GET(self) -> None:
+        if self.path == "/etag" and self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        if self.path == "/etag":
+            self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def unpooled_session() -> req.CustomSession:
+    session = req.get_http_session()
+    session.mount("http://", HTTPAdapter())
+    return session
+
+
+def measure(name: str, url: str, get_session) -> None:
+    def cycle():
+        for _ in range(DEVICES):
+            with get_session() as session:
+                session.get(url)
+    Handler.connections = 0
+    duration = min(timeit.repeat(cycle, number=NUMBER, repeat=3)) / NUMBER
+    print(f"{name:<28} {duration * 1000:6.2f} ms je Zyklus, {Handler.connections / (3 * NUMBER):5.2f} Verbindungen "
+          "je Zyklus")
+
+
+def main() -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    measure("eigene Verbindung je Session", f"{url}/plain", unpooled_session)
+    measure("gemeinsamer Pool", f"{url}/plain", req.get_http_session)
+    measure("gemeinsamer Pool mit ETag", f"{url}/etag", req.get_http_session)
+    print(http_adapter.statistics_report())
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
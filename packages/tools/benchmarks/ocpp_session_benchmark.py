@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+""" Vergleicht das Senden von OCPP-Nachrichten mit je einer neuen Event-Loop und Websocket-Verbindung pro Nachricht,
+wie bisher, mit der dauerhaften Verbindung des OcppSessionManagers.
+
+Als Backend dient das lokale OCPP-Backend aus packages/tools/ocpp_csms_stub.py.
+
+Aufruf aus dem Repository-Verzeichnis: PYTHONPATH=packages python3 packages/tools/benchmarks/ocpp_session_benchmark.py
+"""
+# flake8: noqa: E402
+import asyncio
+import statistics
+import time
+import warnings
+
+warnings.simplefilter("ignore", DeprecationWarning)
+
+import websockets
+from ocpp.v16 import call, ChargePoint as OcppChargepoint
+
+from helpermodules import timecheck  # noqa: F401, vor error_handling importieren (zirkulärer Import)
+from control.ocpp_session import OcppSessionManager
+from tools.ocpp_csms_stub import CsmsStub, OCPP_VERSION
+
+CALLS = 200
+
+
+def per_call(url: str, payload) -> None:
+    async def make_call():
+        async with websockets.connect(f"{url}cp1", subprotocols=[OCPP_VERSION]) as ws:
+            cp = OcppChargepoint("cp1", ws, 2)
+            reader = asyncio.create_task(cp.start())
+            await cp.call(payload)
+            reader.cancel()
+    asyncio.run(make_call())
+
+
+def measure(name: str, send) -> None:
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        call_start = time.perf_counter()
+        send()
+        latencies.append(time.perf_counter() - call_start)
+    duration = time.perf_counter() - start
+    print(f"{name:<22} {CALLS / duration:8.0f} Nachrichten/s, Latenz Median {statistics.median(latencies) * 1000:6.2f} "
+          f"ms, max {max(latencies) * 1000:6.2f} ms")
+
+
+def main() -> None:
+    csms = CsmsStub().start()
+    manager = OcppSessionManager()
+    print(f"{CALLS} Heartbeats")
+    measure("Verbindung je Nachricht", lambda: per_call(csms.url, call.Heartbeat()))
+    measure("Dauerhafte Verbindung", lambda: manager.call(csms.url, OCPP_VERSION, "cp1", call.Heartbeat()))
+    print(f"Verbindungen zum Backend: {csms.connections['cp1']}")
+    csms.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+""" Misst die Auswertung der Strompreise in einem Regelzyklus: Für jeden Ladepunkt mit Zielladen werden die günstigen
+Zeitslots bis zum Termin ermittelt und geprüft, ob der aktuelle Zeitslot ausgewählt ist. Der Speicher prüft die
+Preisgrenze. Die Preisliste enthält Viertelstundenpreise für zwei Tage.
+
+Aufruf aus dem Repository-Verzeichnis: PYTHONPATH=packages python3 packages/tools/benchmarks/price_timeline_benchmark.py
+"""
+# flake8: noqa: E402
+import logging
+import random
+import timeit
+from unittest.mock import Mock
+
+from helpermodules import hardware_configuration, pub
+hardware_configuration._read_configuration = Mock(return_value={"dc_charging": False})
+pub.Pub.instance = Mock()
+
+from control import data  # noqa: F401 (Importreihenfolge wie im Regelbetrieb)
+from control.optional import Optional
+from helpermodules import timecheck
+
+START = 1698188400
+SLOTS = 192
+CHARGEPOINTS = 10
+NUMBER = 200
+
+
+def cycle(optional: Optional) -> None:
+    for i in range(CHARGEPOINTS):
+        hours = optional.ep_get_loading_hours(3600 + 600 * i, 8 * 3600 + 1800 * i)
+        optional.ep_is_charging_allowed_hours_list(hours)
+    optional.ep_is_charging_allowed_price_threshold(0.0003)
+
+
+def main() -> None:
+    logging.disable(logging.CRITICAL)
+    random.seed(0)
+    optional = Optional()
+    optional.data.electricity_pricing.configured = True
+    optional.data.electricity_pricing.get.prices = {str(START + 900 * i): random.uniform(0.0002, 0.0004)
+                                                    for i in range(SLOTS)}
+    timecheck.create_timestamp = Mock(return_value=START + 5000)
+    duration = min(timeit.repeat(lambda: cycle(optional), number=NUMBER, repeat=3)) / NUMBER
+    print(f"{'Regelzyklus mit ' + str(CHARGEPOINTS) + ' Ladepunkten':<40} {duration * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
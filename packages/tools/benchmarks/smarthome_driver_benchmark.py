@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+""" Vergleicht die CPU-Zeit je Regelzyklus für die Leistungsmessung von SmartHome-Geräten, wenn der Treiber wie bisher
+je Messung als eigener python3-Prozess gestartet wird, mit dem Aufruf des Treibers im Prozess des SmartHome-Handlers.
+
+Als Geräte dient ein lokaler HTTP-Server, der die Antworten eines Shelly Plus PM (Gen 2) liefert.
+
+Aufruf aus dem Repository-Verzeichnis: PYTHONPATH=packages python3 packages/tools/benchmarks/smarthome_driver_benchmark.py
+"""
+# flake8: noqa: E402
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from modules.smarthome.shelly import driver
+from smarthome.smartdriver import DRIVERS
+
+DEVICES = 9
+CYCLES = 10
+RESPONSES = {
+    "/shelly": {"gen": 2, "model": "SNPM-001PCEU16"},
+    "/rpc/Shelly.GetStatus": {"pm1:0": {"apower": 1234.5}, "switch:0": {"output": True},
+                              "temperature:100": {"tC": 21.5}},
+}
+SUBPROCESS_SCRIPT = """
+import json, sys
+from modules.smarthome.shelly import driver
+driver.RAMDISK_PREFIX = sys.argv[1]
+answer = driver.ShellyDriver.from_args(sys.argv[2:]).watt()
+with open(sys.argv[1] + sys.argv[2], 'w') as f:
+    json.dump(json.dumps(answer), f)
+"""
+
+
+class ShellyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = json.dumps(RESPONSES[self.path]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def cpu_time() -> float:
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def measure(name: str, cycle) -> None:
+    start_cpu, start_wall = cpu_time(), time.perf_counter()
+    for _ in range(CYCLES):
+        cycle()
+    cpu = (cpu_time() - start_cpu) / CYCLES
+    wall = (time.perf_counter() - start_wall) / CYCLES
+    print(f"{name:<14} CPU {cpu * 1000:8.1f} ms/Zyklus, Dauer {wall * 1000:8.1f} ms/Zyklus")
+
+
+def main() -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ShellyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    address = f"127.0.0.1:{server.server_address[1]}"
+    with tempfile.TemporaryDirectory() as ramdisk:
+        ramdisk_prefix = ramdisk + "/smarthome_device_ret."
+        driver.RAMDISK_PREFIX = ramdisk_prefix
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+
+        def subprocess_cycle():
+            for device in range(DEVICES):
+                subprocess.run([sys.executable, "-c", SUBPROCESS_SCRIPT, ramdisk_prefix, str(device), address, "0",
+                                "0", "0", "", ""], env=env, check=True)
+
+        def in_process_cycle():
+            for device in range(DEVICES):
+                DRIVERS["shelly/watt.py"]([str(device), address, "0", "0", "0", "", ""])
+
+        print(f"{DEVICES} Geräte, {CYCLES} Zyklen")
+        measure("Subprozess", subprocess_cycle)
+        measure("Im Prozess", in_process_cycle)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
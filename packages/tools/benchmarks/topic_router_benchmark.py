@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+""" Vergleicht die Zuordnung von Topics zu Handlern in SubData über die frühere if-Kette mit Teilstring-Vergleichen
+mit dem TopicRouter.
+
+Ohne Parameter wird ein synthetischer Abzug der retained Topics erzeugt. Alternativ kann ein Abzug im Format von
+"mosquitto_sub -v -t 'openWB/#'" übergeben werden (ein Topic und Payload pro Zeile).
+
+Aufruf aus dem Repository-Verzeichnis: PYTHONPATH=packages python3 packages/tools/benchmarks/topic_router_benchmark.py
+"""
+# flake8: noqa: E402
+import sys
+import timeit
+from unittest.mock import Mock
+
+from helpermodules import hardware_configuration, pub
+hardware_configuration._read_configuration = Mock(return_value={"dc_charging": False})
+pub.Pub.instance = Mock()
+
+from control import data  # noqa: F401, löst den zirkulären Import von subdata auf
+from helpermodules.subdata import SubData
+
+REPETITIONS = 20
+PREFIXES = ["openWB/vehicle/template/charge_template/", "openWB/vehicle/template/ev_template/", "openWB/vehicle/",
+            "openWB/chargepoint/template/", "openWB/chargepoint/", "openWB/pv/", "openWB/bat/", "openWB/general/",
+            "openWB/graph/", "openWB/io/action", "openWB/io/states", "openWB/internal_io/states",
+            "openWB/internal_chargepoint/", "openWB/optional/", "openWB/counter/", "openWB/system/",
+            "openWB/LegacySmartHome/"]
+
+
+def synthetic_topics() -> list:
+    topics = []
+    for i in range(30):
+        topics.extend(f"openWB/chargepoint/{i}/get/{key}" for key in
+                      ("power", "currents", "voltages", "imported", "exported", "plug_state", "charge_state"))
+        topics.extend(f"openWB/chargepoint/{i}/set/{key}" for key in ("current", "manual_lock", "plug_time"))
+        topics.extend(f"openWB/vehicle/{i}/get/{key}" for key in ("soc", "range", "soc_timestamp"))
+        topics.append(f"openWB/vehicle/template/charge_template/{i}")
+        topics.append(f"openWB/vehicle/template/ev_template/{i}")
+        topics.extend(f"openWB/counter/{i}/get/{key}" for key in ("power", "currents", "imported", "exported"))
+        topics.extend(f"openWB/pv/{i}/get/{key}" for key in ("power", "exported"))
+        topics.extend(f"openWB/bat/{i}/get/{key}" for key in ("power", "soc", "imported"))
+    topics.extend(f"openWB/general/{key}" for key in ("control_interval", "chargemode_config/pv_charging/feed_in_yield",
+                                                      "prices/grid", "extern"))
+    topics.extend(["openWB/system/subdata_initialized", "openWB/system/device/0/config", "openWB/graph/config/duration",
+                   "openWB/command/command_completed"])
+    return topics
+
+
+def read_topics(path: str) -> list:
+    with open(path, "r") as f:
+        return [line.split(" ", 1)[0] for line in f if line.strip()]
+
+
+def if_chain(topic: str) -> int:
+    for i, prefix in enumerate(PREFIXES):
+        if prefix in topic:
+            return i
+    if "openWB/command/command_completed" == topic:
+        return len(PREFIXES)
+    return -1
+
+
+def main() -> None:
+    topics = read_topics(sys.argv[1]) if len(sys.argv) > 1 else synthetic_topics()
+    router = SubData.__new__(SubData)._create_router()
+    if_chain_time = timeit.timeit(lambda: [if_chain(topic) for topic in topics], number=REPETITIONS)
+    router_time = timeit.timeit(lambda: [router.match(topic) for topic in topics], number=REPETITIONS)
+    messages = len(topics) * REPETITIONS
+    print(f"{len(topics)} Topics")
+    print(f"if-Kette:    {messages / if_chain_time:12.0f} Nachrichten/s")
+    print(f"TopicRouter: {messages / router_time:12.0f} Nachrichten/s")
+
+
+if __name__ == "__main__":
+    main()
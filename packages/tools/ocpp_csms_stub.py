@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+""" Einfaches OCPP-1.6-Backend (CSMS) zum Testen des OCPP-Clients.
+
+Beantwortet BootNotification, Heartbeat, StartTransaction, StopTransaction und MeterValues und zählt die Verbindungen
+und empfangenen Nachrichten.
+
+Aufruf aus dem Repository-Verzeichnis: PYTHONPATH=packages python3 packages/tools/ocpp_csms_stub.py [Port]
+"""
+import asyncio
+from datetime import datetime, timezone
+import itertools
+import sys
+import threading
+from typing import Dict, List
+
+import websockets
+from ocpp.routing import on
+from ocpp.v16 import ChargePoint, call_result
+
+OCPP_VERSION = "ocpp1.6"
+
+
+class CsmsChargepoint(ChargePoint):
+    def __init__(self, csms: "CsmsStub", *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.csms = csms
+
+    @on("BootNotification")
+    def on_boot_notification(self, **kwargs):
+        self.csms.received.append(("BootNotification", kwargs))
+        return call_result.BootNotification(current_time=datetime.now(timezone.utc).isoformat(), interval=300,
+                                            status="Accepted")
+
+    @on("Heartbeat")
+    def on_heartbeat(self, **kwargs):
+        self.csms.received.append(("Heartbeat", kwargs))
+        return call_result.Heartbeat(current_time=datetime.now(timezone.utc).isoformat())
+
+    @on("StartTransaction")
+    def on_start_transaction(self, **kwargs):
+        self.csms.received.append(("StartTransaction", kwargs))
+        return call_result.StartTransaction(transaction_id=next(self.csms.transaction_ids),
+                                            id_tag_info={"status": "Accepted"})
+
+    @on("StopTransaction")
+    def on_stop_transaction(self, **kwargs):
+        self.csms.received.append(("StopTransaction", kwargs))
+        return call_result.StopTransaction()
+
+    @on("MeterValues")
+    def on_meter_values(self, **kwargs):
+        self.csms.received.append(("MeterValues", kwargs))
+        return call_result.MeterValues()
+
+
+class CsmsStub:
+    def __init__(self, port: int = 0) -> None:
+        self.port = port
+        self.connections: Dict[str, int] = {}
+        self.received: List = []
+        self.transaction_ids = itertools.count(1)
+        self._loop = asyncio.new_event_loop()
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}/"
+
+    async def _handle(self, websocket, path: str) -> None:
+        chargebox_id = path.strip("/")
+        self.connections[chargebox_id] = self.connections.get(chargebox_id, 0) + 1
+        try:
+            await CsmsChargepoint(self, chargebox_id, websocket).start()
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    def start(self) -> "CsmsStub":
+        """ startet das Backend in einem eigenen Thread"""
+        started = threading.Event()
+
+        async def serve():
+            self._server = await websockets.serve(self._handle, "127.0.0.1", self.port, subprotocols=[OCPP_VERSION])
+            self.port = self._server.sockets[0].getsockname()[1]
+            started.set()
+        threading.Thread(target=self._loop.run_forever, name="CSMS Stub", daemon=True).start()
+        asyncio.run_coroutine_threadsafe(serve(), self._loop)
+        started.wait(5)
+        return self
+
+    def stop(self) -> None:
+        async def close():
+            self._server.close()
+            await self._server.wait_closed()
+        asyncio.run_coroutine_threadsafe(close(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+if __name__ == "__main__":
+    csms = CsmsStub(int(sys.argv[1]) if len(sys.argv) > 1 else 9000).start()
+    print(f"OCPP-Backend läuft unter {csms.url}")
+    threading.Event().wait()